@@ -0,0 +1,70 @@
+"""Add ledger_transaction.dedup_hash with unique index
+
+Revision ID: 018_add_ledger_dedup_hash
+Revises: 017_add_upload_history
+Create Date: 2026-10-17
+"""
+import hashlib
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '018_add_ledger_dedup_hash'
+down_revision: Union[str, None] = '017_add_upload_history'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _dedup_hash(tx_date, tx_time, description, amount) -> str:
+    # app.services.ledger_loader.ledger_dedup_hash 와 동일한 정규화 규칙
+    amount_str = ""
+    if amount is not None:
+        amount_str = f"{float(amount):.2f}"
+        if amount_str == "-0.00":
+            amount_str = "0.00"
+    parts = (
+        tx_date.strftime("%Y-%m-%d") if tx_date else "",
+        str(tx_time) if tx_time else "",
+        str(description) if description else "",
+        amount_str,
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE ledger_transaction ADD COLUMN IF NOT EXISTS dedup_hash VARCHAR(64)")
+
+    # 기존 행 backfill — 같은 키의 중복 행은 가장 오래된(id 최소) 행에만 hash를 부여하고
+    # 나머지는 NULL로 남겨 데이터를 지우지 않고 유니크 인덱스를 만들 수 있게 합니다.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("""
+        SELECT id, transaction_date, transaction_time, description, amount
+        FROM ledger_transaction
+        ORDER BY id
+    """))
+    seen: set = set()
+    updates: list = []
+    update_stmt = sa.text("UPDATE ledger_transaction SET dedup_hash = :h WHERE id = :id")
+    for row in rows.fetchall():
+        h = _dedup_hash(row.transaction_date, row.transaction_time, row.description, row.amount)
+        if h in seen:
+            continue
+        seen.add(h)
+        updates.append({"id": row.id, "h": h})
+        if len(updates) >= BACKFILL_BATCH_SIZE:
+            conn.execute(update_stmt, updates)
+            updates = []
+    if updates:
+        conn.execute(update_stmt, updates)
+
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_ledger_transaction_dedup_hash
+        ON ledger_transaction (dedup_hash)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ux_ledger_transaction_dedup_hash")
+    op.execute("ALTER TABLE ledger_transaction DROP COLUMN IF EXISTS dedup_hash")
@@ -0,0 +1,30 @@
+"""Add upload_history.import_kind and content_sha256
+
+Revision ID: 019_upload_history_content_hash
+Revises: 018_add_ledger_dedup_hash
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '019_upload_history_content_hash'
+down_revision: Union[str, None] = '018_add_ledger_dedup_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE upload_history ADD COLUMN IF NOT EXISTS import_kind VARCHAR")
+    op.execute("ALTER TABLE upload_history ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64)")
+    # 기존 이력은 모두 뱅크샐러드 import 결과 (가계부 단독 import는 이력을 남기지 않았음)
+    op.execute("UPDATE upload_history SET import_kind = 'banksalad' WHERE import_kind IS NULL")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_upload_history_content_sha256 ON upload_history (content_sha256)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_upload_history_content_sha256")
+    op.execute("ALTER TABLE upload_history DROP COLUMN IF EXISTS content_sha256")
+    op.execute("ALTER TABLE upload_history DROP COLUMN IF EXISTS import_kind")
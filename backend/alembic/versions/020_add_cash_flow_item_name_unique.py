@@ -0,0 +1,70 @@
+"""Make cash_flow.item_name unique for bulk upsert
+
+같은 항목명의 중복 행은 유니크 인덱스를 만들기 전에 하나로 합칩니다 (손실 있음).
+- 가장 최근 행(id 최대)을 남기고, monthly_data는 오래된 행부터 차례로 덮어써 월마다 최근 행의 값을 남깁니다.
+  출처 범위(month_sources, migration 023) 기록 전이므로 cash_flow_service.CashFlowMerger의 출처 불명 규칙
+  (나중 값 우선)과 같습니다. 항목 유형 · 합계 · 월평균은 남긴 행의 값입니다.
+- 나머지 행은 삭제되며 downgrade로 되돌릴 수 없습니다. 합친 항목명과 삭제한 행 수는 로그에 남깁니다.
+
+Revision ID: 020_cash_flow_item_name_unique
+Revises: 019_upload_history_content_hash
+Create Date: 2026-10-17
+"""
+import json
+import logging
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '020_cash_flow_item_name_unique'
+down_revision: Union[str, None] = '019_upload_history_content_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _monthly_data(value) -> dict:
+    # PostgreSQL JSON은 dict로, SQLite는 문자열로 읽힘
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or {}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("""
+        SELECT id, item_name, monthly_data
+        FROM cash_flow
+        WHERE item_name IN (SELECT item_name FROM cash_flow GROUP BY item_name HAVING COUNT(*) > 1)
+        ORDER BY item_name, id
+    """)).fetchall()
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault(row.item_name, []).append(row)
+
+    update_stmt = sa.text("UPDATE cash_flow SET monthly_data = :data WHERE id = :id").bindparams(
+        sa.bindparam("data", type_=sa.JSON),
+    )
+    removed = []
+    for name, group in groups.items():
+        merged: dict = {}
+        for row in group:
+            merged.update(_monthly_data(row.monthly_data))
+        conn.execute(update_stmt, {"id": group[-1].id, "data": merged})
+        removed.extend(row.id for row in group[:-1])
+        logger.info("cash_flow '%s': 중복 %d행을 id=%d에 합침", name, len(group) - 1, group[-1].id)
+    if removed:
+        conn.execute(sa.text("DELETE FROM cash_flow WHERE id IN :ids").bindparams(
+            sa.bindparam("ids", expanding=True),
+        ), {"ids": removed})
+        logger.info("cash_flow 중복 행 %d개 삭제 (항목 %d개)", len(removed), len(groups))
+
+    op.execute("DROP INDEX IF EXISTS ix_cash_flow_item_name")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_cash_flow_item_name ON cash_flow (item_name)")
+
+
+def downgrade() -> None:
+    # 합치며 삭제한 중복 행은 복원하지 않음
+    op.execute("DROP INDEX IF EXISTS ux_cash_flow_item_name")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_cash_flow_item_name ON cash_flow (item_name)")
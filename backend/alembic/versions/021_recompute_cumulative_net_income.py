@@ -0,0 +1,34 @@
+"""Recompute monthly_summary.cumulative_net_income once
+
+수동 편집(PUT/POST/DELETE /api/monthly-summaries)은 지금까지 누적값을 갱신하지 않았습니다.
+이후로는 변경된 월부터만 증분 갱신하므로, 기존 값을 한 번 전체 재계산해 기준을 맞춥니다.
+
+Revision ID: 021_recompute_cumulative
+Revises: 020_cash_flow_item_name_unique
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '021_recompute_cumulative'
+down_revision: Union[str, None] = '020_cash_flow_item_name_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        UPDATE monthly_summary
+        SET cumulative_net_income = c.cumulative
+        FROM (
+            SELECT id,
+                   SUM(COALESCE(net_income, 0)) OVER (PARTITION BY year ORDER BY month, id) AS cumulative
+            FROM monthly_summary
+        ) AS c
+        WHERE monthly_summary.id = c.id
+    """)
+
+
+def downgrade() -> None:
+    # 데이터 재계산만 수행하므로 되돌릴 스키마 변경 없음
+    pass
@@ -0,0 +1,30 @@
+"""Add upload_history.ledger_source and ledger_high_water
+
+Revision ID: 022_upload_history_ledger_mark
+Revises: 021_recompute_cumulative
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '022_upload_history_ledger_mark'
+down_revision: Union[str, None] = '021_recompute_cumulative'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE upload_history ADD COLUMN IF NOT EXISTS ledger_source VARCHAR")
+    op.execute("ALTER TABLE upload_history ADD COLUMN IF NOT EXISTS ledger_high_water TIMESTAMP WITHOUT TIME ZONE")
+    # 기존 이력은 어느 거래까지 반영됐는지 알 수 없으므로 비워 둠 → 업그레이드 후 첫 import는 전체 검사
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_upload_history_ledger_mark "
+        "ON upload_history (ledger_source, ledger_high_water)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_upload_history_ledger_mark")
+    op.execute("ALTER TABLE upload_history DROP COLUMN IF EXISTS ledger_high_water")
+    op.execute("ALTER TABLE upload_history DROP COLUMN IF EXISTS ledger_source")
@@ -0,0 +1,22 @@
+"""Add cash_flow.month_sources for month-level merge across uploads
+
+Revision ID: 023_cash_flow_month_sources
+Revises: 022_upload_history_ledger_mark
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '023_cash_flow_month_sources'
+down_revision: Union[str, None] = '022_upload_history_ledger_mark'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 기존 월 값은 출처를 알 수 없으므로 비워 둠 → 다음 import에서 범위가 있는 업로드 값으로 대체됨
+    op.execute("ALTER TABLE cash_flow ADD COLUMN IF NOT EXISTS month_sources JSON")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE cash_flow DROP COLUMN IF EXISTS month_sources")
@@ -0,0 +1,30 @@
+"""Add composite indexes for ledger keyset pagination
+
+Revision ID: 024_ledger_keyset_indexes
+Revises: 023_cash_flow_month_sources
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '024_ledger_keyset_indexes'
+down_revision: Union[str, None] = '023_cash_flow_month_sources'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (transaction_date DESC NULLS FIRST, id DESC) 목록 정렬 = 아래 인덱스의 역방향 스캔
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_ledger_transaction_date_id "
+        "ON ledger_transaction (transaction_date, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_ledger_transaction_category_date_id "
+        "ON ledger_transaction (category, transaction_date, id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_ledger_transaction_category_date_id")
+    op.execute("DROP INDEX IF EXISTS ix_ledger_transaction_date_id")
@@ -0,0 +1,58 @@
+"""Add ledger_rollup daily aggregate table
+
+Revision ID: 025_ledger_rollup
+Revises: 024_ledger_keyset_indexes
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '025_ledger_rollup'
+down_revision: Union[str, None] = '024_ledger_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS ledger_rollup (
+            id SERIAL NOT NULL,
+            day DATE NOT NULL,
+            transaction_type VARCHAR DEFAULT '' NOT NULL,
+            category VARCHAR DEFAULT '' NOT NULL,
+            subcategory VARCHAR DEFAULT '' NOT NULL,
+            payment_method VARCHAR DEFAULT '' NOT NULL,
+            total NUMERIC(18, 2) DEFAULT 0 NOT NULL,
+            abs_total NUMERIC(18, 2) DEFAULT 0 NOT NULL,
+            count INTEGER DEFAULT 0 NOT NULL,
+            min_amount NUMERIC(15, 2),
+            max_amount NUMERIC(15, 2),
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ledger_rollup_id ON ledger_rollup (id)")
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_ledger_rollup_key "
+        "ON ledger_rollup (day, transaction_type, category, subcategory, payment_method)"
+    )
+    # 기존 거래로 채움 (ledger_rollup_service.rebuild_rollup과 같은 규칙)
+    op.execute("""
+        INSERT INTO ledger_rollup
+            (day, transaction_type, category, subcategory, payment_method,
+             total, abs_total, count, min_amount, max_amount)
+        SELECT
+            transaction_date::date,
+            COALESCE(transaction_type, ''), COALESCE(category, ''),
+            COALESCE(subcategory, ''), COALESCE(payment_method, ''),
+            COALESCE(SUM(amount), 0), COALESCE(SUM(ABS(amount)), 0), COUNT(*), MIN(amount), MAX(amount)
+        FROM ledger_transaction
+        WHERE transaction_date IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ux_ledger_rollup_key")
+    op.execute("DROP INDEX IF EXISTS ix_ledger_rollup_id")
+    op.execute("DROP TABLE IF EXISTS ledger_rollup")
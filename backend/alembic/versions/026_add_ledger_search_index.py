@@ -0,0 +1,36 @@
+"""Add trigram index for ledger description/memo search
+
+Revision ID: 026_ledger_search_trgm
+Revises: 025_ledger_rollup
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '026_ledger_search_trgm'
+down_revision: Union[str, None] = '025_ledger_rollup'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 검색(ledger_search_service)의 ILIKE 부분 일치와 %> 유사도 조건을 모두 처리하는 GIN trigram 인덱스.
+    # 식은 ledger_search_service.SEARCH_DOCUMENT와 같아야 합니다.
+    # pg_trgm(contrib)이 없는 서버에서는 건너뛰고, 검색은 인덱스 없이 동작합니다.
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX IF NOT EXISTS ix_ledger_transaction_search_trgm
+                    ON ledger_transaction
+                    USING gin ((coalesce(description, '') || ' ' || coalesce(memo, '')) gin_trgm_ops);
+            END IF;
+        END
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    # 확장은 다른 객체가 쓸 수 있으므로 남겨 둠
+    op.execute("DROP INDEX IF EXISTS ix_ledger_transaction_search_trgm")
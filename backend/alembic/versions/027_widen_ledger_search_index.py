@@ -0,0 +1,41 @@
+"""Widen ledger search trigram index to category and payment method
+
+Revision ID: 027_ledger_search_columns
+Revises: 026_ledger_search_trgm
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '027_ledger_search_columns'
+down_revision: Union[str, None] = '026_ledger_search_trgm'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_TRGM_INDEX = """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            CREATE INDEX IF NOT EXISTS ix_ledger_transaction_search_trgm
+                ON ledger_transaction
+                USING gin (({document}) gin_trgm_ops);
+        END IF;
+    END
+    $$;
+"""
+
+
+def upgrade() -> None:
+    # 검색 대상에 대분류 · 소분류 · 결제수단을 더해 인덱스 식을 바꿉니다.
+    # 식은 ledger_search_service.SEARCH_DOCUMENT와 같아야 합니다.
+    op.execute("DROP INDEX IF EXISTS ix_ledger_transaction_search_trgm")
+    op.execute(SEARCH_TRGM_INDEX.format(document=(
+        "coalesce(description, '') || ' ' || coalesce(memo, '') || ' ' || coalesce(category, '') || ' ' || "
+        "coalesce(subcategory, '') || ' ' || coalesce(payment_method, '')"
+    )))
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_ledger_transaction_search_trgm")
+    op.execute(SEARCH_TRGM_INDEX.format(document="coalesce(description, '') || ' ' || coalesce(memo, '')"))
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, date
-import io
-import openpyxl
-from app.database import get_db
+from typing import Callable, List, Literal, Optional
+from app.database import get_db, get_session_factory
 from app.models.models import (
     Customer, CashFlow, FixedExpense,
     MonthlySummary, FinancialGoal, RealEstateAnalysis,
@@ -20,8 +20,26 @@ from app.schemas.schemas import (
     InvestmentStatusCreate, InvestmentStatusUpdate, InvestmentStatusResponse,
     FinancialSnapshotResponse,
     LedgerTransactionCreate, LedgerTransactionUpdate, LedgerTransactionResponse,
-    UploadHistoryResponse,
+    LedgerAggregateResponse, LedgerSearchHit,
+    UploadHistoryResponse, ImportJobResponse,
 )
+from app.services.import_service import (
+    IMPORT_KIND_BANKSALAD, IMPORT_KIND_BANKSALAD_ARCHIVE, IMPORT_KIND_LEDGER,
+    import_banksalad_archive, import_banksalad_workbook, import_ledger_workbook,
+    find_previous_upload, replay_result,
+)
+from app.services.ledger_aggregation_service import aggregate_ledger
+from app.services.ledger_export_service import EXPORT_MEDIA_TYPES, iter_ledger_export
+from app.services.ledger_loader import ledger_dedup_hash
+from app.services.ledger_query_service import NEXT_CURSOR_HEADER, InvalidCursor, ledger_page
+from app.services.ledger_rollup_service import (
+    RollupFact, add_to_rollup, remove_from_rollup, transaction_fact,
+)
+from app.services.ledger_search_service import normalize_query, search_ledger
+from app.services.monthly_summary_service import refresh_cumulative_net_income
+from app.services import import_job_service
+from app.services.import_diff import diff_banksalad_workbook
+from app.services.upload_spool import SpooledUpload, UploadTooLarge, spool_upload
 
 router = APIRouter()
 
@@ -65,12 +83,31 @@ async def delete_customer(customer_id: int, db: Session = Depends(get_db)):
 async def get_cash_flows(skip: int = 0, limit: int = 1000, db: Session = Depends(get_db)):
     return db.query(CashFlow).offset(skip).limit(limit).all()
 
+def _commit_cash_flow(db: Session, obj: CashFlow) -> None:
+    """commit합니다. 같은 항목명의 현금흐름 항목이 이미 있으면 409."""
+    q = db.query(CashFlow.id).filter(CashFlow.item_name == obj.item_name)
+    if obj.id is not None:
+        q = q.filter(CashFlow.id != obj.id)
+    with db.no_autoflush:
+        duplicate = q.first()
+    if duplicate:
+        if obj in db.new:
+            db.expunge(obj)
+        else:
+            db.expire(obj)
+        raise HTTPException(status_code=409, detail="같은 항목명의 현금흐름 항목이 이미 있습니다.")
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="같은 항목명의 현금흐름 항목이 이미 있습니다.")
+    db.refresh(obj)
+
 @router.post("/cash-flows", response_model=CashFlowResponse)
 async def create_cash_flow(data: CashFlowCreate, db: Session = Depends(get_db)):
     obj = CashFlow(**data.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    _commit_cash_flow(db, obj)
     return obj
 
 @router.put("/cash-flows/{cash_flow_id}", response_model=CashFlowResponse)
@@ -80,8 +117,7 @@ async def update_cash_flow(cash_flow_id: int, data: CashFlowUpdate, db: Session
         raise HTTPException(status_code=404, detail="현금흐름 항목을 찾을 수 없습니다.")
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(obj, key, value)
-    db.commit()
-    db.refresh(obj)
+    _commit_cash_flow(db, obj)
     return obj
 
 @router.delete("/cash-flows/{cash_flow_id}")
@@ -146,6 +182,7 @@ async def get_monthly_summaries(
 async def create_monthly_summary(data: MonthlySummaryCreate, db: Session = Depends(get_db)):
     obj = MonthlySummary(**data.model_dump())
     db.add(obj)
+    refresh_cumulative_net_income(db, [(obj.year, obj.month)])
     db.commit()
     db.refresh(obj)
     return obj
@@ -155,8 +192,11 @@ async def update_monthly_summary(summary_id: int, data: MonthlySummaryUpdate, db
     obj = db.query(MonthlySummary).filter(MonthlySummary.id == summary_id).first()
     if not obj:
         raise HTTPException(status_code=404, detail="월별 결산 항목을 찾을 수 없습니다.")
+    previous = (obj.year, obj.month)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(obj, key, value)
+    # 연·월을 옮긴 경우 이전 위치의 누적값도 다시 계산
+    refresh_cumulative_net_income(db, [previous, (obj.year, obj.month)])
     db.commit()
     db.refresh(obj)
     return obj
@@ -167,6 +207,7 @@ async def delete_monthly_summary(summary_id: int, db: Session = Depends(get_db))
     if not obj:
         raise HTTPException(status_code=404, detail="월별 결산 항목을 찾을 수 없습니다.")
     db.delete(obj)
+    refresh_cumulative_net_income(db, [(obj.year, obj.month)])
     db.commit()
     return {"ok": True}
 
@@ -282,25 +323,153 @@ async def get_financial_snapshot(db: Session = Depends(get_db)):
 # ── LedgerTransaction ─────────────────────────────────────────
 @router.get("/ledger-transactions", response_model=List[LedgerTransactionResponse])
 async def get_ledger_transactions(
+    response: Response,
     transaction_type: Optional[str] = None,
     category: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 5000,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(5000, ge=1),
     db: Session = Depends(get_db),
 ):
-    q = db.query(LedgerTransaction)
-    if transaction_type:
-        q = q.filter(LedgerTransaction.transaction_type == transaction_type)
-    if category:
-        q = q.filter(LedgerTransaction.category == category)
-    return q.order_by(LedgerTransaction.transaction_date.desc()).offset(skip).limit(limit).all()
+    """
+    가계부 내역 목록 (거래일 최신순, 거래일 없는 행 먼저). date_from ~ date_to(포함)로 범위를 제한할 수 있습니다.
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 돌려주며, 그 값을 cursor로 넘기면 이어서 조회합니다.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from이 date_to보다 늦습니다.")
+    try:
+        rows, next_cursor = ledger_page(
+            db, cursor=cursor, limit=limit, skip=skip, transaction_type=transaction_type,
+            category=category, date_from=date_from, date_to=date_to,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
+@router.get("/ledger-transactions/search", response_model=List[LedgerSearchHit])
+async def search_ledger_transactions(
+    q: str = Query(..., min_length=1, max_length=100),
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """
+    가계부 내용 · 메모 · 분류 · 결제수단 검색. 부분 일치(대소문자 무시)와 오타를 허용하는 trigram 유사도로 찾아
+    점수(score) · 거래일 최신순으로 반환합니다. 타입 · 대분류 · 기간 필터를 함께 쓸 수 있습니다.
+    PostgreSQL은 pg_trgm 인덱스, SQLite는 FTS5 trigram 색인으로 찾습니다. 색인으로 찾을 수 없으면
+    (pg_trgm 미설치, SQLite에서 2글자 이하 검색어) 조건에 맞는 최근 LEDGER_SEARCH_SCAN_ROWS건(기본 20000) 안에서만
+    부분 일치로 찾으므로 그보다 오래된 거래는 결과에 나오지 않습니다.
+    """
+    if not normalize_query(q):
+        raise HTTPException(status_code=400, detail="검색어를 입력하세요.")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from이 date_to보다 늦습니다.")
+    hits = search_ledger(
+        db, q, transaction_type=transaction_type, category=category,
+        date_from=date_from, date_to=date_to, limit=limit, skip=skip,
+    )
+    return [
+        dict(LedgerTransactionResponse.model_validate(tx).model_dump(), score=round(score, 4))
+        for tx, score in hits
+    ]
+
+@router.get("/ledger-transactions/export")
+async def export_ledger_transactions(
+    format: Literal["csv", "ndjson"] = "csv",
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    session_factory=Depends(get_session_factory),
+):
+    """
+    가계부 내역을 CSV 또는 NDJSON(한 줄에 JSON 객체 하나)으로 스트리밍합니다. 순서와 필터는 목록과 같습니다.
+    행을 배치 단위로 읽어 바로 보내므로 전체 기간을 내보내도 메모리 사용량이 일정합니다.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from이 date_to보다 늦습니다.")
+
+    # 요청 의존성 세션은 응답 본문을 보내기 전에 닫히므로 스트림이 끝날 때까지 쓸 세션을 따로 엶
+    def _stream():
+        db = session_factory()
+        try:
+            yield from iter_ledger_export(
+                db, format, transaction_type=transaction_type, category=category,
+                date_from=date_from, date_to=date_to,
+            )
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        _stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="ledger-transactions.{format}"'},
+    )
+
+@router.get("/ledger-transactions/aggregate", response_model=LedgerAggregateResponse)
+async def get_ledger_aggregate(
+    period: Optional[Literal["day", "week", "month", "year"]] = None,
+    group_by: List[Literal["transaction_type", "category", "subcategory", "payment_method"]] = Query([]),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    가계부 내역 기간(period) · 분류(group_by, 여러 번 지정 가능)별 합계 · 건수.
+    date_from ~ date_to(포함)로 범위를 제한할 수 있습니다. 차트용 집계만 반환하며 거래 행은 보내지 않습니다.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from이 date_to보다 늦습니다.")
+    rows = aggregate_ledger(
+        db, period=period, group_by=group_by, date_from=date_from, date_to=date_to,
+        transaction_type=transaction_type, category=category,
+    )
+    return {"period": period, "group_by": list(dict.fromkeys(group_by)), "rows": rows}
+
+def _commit_ledger_transaction(db: Session, obj: LedgerTransaction, previous: Optional[RollupFact] = None) -> None:
+    """
+    dedup_hash를 갱신하고 롤업에 반영한 뒤 commit합니다. 같은 날짜·시간·내용·금액 거래가 이미 있으면 409.
+    previous는 수정 전 거래의 롤업 값입니다 (신규 거래는 None).
+    """
+    obj.dedup_hash = ledger_dedup_hash(obj.transaction_date, obj.transaction_time, obj.description, obj.amount)
+    q = db.query(LedgerTransaction.id).filter(LedgerTransaction.dedup_hash == obj.dedup_hash)
+    if obj.id is not None:
+        q = q.filter(LedgerTransaction.id != obj.id)
+    with db.no_autoflush:
+        duplicate = q.first()
+    if duplicate:
+        # 변경 내용 폐기 (신규 객체는 세션에서 제거, 기존 객체는 DB 값으로 되돌림)
+        if obj in db.new:
+            db.expunge(obj)
+        else:
+            db.expire(obj)
+        raise HTTPException(status_code=409, detail="같은 날짜·시간·내용·금액의 가계부 내역이 이미 있습니다.")
+    try:
+        db.flush()
+        if previous is not None:
+            remove_from_rollup(db, [previous])
+        add_to_rollup(db, [transaction_fact(obj)])
+        db.commit()
+    except IntegrityError:  # 동시 요청이 같은 거래를 먼저 저장한 경우
+        db.rollback()
+        raise HTTPException(status_code=409, detail="같은 날짜·시간·내용·금액의 가계부 내역이 이미 있습니다.")
+    db.refresh(obj)
 
 @router.post("/ledger-transactions", response_model=LedgerTransactionResponse)
 async def create_ledger_transaction(data: LedgerTransactionCreate, db: Session = Depends(get_db)):
     obj = LedgerTransaction(**data.model_dump())
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    _commit_ledger_transaction(db, obj)
     return obj
 
 @router.put("/ledger-transactions/{tx_id}", response_model=LedgerTransactionResponse)
@@ -308,10 +477,10 @@ async def update_ledger_transaction(tx_id: int, data: LedgerTransactionUpdate, d
     obj = db.query(LedgerTransaction).filter(LedgerTransaction.id == tx_id).first()
     if not obj:
         raise HTTPException(status_code=404, detail="가계부 내역을 찾을 수 없습니다.")
+    previous = transaction_fact(obj)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(obj, key, value)
-    db.commit()
-    db.refresh(obj)
+    _commit_ledger_transaction(db, obj, previous)
     return obj
 
 @router.delete("/ledger-transactions/{tx_id}")
@@ -319,7 +488,10 @@ async def delete_ledger_transaction(tx_id: int, db: Session = Depends(get_db)):
     obj = db.query(LedgerTransaction).filter(LedgerTransaction.id == tx_id).first()
     if not obj:
         raise HTTPException(status_code=404, detail="가계부 내역을 찾을 수 없습니다.")
+    fact = transaction_fact(obj)
     db.delete(obj)
+    db.flush()
+    remove_from_rollup(db, [fact])
     db.commit()
     return {"ok": True}
 
@@ -335,635 +507,188 @@ async def get_upload_history(limit: int = 50, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/import/banksalad-excel")
-async def import_banksalad_excel(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
-    """뱅크샐러드 Excel 파일을 파싱하여 고객·현금흐름·월별결산·가계부 내역을 일괄 갱신합니다."""
-    if not file.filename or not (file.filename.endswith(".xlsx") or file.filename.endswith(".xls")):
-        raise HTTPException(status_code=400, detail="xlsx 또는 xls 파일만 지원합니다.")
 
-    file_bytes = await file.read()
-    file_size = len(file_bytes)
-    try:
-        wb = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Excel 파일을 읽을 수 없습니다.")
-
-    result: dict = {
-        "customer": {"updated": 0, "inserted": 0},
-        "cash_flow": {"updated": 0, "inserted": 0},
-        "monthly_summary": {"updated": 0, "inserted": 0},
-        "investment": {"updated": 0, "inserted": 0},
-        "financial_snapshot": {"updated": 0, "inserted": 0},
-        "ledger": {"inserted": 0, "skipped": 0},
-    }
-
-    # ── 기존 오염 데이터 정리 ──────────────────────────────────
-    # company/principal 없이 삽입된 투자 레코드 제거 (이전 import 버그로 인한 잉여 레코드)
-    db.query(InvestmentStatus).filter(
-        InvestmentStatus.company == None,
-        InvestmentStatus.principal == None,
-        InvestmentStatus.return_rate == None,
-    ).delete(synchronize_session=False)
-    # 수입·지출·순수익이 모두 0인 월별 결산 레코드 제거 (빈 월 레코드)
-    db.query(MonthlySummary).filter(
-        MonthlySummary.income == 0,
-        MonthlySummary.expense == 0,
-        MonthlySummary.net_income == 0,
-    ).delete(synchronize_session=False)
-    db.query(MonthlySummary).filter(
-        MonthlySummary.income == None,
-        MonthlySummary.expense == None,
-        MonthlySummary.net_income == None,
-    ).delete(synchronize_session=False)
-    db.commit()
 
-    # ── 뱅샐현황 시트 ─────────────────────────────────────────
-    if "뱅샐현황" in wb.sheetnames:
-        ws_bs = wb["뱅샐현황"]
-
-        # 행별 데이터 추출 (rows 1~120, cols B~P = cols 2~16)
-        rows: dict[int, tuple] = {}
-        for ws_row in ws_bs.iter_rows(min_row=1, max_row=120, min_col=2, max_col=16):
-            row_idx = ws_row[0].row
-            rows[row_idx] = tuple(cell.value for cell in ws_row)
-
-        # 1. 고객 정보 (Row 6: B=이름, C=성별, D=나이, E=신용점수, F=이메일)
-        r6 = rows.get(6)
-        if r6 and r6[0]:
-            name = str(r6[0])
-            gender = str(r6[1]) if r6[1] else None
-            age = int(r6[2]) if r6[2] is not None else None
-            credit_score = int(r6[3]) if r6[3] is not None else None
-            email_raw = str(r6[4]) if r6[4] else None
-            email = email_raw if email_raw and email_raw != '-' else None
-
-            customer = db.query(Customer).filter(Customer.name == name).first()
-            if customer:
-                customer.gender = gender
-                customer.age = age
-                customer.credit_score = credit_score
-                if email:
-                    customer.email = email
-                result["customer"]["updated"] += 1
-            else:
-                db.add(Customer(name=name, gender=gender, age=age, credit_score=credit_score, email=email))
-                result["customer"]["inserted"] += 1
-            db.commit()
-
-        # 2. 현금흐름 항목 파싱 — 헤더('항목')를 동적으로 찾아 월 레이블 추출
-        #    이후 '월수입 총계' / '월지출 총계' / '순수입 총계' 키워드로 경계 탐지
-        #    (Excel 버전마다 항목 수가 달라 행 번호가 변동됨)
-        header_row_idx = None
-        for ridx in range(9, 20):
-            r = rows.get(ridx)
-            if r and r[0] == '항목':
-                header_row_idx = ridx
-                break
-        r_header = rows.get(header_row_idx, (None,) * 15) if header_row_idx else (None,) * 15
-        month_labels = [str(r_header[i]) for i in range(3, 15) if r_header and r_header[i] is not None]
-
-        # 키워드로 경계 행 찾기
-        income_total_row: "int | None" = None
-        expense_total_row: "int | None" = None
-        net_total_row: "int | None" = None
-        for ridx in range(10, 45):
-            r = rows.get(ridx)
-            if r is None:
-                continue
-            label = str(r[0]) if r[0] else ''
-            if label == '월수입 총계' and income_total_row is None:
-                income_total_row = ridx
-            elif label == '월지출 총계' and expense_total_row is None:
-                expense_total_row = ridx
-            elif label == '순수입 총계' and net_total_row is None:
-                net_total_row = ridx
-
-        SKIP_CASHFLOW = {'월수입 총계', '월지출 총계', '순수입 총계'}
-
-        def _upsert_cashflow(row_data: tuple, item_type: str) -> None:
-            item_name = str(row_data[0]) if row_data[0] else None
-            if not item_name or item_name in SKIP_CASHFLOW:
-                return
-            total = float(row_data[1]) if row_data[1] is not None else None
-            monthly_avg = float(row_data[2]) if row_data[2] is not None else None
-            monthly_data = {
-                month_labels[j]: float(row_data[3 + j])
-                for j in range(len(month_labels))
-                if 3 + j < len(row_data) and row_data[3 + j] is not None
-            }
-            # Excel 합계 컬럼이 수식(formula)이어서 0으로 읽히는 경우 monthly_data 합계로 대체
-            if not total and monthly_data:
-                total = sum(monthly_data.values())
-            if not monthly_avg and total and month_labels:
-                monthly_avg = total / len(month_labels)
-            existing = db.query(CashFlow).filter(CashFlow.item_name == item_name).first()
-            if existing:
-                existing.item_type = item_type
-                existing.total = total
-                existing.monthly_average = monthly_avg
-                existing.monthly_data = monthly_data
-                result["cash_flow"]["updated"] += 1
-            else:
-                db.add(CashFlow(
-                    item_name=item_name, item_type=item_type,
-                    total=total, monthly_average=monthly_avg, monthly_data=monthly_data,
-                ))
-                result["cash_flow"]["inserted"] += 1
-
-        # 헤더 다음 행 ~ 월수입 총계 직전 → 수입 항목
-        if header_row_idx and income_total_row:
-            for ridx in range(header_row_idx + 1, income_total_row):
-                if ridx in rows:
-                    _upsert_cashflow(rows[ridx], "수입")
-        # 월수입 총계 다음 행 ~ 월지출 총계 직전 → 지출 항목
-        if income_total_row and expense_total_row:
-            for ridx in range(income_total_row + 1, expense_total_row):
-                if ridx in rows:
-                    _upsert_cashflow(rows[ridx], "지출")
-        db.commit()
+# ── Import (백그라운드 작업) ──────────────────────────────────
+def _is_excel_filename(filename: Optional[str]) -> bool:
+    return bool(filename) and (filename.endswith(".xlsx") or filename.endswith(".xls"))
 
-        # 3. 월별 결산 upsert — 동적으로 찾은 총계 행 사용
-        r_income_total = rows.get(income_total_row) if income_total_row else None
-        r_expense_total = rows.get(expense_total_row) if expense_total_row else None
-        r_net_total = rows.get(net_total_row) if net_total_row else None
-
-        # 총계 행의 월별 값도 수식 캐시 없으면 0 → 수입/지출 항목 합계로 대체
-        def _monthly_sum_from_items(item_type_filter: str, j: int) -> "float | None":
-            items = db.query(CashFlow).filter(CashFlow.item_type == item_type_filter).all()
-            total_j = sum(
-                float(cf.monthly_data.get(month_labels[j], 0))
-                for cf in items
-                if cf.monthly_data and j < len(month_labels)
-            )
-            return total_j if total_j else None
 
-        def _safe_float(row_data: "tuple | None", idx: int) -> "float | None":
-            if row_data is None:
-                return None
-            return float(row_data[idx]) if len(row_data) > idx and row_data[idx] is not None else None
+async def _spool_zip_upload(file: UploadFile, unreadable_detail: str) -> SpooledUpload:
+    """
+    업로드를 청크 단위로 스풀한 뒤 zip 시그니처(xlsx도 zip)를 확인합니다.
+    크기 상한을 넘으면 413, 시그니처가 맞지 않으면 400. 반환된 스풀은 호출자가 close해야 합니다.
+    """
+    try:
+        spooled = await spool_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if not spooled.is_zipfile():
+        spooled.close()
+        raise HTTPException(status_code=400, detail=unreadable_detail)
+    return spooled
+
+
+async def _spool_excel_upload(file: UploadFile) -> SpooledUpload:
+    """확장자를 확인하고 Excel 업로드를 스풀합니다 (_spool_zip_upload 참고)."""
+    if not _is_excel_filename(file.filename):
+        raise HTTPException(status_code=400, detail="xlsx 또는 xls 파일만 지원합니다.")
+    return await _spool_zip_upload(file, "Excel 파일을 읽을 수 없습니다.")
 
-        for j, label in enumerate(month_labels):
-            try:
-                year_val, month_val = int(label[:4]), int(label[5:7])
-            except (ValueError, IndexError):
-                continue
-
-            income = _safe_float(r_income_total, 3 + j)
-            expense = _safe_float(r_expense_total, 3 + j)
-            net = _safe_float(r_net_total, 3 + j)
-
-            # 수식 캐시 없어서 0인 경우 항목 합산으로 대체
-            if not income:
-                income = _monthly_sum_from_items("수입", j)
-            if not expense:
-                expense = _monthly_sum_from_items("지출", j)
-            if income is not None and expense is not None and not net:
-                net = income - expense
-
-            # 수입·지출·순수익이 모두 None 또는 0이면 의미 없는 행이므로 건너뜀
-            if income is None and expense is None and net is None:
-                continue
-            if (income or 0) == 0 and (expense or 0) == 0 and (net or 0) == 0:
-                continue
-
-            existing_ms = db.query(MonthlySummary).filter(
-                MonthlySummary.year == year_val,
-                MonthlySummary.month == month_val,
-            ).first()
-            if existing_ms:
-                existing_ms.income = income
-                existing_ms.expense = expense
-                existing_ms.net_income = net
-                result["monthly_summary"]["updated"] += 1
-            else:
-                db.add(MonthlySummary(year=year_val, month=month_val, income=income, expense=expense, net_income=net))
-                result["monthly_summary"]["inserted"] += 1
 
-        db.commit()
+def _submit_spooled_import(kind: str, filename: str, spooled: SpooledUpload, run_import: Callable[..., dict]):
+    """
+    스풀된 업로드로 import 작업을 제출합니다. 작업이 끝나면 스풀(임시 파일)을 정리합니다.
+    run_import(source, file_size, content_sha256, progress)는 워커 스레드에서 실행됩니다.
+    """
+    def _run(job: import_job_service.ImportJob) -> dict:
+        try:
+            return run_import(spooled.source, spooled.size, spooled.sha256, job.report)
+        finally:
+            spooled.close()
 
-        # cumulative_net_income 재계산 (연도별 누적)
-        from itertools import groupby as _groupby
-        all_sums = db.query(MonthlySummary).order_by(MonthlySummary.year, MonthlySummary.month).all()
-        for _year, _group in _groupby(all_sums, key=lambda s: s.year):
-            _cumulative = 0.0
-            for s in _group:
-                if s.net_income is not None:
-                    _cumulative += float(s.net_income)
-                s.cumulative_net_income = _cumulative
-        db.commit()
+    try:
+        return import_job_service.submit_import_job(kind, filename, _run)
+    except BaseException:
+        spooled.close()
+        raise
 
-        # 4. 투자성 자산 (뱅샐현황 rows 73~102, '투자성 자산' 섹션)
-        # col B(index 0)=섹션라벨, col C(index 1)=상품명, col E(index 3)=평가금액
-        from collections import defaultdict as _defaultdict
-
-        excel_investments: list[tuple[str, float]] = []
-        in_inv_section = False
-        for ridx in range(70, 120):
-            r = rows.get(ridx)
-            if r is None:
-                continue
-            label = r[0]  # col B
-            if label == '투자성 자산':
-                in_inv_section = True
-            elif in_inv_section and label is not None:
-                break  # 다음 섹션 진입 → 종료
-
-            if not in_inv_section:
-                continue
-
-            product_name = str(r[1]) if r[1] else None
-            raw_val = r[3]  # col E
-            if not product_name or raw_val is None:
-                continue
-            try:
-                val = float(raw_val)
-            except (TypeError, ValueError):
-                continue
-            if val <= 1:  # 사실상 0인 항목 제외
-                continue
-            excel_investments.append((product_name, val))
-
-        if excel_investments:
-            # DB 레코드를 상품명별로 그룹화 (ID 오름차순 = 마이그레이션 삽입 순서)
-            all_inv_db = db.query(InvestmentStatus).order_by(InvestmentStatus.id).all()
-            db_by_name: dict[str, list] = _defaultdict(list)
-            for inv in all_inv_db:
-                db_by_name[inv.product_name].append(inv)
-
-            # 엑셀도 상품명별로 순서대로 그룹화
-            excel_by_name: dict[str, list[float]] = _defaultdict(list)
-            for pname, val in excel_investments:
-                excel_by_name[pname].append(val)
-
-            for pname, excel_vals in excel_by_name.items():
-                db_records = db_by_name.get(pname, [])
-                for i, val in enumerate(excel_vals):
-                    if i < len(db_records):
-                        rec = db_records[i]
-                        rec.current_value = val
-                        # 원금이 있으면 수익률 재계산
-                        if rec.principal and float(rec.principal) > 0:
-                            rec.return_rate = (val - float(rec.principal)) / float(rec.principal) * 100
-                        result["investment"]["updated"] += 1
-                    # DB에 없는 상품은 신규 삽입하지 않음 (기존 마이그레이션 데이터만 갱신)
-
-            db.commit()
-
-        # investment_principal / investment_value → 가장 최근 MonthlySummary에 반영
-        # investment_value: 엑셀 투자성 자산 섹션의 평가금액 합계
-        # investment_principal: InvestmentStatus DB의 원금 합계
-        if excel_investments:
-            inv_value_total = sum(v for _, v in excel_investments)
-            # all_inv_db는 위에서 이미 조회한 전체 InvestmentStatus 목록을 재사용
-            inv_principal_total: "float | None" = None
-            principal_sum = sum(
-                float(inv.principal)
-                for inv in all_inv_db
-                if inv.principal is not None and float(inv.principal) > 0
-            )
-            if principal_sum > 0:
-                inv_principal_total = principal_sum
-
-            # 가장 마지막 월(현재 파일 기준)의 MonthlySummary에 저장
-            if month_labels:
-                last_label = month_labels[-1]
-                try:
-                    last_year, last_month = int(last_label[:4]), int(last_label[5:7])
-                    latest_ms = db.query(MonthlySummary).filter(
-                        MonthlySummary.year == last_year,
-                        MonthlySummary.month == last_month,
-                    ).first()
-                    if latest_ms:
-                        latest_ms.investment_value = inv_value_total
-                        if inv_principal_total is not None:
-                            latest_ms.investment_principal = inv_principal_total
-                        db.commit()
-                except (ValueError, IndexError):
-                    pass
-
-        # 5. 재무현황 (3.재무현황 섹션, rows 39~119)
-        # col B(index 0)=카테고리, col C(index 1)=상품명, col E(index 3)=금액(자산), col I(index 7)=금액(부채)
-        ASSET_CATEGORIES = {
-            '자유입출금 자산', '신탁 자산', '현금 자산', '저축성 자산',
-            '전자금융 자산', '투자성 자산', '부동산', '동산',
-            '기타 실물 자산', '보험 자산', '연금 자산',
-        }
-
-        snap_data: dict = {}
-        cur_cat: "str | None" = None
-        total_assets_v: "float | None" = None
-        total_liab_v: "float | None" = None
-        net_assets_v: "float | None" = None
-
-        for ridx in range(39, 120):
-            r = rows.get(ridx)
-            if r is None:
-                continue
-            label = r[0]          # col B
-            product = r[1] if len(r) > 1 else None   # col C
-            amt_e = r[3] if len(r) > 3 else None      # col E (자산 금액)
-            amt_i = r[7] if len(r) > 7 else None      # col I (부채 금액)
-
-            # 총자산/총부채 행
-            if label == '총자산':
-                if amt_e is not None:
-                    total_assets_v = float(amt_e)
-                if amt_i is not None:
-                    total_liab_v = float(amt_i)
-                continue
-
-            # 순자산 값 행 (col B가 숫자인 경우)
-            if label is not None and not isinstance(label, str):
-                try:
-                    net_assets_v = float(label)
-                except (TypeError, ValueError):
-                    pass
-                continue
-
-            # 자산 카테고리 헤더
-            if isinstance(label, str) and label in ASSET_CATEGORIES:
-                cur_cat = label
-                if cur_cat not in snap_data:
-                    snap_data[cur_cat] = []
-                if product is not None and amt_e is not None:
-                    snap_data[cur_cat].append({"name": str(product), "amount": float(amt_e)})
-                continue
-
-            # 카테고리 내 항목 (label=None, product 있음)
-            if cur_cat and label is None and product is not None and amt_e is not None:
-                snap_data[cur_cat].append({"name": str(product), "amount": float(amt_e)})
-
-        # 부채 항목 파싱 (col F(r[4])=카테고리, col G(r[5])=상품명, col I(r[7])=금액)
-        liab_data: dict = {}
-        cur_liab: "str | None" = None
-        SKIP_LIAB_LABELS = {'부채', '항목', None}
-        for ridx in range(39, 118):
-            r = rows.get(ridx)
-            if r is None:
-                continue
-            liab_label = r[4] if len(r) > 4 else None   # col F
-            liab_product = r[5] if len(r) > 5 else None  # col G
-            liab_amt = r[7] if len(r) > 7 else None      # col I
-
-            if liab_label == '총부채':
-                break
-            if isinstance(liab_label, str) and liab_label not in SKIP_LIAB_LABELS:
-                cur_liab = liab_label.strip()
-                liab_data.setdefault(cur_liab, [])
-                if liab_product is not None and liab_amt is not None:
-                    liab_data[cur_liab].append({"name": str(liab_product), "amount": float(liab_amt)})
-            elif cur_liab and liab_label is None and liab_product is not None and liab_amt is not None:
-                liab_data[cur_liab].append({"name": str(liab_product), "amount": float(liab_amt)})
-
-        if liab_data:
-            snap_data['_liabilities'] = liab_data
-
-        # 의미 없는 빈 자산 카테고리 제거 (부채 키는 유지)
-        snap_data = {
-            k: v for k, v in snap_data.items()
-            if k == '_liabilities' or v
-        }
-
-        # 총자산이 파싱되지 않은 경우(0 또는 None) snapshot_data 합계로 대체
-        if not total_assets_v:
-            total_assets_v = sum(
-                item["amount"]
-                for k, items in snap_data.items()
-                if k != '_liabilities' and isinstance(items, list)
-                for item in items
-                if isinstance(item.get("amount"), (int, float))
-            )
-        # 총부채가 파싱되지 않은 경우 _liabilities 합계로 대체
-        if not total_liab_v and '_liabilities' in snap_data:
-            total_liab_v = sum(
-                item["amount"]
-                for items in snap_data['_liabilities'].values()
-                if isinstance(items, list)
-                for item in items
-                if isinstance(item.get("amount"), (int, float))
-            )
-        if total_assets_v is not None and total_liab_v is not None and not net_assets_v:
-            net_assets_v = total_assets_v - total_liab_v
-
-        existing_snap = db.query(FinancialSnapshot).first()
-        if existing_snap:
-            existing_snap.total_assets = total_assets_v
-            existing_snap.total_liabilities = total_liab_v
-            existing_snap.net_assets = net_assets_v
-            existing_snap.snapshot_data = snap_data
-            result["financial_snapshot"]["updated"] = 1
-        else:
-            db.add(FinancialSnapshot(
-                total_assets=total_assets_v,
-                total_liabilities=total_liab_v,
-                net_assets=net_assets_v,
-                snapshot_data=snap_data,
-            ))
-            result["financial_snapshot"]["inserted"] = 1
-        db.commit()
 
-    # ── 가계부 내역 시트 ──────────────────────────────────────────
-    if "가계부 내역" in wb.sheetnames:
-        ws_ledger = wb["가계부 내역"]
-        parsed_rows: list[dict] = []
-        for row in ws_ledger.iter_rows(min_row=2, values_only=True):
-            if not any(row):
-                continue
+def _replay_job(db: Session, content_sha256: str, import_kind: str, filename: str, response: Response):
+    """같은 파일의 이전 import 결과가 있으면 완료된 작업으로 즉시 반환합니다 (없으면 None)."""
+    previous = find_previous_upload(db, content_sha256, import_kind)
+    if previous is None:
+        return None
+    response.status_code = 200
+    return import_job_service.record_completed_job(import_kind, filename, replay_result(previous)).to_dict()
+
+
+@router.post("/import/banksalad-excel", response_model=ImportJobResponse, status_code=202)
+async def import_banksalad_excel(
+    response: Response,
+    file: UploadFile = File(...),
+    force: bool = False,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory),
+):
+    """
+    뱅크샐러드 Excel import 작업을 등록합니다. 진행 상황과 결과는 /import/jobs/{job_id}로 조회합니다.
+    이미 import한 파일과 바이트가 같으면 저장된 결과를 replay로 즉시 반환합니다.
+    가계부 내역은 이전 import 이후 구간만 검사합니다. force=true면 replay 없이 모든 행을 다시 검사합니다.
+    dry_run=true면 DB에 쓰지 않고 섹션별 변경 사항(diff)만 결과로 반환합니다 (import_diff 참고).
+    """
+    spooled = await _spool_excel_upload(file)
+    filename = file.filename
+
+    if dry_run:
+        def _diff(source, file_size: int, content_sha256: str, progress) -> dict:
+            db = session_factory()
             try:
-                raw_date, raw_time, tx_type, category, subcategory, description, raw_amount, currency, payment_method, memo = row
-            except ValueError:
-                continue
-
-            if isinstance(raw_date, datetime):
-                tx_date = raw_date
-            elif isinstance(raw_date, date):
-                tx_date = datetime(raw_date.year, raw_date.month, raw_date.day)
-            elif isinstance(raw_date, str) and raw_date.strip():
-                try:
-                    tx_date = datetime.fromisoformat(raw_date.strip())
-                except ValueError:
-                    continue
-            else:
-                continue
-
-            amount_val: "float | None" = None
-            if raw_amount is not None:
-                try:
-                    amount_val = float(str(raw_amount).replace(",", ""))
-                except (ValueError, TypeError):
-                    pass
-
-            parsed_rows.append({
-                "transaction_date": tx_date,
-                "transaction_time": str(raw_time) if raw_time is not None else None,
-                "transaction_type": str(tx_type) if tx_type else None,
-                "category": str(category) if category else None,
-                "subcategory": str(subcategory) if subcategory else None,
-                "description": str(description) if description else None,
-                "amount": amount_val,
-                "currency": str(currency) if currency else None,
-                "payment_method": str(payment_method) if payment_method else None,
-                "memo": str(memo) if memo else None,
-            })
-
-        if parsed_rows:
-            all_dates_l = [r["transaction_date"] for r in parsed_rows]
-            min_dt, max_dt = min(all_dates_l), max(all_dates_l)
-            existing_txns = (
-                db.query(LedgerTransaction)
-                .filter(
-                    LedgerTransaction.transaction_date >= min_dt,
-                    LedgerTransaction.transaction_date <= max_dt,
+                return diff_banksalad_workbook(
+                    db, source, full_scan=force, progress=progress,
+                    filename=filename, content_sha256=content_sha256,
                 )
-                .all()
-            )
+            finally:
+                db.close()
 
-            def _dedup_key_bs(tx_date, tx_time, desc, amt):
-                return (
-                    tx_date.strftime("%Y-%m-%d") if tx_date else None,
-                    str(tx_time) if tx_time else None,
-                    str(desc) if desc else None,
-                    float(amt) if amt is not None else None,
-                )
+        return _submit_spooled_import(IMPORT_KIND_BANKSALAD, filename, spooled, _diff).to_dict()
 
-            existing_keys_bs = {
-                _dedup_key_bs(e.transaction_date, e.transaction_time, e.description, e.amount)
-                for e in existing_txns
-            }
-
-            for row in parsed_rows:
-                k = _dedup_key_bs(row["transaction_date"], row["transaction_time"], row["description"], row["amount"])
-                if k in existing_keys_bs:
-                    result["ledger"]["skipped"] += 1
-                else:
-                    db.add(LedgerTransaction(**row))
-                    existing_keys_bs.add(k)  # 같은 배치 내 중복 삽입 방지
-                    result["ledger"]["inserted"] += 1
-
-            if result["ledger"]["inserted"] > 0:
-                db.commit()
-
-    # 업로드 이력 저장
-    history = UploadHistory(
-        filename=file.filename,
-        file_size=file_size,
-        result_json=result,
-    )
-    db.add(history)
-    db.commit()
+    if not force:
+        replay = _replay_job(db, spooled.sha256, IMPORT_KIND_BANKSALAD, filename, response)
+        if replay is not None:
+            spooled.close()
+            return replay
+
+    def _run(source, file_size: int, content_sha256: str, progress) -> dict:
+        db = session_factory()
+        try:
+            return import_banksalad_workbook(
+                db, source, filename, file_size,
+                content_sha256=content_sha256, progress=progress, full_scan=force,
+            )
+        finally:
+            db.close()
 
-    return result
+    return _submit_spooled_import(IMPORT_KIND_BANKSALAD, filename, spooled, _run).to_dict()
 
 
-@router.post("/ledger-transactions/import-excel")
-async def import_ledger_from_excel(
+@router.post("/import/banksalad-zip", response_model=ImportJobResponse, status_code=202)
+async def import_banksalad_zip(
+    response: Response,
     file: UploadFile = File(...),
+    force: bool = False,
     db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory),
 ):
-    """가계부 내역 Excel 파일(뱅크샐러드 형식)을 읽어 신규 거래만 DB에 추가합니다."""
-    if not file.filename or not (file.filename.endswith(".xlsx") or file.filename.endswith(".xls")):
-        raise HTTPException(status_code=400, detail="xlsx 또는 xls 파일만 지원합니다.")
-
-    file_bytes = await file.read()
-
-    try:
-        wb = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Excel 파일을 읽을 수 없습니다.")
+    """
+    여러 기간의 뱅크샐러드 export(xlsx)를 묶은 zip import 작업을 등록합니다.
+    파일들을 동시에 파싱하고 파일명의 날짜 범위 순으로 합쳐(같은 월은 최신 범위 우선) 한 번에 반영합니다.
+    과거 기간을 채우는 용도이므로 가계부 내역은 증분 기준일 없이 항상 모든 행을 검사합니다.
+    force=true면 같은 파일의 저장된 결과를 replay하지 않고 다시 import합니다.
+    """
+    if not (file.filename or "").lower().endswith(".zip"):
+        raise HTTPException(status_code=400, detail="zip 파일만 지원합니다.")
+    spooled = await _spool_zip_upload(file, "zip 파일을 읽을 수 없습니다.")
+    filename = file.filename
+
+    if not force:
+        replay = _replay_job(db, spooled.sha256, IMPORT_KIND_BANKSALAD_ARCHIVE, filename, response)
+        if replay is not None:
+            spooled.close()
+            return replay
+
+    def _run(source, file_size: int, content_sha256: str, progress) -> dict:
+        db = session_factory()
+        try:
+            return import_banksalad_archive(
+                db, source, filename, file_size, content_sha256=content_sha256, progress=progress,
+            )
+        finally:
+            db.close()
 
-    if "가계부 내역" not in wb.sheetnames:
-        raise HTTPException(status_code=400, detail='"가계부 내역" 시트를 찾을 수 없습니다.')
+    return _submit_spooled_import(IMPORT_KIND_BANKSALAD_ARCHIVE, filename, spooled, _run).to_dict()
 
-    ws = wb["가계부 내역"]
 
-    # ── 행 파싱 ──────────────────────────────────────────────
-    parsed: list[dict] = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if not any(row):
-            continue
+@router.post("/ledger-transactions/import-excel", response_model=ImportJobResponse, status_code=202)
+async def import_ledger_from_excel(
+    response: Response,
+    file: UploadFile = File(...),
+    force: bool = False,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory),
+):
+    """
+    가계부 내역 Excel import 작업을 등록합니다. 결과({inserted, skipped, before_mark})는 /import/jobs/{job_id}로 조회합니다.
+    이미 import한 파일과 바이트가 같으면 저장된 결과를 replay로 즉시 반환합니다.
+    이전 import 이후 구간만 검사하며(before_mark: 건너뛴 이전 행 수), force=true면 replay 없이 모든 행을 다시 검사합니다.
+    """
+    spooled = await _spool_excel_upload(file)
+    filename = file.filename
+
+    if not force:
+        replay = _replay_job(db, spooled.sha256, IMPORT_KIND_LEDGER, filename, response)
+        if replay is not None:
+            spooled.close()
+            return replay
+
+    def _run(source, file_size: int, content_sha256: str, progress) -> dict:
+        db = session_factory()
         try:
-            raw_date, raw_time, tx_type, category, subcategory, description, raw_amount, currency, payment_method, memo = row
-        except ValueError:
-            continue
-
-        # 날짜 → datetime
-        if isinstance(raw_date, datetime):
-            tx_date = raw_date
-        elif isinstance(raw_date, date):
-            tx_date = datetime(raw_date.year, raw_date.month, raw_date.day)
-        elif isinstance(raw_date, str) and raw_date.strip():
-            try:
-                tx_date = datetime.fromisoformat(raw_date.strip())
-            except ValueError:
-                continue
-        else:
-            continue  # 날짜 없으면 스킵
-
-        # 금액 정규화
-        amount_val: float | None = None
-        if raw_amount is not None:
-            try:
-                amount_val = float(str(raw_amount).replace(",", ""))
-            except (ValueError, TypeError):
-                pass
-
-        parsed.append({
-            "transaction_date": tx_date,
-            "transaction_time": str(raw_time) if raw_time is not None else None,
-            "transaction_type": str(tx_type) if tx_type else None,
-            "category": str(category) if category else None,
-            "subcategory": str(subcategory) if subcategory else None,
-            "description": str(description) if description else None,
-            "amount": amount_val,
-            "currency": str(currency) if currency else None,
-            "payment_method": str(payment_method) if payment_method else None,
-            "memo": str(memo) if memo else None,
-        })
-
-    if not parsed:
-        return {"inserted": 0, "skipped": 0}
-
-    # ── 중복 제거 (date + time + description + amount) ───────
-    all_dates = [r["transaction_date"] for r in parsed]
-    min_date, max_date = min(all_dates), max(all_dates)
-
-    existing = (
-        db.query(LedgerTransaction)
-        .filter(
-            LedgerTransaction.transaction_date >= min_date,
-            LedgerTransaction.transaction_date <= max_date,
-        )
-        .all()
-    )
-
-    def _dedup_key(tx_date, tx_time, desc, amt):
-        return (
-            tx_date.strftime("%Y-%m-%d") if tx_date else None,
-            str(tx_time) if tx_time else None,
-            str(desc) if desc else None,
-            float(amt) if amt is not None else None,
-        )
+            return import_ledger_workbook(
+                db, source, filename, file_size,
+                content_sha256=content_sha256, progress=progress, full_scan=force,
+            )
+        finally:
+            db.close()
 
-    existing_keys = {
-        _dedup_key(e.transaction_date, e.transaction_time, e.description, e.amount)
-        for e in existing
-    }
-
-    # ── INSERT 신규 거래 ──────────────────────────────────────
-    inserted = 0
-    skipped = 0
-    for row in parsed:
-        key = _dedup_key(row["transaction_date"], row["transaction_time"], row["description"], row["amount"])
-        if key in existing_keys:
-            skipped += 1
-        else:
-            db.add(LedgerTransaction(**row))
-            inserted += 1
+    return _submit_spooled_import(IMPORT_KIND_LEDGER, filename, spooled, _run).to_dict()
 
-    if inserted > 0:
-        db.commit()
 
-    return {"inserted": inserted, "skipped": skipped}
+@router.get("/import/jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(job_id: str):
+    """import 작업의 상태 · 진행 단계 · 처리 건수 · 최종 결과를 반환합니다."""
+    job = import_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="import 작업을 찾을 수 없습니다.")
+    return job.to_dict()
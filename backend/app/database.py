@@ -17,3 +17,8 @@ def get_db():
     finally:
         db.close()
 
+
+
+def get_session_factory():
+    """백그라운드 작업이 요청 수명과 무관하게 자체 세션을 열 때 사용하는 팩토리."""
+    return SessionLocal
@@ -1,10 +1,15 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api import data
 from app.database import engine
 from app.models import Base
 from app.services.scheduler_service import start_scheduler, stop_scheduler
+from app.services.import_job_service import shutdown_import_workers
+from app.services.workbook_parser import shutdown_parse_workers
+from app.services import upload_spool
+from app.services.ledger_query_service import NEXT_CURSOR_HEADER
 import logging
 import sys
 import os
@@ -27,10 +32,27 @@ async def lifespan(app: FastAPI):
     start_scheduler(interval_seconds=interval)
     yield
     stop_scheduler()
+    shutdown_import_workers()
+    shutdown_parse_workers()
 
 
 app = FastAPI(title="MyMoney API", version="0.2.0", lifespan=lifespan)
 
+# multipart 경계 · 헤더 여유분
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Content-Length가 업로드 상한을 넘는 multipart 요청은 본문을 읽기 전에 413으로 거절합니다."""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > upload_spool.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+            error = upload_spool.UploadTooLarge(upload_spool.MAX_UPLOAD_BYTES)
+            return JSONResponse(status_code=413, content={"detail": str(error)})
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -40,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["Content-Type"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(data.router, prefix="/api", tags=["data"])
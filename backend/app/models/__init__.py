@@ -1,13 +1,13 @@
 from app.models.models import (
     Customer, CashFlow,
     FixedExpense, MonthlySummary, FinancialGoal, RealEstateAnalysis,
-    InvestmentStatus, FinancialSnapshot, LedgerTransaction, UploadHistory,
+    InvestmentStatus, FinancialSnapshot, LedgerTransaction, LedgerRollup, UploadHistory,
 )
 from app.database import Base
 
 __all__ = [
     "Customer", "CashFlow",
     "FixedExpense", "MonthlySummary", "FinancialGoal", "RealEstateAnalysis",
-    "InvestmentStatus", "FinancialSnapshot", "LedgerTransaction", "UploadHistory",
+    "InvestmentStatus", "FinancialSnapshot", "LedgerTransaction", "LedgerRollup", "UploadHistory",
     "Base",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Numeric, Index
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, Numeric, Index, DDL, event
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -20,14 +20,19 @@ class CashFlow(Base):
     __tablename__ = "cash_flow"
 
     id = Column(Integer, primary_key=True, index=True)
-    item_name = Column(String, nullable=False, index=True)
+    item_name = Column(String, nullable=False)
     item_type = Column(String, nullable=True)
     total = Column(Numeric(precision=15, scale=2), nullable=True)
     monthly_average = Column(Numeric(precision=15, scale=2), nullable=True)
     monthly_data = Column(JSON, nullable=True)
+    month_sources = Column(JSON, nullable=True)       # {월: 값을 준 export 날짜 범위} (cash_flow_service 참고)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ux_cash_flow_item_name', 'item_name', unique=True),
+    )
+
 
 class FixedExpense(Base):
     __tablename__ = "fixed_expense"
@@ -143,9 +148,87 @@ class LedgerTransaction(Base):
     currency = Column(String, nullable=True)
     payment_method = Column(String, nullable=True)                # 결제수단
     memo = Column(String, nullable=True)
+    dedup_hash = Column(String(64), nullable=True)                # 날짜·시간·내용·금액 SHA-256 (중복 방지)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ux_ledger_transaction_dedup_hash', 'dedup_hash', unique=True),
+        # 목록 keyset 페이지(ledger_query_service): 거래일 범위 조건과 (거래일, id) 정렬을 한 인덱스로 처리
+        Index('ix_ledger_transaction_date_id', 'transaction_date', 'id'),
+        Index('ix_ledger_transaction_category_date_id', 'category', 'transaction_date', 'id'),
+        # 가계부 검색의 GIN trigram 인덱스(ix_ledger_transaction_search_trgm)는 pg_trgm 확장이 필요해
+        # migration 026 · 027에서만 만듭니다. SQLite는 아래 FTS5 색인(LEDGER_SEARCH_FTS)을 씁니다.
+    )
+
+
+# ── 가계부 검색 색인 (SQLite) ───────────────────────────────────
+# 검색 대상 컬럼을 FTS5 trigram 토크나이저로 색인해 3글자 이상 부분 문자열을 색인으로 찾습니다 (ledger_search_service).
+# ledger_transaction을 content로 쓰는 외부 content 테이블이라 텍스트를 따로 저장하지 않고, 트리거로 변경을 따라갑니다.
+# trigram 토크나이저는 SQLite 3.34 이상 · FTS5 포함 빌드에만 있어, 아니면 만들지 않습니다 (검색은 최근 행만 훑음).
+
+LEDGER_SEARCH_COLUMNS = ("description", "memo", "category", "subcategory", "payment_method")
+LEDGER_SEARCH_FTS = "ledger_transaction_fts"
+
+
+def _fts_values(prefix: str) -> str:
+    return ", ".join(f"{prefix}.{col}" for col in LEDGER_SEARCH_COLUMNS)
+
+
+_FTS_COLUMNS = ", ".join(LEDGER_SEARCH_COLUMNS)
+_FTS_INSERT = f"INSERT INTO {LEDGER_SEARCH_FTS}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_fts_values('new')});"
+_FTS_DELETE = (
+    f"INSERT INTO {LEDGER_SEARCH_FTS}({LEDGER_SEARCH_FTS}, rowid, {_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {_fts_values('old')});"
+)
+_LEDGER_SEARCH_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE {LEDGER_SEARCH_FTS} USING fts5("
+    f"{_FTS_COLUMNS}, content='ledger_transaction', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER {LEDGER_SEARCH_FTS}_ai AFTER INSERT ON ledger_transaction BEGIN {_FTS_INSERT} END",
+    f"CREATE TRIGGER {LEDGER_SEARCH_FTS}_ad AFTER DELETE ON ledger_transaction BEGIN {_FTS_DELETE} END",
+    f"CREATE TRIGGER {LEDGER_SEARCH_FTS}_au AFTER UPDATE OF {_FTS_COLUMNS} ON ledger_transaction "
+    f"BEGIN {_FTS_DELETE} {_FTS_INSERT} END",
+)
+
+
+def _sqlite_fts5_trigram(ddl, target, bind, **kw) -> bool:
+    if bind.dialect.name != "sqlite" or bind.dialect.dbapi.sqlite_version_info < (3, 34, 0):
+        return False
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+for _statement in _LEDGER_SEARCH_FTS_DDL:
+    event.listen(LedgerTransaction.__table__, "after_create", DDL(_statement).execute_if(callable_=_sqlite_fts5_trigram))
+event.listen(
+    LedgerTransaction.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {LEDGER_SEARCH_FTS}").execute_if(dialect="sqlite"),
+)
+
+
+class LedgerRollup(Base):
+    """가계부 내역 일 × 분류별 합계 (ledger_rollup_service가 거래 추가 · 수정 · 삭제마다 증분 반영)"""
+    __tablename__ = "ledger_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    # 분류 값이 없으면 '' (유니크 키에 NULL을 넣지 않기 위함)
+    transaction_type = Column(String, nullable=False, server_default="")
+    category = Column(String, nullable=False, server_default="")
+    subcategory = Column(String, nullable=False, server_default="")
+    payment_method = Column(String, nullable=False, server_default="")
+    total = Column(Numeric(18, 2), nullable=False, server_default="0")      # 금액 합
+    abs_total = Column(Numeric(18, 2), nullable=False, server_default="0")  # 금액 절댓값 합
+    count = Column(Integer, nullable=False, server_default="0")             # 거래 건수 (금액 없는 거래 포함)
+    min_amount = Column(Numeric(15, 2), nullable=True)
+    max_amount = Column(Numeric(15, 2), nullable=True)
+
+    __table_args__ = (
+        Index(
+            'ux_ledger_rollup_key', 'day', 'transaction_type', 'category', 'subcategory', 'payment_method',
+            unique=True,
+        ),
+    )
+
 
 class UploadHistory(Base):
     __tablename__ = "upload_history"
@@ -153,5 +236,13 @@ class UploadHistory(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     file_size = Column(Integer, nullable=True)       # bytes
+    import_kind = Column(String, nullable=True)      # banksalad / ledger
+    content_sha256 = Column(String(64), nullable=True, index=True)  # 업로드 파일 바이트 해시 (재업로드 감지)
+    ledger_source = Column(String, nullable=True)    # 가계부 내역 출처 (banksalad)
+    ledger_high_water = Column(DateTime, nullable=True)  # 이 업로드로 반영된 가장 최근 거래일
     result_json = Column(JSON, nullable=True)        # import 결과 (upsert 건수 등)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_upload_history_ledger_mark', 'ledger_source', 'ledger_high_water'),
+    )
@@ -50,6 +50,7 @@ class CashFlowUpdate(BaseModel):
 
 class CashFlowResponse(CashFlowBase):
     id: int
+    month_sources: Optional[Dict[str, Optional[str]]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -229,6 +230,27 @@ class LedgerTransactionResponse(LedgerTransactionBase):
         from_attributes = True
 
 
+class LedgerSearchHit(LedgerTransactionResponse):
+    score: float                               # 부분 일치 1 + trigram 유사도(0~1), 클수록 앞
+
+
+class LedgerAggregateRow(BaseModel):
+    period: Optional[str] = None               # 기간 시작일 (YYYY-MM-DD), period 미지정 시 None
+    transaction_type: Optional[str] = None     # group_by에 포함된 컬럼만 채워짐
+    category: Optional[str] = None
+    subcategory: Optional[str] = None
+    payment_method: Optional[str] = None
+    total: float                               # 금액 합계 (지출은 음수)
+    abs_total: float                           # 금액 절댓값 합계
+    count: int
+
+
+class LedgerAggregateResponse(BaseModel):
+    period: Optional[str] = None               # day / week / month / year
+    group_by: List[str] = []
+    rows: List[LedgerAggregateRow]
+
+
 # ── InvestmentStatus ──────────────────────────────────────────
 class InvestmentStatusBase(BaseModel):
     investment_type: Optional[str] = None
@@ -263,6 +285,10 @@ class UploadHistoryResponse(BaseModel):
     id: int
     filename: str
     file_size: Optional[int] = None
+    import_kind: Optional[str] = None
+    content_sha256: Optional[str] = None
+    ledger_source: Optional[str] = None
+    ledger_high_water: Optional[datetime] = None
     result_json: Optional[Dict[str, Any]] = None
     created_at: datetime
 
@@ -270,6 +296,21 @@ class UploadHistoryResponse(BaseModel):
         from_attributes = True
 
 
+# ── ImportJob ─────────────────────────────────────────────────
+class ImportJobResponse(BaseModel):
+    id: str
+    kind: str                                  # banksalad / banksalad_archive / ledger
+    filename: str
+    status: str                                # queued / running / succeeded / failed
+    stage: Optional[str] = None                # 현재 처리 단계 (load, cash_flow, ledger ...)
+    counts: Dict[str, int] = {}                # 단계별 처리 건수
+    result: Optional[Dict[str, Any]] = None    # 완료 시 import 결과
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 # ── FinancialSnapshot ─────────────────────────────────────────
 class FinancialSnapshotItem(BaseModel):
     name: str
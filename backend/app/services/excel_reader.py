@@ -0,0 +1,62 @@
+"""
+Excel 워크북 스트리밍 리더
+
+openpyxl read-only 모드로 워크북을 열어 필요한 시트의 행만 지연(lazy) 순회합니다.
+셀 전체를 메모리에 올리지 않으므로 가계부 내역 행 수와 무관하게 메모리 사용량이 일정합니다.
+"""
+from typing import IO, Any, Iterator, Optional, Tuple, Union
+
+import openpyxl
+from openpyxl.workbook.workbook import Workbook
+
+SUMMARY_SHEET = "뱅샐현황"
+LEDGER_SHEET = "가계부 내역"
+
+# 가계부 내역 시트 컬럼 수 (날짜 ~ 메모)
+LEDGER_COLUMN_COUNT = 10
+
+
+def open_workbook(source: Union[str, IO[bytes]]) -> Workbook:
+    """
+    read-only 모드로 워크북을 엽니다. 시트는 실제로 순회할 때 XML 스트림에서 파싱됩니다.
+    read-only 워크북은 원본 파일 핸들을 유지하므로 사용 후 wb.close()를 호출해야 합니다.
+    """
+    return openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+
+def iter_sheet_rows(
+    wb: Workbook,
+    sheet_name: str,
+    min_row: int = 1,
+    max_row: Optional[int] = None,
+    min_col: Optional[int] = None,
+    max_col: Optional[int] = None,
+) -> Iterator[Tuple[int, Tuple[Any, ...]]]:
+    """
+    시트의 (행 번호, 값 튜플)을 하나씩 yield합니다.
+    read-only 워크시트는 비어 있는 행도 빈 튜플로 채워 주므로 행 번호가 어긋나지 않습니다.
+    max_col을 지정하면 값 튜플이 해당 길이로 패딩됩니다.
+    """
+    ws = wb[sheet_name]
+    rows = ws.iter_rows(
+        min_row=min_row, max_row=max_row,
+        min_col=min_col, max_col=max_col,
+        values_only=True,
+    )
+    for offset, values in enumerate(rows):
+        yield min_row + offset, values
+
+
+def ledger_row_total(wb: Workbook) -> Optional[int]:
+    """
+    가계부 내역 시트의 데이터 행 수(헤더 제외, iter_ledger_rows가 yield할 행 수).
+    시트 크기(dimension)가 기록되지 않은 파일이면 행을 모두 읽기 전에는 알 수 없으므로 None.
+    """
+    max_row = wb[LEDGER_SHEET].max_row
+    return max(0, max_row - 1) if max_row else None
+
+
+def iter_ledger_rows(wb: Workbook) -> Iterator[Tuple[Any, ...]]:
+    """가계부 내역 시트의 데이터 행(헤더 제외)을 10개 컬럼 튜플로 yield합니다."""
+    for _, values in iter_sheet_rows(wb, LEDGER_SHEET, min_row=2, min_col=1, max_col=LEDGER_COLUMN_COUNT):
+        yield values
@@ -0,0 +1,222 @@
+"""
+뱅크샐러드 export 묶음(zip) 파서
+
+여러 기간의 export 파일을 zip 하나로 받아 파일 하나를 import할 때와 같은 형태의 파싱 결과로 합칩니다.
+1. zip 안의 xlsx를 임시 디렉터리에 풀고 파일명의 날짜 범위(YYYY-MM-DD~YYYY-MM-DD) 순으로 정렬합니다.
+   범위 비교는 업로드 이력과 같은 기준(date_utils.is_upload_newer: 시작일, 같으면 종료일)이며,
+   범위가 없는 파일은 가장 오래된 것으로 취급합니다.
+2. 모든 파일의 시트를 workbook_parser 프로세스 풀에 한 번에 제출해 동시에 파싱합니다.
+3. merge_parsed_workbooks가 결과를 합칩니다. 같은 월이 여러 파일에 있으면 가장 최신 범위 파일의 값이 남습니다
+   (현금흐름은 cash_flow_service의 월 단위 병합 규칙).
+
+DB에 접근하지 않으며, 합친 결과의 쓰기는 import_service.import_banksalad_archive가 한 번에 처리합니다.
+"""
+import io
+import os
+import zipfile
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.services.cash_flow_service import CashFlowMerger
+from app.services.upload_spool import MAX_UPLOAD_BYTES
+from app.services.utils.date_utils import parse_date_range_from_filename
+from app.services.workbook_parser import (
+    ParsedLedger, ParsedSummary, ParsedWorkbook, parse_workbooks,
+)
+
+# zip 하나에 담을 수 있는 export 파일 수
+ARCHIVE_MAX_FILES = int(os.getenv("IMPORT_ARCHIVE_MAX_FILES", "60"))
+# 압축 해제 후 전체 크기 상한 (zip bomb 방지)
+ARCHIVE_MAX_EXTRACTED_BYTES = int(os.getenv("IMPORT_ARCHIVE_MAX_EXTRACTED_MB", "500")) * 1024 * 1024
+
+EXPORT_EXTENSIONS = (".xlsx",)
+
+# 시점 기준 섹션 — 가장 최신 파일의 값만 사용
+POINT_IN_TIME_SECTIONS = ("customer", "investment", "financial_snapshot")
+
+
+class ExportArchiveError(ValueError):
+    """zip 파일 자체를 import할 수 없는 경우 (손상된 zip, export 파일 없음, 크기 초과 등)."""
+
+
+@dataclass
+class ArchiveMember:
+    """zip에서 꺼낸 export 파일 하나. path는 임시 디렉터리 안의 경로입니다."""
+    name: str
+    path: str
+    date_range: Optional[Tuple[date, date]]
+
+
+def export_sort_key(name: str) -> tuple:
+    """오래된 export가 앞에 오도록 정렬하는 키. 범위가 같으면 파일명 순."""
+    date_range = parse_date_range_from_filename(os.path.basename(name))
+    return (date_range is not None, date_range or (), name)
+
+
+def _is_export(info: zipfile.ZipInfo) -> bool:
+    basename = os.path.basename(info.filename)
+    return (
+        not info.is_dir()
+        and basename.lower().endswith(EXPORT_EXTENSIONS)
+        and not basename.startswith((".", "~$"))
+        and not info.filename.startswith("__MACOSX/")
+    )
+
+
+def extract_exports(source: Union[str, bytes], workdir: str) -> List[ArchiveMember]:
+    """
+    zip 안의 export 파일을 workdir에 풀고 오래된 순으로 반환합니다.
+    zip 안의 경로는 파일명 표시에만 쓰고, 실제 파일은 workdir 아래 순번 이름으로 저장합니다.
+    """
+    try:
+        archive = zipfile.ZipFile(source if isinstance(source, str) else io.BytesIO(source))
+    except (zipfile.BadZipFile, OSError):
+        raise ExportArchiveError("zip 파일을 읽을 수 없습니다.")
+
+    with archive:
+        infos = sorted((info for info in archive.infolist() if _is_export(info)),
+                       key=lambda info: export_sort_key(info.filename))
+        if not infos:
+            raise ExportArchiveError("zip 안에 xlsx 파일이 없습니다.")
+        if len(infos) > ARCHIVE_MAX_FILES:
+            raise ExportArchiveError(f"zip 하나에는 xlsx 파일을 {ARCHIVE_MAX_FILES}개까지 담을 수 있습니다.")
+        if any(info.file_size > MAX_UPLOAD_BYTES for info in infos) \
+                or sum(info.file_size for info in infos) > ARCHIVE_MAX_EXTRACTED_BYTES:
+            raise ExportArchiveError("압축을 푼 파일 크기가 상한을 넘습니다.")
+
+        members = []
+        for i, info in enumerate(infos):
+            path = os.path.join(workdir, f"{i:03d}.xlsx")
+            try:
+                with archive.open(info) as src, open(path, "wb") as dst:
+                    _copy_limited(src, dst, info.file_size)
+            except (zipfile.BadZipFile, OSError, EOFError):
+                raise ExportArchiveError(f"{info.filename}: zip에서 파일을 꺼낼 수 없습니다.")
+            members.append(ArchiveMember(
+                name=info.filename,
+                path=path,
+                date_range=parse_date_range_from_filename(os.path.basename(info.filename)),
+            ))
+    return members
+
+
+def _copy_limited(src, dst, declared_size: int, chunk_size: int = 64 * 1024) -> None:
+    """zip 헤더의 크기를 믿지 않고, 선언된 크기를 넘게 풀리면 중단합니다."""
+    written = 0
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            return
+        written += len(chunk)
+        if written > declared_size:
+            raise ExportArchiveError("압축을 푼 파일 크기가 상한을 넘습니다.")
+        dst.write(chunk)
+
+
+def parse_archive_members(members: List[ArchiveMember]) -> List[ParsedWorkbook]:
+    """export 파일들을 동시에 파싱해 members와 같은 순서(오래된 순)로 반환합니다. 가계부는 모든 행을 읽습니다."""
+    parsed = parse_workbooks({member.name: member.path for member in members})
+    return [parsed[member.name] for member in members]
+
+
+# ── 병합 (newest-range-wins) ─────────────────────────────────
+
+def merge_parsed_workbooks(
+    parsed: List[ParsedWorkbook],
+    sources: Optional[List[Optional[str]]] = None,
+) -> ParsedWorkbook:
+    """
+    오래된 순으로 정렬된 파싱 결과를 하나로 합칩니다 (뒤의 파일일수록 최신).
+    sources는 파일별 날짜 범위 문자열(date_utils.date_range_key, 없으면 None)로 현금흐름 월 병합에 쓰입니다.
+    """
+    sources = sources or [None] * len(parsed)
+    with_summary = [(source, p.summary) for source, p in zip(sources, parsed) if p.summary is not None]
+    ledgers = [p.ledger for p in parsed if p.ledger is not None]
+    return ParsedWorkbook(
+        summary=merge_summaries([s for _, s in with_summary], [src for src, _ in with_summary])
+        if with_summary else None,
+        ledger=merge_ledgers(ledgers) if ledgers else None,
+    )
+
+
+def merge_summaries(
+    summaries: List[ParsedSummary],
+    sources: Optional[List[Optional[str]]] = None,
+) -> ParsedSummary:
+    """
+    뱅샐현황 섹션 병합.
+    - 고객 · 투자 · 재무현황: 해당 섹션을 파싱한 가장 최신 파일의 값
+    - 현금흐름: 항목별로 월 단위 병합 (merge_cash_flow_items)
+    - 월별 결산: (연, 월)별로 최신 파일 값 (merge_monthly_summaries)
+    모든 파일에서 파싱에 실패한 섹션만 errors에 남습니다 (가장 최신 파일의 사유).
+    """
+    sources = sources or [None] * len(summaries)
+    merged = ParsedSummary(month_labels=sorted({label for s in summaries for label in s.month_labels}))
+
+    for section in POINT_IN_TIME_SECTIONS:
+        parsed = [s for s in summaries if section not in s.errors]
+        if not parsed:
+            merged.errors[section] = summaries[-1].errors[section]
+            continue
+        # 섹션이 비어 있는 최신 파일(고객 정보 없음 등)은 건너뜀
+        values = [getattr(s, section) for s in parsed]
+        setattr(merged, section, next((v for v in reversed(values) if v), values[-1]))
+
+    cash_flow = [s.cash_flow or [] for s in summaries if "cash_flow" not in s.errors]
+    if cash_flow:
+        merged.cash_flow = merge_cash_flow_items(
+            cash_flow, [src for src, s in zip(sources, summaries) if "cash_flow" not in s.errors],
+        )
+    else:
+        merged.errors["cash_flow"] = summaries[-1].errors["cash_flow"]
+
+    monthly = [s.monthly_summary or [] for s in summaries if "monthly_summary" not in s.errors]
+    if monthly:
+        merged.monthly_summary = merge_monthly_summaries(monthly)
+    else:
+        merged.errors["monthly_summary"] = summaries[-1].errors["monthly_summary"]
+    return merged
+
+
+def merge_cash_flow_items(
+    item_lists: List[List[dict]],
+    sources: Optional[List[Optional[str]]] = None,
+) -> List[dict]:
+    """
+    파일별 현금흐름 항목(오래된 순)을 cash_flow_service.CashFlowMerger로 항목명 · 월 단위 병합합니다.
+    monthly_data는 모든 파일의 월을 합치고, 같은 월은 그 월을 담은 더 최신 범위 파일 값이 남습니다.
+    결과 항목의 month_sources에 월별 출처 범위가 담겨, DB의 기존 값과 병합할 때 그대로 쓰입니다.
+    """
+    sources = sources or [None] * len(item_lists)
+    merger = CashFlowMerger()
+    merged: Dict[str, dict] = {}
+    for source, items in zip(sources, item_lists):
+        merged.update(merger.merge_items(merged, items, source))
+    return list(merged.values())
+
+
+def merge_monthly_summaries(month_lists: List[List[dict]]) -> List[dict]:
+    """파일별 월별 결산(오래된 순)을 (연, 월)별로 합칩니다. 같은 월은 최신 파일 값이 남습니다."""
+    merged: Dict[Tuple[int, int], dict] = {}
+    for months in month_lists:
+        for m in months:
+            merged[(m["year"], m["month"])] = m
+    return [merged[key] for key in sorted(merged)]
+
+
+def merge_ledgers(ledgers: List[ParsedLedger]) -> ParsedLedger:
+    """
+    파일별 가계부 스풀 파일을 최신 파일부터 이어 붙입니다 (행을 읽거나 복사하지 않음).
+    기간이 겹쳐 같은 거래가 여러 번 들어 있어도 적재 시 dedup_hash 유니크 인덱스가 하나만 남기며,
+    최신 파일이 앞에 있으므로 분류 · 메모가 다르면 최신 파일의 값이 남습니다.
+    스풀 파일은 파일별 결과와 공유하므로 지우는 것은 파일별 결과 쪽(ParsedWorkbook.discard)입니다.
+    """
+    dates = [ledger.max_date for ledger in ledgers if ledger.max_date is not None]
+    return ParsedLedger(
+        paths=[path for ledger in reversed(ledgers) for path in ledger.paths],
+        rows=sum(len(ledger) for ledger in ledgers),
+        max_date=max(dates, default=None),
+        before_mark=sum(ledger.before_mark for ledger in ledgers),
+        stopped_early=any(ledger.stopped_early for ledger in ledgers),
+    )
@@ -0,0 +1,251 @@
+"""
+뱅크샐러드 import dry-run (변경 사항 미리보기)
+
+import와 같은 파서로 파일을 읽은 뒤, 현재 DB 상태와 비교해 섹션별로 무엇이 추가 · 변경될지를 반환합니다.
+조회(SELECT)만 하고 flush · commit · 행 잠금(FOR UPDATE)을 하지 않으며, PostgreSQL에서는 트랜잭션을 READ ONLY로 엽니다.
+업로드 이력도 남기지 않으므로 같은 파일을 dry-run한 뒤 그대로 import할 수 있습니다.
+
+가계부 내역은 import와 같은 증분 기준일(import_service.ledger_cutoff) 이후 행만 dedup_hash로 조회합니다.
+"""
+from decimal import Decimal
+from typing import IO, Any, Iterable, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.models import (
+    Customer, CashFlow, MonthlySummary,
+    InvestmentStatus, FinancialSnapshot, LedgerTransaction,
+)
+from app.services.cash_flow_service import CashFlowMerger, cash_flow_as_item
+from app.services.import_profile import ImportProfile
+from app.services.import_service import (
+    ProgressCallback, ledger_cutoff, match_investments, no_progress, parse_upload, upload_month_source,
+)
+from app.services.workbook_parser import SUMMARY_SECTIONS, ParsedLedger, ParsedSummary, ParsedWorkbook
+
+# dedup_hash IN (...) 조회 한 번에 넣을 해시 수
+LEDGER_LOOKUP_BATCH = 1000
+
+
+def _same(old: Any, new: Any) -> bool:
+    """DB 값(Decimal 등)과 파싱 값(float)을 소수 둘째 자리까지 비교합니다."""
+    if isinstance(old, (Decimal, float, int)) and isinstance(new, (Decimal, float, int)):
+        return round(float(old), 2) == round(float(new), 2)
+    return old == new
+
+
+def _plain(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _changes(obj: Any, values: dict, fields: Iterable[str]) -> dict:
+    """obj의 fields 중 values와 다른 항목을 {필드: {"from", "to"}}로 반환합니다."""
+    return {
+        field: {"from": _plain(getattr(obj, field)), "to": values[field]}
+        for field in fields
+        if not _same(getattr(obj, field), values[field])
+    }
+
+
+def diff_banksalad_workbook(
+    db: Session,
+    source: Union[str, bytes, IO[bytes]],
+    full_scan: bool = False,
+    progress: ProgressCallback = no_progress,
+    filename: Optional[str] = None,
+    content_sha256: Optional[str] = None,
+) -> dict:
+    """
+    뱅크샐러드 Excel 파일을 import했을 때의 변경 사항을 섹션별로 반환합니다. DB에는 쓰지 않습니다.
+    filename의 날짜 범위는 import와 같이 현금흐름 월 병합 기준으로 쓰입니다.
+    파싱 결과는 content_sha256을 키로 캐시되므로, 이어서 같은 파일을 import하면 시트를 다시 파싱하지 않습니다.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET TRANSACTION READ ONLY"))
+
+    profile = ImportProfile()
+    parsed: Optional[ParsedWorkbook] = None
+    try:
+        since = None if full_scan else ledger_cutoff(db)
+        parsed = parse_upload(source, profile, progress, ledger_since=since, content_sha256=content_sha256)
+
+        result: dict = {"dry_run": True, "errors": {}}
+        with db.no_autoflush:
+            progress("diff")
+            with profile.stage("diff"):
+                result["cleanup"] = _diff_cleanup(db)
+                if parsed.summary is not None:
+                    result.update(_diff_summary(db, parsed.summary, upload_month_source(filename)))
+            if parsed.ledger is not None:
+                progress("ledger")
+                with profile.stage("ledger_diff") as stage:
+                    result["ledger"] = _diff_ledger(db, parsed.ledger)
+                    stage.rows += len(parsed.ledger)
+        result["profile"] = profile.finish()
+        return result
+    finally:
+        # 어느 단계에서 실패해도 메모리 추적을 끄고 가계부 스풀 파일을 지움 (성공 시에는 위에서 끝낸 결과 유지)
+        profile.finish()
+        if parsed is not None:
+            parsed.discard()
+
+
+def _diff_cleanup(db: Session) -> dict:
+    """import 시작 시 정리(삭제)될 잉여 레코드 수 (import_service._cleanup_stale_rows와 같은 조건)."""
+    return {
+        "investment": db.query(InvestmentStatus).filter(
+            InvestmentStatus.company == None,
+            InvestmentStatus.principal == None,
+            InvestmentStatus.return_rate == None,
+        ).count(),
+        "monthly_summary": db.query(MonthlySummary).filter(
+            ((MonthlySummary.income == 0) & (MonthlySummary.expense == 0) & (MonthlySummary.net_income == 0))
+            | ((MonthlySummary.income == None) & (MonthlySummary.expense == None) & (MonthlySummary.net_income == None))
+        ).count(),
+    }
+
+
+def _diff_summary(db: Session, summary: ParsedSummary, month_source: Optional[str]) -> dict:
+    diffs: dict = {"errors": dict(summary.errors)}
+    differs = {
+        "customer": lambda: _diff_customer(db, summary.customer),
+        "cash_flow": lambda: _diff_cash_flow(db, summary.cash_flow or [], month_source),
+        "monthly_summary": lambda: _diff_monthly_summary(db, summary.monthly_summary or []),
+        "investment": lambda: _diff_investments(db, summary.investment),
+        "financial_snapshot": lambda: _diff_financial_snapshot(db, summary.financial_snapshot),
+    }
+    for section in SUMMARY_SECTIONS:
+        if section not in summary.errors:
+            diffs[section] = differs[section]()
+    return diffs
+
+
+def _diff_customer(db: Session, customer_data: Optional[dict]) -> Optional[dict]:
+    if not customer_data:
+        return None
+    customer = db.query(Customer).filter(Customer.name == customer_data["name"]).first()
+    if customer is None:
+        return {"action": "insert", "values": customer_data}
+    fields = ["gender", "age", "credit_score"] + (["email"] if customer_data["email"] else [])
+    changes = _changes(customer, customer_data, fields)
+    return {"action": "update" if changes else "unchanged", "name": customer.name, "changes": changes}
+
+
+def _diff_cash_flow(db: Session, items: list[dict], month_source: Optional[str]) -> dict:
+    """import와 같이 기존 항목과 월 단위로 병합한 결과를 현재 값과 비교합니다 (cash_flow_service 참고)."""
+    names = {item["item_name"] for item in items}
+    existing = {
+        cf.item_name: cf
+        for cf in db.query(CashFlow).filter(CashFlow.item_name.in_(names))
+    } if names else {}
+    latest = CashFlowMerger().merge_items(
+        {name: cash_flow_as_item(cf) for name, cf in existing.items()}, items, month_source,
+    )
+
+    diff: dict = {"inserted": [], "updated": [], "unchanged": 0}
+    for name, item in latest.items():
+        current = existing.get(name)
+        if current is None:
+            diff["inserted"].append({"item_name": name, "item_type": item["item_type"], "total": item["total"]})
+            continue
+        changes = _changes(current, item, ("item_type", "total", "monthly_average"))
+        if (current.monthly_data or {}) != item["monthly_data"]:
+            changed_months = sorted(
+                label for label in set(current.monthly_data or {}) | set(item["monthly_data"])
+                if not _same((current.monthly_data or {}).get(label), item["monthly_data"].get(label))
+            )
+            if changed_months:
+                changes["monthly_data"] = {"months": changed_months}
+        if changes:
+            diff["updated"].append({"item_name": name, "changes": changes})
+        else:
+            diff["unchanged"] += 1
+    return diff
+
+
+def _diff_monthly_summary(db: Session, months: list[dict]) -> dict:
+    years = {m["year"] for m in months}
+    existing = {
+        (ms.year, ms.month): ms
+        for ms in db.query(MonthlySummary).filter(MonthlySummary.year.in_(years))
+    } if years else {}
+
+    diff: dict = {"inserted": [], "updated": [], "unchanged": 0}
+    for m in months:
+        current = existing.get((m["year"], m["month"]))
+        if current is None:
+            diff["inserted"].append(m)
+            continue
+        changes = _changes(current, m, ("income", "expense", "net_income"))
+        if changes:
+            diff["updated"].append({"year": m["year"], "month": m["month"], "changes": changes})
+        else:
+            diff["unchanged"] += 1
+    return diff
+
+
+def _diff_investments(db: Session, investment: Optional[dict]) -> dict:
+    diff: dict = {"updated": [], "unchanged": 0, "unmatched": []}
+    excel_investments: list[tuple[str, float]] = investment["items"] if investment else []
+    if not excel_investments:
+        return diff
+
+    all_inv_db = db.query(InvestmentStatus).order_by(InvestmentStatus.id).all()
+    matched = match_investments(all_inv_db, excel_investments)
+    for rec, val in matched:
+        if _same(rec.current_value, val):
+            diff["unchanged"] += 1
+        else:
+            diff["updated"].append({
+                "id": rec.id, "product_name": rec.product_name,
+                "from": _plain(rec.current_value), "to": val,
+            })
+    matched_names = {rec.product_name for rec, _ in matched}
+    diff["unmatched"] = sorted({name for name, _ in excel_investments} - matched_names)
+    diff["investment_value"] = sum(v for _, v in excel_investments)
+    if investment["month"]:
+        diff["month"] = "{}-{:02d}".format(*investment["month"])
+    return diff
+
+
+def _diff_financial_snapshot(db: Session, snapshot: Optional[dict]) -> Optional[dict]:
+    if snapshot is None:
+        return None
+    current = db.query(FinancialSnapshot).first()
+    if current is None:
+        return {"action": "insert", "values": {k: v for k, v in snapshot.items() if k != "snapshot_data"}}
+    changes = _changes(current, snapshot, ("total_assets", "total_liabilities", "net_assets"))
+    if (current.snapshot_data or {}) != snapshot["snapshot_data"]:
+        changes["snapshot_data"] = {"changed": True}
+    return {"action": "update" if changes else "unchanged", "changes": changes}
+
+
+def _diff_ledger(db: Session, ledger: ParsedLedger) -> dict:
+    """
+    import 결과와 같은 형태로 가계부 내역 건수를 예측합니다.
+    파일의 dedup_hash 중 DB에 없는 것만 inserted로 셉니다 (파일 안 중복은 한 건).
+    배치를 하나씩 읽으며, 파일 안 중복을 가리기 위해 이미 본 해시만 32바이트 digest로 모아 둡니다.
+    """
+    seen: set = set()
+    inserted = 0
+    for columns in ledger.batches():
+        hashes = []
+        for dedup_hash in columns["dedup_hash"]:
+            digest = bytes.fromhex(dedup_hash)
+            if digest not in seen:
+                seen.add(digest)
+                hashes.append(dedup_hash)
+        for start in range(0, len(hashes), LEDGER_LOOKUP_BATCH):
+            batch = hashes[start:start + LEDGER_LOOKUP_BATCH]
+            existing = (
+                db.query(LedgerTransaction.dedup_hash)
+                .filter(LedgerTransaction.dedup_hash.in_(batch))
+                .count()
+            )
+            inserted += len(batch) - existing
+    return {
+        "inserted": inserted,
+        "skipped": len(ledger) - inserted + ledger.before_mark,
+        "before_mark": ledger.before_mark,
+    }
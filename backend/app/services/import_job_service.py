@@ -0,0 +1,151 @@
+"""
+Excel import 작업 큐 - 업로드를 작업으로 등록하고 워커 스레드 풀에서 실행합니다.
+
+import 파이프라인(openpyxl 파싱 · ORM 커밋)은 동기 코드이므로 요청 핸들러에서 직접 실행하면
+이벤트 루프가 막혀 다른 API 요청까지 지연됩니다. API는 작업 ID를 즉시 반환하고,
+진행 단계와 처리 건수, 최종 결과는 GET /api/import/jobs/{id} 로 조회합니다.
+작업 상태는 프로세스 메모리에만 보관하며, 최종 결과는 import 파이프라인이 UploadHistory에 저장합니다.
+"""
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+# 완료된 작업은 이 개수까지만 보관 (오래된 순으로 제거)
+MAX_FINISHED_JOBS = 200
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class ImportJob:
+    """단일 import 작업의 상태. 워커 스레드가 갱신하고 API 스레드가 읽습니다."""
+
+    def __init__(self, kind: str, filename: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.status = JOB_QUEUED
+        self.stage: Optional[str] = None
+        self.counts: Dict[str, int] = {}
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.future: Optional[Future] = None
+
+    def report(self, stage: str, **counts: int) -> None:
+        """import 파이프라인의 progress 콜백."""
+        self.stage = stage
+        self.counts.update(counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "counts": dict(self.counts),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_jobs: Dict[str, ImportJob] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import")
+        return _executor
+
+
+def _prune_finished_jobs() -> None:
+    finished = [j for j in _jobs.values() if j.status in (JOB_SUCCEEDED, JOB_FAILED)]
+    if len(finished) <= MAX_FINISHED_JOBS:
+        return
+    finished.sort(key=lambda j: j.finished_at)
+    for job in finished[: len(finished) - MAX_FINISHED_JOBS]:
+        _jobs.pop(job.id, None)
+
+
+def _run_job(job: ImportJob, runner: Callable[[ImportJob], dict]) -> None:
+    job.status = JOB_RUNNING
+    job.started_at = datetime.now()
+    try:
+        job.result = runner(job)
+        job.status = JOB_SUCCEEDED
+    except Exception as e:
+        if not isinstance(e, ValueError):
+            logger.error(f"import 작업 실패 ({job.filename}): {str(e)}", exc_info=True)
+        job.error = str(e)
+        job.status = JOB_FAILED
+    finally:
+        job.stage = "done"
+        job.finished_at = datetime.now()
+        with _lock:
+            _prune_finished_jobs()
+
+
+def submit_import_job(kind: str, filename: str, runner: Callable[[ImportJob], dict]) -> ImportJob:
+    """
+    import 작업을 등록하고 워커 풀에 제출합니다.
+    runner(job)은 워커 스레드에서 실행되며 결과 dict를 반환해야 합니다.
+    """
+    job = ImportJob(kind, filename)
+    with _lock:
+        _jobs[job.id] = job
+    job.future = _get_executor().submit(_run_job, job, runner)
+    return job
+
+
+def record_completed_job(kind: str, filename: str, result: dict) -> ImportJob:
+    """워커 실행 없이 이미 결과가 있는 작업(재업로드 재사용 등)을 완료 상태로 등록합니다."""
+    job = ImportJob(kind, filename)
+    job.status = JOB_SUCCEEDED
+    job.stage = "done"
+    job.result = result
+    job.started_at = job.finished_at = datetime.now()
+    with _lock:
+        _jobs[job.id] = job
+        _prune_finished_jobs()
+    return job
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def wait_for_job(job_id: str, timeout: Optional[float] = None) -> Optional[ImportJob]:
+    """작업이 끝날 때까지 대기합니다 (스크립트·테스트용)."""
+    job = get_job(job_id)
+    if job is not None and job.future is not None:
+        job.future.result(timeout=timeout)
+    return job
+
+
+def shutdown_import_workers(wait: bool = True) -> None:
+    """워커 풀을 종료합니다. 다음 제출 시 새 풀이 생성됩니다."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
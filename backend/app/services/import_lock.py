@@ -0,0 +1,76 @@
+"""
+import 쓰기 단계 직렬화 (PostgreSQL advisory lock)
+
+두 업로드가 동시에 쓰기 단계에 들어가면 정리 DELETE(InvestmentStatus · MonthlySummary)와
+기존 키 조회 → INSERT가 같은 행을 두고 경합하고, 같은 가계부 행을 양쪽에서 중복 INSERT 시도하게 됩니다.
+쓰기 단계 시작 시 트랜잭션 단위 advisory lock(pg_advisory_xact_lock)을 잡아 import 쓰기를 한 번에 하나씩 실행합니다.
+- 파싱(workbook_parser 프로세스 풀)은 락 밖에서 진행되므로 여러 업로드의 파싱은 계속 동시에 돌고,
+  기다리는 동안 앞선 import가 commit한 데이터는 락을 잡은 뒤의 조회에서 그대로 보입니다.
+- 락은 import 트랜잭션의 데이터 commit(또는 rollback)과 함께 풀리므로 별도 해제가 없습니다.
+- 바로 잡지 못하면 앞에 있는 import 수(락 보유 1 + 먼저 기다리는 세션 수)를 대기 순번으로 보고한 뒤 기다립니다.
+  PostgreSQL은 같은 락의 대기자를 도착 순서대로 깨우므로 순번대로 진행됩니다.
+- IMPORT_LOCK_TIMEOUT_SECONDS 안에 잡지 못하면 ImportLockTimeout으로 실패합니다 (0이면 제한 없이 대기).
+
+SQLite(테스트 DB)는 DB 전체에 쓰기 락이 하나라 advisory lock이 없으므로 아무것도 하지 않습니다.
+"""
+import os
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# 다른 애플리케이션과 같은 DB를 쓸 때 겹치지 않도록 바꿀 수 있는 advisory lock 키 (32비트 양수)
+IMPORT_LOCK_KEY = int(os.getenv("IMPORT_ADVISORY_LOCK_KEY", "72001"))
+IMPORT_LOCK_TIMEOUT_SECONDS = int(os.getenv("IMPORT_LOCK_TIMEOUT_SECONDS", "600"))
+
+# 대기 순번 보고 시 progress 단계명
+STAGE_WAITING = "waiting"
+
+
+class ImportLockTimeout(ValueError):
+    """제한 시간 안에 import 쓰기 락을 잡지 못한 경우."""
+
+
+def _waiting_sessions(db: Session) -> int:
+    """같은 DB에서 import 락을 기다리고 있는 다른 세션 수."""
+    return db.execute(text(
+        "SELECT count(*) FROM pg_locks"
+        " WHERE locktype = 'advisory' AND NOT granted"
+        " AND classid = 0 AND objid = :key AND objsubid = 1"
+        " AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+    ), {"key": IMPORT_LOCK_KEY}).scalar() or 0
+
+
+def lock_import_writes(
+    db: Session,
+    progress: Optional[Callable[..., None]] = None,
+    timeout_seconds: Optional[int] = None,
+) -> int:
+    """
+    현재 트랜잭션에 import 쓰기 락을 잡고, 기다리기 시작할 때의 대기 순번을 반환합니다 (바로 잡으면 0).
+    기다려야 하면 progress("waiting", queue_position=n)을 먼저 호출합니다.
+    락은 트랜잭션이 끝날 때(commit · rollback) 풀립니다.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    if db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": IMPORT_LOCK_KEY}).scalar():
+        return 0
+
+    position = 1 + _waiting_sessions(db)
+    if progress is not None:
+        progress(STAGE_WAITING, queue_position=position)
+
+    timeout = IMPORT_LOCK_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds
+    previous = db.execute(text("SELECT current_setting('lock_timeout')")).scalar()
+    db.execute(text("SELECT set_config('lock_timeout', :value, true)"), {"value": f"{timeout * 1000}ms"})
+    try:
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": IMPORT_LOCK_KEY})
+    except OperationalError as e:
+        if getattr(e.orig, "pgcode", None) == "55P03":  # lock_not_available
+            raise ImportLockTimeout(
+                f"다른 import가 진행 중이라 {timeout}초 안에 시작하지 못했습니다. 잠시 후 다시 시도해 주세요."
+            )
+        raise
+    db.execute(text("SELECT set_config('lock_timeout', :value, true)"), {"value": previous})
+    return position
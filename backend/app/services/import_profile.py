@@ -0,0 +1,144 @@
+"""
+import 단계별 성능 프로파일
+
+단계마다 소요 시간(wall time), 처리 행 수, 단계를 실행한 프로세스의 RSS 최고치(rss_kb)를 기록하고,
+IMPORT_PROFILE_MEMORY=1이면 최대 할당 메모리(peak_kb)도 기록합니다.
+가계부 내역처럼 배치 단위로 여러 번 들어가는 단계는 같은 이름으로 누적됩니다(시간·행 수 합계, 메모리는 최댓값).
+결과는 UploadHistory.result_json["profile"]에 저장되어 GET /api/upload-history로 조회할 수 있습니다.
+
+rss_kb는 getrusage의 ru_maxrss(프로세스 시작 이후 RSS 최고치)를 단계 종료 시점에 읽은 값으로, 시스템 호출 한 번이라
+항상 기록합니다. 시트 파싱 단계는 워커 프로세스의 값이고, 워커는 재사용되므로 이전 import의 최고치를 포함할 수 있습니다.
+resource 모듈이 없는 플랫폼(Windows)에서는 None입니다.
+
+상세 측정(peak_kb)은 tracemalloc을 쓰며 기본으로 꺼져 있습니다. tracemalloc은 프로세스 전역이라 켜 두는 동안
+같은 프로세스의 모든 요청이 할당 추적 비용을 치르기 때문입니다 (peak_kb는 None).
+전역 최고치(peak)를 단계마다 초기화하면 바깥 단계 · 동시에 실행 중인 다른 import의 측정이 망가지므로 초기화하지 않고,
+단계 시작 시점의 사용량과 전역 최고치를 기억해 둡니다.
+- 단계 중 전역 최고치가 갱신되었으면: 새 최고치 - 시작 시 사용량 (이 단계에서 도달한 최대 증가량)
+- 갱신되지 않았으면: 단계 종료 시 사용량 - 시작 시 사용량 (하한값)
+rss_kb · peak_kb 모두 import 한 건이 아니라 프로세스 단위 값이라, 동시에 실행되는 import가 있으면
+겹치는 작업의 메모리를 함께 포함합니다. 결과의 memory_scope("process")가 이를 나타냅니다.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_MEMORY = os.getenv("IMPORT_PROFILE_MEMORY", "0") == "1"
+
+_trace_lock = threading.Lock()
+_trace_users = 0
+
+
+def _start_tracing() -> bool:
+    global _trace_users
+    if not PROFILE_MEMORY:
+        return False
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _trace_users += 1
+    return True
+
+
+def _stop_tracing() -> None:
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _rss_high_water_kb() -> Optional[int]:
+    """현재 프로세스의 RSS 최고치(KB). macOS의 ru_maxrss는 바이트 단위."""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+def _new_entry(name: str) -> Dict[str, Any]:
+    return {"stage": name, "seconds": 0.0, "rows": 0, "rss_kb": None, "peak_kb": None}
+
+
+def _max_kb(current: Optional[int], value: Optional[int]) -> Optional[int]:
+    return current if value is None else max(current or 0, value)
+
+
+class StageRecord:
+    """진행 중인 단계에 처리 행 수를 더하기 위한 핸들."""
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+
+class ImportProfile:
+    """import 한 건의 단계별 프로파일."""
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._tracing = _start_tracing()
+        self._finished: Optional[Dict[str, Any]] = None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[StageRecord]:
+        """with 블록을 단계 name으로 측정합니다. 블록 안에서 record.rows에 처리 건수를 더할 수 있습니다."""
+        record = StageRecord()
+        record.rows = rows
+        if self._tracing:
+            base, peak_before = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            peak_kb: Optional[int] = None
+            if self._tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                reached = peak if peak > peak_before else current
+                peak_kb = max(0, reached - base) // 1024
+            entry = self._stages.setdefault(name, _new_entry(name))
+            entry["seconds"] += elapsed
+            entry["rows"] += record.rows
+            entry["rss_kb"] = _max_kb(entry["rss_kb"], _rss_high_water_kb())
+            entry["peak_kb"] = _max_kb(entry["peak_kb"], peak_kb)
+
+    def merge(self, stages: List[Dict[str, Any]]) -> None:
+        """다른 프로세스에서 측정한 to_dict()["stages"] 목록을 같은 이름의 단계에 누적합니다."""
+        for other in stages:
+            entry = self._stages.setdefault(other["stage"], _new_entry(other["stage"]))
+            entry["seconds"] += other["seconds"]
+            entry["rows"] += other["rows"]
+            entry["rss_kb"] = _max_kb(entry["rss_kb"], other["rss_kb"])
+            entry["peak_kb"] = _max_kb(entry["peak_kb"], other["peak_kb"])
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        메모리 추적을 끝내고 result_json에 넣을 dict를 반환합니다.
+        실패 시 정리를 위해 finally에서 다시 불러도 되며, 두 번째 호출부터는 처음 반환한 결과를 그대로 돌려줍니다.
+        """
+        if self._finished is None:
+            if self._tracing:
+                _stop_tracing()
+                self._tracing = False
+            self._finished = self.to_dict()
+        return self._finished
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": [
+                {**entry, "seconds": round(entry["seconds"], 4)}
+                for entry in self._stages.values()
+            ],
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "memory_scope": "process",
+        }
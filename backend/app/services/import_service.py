@@ -0,0 +1,635 @@
+"""
+뱅크샐러드 Excel import 파이프라인
+
+API 요청 스레드와 분리되어 import 작업 워커에서 실행됩니다.
+각 단계 진입 시 progress 콜백으로 단계명과 처리 건수를 보고합니다.
+
+시트 파싱은 workbook_parser가 프로세스 풀에서 시트별로 동시에 수행하고,
+이 모듈은 파싱 결과를 받아 DB 쓰기만 순서대로 처리합니다.
+
+import 전체가 하나의 트랜잭션이며 마지막에 한 번만 commit합니다.
+뱅샐현황의 각 섹션은 SAVEPOINT 안에서 실행되어, 실패한 섹션만 되돌리고 result["errors"]에 기록한 뒤
+나머지 섹션을 계속 진행합니다.
+단계별 소요 시간 · 행 수 · 최대 메모리는 result["profile"]에 기록됩니다 (import_profile 참고).
+
+가계부 내역은 증분으로 반영합니다. 출처별로 지금까지 반영된 가장 최근 거래일(UploadHistory.ledger_high_water)을
+기준으로, 그보다 LEDGER_OVERLAP_DAYS일 앞선 날부터의 행만 파싱 · 중복 검사하고 그 이전 행은 건너뜁니다.
+full_scan=True면 기준일 없이 모든 행을 검사합니다.
+
+현금흐름 항목은 행을 통째로 덮어쓰지 않고 기존 값과 월 단위로 병합합니다 (cash_flow_service 참고).
+
+여러 기간의 export를 묶은 zip은 import_banksalad_archive가 파일들을 동시에 파싱 · 병합한 뒤
+같은 쓰기 단계를 한 번만 실행합니다 (파일 수만큼 import를 반복하지 않음).
+zip은 주로 지난 기간을 채우는(backfill) 용도라 증분 기준일을 적용하지 않고 모든 행을 검사합니다.
+
+동시에 올라온 import는 파싱까지 병렬로 진행하고, 쓰기 단계는 import_lock의 advisory lock으로 하나씩 실행합니다.
+기다린 경우 앞에 있던 import 수를 result["queue_position"]에 남깁니다 (바로 시작했으면 0).
+"""
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import IO, Callable, List, Optional, Union
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.models import (
+    Customer, CashFlow, MonthlySummary,
+    InvestmentStatus, FinancialSnapshot, UploadHistory,
+)
+from app.services.cash_flow_service import CashFlowMerger, load_cash_flow_items
+from app.services.export_archive import (
+    ExportArchiveError, extract_exports, merge_parsed_workbooks, parse_archive_members,
+)
+from app.services.import_lock import lock_import_writes
+from app.services.import_profile import ImportProfile
+from app.services.ledger_loader import bulk_insert_ledger_batches
+from app.services.monthly_summary_service import refresh_cumulative_net_income
+from app.services.utils.date_utils import date_range_key, parse_date_range_from_filename
+from app.services.workbook_parser import (
+    SUMMARY_SECTIONS, ParsedLedger, ParsedWorkbook, WorkbookLoadError, parse_workbook,
+)
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[..., None]
+
+IMPORT_KIND_BANKSALAD = "banksalad"
+IMPORT_KIND_LEDGER = "ledger"
+IMPORT_KIND_BANKSALAD_ARCHIVE = "banksalad_archive"
+
+# 두 import 방식 모두 뱅크샐러드 export의 같은 가계부 내역 시트를 읽으므로 출처가 같음
+LEDGER_SOURCE_BANKSALAD = "banksalad"
+
+# 기준일 이전이라도 다시 검사할 기간 (늦게 확정되어 과거 날짜로 들어오는 카드 거래 등)
+LEDGER_OVERLAP_DAYS = int(os.getenv("LEDGER_OVERLAP_DAYS", "7"))
+
+
+class ImportFileError(ValueError):
+    """업로드 파일을 import할 수 없는 경우 (손상된 파일, 필수 시트 누락 등)."""
+
+
+def no_progress(stage: str, **counts: int) -> None:
+    pass
+
+
+def _run_section(
+    db: Session,
+    result: dict,
+    section: str,
+    fn: Callable[[], dict],
+    profile: Optional[ImportProfile] = None,
+) -> None:
+    """
+    섹션 하나를 SAVEPOINT 안에서 실행하고 반환된 건수를 result[section]에 기록합니다.
+    실패하면 SAVEPOINT까지 되돌리고 result["errors"][section]에 사유를 남긴 뒤 계속 진행합니다.
+    profile을 넘기면 섹션 전체를 같은 이름의 단계로 측정합니다.
+    """
+    savepoint = db.begin_nested()
+    try:
+        with profile.stage(section) if profile else nullcontext() as stage:
+            counts = fn()
+            db.flush()
+            if stage is not None:
+                stage.rows += sum(counts.values())
+    except Exception as e:
+        savepoint.rollback()
+        logger.warning(f"import 섹션 실패 ({section}): {str(e)}", exc_info=True)
+        result["errors"][section] = str(e)
+        return
+    savepoint.commit()
+    result[section] = counts
+
+
+def ledger_cutoff(db: Session, source: str = LEDGER_SOURCE_BANKSALAD) -> Optional[datetime]:
+    """
+    출처의 가계부 증분 기준일을 반환합니다: 지금까지 반영된 가장 최근 거래일에서 LEDGER_OVERLAP_DAYS일 전 자정.
+    반영 이력이 없으면 None (전체 검사).
+    """
+    mark = (
+        db.query(func.max(UploadHistory.ledger_high_water))
+        .filter(UploadHistory.ledger_source == source)
+        .scalar()
+    )
+    if mark is None:
+        return None
+    return datetime(mark.year, mark.month, mark.day) - timedelta(days=LEDGER_OVERLAP_DAYS)
+
+
+def parse_upload(
+    source: Union[str, bytes, IO[bytes]],
+    profile: ImportProfile,
+    progress: ProgressCallback,
+    summary: bool = True,
+    ledger_since: Optional[datetime] = None,
+    content_sha256: Optional[str] = None,
+):
+    """
+    워크북을 시트별로 병렬 파싱하고 워커가 기록한 단계를 profile에 합칩니다.
+    content_sha256은 파싱 캐시 키로 쓰입니다 (workbook_parser 참고).
+    """
+    progress("parse")
+    try:
+        with profile.stage("parse"):
+            parsed = parse_workbook(
+                source, summary=summary, ledger_since=ledger_since, content_sha256=content_sha256,
+            )
+    except WorkbookLoadError as e:
+        raise ImportFileError(str(e))
+    for sheet in (parsed.summary, parsed.ledger):
+        if sheet is not None:
+            profile.merge(sheet.stages)
+    return parsed
+
+
+def import_banksalad_workbook(
+    db: Session,
+    source: Union[str, bytes, IO[bytes]],
+    filename: str,
+    file_size: Optional[int] = None,
+    content_sha256: Optional[str] = None,
+    progress: ProgressCallback = no_progress,
+    full_scan: bool = False,
+) -> dict:
+    """뱅크샐러드 Excel 파일을 파싱하여 고객·현금흐름·월별결산·가계부 내역을 일괄 갱신합니다."""
+    profile = ImportProfile()
+    parsed: Optional[ParsedWorkbook] = None
+    try:
+        since = None if full_scan else ledger_cutoff(db)
+        parsed = parse_upload(source, profile, progress, ledger_since=since, content_sha256=content_sha256)
+
+        result = _empty_result()
+        _write_parsed(db, parsed, result, profile, progress, month_source=upload_month_source(filename))
+
+        # 업로드 이력 저장 — import 데이터 전체에서 유일한 commit
+        progress("history")
+        history = _banksalad_history(parsed, result, filename, file_size, content_sha256, IMPORT_KIND_BANKSALAD)
+        return _commit_with_history(db, history, result, profile)
+    finally:
+        # 어느 단계에서 실패해도 메모리 추적을 끄고 가계부 스풀 파일을 지움
+        profile.finish()
+        if parsed is not None:
+            parsed.discard()
+
+
+def import_banksalad_archive(
+    db: Session,
+    source: Union[str, bytes],
+    filename: str,
+    file_size: Optional[int] = None,
+    content_sha256: Optional[str] = None,
+    progress: ProgressCallback = no_progress,
+) -> dict:
+    """
+    뱅크샐러드 export 여러 개를 묶은 zip을 한 번에 반영합니다 (export_archive 참고).
+    파일들을 동시에 파싱해 기간 순으로 합친 뒤(같은 월은 최신 범위 파일 우선),
+    파일 하나를 import할 때와 같은 쓰기 단계를 한 번만 실행하고 한 번만 commit합니다.
+    result["files"]에는 반영 순서(오래된 순)대로 파일별 날짜 범위 · 가계부 행 수 · 파싱 오류가 담깁니다.
+    가계부 내역은 증분 기준일 없이 모든 행을 검사합니다. 기준일은 지금까지 반영한 가장 최근 거래일에서 정해지므로,
+    그보다 오래된 기간을 채우는 zip에 적용하면 아직 없는 과거 거래를 모두 건너뛰게 됩니다.
+    중복은 dedup_hash 유니크 인덱스가 건너뛰고, 업로드 이력의 기준일(최댓값)도 앞당겨지지 않습니다.
+    """
+    profile = ImportProfile()
+    parsed_files: List[ParsedWorkbook] = []
+    try:
+        progress("parse")
+        with tempfile.TemporaryDirectory(prefix="mymoney-archive-") as workdir:
+            try:
+                with profile.stage("extract") as stage:
+                    members = extract_exports(source, workdir)
+                    stage.rows += len(members)
+                progress("parse", files=len(members))
+                with profile.stage("parse"):
+                    parsed_files = parse_archive_members(members)
+            except (ExportArchiveError, WorkbookLoadError) as e:
+                raise ImportFileError(str(e))
+
+        for parsed_file in parsed_files:
+            for sheet in (parsed_file.summary, parsed_file.ledger):
+                if sheet is not None:
+                    profile.merge(sheet.stages)
+        with profile.stage("merge"):
+            parsed = merge_parsed_workbooks(parsed_files, [
+                date_range_key(member.date_range) if member.date_range else None for member in members
+            ])
+
+        result = _empty_result()
+        result["files"] = [
+            {
+                "name": member.name,
+                "date_range": "~".join(d.isoformat() for d in member.date_range) if member.date_range else None,
+                "ledger_rows": len(parsed_file.ledger) if parsed_file.ledger is not None else None,
+                "errors": dict(parsed_file.summary.errors) if parsed_file.summary is not None else {},
+            }
+            for member, parsed_file in zip(members, parsed_files)
+        ]
+        _write_parsed(db, parsed, result, profile, progress)
+
+        progress("history")
+        history = _banksalad_history(
+            parsed, result, filename, file_size, content_sha256, IMPORT_KIND_BANKSALAD_ARCHIVE,
+        )
+        return _commit_with_history(db, history, result, profile)
+    finally:
+        profile.finish()
+        # 병합 결과의 가계부는 파일별 스풀 파일을 그대로 가리킴
+        for parsed_file in parsed_files:
+            parsed_file.discard()
+
+
+def upload_month_source(filename: Optional[str]) -> Optional[str]:
+    """업로드 파일명의 날짜 범위 문자열 (현금흐름 월 병합의 출처 표시, 범위가 없으면 None)."""
+    date_range = parse_date_range_from_filename(filename) if filename else None
+    return date_range_key(date_range) if date_range else None
+
+
+def _empty_result() -> dict:
+    return {
+        "customer": {"updated": 0, "inserted": 0},
+        "cash_flow": {"updated": 0, "inserted": 0},
+        "monthly_summary": {"updated": 0, "inserted": 0},
+        "investment": {"updated": 0, "inserted": 0},
+        "financial_snapshot": {"updated": 0, "inserted": 0},
+        "ledger": {"inserted": 0, "skipped": 0, "before_mark": 0},
+        "errors": {},
+        "queue_position": 0,
+    }
+
+
+def _write_parsed(
+    db: Session,
+    parsed: ParsedWorkbook,
+    result: dict,
+    profile: ImportProfile,
+    progress: ProgressCallback,
+    month_source: Optional[str] = None,
+) -> None:
+    """
+    파싱 결과(파일 하나 또는 zip 병합 결과)를 섹션 순서대로 씁니다. commit은 호출자가 담당합니다.
+    month_source는 업로드 파일명의 날짜 범위 문자열(현금흐름 월 병합 기준, 범위가 없으면 None)입니다.
+    """
+    result["queue_position"] = _lock_writes(db, profile, progress)
+    progress("cleanup")
+    with profile.stage("cleanup"):
+        _cleanup_stale_rows(db)
+
+    # ── 뱅샐현황 시트 ─────────────────────────────────────────
+    summary = parsed.summary
+    if summary is not None:
+        writers = {
+            "customer": lambda: _write_customer(db, summary.customer),
+            "cash_flow": lambda: _write_cash_flow(db, summary.cash_flow, month_source),
+            "monthly_summary": lambda: _write_monthly_summary(db, summary.monthly_summary),
+            "investment": lambda: _write_investments(db, summary.investment),
+            "financial_snapshot": lambda: _write_financial_snapshot(db, summary.financial_snapshot),
+        }
+        for section in SUMMARY_SECTIONS:
+            progress(section)
+            if section in summary.errors:
+                # 파싱 단계에서 실패한 섹션은 쓰지 않고 사유만 기록
+                result["errors"][section] = summary.errors[section]
+                continue
+            _run_section(db, result, section, writers[section], profile)
+
+    # ── 가계부 내역 시트 ──────────────────────────────────────────
+    if parsed.ledger is not None:
+        progress("ledger")
+        _run_section(db, result, "ledger", lambda: _write_ledger(db, parsed.ledger, profile, progress))
+
+
+def _lock_writes(db: Session, profile: ImportProfile, progress: ProgressCallback) -> int:
+    """쓰기 단계 시작 전 import 쓰기 락을 잡고 대기 순번을 반환합니다 (import_lock 참고)."""
+    with profile.stage("lock_wait"):
+        return lock_import_writes(db, progress)
+
+
+def _banksalad_history(
+    parsed: ParsedWorkbook,
+    result: dict,
+    filename: str,
+    file_size: Optional[int],
+    content_sha256: Optional[str],
+    import_kind: str,
+) -> UploadHistory:
+    """뱅크샐러드 import 이력 행. 가계부 내역을 반영했을 때만 증분 기준일을 남깁니다."""
+    ledger_written = parsed.ledger is not None and "ledger" not in result["errors"]
+    return UploadHistory(
+        filename=filename,
+        file_size=file_size,
+        import_kind=import_kind,
+        content_sha256=content_sha256,
+        ledger_source=LEDGER_SOURCE_BANKSALAD if ledger_written else None,
+        ledger_high_water=_high_water(parsed.ledger) if ledger_written else None,
+        result_json=result,
+    )
+
+
+def _commit_with_history(db: Session, history: UploadHistory, result: dict, profile: ImportProfile) -> dict:
+    """
+    업로드 이력과 함께 import 트랜잭션을 한 번만 commit하고 result를 반환합니다.
+    이력 행에는 commit 직전까지의 프로파일이 저장되며, commit 단계 소요 시간은 commit이 끝나야 알 수 있으므로
+    반환하는 result(작업 결과)에만 들어갑니다.
+    """
+    result["profile"] = profile.to_dict()
+    history.result_json = dict(result)
+    db.add(history)
+    with profile.stage("commit"):
+        db.commit()
+    result["profile"] = profile.finish()
+    return result
+
+
+# ── 뱅샐현황 섹션별 쓰기 ───────────────────────────────────────
+
+def _cleanup_stale_rows(db: Session) -> None:
+    """기존 오염 데이터 정리."""
+    # company/principal 없이 삽입된 투자 레코드 제거 (이전 import 버그로 인한 잉여 레코드)
+    db.query(InvestmentStatus).filter(
+        InvestmentStatus.company == None,
+        InvestmentStatus.principal == None,
+        InvestmentStatus.return_rate == None,
+    ).delete(synchronize_session=False)
+    # 수입·지출·순수익이 모두 0인 월별 결산 레코드 제거 (빈 월 레코드)
+    db.query(MonthlySummary).filter(
+        MonthlySummary.income == 0,
+        MonthlySummary.expense == 0,
+        MonthlySummary.net_income == 0,
+    ).delete(synchronize_session=False)
+    db.query(MonthlySummary).filter(
+        MonthlySummary.income == None,
+        MonthlySummary.expense == None,
+        MonthlySummary.net_income == None,
+    ).delete(synchronize_session=False)
+
+
+def _write_customer(db: Session, customer_data: Optional[dict]) -> dict:
+    """1. 고객 정보 — 이름 기준 upsert (이메일은 값이 있을 때만 갱신)"""
+    counts = {"updated": 0, "inserted": 0}
+    if not customer_data:
+        return counts
+    customer = db.query(Customer).filter(Customer.name == customer_data["name"]).first()
+    if customer:
+        customer.gender = customer_data["gender"]
+        customer.age = customer_data["age"]
+        customer.credit_score = customer_data["credit_score"]
+        if customer_data["email"]:
+            customer.email = customer_data["email"]
+        counts["updated"] += 1
+    else:
+        db.add(Customer(**customer_data))
+        counts["inserted"] += 1
+    return counts
+
+
+def _write_cash_flow(db: Session, items: Optional[list[dict]], month_source: Optional[str] = None) -> dict:
+    """
+    2. 현금흐름 항목 — 기존 항목과 월 단위로 병합(cash_flow_service)한 뒤 bulk upsert 1회로 저장.
+    month_source는 이번 업로드의 날짜 범위 문자열이며, 항목에 month_sources가 이미 있으면(zip 병합 결과) 그 값을 씁니다.
+    """
+    items = items or []
+    existing = load_cash_flow_items(db, (item["item_name"] for item in items))
+    merged = CashFlowMerger().merge_items(existing, items, month_source)
+    updated, inserted = upsert_cash_flow_items(db, list(merged.values()))
+    return {"updated": updated, "inserted": inserted}
+
+
+def _write_monthly_summary(db: Session, months: Optional[list[dict]]) -> dict:
+    """3. 월별 결산 upsert 후 변경된 월부터 cumulative_net_income 갱신"""
+    counts = {"updated": 0, "inserted": 0}
+    months = months or []
+    # 대상 연도의 기존 월별 결산을 한 번에 조회
+    years = {m["year"] for m in months}
+    existing_summaries = {
+        (ms.year, ms.month): ms
+        for ms in db.query(MonthlySummary).filter(MonthlySummary.year.in_(years))
+    } if years else {}
+
+    changed_months: list[tuple[int, int]] = []
+    for m in months:
+        key = (m["year"], m["month"])
+        changed_months.append(key)
+        existing_ms = existing_summaries.get(key)
+        if existing_ms:
+            existing_ms.income = m["income"]
+            existing_ms.expense = m["expense"]
+            existing_ms.net_income = m["net_income"]
+            counts["updated"] += 1
+        else:
+            existing_summaries[key] = MonthlySummary(**m)
+            db.add(existing_summaries[key])
+            counts["inserted"] += 1
+
+    # cumulative_net_income 재계산 — 변경된 가장 이른 월부터 그 해 말까지만
+    refresh_cumulative_net_income(db, changed_months)
+    return counts
+
+
+def _write_investments(db: Session, investment: Optional[dict]) -> dict:
+    """4. 투자성 자산 — 기존 InvestmentStatus 평가금액 갱신 + 마지막 월 MonthlySummary에 합계 반영"""
+    counts = {"updated": 0, "inserted": 0}
+    excel_investments: list[tuple[str, float]] = investment["items"] if investment else []
+    if not excel_investments:
+        return counts
+
+    all_inv_db = db.query(InvestmentStatus).order_by(InvestmentStatus.id).all()
+    for rec, val in match_investments(all_inv_db, excel_investments):
+        rec.current_value = val
+        # 원금이 있으면 수익률 재계산
+        if rec.principal and float(rec.principal) > 0:
+            rec.return_rate = (val - float(rec.principal)) / float(rec.principal) * 100
+        counts["updated"] += 1
+
+    # investment_principal / investment_value → 가장 최근 MonthlySummary에 반영
+    # investment_value: 엑셀 투자성 자산 섹션의 평가금액 합계
+    # investment_principal: InvestmentStatus DB의 원금 합계
+    inv_value_total = sum(v for _, v in excel_investments)
+    inv_principal_total: "float | None" = None
+    principal_sum = sum(
+        float(inv.principal)
+        for inv in all_inv_db
+        if inv.principal is not None and float(inv.principal) > 0
+    )
+    if principal_sum > 0:
+        inv_principal_total = principal_sum
+
+    # 가장 마지막 월(현재 파일 기준)의 MonthlySummary에 저장
+    if investment["month"]:
+        last_year, last_month = investment["month"]
+        latest_ms = db.query(MonthlySummary).filter(
+            MonthlySummary.year == last_year,
+            MonthlySummary.month == last_month,
+        ).first()
+        if latest_ms:
+            latest_ms.investment_value = inv_value_total
+            if inv_principal_total is not None:
+                latest_ms.investment_principal = inv_principal_total
+    return counts
+
+
+def match_investments(
+    all_inv_db: list[InvestmentStatus],
+    excel_investments: list[tuple[str, float]],
+) -> list[tuple[InvestmentStatus, float]]:
+    """
+    엑셀 투자성 자산 (상품명, 평가금액)을 기존 InvestmentStatus 레코드와 짝지어 반환합니다.
+    같은 상품명은 DB ID 오름차순(마이그레이션 삽입 순서)과 엑셀 순서대로 짝지으며,
+    DB에 없는 상품은 신규 삽입하지 않으므로 결과에서 빠집니다.
+    """
+    db_by_name: dict[str, list] = defaultdict(list)
+    for inv in all_inv_db:
+        db_by_name[inv.product_name].append(inv)
+
+    excel_by_name: dict[str, list[float]] = defaultdict(list)
+    for pname, val in excel_investments:
+        excel_by_name[pname].append(val)
+
+    matched = []
+    for pname, excel_vals in excel_by_name.items():
+        db_records = db_by_name.get(pname, [])
+        matched.extend(zip(db_records, excel_vals))
+    return matched
+
+
+def _write_financial_snapshot(db: Session, snapshot: Optional[dict]) -> dict:
+    """5. 재무현황 — 단일 FinancialSnapshot 행 upsert"""
+    if snapshot is None:
+        return {"updated": 0, "inserted": 0}
+    existing_snap = db.query(FinancialSnapshot).first()
+    if existing_snap:
+        for key, value in snapshot.items():
+            setattr(existing_snap, key, value)
+        return {"updated": 1, "inserted": 0}
+    db.add(FinancialSnapshot(**snapshot))
+    return {"updated": 0, "inserted": 1}
+
+
+def _write_ledger(db: Session, ledger: ParsedLedger, profile: ImportProfile, progress: ProgressCallback) -> dict:
+    """
+    가계부 내역 — 파싱 · dedup_hash 계산이 끝난 배치를 스풀 파일에서 하나씩 읽어 대량 INSERT합니다.
+    중복(date + time + description + amount)은 dedup_hash 유니크 인덱스로 DB가 건너뜁니다.
+    skipped에는 증분 기준일 이전이라 검사하지 않은 행(before_mark)도 포함됩니다.
+    """
+    with profile.stage("write") as stage:
+        inserted, skipped = bulk_insert_ledger_batches(
+            db, ledger.batches(),
+            on_batch=lambda i, s: progress("ledger", ledger_inserted=i, ledger_skipped=s + ledger.before_mark),
+        )
+        stage.rows += inserted
+    return {"inserted": inserted, "skipped": skipped + ledger.before_mark, "before_mark": ledger.before_mark}
+
+
+def _high_water(ledger: Optional[ParsedLedger]) -> Optional[datetime]:
+    """이번 업로드로 반영된 가장 최근 거래일 (검사한 행이 없으면 None)."""
+    if ledger is None:
+        return None
+    return ledger.max_date
+
+
+def import_ledger_workbook(
+    db: Session,
+    source: Union[str, bytes, IO[bytes]],
+    filename: str,
+    file_size: Optional[int] = None,
+    content_sha256: Optional[str] = None,
+    progress: ProgressCallback = no_progress,
+    full_scan: bool = False,
+) -> dict:
+    """가계부 내역 Excel 파일(뱅크샐러드 형식)을 읽어 신규 거래만 DB에 추가합니다."""
+    profile = ImportProfile()
+    parsed: Optional[ParsedWorkbook] = None
+    try:
+        since = None if full_scan else ledger_cutoff(db)
+        parsed = parse_upload(
+            source, profile, progress, summary=False, ledger_since=since, content_sha256=content_sha256,
+        )
+        if parsed.ledger is None:
+            raise ImportFileError('"가계부 내역" 시트를 찾을 수 없습니다.')
+
+        # ── 중복 제거 (date + time + description + amount) · INSERT ──
+        queue_position = _lock_writes(db, profile, progress)
+        progress("ledger")
+        result = _write_ledger(db, parsed.ledger, profile, progress)
+        result["queue_position"] = queue_position
+
+        # 업로드 이력 저장 (같은 파일 재업로드 시 결과 재사용)
+        progress("history")
+        history = UploadHistory(
+            filename=filename,
+            file_size=file_size,
+            import_kind=IMPORT_KIND_LEDGER,
+            content_sha256=content_sha256,
+            ledger_source=LEDGER_SOURCE_BANKSALAD,
+            ledger_high_water=_high_water(parsed.ledger),
+            result_json=result,
+        )
+        return _commit_with_history(db, history, result, profile)
+    finally:
+        profile.finish()
+        if parsed is not None:
+            parsed.discard()
+
+
+def find_previous_upload(db: Session, content_sha256: str, import_kind: str) -> Optional[UploadHistory]:
+    """같은 바이트의 파일을 같은 방식으로 import한 가장 최근 이력을 반환합니다."""
+    return (
+        db.query(UploadHistory)
+        .filter(
+            UploadHistory.content_sha256 == content_sha256,
+            UploadHistory.import_kind == import_kind,
+            UploadHistory.result_json.isnot(None),
+        )
+        .order_by(UploadHistory.id.desc())
+        .first()
+    )
+
+
+def replay_result(history: UploadHistory) -> dict:
+    """저장된 import 결과에 재사용 표시를 붙여 반환합니다."""
+    return {**history.result_json, "replay": True, "replayed_upload_id": history.id}
+
+
+# ── 현금흐름 bulk upsert 헬퍼 ─────────────────────────────────
+def upsert_cash_flow_items(db: Session, items: list[dict]) -> tuple[int, int]:
+    """
+    현금흐름 항목 dict 목록을 item_name 기준으로 upsert하고 (updated, inserted)를 반환합니다.
+    항목 수와 무관하게 기존 항목명 조회 1회 + INSERT ... ON CONFLICT (item_name) DO UPDATE 1회만 실행합니다.
+    같은 항목명이 여러 번 나오면 마지막 행이 남습니다. month_sources가 없는 항목은 출처를 비웁니다.
+    commit은 호출자가 담당합니다.
+    """
+    if not items:
+        return 0, 0
+    names = {item["item_name"] for item in items}
+    existing = {
+        name for (name,) in db.query(CashFlow.item_name).filter(CashFlow.item_name.in_(names))
+    }
+
+    # 항목명별 마지막 행만 남긴 뒤 항목명 하나를 한 번씩 셈
+    latest: dict[str, dict] = {}
+    for item in items:
+        latest[item["item_name"]] = {**item, "month_sources": item.get("month_sources")}
+    updated = sum(1 for name in latest if name in existing)
+    inserted = len(latest) - updated
+
+    table = CashFlow.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = pg_insert(table)
+    else:
+        stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["item_name"],
+        set_={
+            "item_type": stmt.excluded.item_type,
+            "total": stmt.excluded.total,
+            "monthly_average": stmt.excluded.monthly_average,
+            "monthly_data": stmt.excluded.monthly_data,
+            "month_sources": stmt.excluded.month_sources,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt, list(latest.values()))
+    return updated, inserted
@@ -0,0 +1,135 @@
+"""
+가계부 내역 집계
+
+가계부 화면의 연도 목록 · 분류별 합계 · 월별 수입/지출을 브라우저에서 전체 행을 받아 계산하지 않고,
+SQL GROUP BY 한 번으로 기간(일 · 주 · 월 · 연)과 분류 컬럼별 합계 · 건수만 반환합니다.
+
+거래 행 대신 일 단위 롤업(ledger_rollup, ledger_rollup_service가 거래 변경마다 갱신)을 묶으므로
+읽는 행 수가 거래 수가 아니라 (일 × 분류 조합) 수입니다.
+거래일이 없는 거래는 롤업에 없으므로, 기간 · 날짜 범위 없이 묶을 때만 ledger_transaction에서 따로 더합니다.
+
+기간은 시작일 문자열(YYYY-MM-DD)로 묶습니다: 주는 월요일, 월은 1일, 연은 1월 1일.
+- PostgreSQL: to_char(date_trunc(단위, day::timestamp), 'YYYY-MM-DD')
+- SQLite(테스트 DB): date() / strftime()
+"""
+from datetime import date
+from typing import List, Optional, Sequence
+
+from sqlalchemy import DateTime, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.models import LedgerRollup, LedgerTransaction
+from app.services.ledger_query_service import ledger_filters
+
+AGGREGATE_PERIODS = ("day", "week", "month", "year")
+AGGREGATE_DIMENSIONS = ("transaction_type", "category", "subcategory", "payment_method")
+
+_SQLITE_PERIODS = {
+    "day": lambda col: func.date(col),
+    "week": lambda col: func.date(col, "weekday 0", "-6 days"),
+    "month": lambda col: func.strftime("%Y-%m-01", col),
+    "year": lambda col: func.strftime("%Y-01-01", col),
+}
+
+
+def period_start(dialect: str, period: str, column=LedgerRollup.day):
+    """날짜 → 기간 시작일 문자열(YYYY-MM-DD) SQL 식."""
+    if period not in AGGREGATE_PERIODS:
+        raise ValueError(f"지원하지 않는 집계 기간: {period}")
+    if dialect == "postgresql":
+        # date를 그대로 넘기면 timestamptz로 변환되어 타임존 계산이 붙으므로 timestamp로 변환
+        return func.to_char(func.date_trunc(period, cast(column, DateTime)), "YYYY-MM-DD")
+    return _SQLITE_PERIODS[period](column)
+
+
+def _rollup_filters(
+    date_from: Optional[date],
+    date_to: Optional[date],
+    transaction_type: Optional[str],
+    category: Optional[str],
+) -> list:
+    filters = []
+    if date_from is not None:
+        filters.append(LedgerRollup.day >= date_from)
+    if date_to is not None:
+        filters.append(LedgerRollup.day <= date_to)
+    if transaction_type:
+        filters.append(LedgerRollup.transaction_type == transaction_type)
+    if category:
+        filters.append(LedgerRollup.category == category)
+    return filters
+
+
+def _sort_key(row: dict, fields: Sequence[str]) -> tuple:
+    # 값 없는 그룹은 뒤로 (DB마다 NULL 정렬 위치가 달라 Python에서 정렬)
+    return tuple((row[f] is None, row[f] or "") for f in fields)
+
+
+def aggregate_ledger(
+    db: Session,
+    period: Optional[str] = None,
+    group_by: Sequence[str] = (),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+) -> List[dict]:
+    """
+    가계부 내역을 기간 · 분류 컬럼별로 묶어 합계를 반환합니다.
+    각 행은 {period, 묶은 컬럼들, total(금액 합), abs_total(금액 절댓값 합), count}이며 묶은 키 순으로 정렬됩니다.
+    period를 주지 않으면 기간 구분 없이 group_by 컬럼으로만 묶고, 둘 다 없으면 전체 합계 한 행입니다.
+    """
+    dims = list(dict.fromkeys(group_by))
+    unknown = [d for d in dims if d not in AGGREGATE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"지원하지 않는 집계 컬럼: {', '.join(unknown)}")
+
+    keys = []
+    if period is not None:
+        keys.append(period_start(db.get_bind().dialect.name, period).label("period"))
+    # 롤업은 값 없는 분류를 ''로 저장하므로 NULL로 되돌려 묶음
+    keys.extend(func.nullif(getattr(LedgerRollup, d), "").label(d) for d in dims)
+    q = db.query(
+        *keys,
+        func.sum(LedgerRollup.total).label("total"),
+        func.sum(LedgerRollup.abs_total).label("abs_total"),
+        func.sum(LedgerRollup.count).label("count"),
+    ).filter(*_rollup_filters(date_from, date_to, transaction_type, category))
+    if keys:
+        q = q.group_by(*keys)
+    results = list(q)
+
+    if period is None and date_from is None and date_to is None:
+        amount = LedgerTransaction.amount
+        dim_columns = [func.nullif(getattr(LedgerTransaction, d), "").label(d) for d in dims]
+        undated = db.query(
+            *dim_columns,
+            func.sum(amount).label("total"),
+            func.sum(func.abs(amount)).label("abs_total"),
+            func.count(LedgerTransaction.id).label("count"),
+        ).filter(
+            LedgerTransaction.transaction_date.is_(None),
+            *ledger_filters(transaction_type, category),
+        )
+        if dim_columns:
+            undated = undated.group_by(*dim_columns)
+        results.extend(undated)
+
+    merged = {}
+    for row in results:
+        if not row.count:
+            continue  # 롤업 · 거래가 하나도 없을 때의 빈 합계 행
+        item = {"period": row.period if period is not None else None}
+        item.update({d: getattr(row, d) for d in dims})
+        key = tuple(item.values())
+        if key not in merged:
+            merged[key] = dict(item, total=0.0, abs_total=0.0, count=0)
+        merged[key]["total"] += float(row.total or 0)
+        merged[key]["abs_total"] += float(row.abs_total or 0)
+        merged[key]["count"] += int(row.count)
+
+    rows = sorted(merged.values(), key=lambda r: _sort_key(r, ["period"] + dims))
+    if not rows and not keys:
+        # 묶지 않은 전체 합계는 거래가 없어도 한 행
+        rows = [{"period": None, "total": 0.0, "abs_total": 0.0, "count": 0}]
+    return rows
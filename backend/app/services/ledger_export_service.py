@@ -0,0 +1,89 @@
+"""
+가계부 내역 내보내기 (CSV · NDJSON 스트리밍)
+
+목록 API에 큰 limit을 주면 모든 행의 ORM 객체와 응답 모델을 메모리에 만든 뒤에야 응답이 시작됩니다.
+내보내기는 필요한 컬럼만 Core select로 읽고, LEDGER_EXPORT_BATCH 행씩 받아 바로 인코딩해 내보냅니다.
+- PostgreSQL: yield_per가 서버 측 커서(psycopg2 named cursor)를 열어 배치 단위로 가져오므로
+  전체 결과를 클라이언트에 받아 두지 않습니다. 메모리는 행 수와 무관하게 배치 하나 크기입니다.
+- 정렬은 목록과 같은 (거래일 DESC NULLS FIRST, id DESC)로, (transaction_date, id) 인덱스를 역방향으로 읽어
+  정렬 없이 첫 배치가 바로 나옵니다. CSV 헤더는 쿼리 전에 먼저 보냅니다.
+- 한 SELECT 문으로 읽으므로 내보내는 동안 추가 · 수정된 거래가 섞이지 않습니다.
+"""
+import csv
+import io
+import json
+import os
+from datetime import date
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import LedgerTransaction
+from app.services.ledger_query_service import LEDGER_PAGE_ORDER, ledger_filters
+
+LEDGER_EXPORT_BATCH = int(os.getenv("LEDGER_EXPORT_BATCH", "2000"))
+
+EXPORT_COLUMNS = (
+    "id", "transaction_date", "transaction_time", "transaction_type", "category", "subcategory",
+    "description", "amount", "currency", "payment_method", "memo",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Excel이 UTF-8 CSV의 한글을 깨뜨리지 않도록 파일 앞에 BOM
+_CSV_BOM = "\ufeff"
+
+
+def _plain(value):
+    """DB 값 → CSV · JSON에 쓸 값 (날짜는 ISO 문자열, 금액은 float)."""
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if isinstance(value, date):
+        return value.isoformat()
+    return float(value)
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(["" if v is None else v for v in map(_plain, row)] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+def iter_ledger_export(
+    db: Session,
+    fmt: str = "csv",
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    조건에 맞는 가계부 내역을 fmt(csv / ndjson) 문자열 조각으로 차례로 반환합니다 (배치 하나당 한 조각).
+    CSV는 첫 조각이 BOM과 헤더 행입니다. 세션은 조각을 모두 받을 때까지 열려 있어야 합니다.
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"지원하지 않는 내보내기 형식: {fmt}")
+    encode = _csv_chunk if fmt == "csv" else _ndjson_chunk
+    if fmt == "csv":
+        yield _CSV_BOM + _csv_chunk([EXPORT_COLUMNS])
+
+    stmt = (
+        select(*(getattr(LedgerTransaction, col) for col in EXPORT_COLUMNS))
+        .where(*ledger_filters(transaction_type, category, date_from, date_to))
+        .order_by(*LEDGER_PAGE_ORDER)
+        .execution_options(yield_per=batch_size or LEDGER_EXPORT_BATCH)
+    )
+    for rows in db.execute(stmt).partitions():
+        yield encode(rows)
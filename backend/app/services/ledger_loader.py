@@ -0,0 +1,197 @@
+"""
+가계부 내역 대량 적재기
+
+파싱된 가계부 컬럼(ledger_parser.parse_ledger_columns)을 ORM 객체 없이 ledger_transaction 테이블에 배치 단위로 INSERT합니다.
+컬럼 리스트를 배치 구간만큼 잘라 행 튜플로 묶어 쓰므로 행마다 dict를 만들지 않습니다.
+중복 판정은 DB가 담당합니다: 각 행의 dedup_hash(날짜·시간·내용·금액)에 유니크 인덱스가 있고,
+INSERT는 ON CONFLICT DO NOTHING으로 이미 있는 거래를 건너뜁니다.
+실제로 INSERT된 행은 RETURNING으로 받아 배치마다 ledger_rollup에 더합니다 (ledger_rollup_service).
+PostgreSQL은 INSERT와 롤업 반영을 한 문장(data-modifying CTE)으로, 그 외에는 반환된 행을 Python에서 묶어 upsert합니다.
+- PostgreSQL(psycopg2): 임시 테이블로 COPY 후 INSERT ... SELECT ... ON CONFLICT DO NOTHING
+- 그 외(SQLite 테스트 DB 등): INSERT ... ON CONFLICT DO NOTHING executemany
+import 엔드포인트와 seed_ledger.py가 같은 적재기를 사용합니다.
+"""
+import hashlib
+import io
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.models import LedgerTransaction
+from app.services.ledger_rollup_service import (
+    ROLLUP_SOURCE_COLUMNS, add_to_rollup, rollup_fact, rollup_upsert_sql,
+)
+
+LEDGER_COLUMNS = (
+    "transaction_date", "transaction_time", "transaction_type", "category",
+    "subcategory", "description", "amount", "currency", "payment_method", "memo",
+)
+INSERT_COLUMNS = LEDGER_COLUMNS + ("dedup_hash",)
+
+# {컬럼명: 값 리스트} — INSERT_COLUMNS 키, 모든 리스트의 길이가 같음
+LedgerColumns = Dict[str, List[Any]]
+
+BULK_INSERT_BATCH_SIZE = 5000
+
+STAGE_TABLE = "_ledger_transaction_stage"
+
+
+def ledger_dedup_hash(tx_date, tx_time, description, amount) -> str:
+    """
+    거래 중복 판정 키(날짜 · 시간 · 내용 · 금액)의 SHA-256 hex digest.
+    날짜는 일 단위, 빈 문자열은 NULL과 같게, 금액은 소수 둘째 자리로 정규화합니다.
+    alembic 018 마이그레이션의 backfill과 같은 규칙을 사용해야 합니다.
+    """
+    amount_str = ""
+    if amount is not None:
+        amount_str = f"{float(amount):.2f}"
+        if amount_str == "-0.00":
+            amount_str = "0.00"
+    parts = (
+        tx_date.strftime("%Y-%m-%d") if tx_date else "",
+        str(tx_time) if tx_time else "",
+        str(description) if description else "",
+        amount_str,
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def add_dedup_hashes(columns: LedgerColumns) -> None:
+    """날짜 · 시간 · 내용 · 금액 컬럼으로 dedup_hash 컬럼을 채웁니다."""
+    columns["dedup_hash"] = [
+        ledger_dedup_hash(tx_date, tx_time, description, amount)
+        for tx_date, tx_time, description, amount in zip(
+            columns["transaction_date"], columns["transaction_time"],
+            columns["description"], columns["amount"],
+        )
+    ]
+
+
+def _copy_value(value: Any) -> str:
+    """COPY text 포맷 한 필드로 변환합니다. NULL은 \\N, 구분자·개행은 이스케이프."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _format_copy_rows(rows: List[tuple]) -> io.StringIO:
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(map(_copy_value, row)))
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def _copy_batch(conn: Connection, rows: List[tuple]) -> int:
+    table = LedgerTransaction.__tablename__
+    columns = ", ".join(INSERT_COLUMNS)
+    returning = ", ".join(ROLLUP_SOURCE_COLUMNS)
+    cursor = conn.connection.cursor()
+    try:
+        # COPY는 ON CONFLICT를 지원하지 않으므로 트랜잭션 임시 테이블을 거쳐 INSERT ... SELECT
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        cursor.execute(f"TRUNCATE {STAGE_TABLE}")
+        cursor.copy_expert(f"COPY {STAGE_TABLE} ({columns}) FROM STDIN", _format_copy_rows(rows))
+        # 실제로 INSERT된 행만 같은 문장 안에서 롤업에 더함
+        cursor.execute(
+            f"WITH inserted AS ("
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {STAGE_TABLE} "
+            f"ON CONFLICT (dedup_hash) DO NOTHING RETURNING {returning}"
+            f"), rolled_up AS ({rollup_upsert_sql('inserted')}) "
+            f"SELECT count(*) FROM inserted"
+        )
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def _insert_batch(conn: Connection, rows: List[tuple]) -> int:
+    # SQLAlchemy executemany는 이름 기반 파라미터만 받으므로 이 경로에서만 dict로 변환
+    table = LedgerTransaction.__table__
+    if conn.dialect.name == "postgresql":
+        stmt = pg_insert(table)
+    else:
+        stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_nothing(index_elements=["dedup_hash"]).returning(*(table.c[col] for col in ROLLUP_SOURCE_COLUMNS))
+    inserted = conn.execute(stmt, [dict(zip(INSERT_COLUMNS, row)) for row in rows]).all()
+    add_to_rollup(conn, (rollup_fact(*row) for row in inserted))
+    return len(inserted)
+
+
+def _column_batches(columns: LedgerColumns, size: int) -> Iterator[List[tuple]]:
+    hashes = columns.get("dedup_hash")
+    if hashes is None or len(hashes) != len(columns["transaction_date"]):
+        add_dedup_hashes(columns)
+    arrays = [columns[col] for col in INSERT_COLUMNS]
+    total = len(arrays[0])
+    for start in range(0, total, size):
+        yield list(zip(*(array[start:start + size] for array in arrays)))
+
+
+def _write_batches(
+    bind: Union[Session, Connection],
+    batches: Iterable[List[tuple]],
+    on_batch: Optional[Callable[[int, int], None]],
+) -> Tuple[int, int]:
+    conn = bind.connection() if isinstance(bind, Session) else bind
+    use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+    write_batch = _copy_batch if use_copy else _insert_batch
+
+    inserted = 0
+    skipped = 0
+    for batch in batches:
+        batch_inserted = write_batch(conn, batch)
+        inserted += batch_inserted
+        skipped += len(batch) - batch_inserted
+        if on_batch is not None:
+            on_batch(inserted, skipped)
+    return inserted, skipped
+
+
+def bulk_insert_ledger_columns(
+    bind: Union[Session, Connection],
+    columns: LedgerColumns,
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[int, int]:
+    """
+    ledger_parser.parse_ledger_columns 결과를 batch_size 행 단위로 INSERT하고 (inserted, skipped)를 반환합니다.
+    dedup_hash 컬럼이 비어 있으면 먼저 계산합니다.
+    이미 같은 dedup_hash가 있는 행(같은 입력 안의 중복 포함)은 DB가 건너뛰며, 건수는 INSERT 문의 결과에서 얻습니다.
+    Session을 넘기면 세션의 현재 트랜잭션 안에서 실행되며, commit은 호출자가 담당합니다.
+    on_batch(inserted, skipped)는 배치마다 누적 건수로 호출됩니다.
+    """
+    return bulk_insert_ledger_batches(bind, [columns], batch_size, on_batch)
+
+
+def bulk_insert_ledger_batches(
+    bind: Union[Session, Connection],
+    batches: Iterable[LedgerColumns],
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[int, int]:
+    """
+    LedgerColumns 여러 개(workbook_parser.ParsedLedger.batches 등)를 차례로 받아 적재합니다.
+    batches를 하나씩 꺼내 쓰므로 전체 행을 한 번에 메모리에 두지 않습니다. 건수 · on_batch는 전체 누적입니다.
+    """
+    row_batches = (rows for columns in batches for rows in _column_batches(columns, batch_size))
+    return _write_batches(bind, row_batches, on_batch)
+
@@ -0,0 +1,139 @@
+"""
+가계부 내역 시트 파서 (컬럼 단위)
+
+가계부 내역 행(날짜 ~ 메모 10개 값 튜플)을 한 번 순회하면서 컬럼별 리스트에 값을 추가합니다.
+행마다 dict를 만들지 않으므로 할당이 적고, 워커 프로세스(workbook_parser)는 배치 단위 컬럼을 그대로 스풀 파일에 씁니다.
+결과는 {컬럼명: 값 리스트} 형태의 LedgerColumns이며 ledger_loader.bulk_insert_ledger_columns가 그대로 적재합니다.
+두 import 엔드포인트(workbook_parser 경유)와 seed_ledger.py가 같은 파서를 사용합니다.
+
+증분 import에서는 iter_rows_since가 기준일(cutoff) 이전 행을 날짜 셀만 보고 건너뜁니다.
+"""
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from app.services.ledger_loader import INSERT_COLUMNS, LedgerColumns, add_dedup_hashes
+
+
+def empty_ledger_columns() -> LedgerColumns:
+    return {col: [] for col in INSERT_COLUMNS}
+
+
+def ledger_row_count(columns: LedgerColumns) -> int:
+    return len(columns["transaction_date"])
+
+
+def _to_datetime(raw_date: Any) -> Optional[datetime]:
+    """날짜 셀 → datetime. 날짜로 해석할 수 없으면 None."""
+    if isinstance(raw_date, datetime):
+        return raw_date
+    if isinstance(raw_date, date):
+        return datetime(raw_date.year, raw_date.month, raw_date.day)
+    if isinstance(raw_date, str) and raw_date.strip():
+        try:
+            return datetime.fromisoformat(raw_date.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _to_amount(raw_amount: Any) -> Optional[float]:
+    """금액 셀 → float. 천 단위 구분자(,)가 들어간 문자열도 허용하고, 숫자가 아니면 None."""
+    if raw_amount is None:
+        return None
+    if type(raw_amount) in (int, float):
+        return float(raw_amount)
+    try:
+        return float(str(raw_amount).replace(",", ""))
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_ledger_columns(rows: Iterable[Tuple[Any, ...]], with_hash: bool = True) -> LedgerColumns:
+    """
+    가계부 내역 데이터 행을 한 번 순회해 LedgerColumns로 변환합니다.
+    빈 행, 컬럼 수가 맞지 않는 행, 날짜가 없는 행은 건너뜁니다.
+    with_hash면 중복 판정 키(dedup_hash) 컬럼도 채웁니다.
+    """
+    columns = empty_ledger_columns()
+    dates = columns["transaction_date"]
+    times = columns["transaction_time"]
+    types = columns["transaction_type"]
+    categories = columns["category"]
+    subcategories = columns["subcategory"]
+    descriptions = columns["description"]
+    amounts = columns["amount"]
+    currencies = columns["currency"]
+    payment_methods = columns["payment_method"]
+    memos = columns["memo"]
+
+    for row in rows:
+        if not any(row):
+            continue
+        try:
+            raw_date, raw_time, tx_type, category, subcategory, description, raw_amount, currency, payment_method, memo = row
+        except ValueError:
+            continue
+        tx_date = _to_datetime(raw_date)
+        if tx_date is None:
+            continue  # 날짜 없으면 스킵
+
+        dates.append(tx_date)
+        times.append(str(raw_time) if raw_time is not None else None)
+        types.append(str(tx_type) if tx_type else None)
+        categories.append(str(category) if category else None)
+        subcategories.append(str(subcategory) if subcategory else None)
+        descriptions.append(str(description) if description else None)
+        amounts.append(_to_amount(raw_amount))
+        currencies.append(str(currency) if currency else None)
+        payment_methods.append(str(payment_method) if payment_method else None)
+        memos.append(str(memo) if memo else None)
+
+    if with_hash:
+        add_dedup_hashes(columns)
+    return columns
+
+
+
+class LedgerScan:
+    """iter_rows_since가 건너뛴 행 수와 조기 종료 여부."""
+
+    def __init__(self) -> None:
+        self.before_mark = 0
+        self.stopped_early = False
+
+
+def iter_rows_since(
+    rows: Iterable[Tuple[Any, ...]],
+    cutoff: datetime,
+    scan: LedgerScan,
+    total: Optional[int] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    날짜가 cutoff 이전인 행은 나머지 셀을 변환하지 않고 건너뛰며 scan.before_mark에 셉니다.
+    날짜 내림차순(최신 거래가 위)으로 정렬된 시트에서 cutoff 이후 행을 지나 cutoff 이전 행을 만나면,
+    나머지 행도 모두 cutoff 이전이므로 시트 읽기를 멈추고 읽지 않은 행 수(total - 읽은 행 수)를 before_mark에 더합니다.
+    total(rows 전체 행 수)을 모르면 건너뛴 행 수를 셀 수 없으므로 멈추지 않고 끝까지 읽습니다.
+    날짜를 해석할 수 없는 행은 그대로 넘깁니다.
+    """
+    previous: Optional[datetime] = None
+    descending = True
+    seen_recent = False
+    read = 0
+    for row in rows:
+        read += 1
+        tx_date = _to_datetime(row[0]) if row else None
+        if tx_date is None:
+            yield row
+            continue
+        if previous is not None and tx_date > previous:
+            descending = False
+        previous = tx_date
+        if tx_date >= cutoff:
+            seen_recent = True
+            yield row
+            continue
+        scan.before_mark += 1
+        if descending and seen_recent and total is not None:
+            scan.before_mark += max(0, total - read)
+            scan.stopped_early = True
+            return
@@ -0,0 +1,112 @@
+"""
+가계부 내역 목록 조회 (필터 · keyset 페이지)
+
+offset 페이지는 뒤 페이지로 갈수록 건너뛸 행을 모두 읽어야 하고, 그 사이 추가 · 삭제된 행 때문에
+페이지 경계가 밀려 같은 행이 두 번 나오거나 빠집니다.
+목록은 (transaction_date DESC NULLS FIRST, id DESC) 순서로 고정하고, 마지막 행의 (거래일, id)를
+불투명 커서로 돌려줘 다음 페이지는 그 키보다 뒤의 행만 조회합니다.
+- 거래일 없는 행이 먼저 나오고(PostgreSQL DESC 기본 순서), 그다음 거래일 내림차순입니다.
+- (transaction_date, id) 인덱스(ix_ledger_transaction_date_id)를 역방향으로 읽으므로 몇 번째 페이지든 비용이 같습니다.
+  대분류 필터는 (category, transaction_date, id) 인덱스가 필터와 정렬을 함께 처리합니다.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models.models import LedgerTransaction
+
+# 다음 페이지 커서를 돌려주는 응답 헤더 (목록 본문은 기존처럼 배열 그대로)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+LEDGER_PAGE_ORDER = (
+    LedgerTransaction.transaction_date.desc().nullsfirst(),
+    LedgerTransaction.id.desc(),
+)
+
+
+class InvalidCursor(ValueError):
+    """해석할 수 없는 페이지 커서."""
+
+
+def encode_cursor(tx: LedgerTransaction) -> str:
+    """행의 정렬 키 (거래일, id) → URL에 그대로 쓸 수 있는 커서 문자열."""
+    key = [tx.transaction_date.isoformat() if tx.transaction_date else None, tx.id]
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        when, tx_id = json.loads(raw)
+        if not isinstance(tx_id, int) or isinstance(tx_id, bool):
+            raise TypeError(tx_id)
+        return (datetime.fromisoformat(when) if when is not None else None), tx_id
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor("잘못된 페이지 커서입니다.") from e
+
+
+def date_range_filters(date_from: Optional[date] = None, date_to: Optional[date] = None) -> list:
+    """거래일 범위 조건 (date_to 포함). 인덱스를 타도록 컬럼에 함수를 씌우지 않습니다."""
+    filters = []
+    if date_from is not None:
+        filters.append(LedgerTransaction.transaction_date >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        filters.append(LedgerTransaction.transaction_date < datetime.combine(date_to + timedelta(days=1), time.min))
+    return filters
+
+
+def ledger_filters(
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list:
+    """목록 · 집계가 공통으로 쓰는 가계부 내역 필터 조건."""
+    filters = date_range_filters(date_from, date_to)
+    if transaction_type:
+        filters.append(LedgerTransaction.transaction_type == transaction_type)
+    if category:
+        filters.append(LedgerTransaction.category == category)
+    return filters
+
+
+def after_cursor(q: Query, cursor: str) -> Query:
+    """커서 행보다 정렬 순서상 뒤에 있는 행으로 제한합니다."""
+    when, tx_id = decode_cursor(cursor)
+    if when is None:
+        # 거래일 없는 구간 안에서는 id로, 그 뒤로는 거래일 있는 행 전체
+        return q.filter(or_(
+            and_(LedgerTransaction.transaction_date.is_(None), LedgerTransaction.id < tx_id),
+            LedgerTransaction.transaction_date.isnot(None),
+        ))
+    return q.filter(tuple_(LedgerTransaction.transaction_date, LedgerTransaction.id) < tuple_(when, tx_id))
+
+
+def ledger_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 5000,
+    skip: int = 0,
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Tuple[List[LedgerTransaction], Optional[str]]:
+    """
+    한 페이지의 가계부 내역과 다음 페이지 커서를 반환합니다 (마지막 페이지면 None).
+    limit + 1건을 읽어 다음 페이지 유무를 판단하므로 별도 count 쿼리가 없습니다.
+    skip은 기존 offset 방식 호출을 위한 것으로 커서와 함께 쓸 일은 없습니다.
+    """
+    q = db.query(LedgerTransaction).filter(*ledger_filters(transaction_type, category, date_from, date_to))
+    if cursor:
+        q = after_cursor(q, cursor)
+    rows = q.order_by(*LEDGER_PAGE_ORDER).offset(skip).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
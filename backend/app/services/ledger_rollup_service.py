@@ -0,0 +1,231 @@
+"""
+가계부 내역 일 단위 롤업 (ledger_rollup)
+
+거래일(일) × 타입 × 대분류 × 소분류 × 결제수단 버킷마다 금액 합 · 절댓값 합 · 건수 · 최솟값 · 최댓값을 미리 모아 둡니다.
+집계 화면(ledger_aggregation_service)은 수십만 건의 거래 대신 수천 개의 버킷을 읽습니다.
+
+거래가 바뀔 때마다 전체를 다시 계산하지 않고 바뀐 거래만큼 버킷에 반영합니다.
+- 추가: 버킷별로 묶은 합 · 건수를 더하고 최솟값 · 최댓값은 비교 (INSERT ... ON CONFLICT DO UPDATE)
+- 삭제 · 수정 전 값: 합 · 건수를 빼고, 건수가 0이 된 버킷은 지움.
+  뺀 금액이 버킷의 최솟값이나 최댓값이었으면 그 버킷(하루치 거래)만 다시 조회해 최솟값 · 최댓값을 구함
+- 가계부 import(ledger_loader)는 실제로 INSERT된 행만 RETURNING으로 받아 배치마다 더합니다.
+  PostgreSQL COPY 경로는 rollup_upsert_sql을 INSERT와 같은 문장에 붙여 행을 Python으로 가져오지 않습니다.
+rebuild_rollup은 ledger_transaction 전체로 롤업을 다시 만듭니다 (복구용, rebuild_ledger_rollup.py).
+
+거래일이 없는 거래는 롤업에 들어가지 않습니다. 분류 값이 없으면 버킷 키에 ''로 저장합니다.
+"""
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from sqlalchemy import and_, bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.models import LedgerRollup, LedgerTransaction
+
+ROLLUP_DIMENSIONS = ("transaction_type", "category", "subcategory", "payment_method")
+ROLLUP_KEY = ("day",) + ROLLUP_DIMENSIONS
+# rollup_fact 인자 순서의 ledger_transaction 컬럼 (import의 RETURNING 컬럼)
+ROLLUP_SOURCE_COLUMNS = ("transaction_date",) + ROLLUP_DIMENSIONS + ("amount",)
+
+_CENT = Decimal("0.01")
+
+# (거래일, 타입, 대분류, 소분류, 결제수단)
+RollupKey = Tuple[date, str, str, str, str]
+# (버킷 키, 금액)
+RollupFact = Tuple[RollupKey, Optional[Decimal]]
+
+
+def rollup_fact(
+    transaction_date, transaction_type, category, subcategory, payment_method, amount,
+) -> Optional[RollupFact]:
+    """거래 한 건 → (버킷 키, 금액). 거래일이 없으면 롤업 대상이 아니므로 None."""
+    if transaction_date is None:
+        return None
+    day = transaction_date.date() if isinstance(transaction_date, datetime) else transaction_date
+    key = (day, transaction_type or "", category or "", subcategory or "", payment_method or "")
+    if amount is not None:
+        # ledger_transaction.amount(Numeric(15, 2))에 저장되는 값과 같게 반올림
+        amount = Decimal(str(amount)).quantize(_CENT, ROUND_HALF_UP)
+    return key, amount
+
+
+def transaction_fact(tx: LedgerTransaction) -> Optional[RollupFact]:
+    return rollup_fact(*(getattr(tx, col) for col in ROLLUP_SOURCE_COLUMNS))
+
+
+def _summarize(facts: Iterable[Optional[RollupFact]]) -> Dict[RollupKey, dict]:
+    """거래들을 버킷별 {total, abs_total, count, min_amount, max_amount}로 묶습니다."""
+    buckets: Dict[RollupKey, dict] = {}
+    for fact in facts:
+        if fact is None:
+            continue
+        key, amount = fact
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {
+                "total": Decimal(0), "abs_total": Decimal(0), "count": 0, "min_amount": None, "max_amount": None,
+            }
+        bucket["count"] += 1
+        if amount is None:
+            continue
+        bucket["total"] += amount
+        bucket["abs_total"] += abs(amount)
+        if bucket["min_amount"] is None or amount < bucket["min_amount"]:
+            bucket["min_amount"] = amount
+        if bucket["max_amount"] is None or amount > bucket["max_amount"]:
+            bucket["max_amount"] = amount
+    return buckets
+
+
+def _connection(bind: Union[Session, Connection]) -> Connection:
+    return bind.connection() if isinstance(bind, Session) else bind
+
+
+def add_to_rollup(bind: Union[Session, Connection], facts: Iterable[Optional[RollupFact]]) -> int:
+    """
+    추가된 거래를 롤업 버킷에 더하고 반영한 버킷 수를 반환합니다.
+    Session을 넘기면 세션의 현재 트랜잭션 안에서 실행되며, commit은 호출자가 담당합니다.
+    """
+    buckets = _summarize(facts)
+    if not buckets:
+        return 0
+    conn = _connection(bind)
+    table = LedgerRollup.__table__
+    if conn.dialect.name == "postgresql":
+        stmt, least, greatest = pg_insert(table), func.least, func.greatest
+    else:
+        stmt, least, greatest = sqlite_insert(table), func.min, func.max
+    # 한쪽이 NULL(금액 없는 거래만 있던 버킷)이면 다른 쪽 값 (SQLite min/max는 NULL을 돌려주므로 coalesce)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "total": table.c.total + stmt.excluded.total,
+            "abs_total": table.c.abs_total + stmt.excluded.abs_total,
+            "count": table.c.count + stmt.excluded.count,
+            "min_amount": func.coalesce(
+                least(table.c.min_amount, stmt.excluded.min_amount), table.c.min_amount, stmt.excluded.min_amount,
+            ),
+            "max_amount": func.coalesce(
+                greatest(table.c.max_amount, stmt.excluded.max_amount), table.c.max_amount, stmt.excluded.max_amount,
+            ),
+        },
+    )
+    conn.execute(stmt, [{**dict(zip(ROLLUP_KEY, key)), **bucket} for key, bucket in buckets.items()])
+    return len(buckets)
+
+
+def rollup_upsert_sql(source: str) -> str:
+    """
+    source(ROLLUP_SOURCE_COLUMNS 컬럼을 가진 테이블 · CTE 이름)의 행을 버킷별로 묶어 롤업에 더하는 PostgreSQL 문.
+    COPY 적재 경로가 INSERT ... RETURNING CTE에 붙여 거래 INSERT와 롤업 반영을 한 문장으로 실행합니다.
+    LEAST · GREATEST는 NULL을 무시하므로 금액 없는 버킷도 그대로 비교됩니다.
+    """
+    keys = ", ".join(ROLLUP_KEY)
+    dims = ", ".join(f"COALESCE({dim}, '')" for dim in ROLLUP_DIMENSIONS)
+    return (
+        f"INSERT INTO {LedgerRollup.__tablename__} "
+        f"({keys}, total, abs_total, count, min_amount, max_amount) "
+        f"SELECT transaction_date::date, {dims}, "
+        f"COALESCE(SUM(amount), 0), COALESCE(SUM(ABS(amount)), 0), COUNT(*), MIN(amount), MAX(amount) "
+        f"FROM {source} WHERE transaction_date IS NOT NULL GROUP BY 1, 2, 3, 4, 5 "
+        f"ON CONFLICT ({keys}) DO UPDATE SET "
+        f"total = {LedgerRollup.__tablename__}.total + EXCLUDED.total, "
+        f"abs_total = {LedgerRollup.__tablename__}.abs_total + EXCLUDED.abs_total, "
+        f"count = {LedgerRollup.__tablename__}.count + EXCLUDED.count, "
+        f"min_amount = LEAST({LedgerRollup.__tablename__}.min_amount, EXCLUDED.min_amount), "
+        f"max_amount = GREATEST({LedgerRollup.__tablename__}.max_amount, EXCLUDED.max_amount)"
+    )
+
+
+def _recompute_min_max(conn: Connection, key: RollupKey) -> None:
+    """버킷에 남은 거래(하루치)로 최솟값 · 최댓값을 다시 구합니다."""
+    day = key[0]
+    tx = LedgerTransaction
+    conditions = [
+        tx.transaction_date >= datetime.combine(day, datetime.min.time()),
+        tx.transaction_date < datetime.combine(day + timedelta(days=1), datetime.min.time()),
+    ]
+    conditions.extend(func.coalesce(getattr(tx, dim), "") == value for dim, value in zip(ROLLUP_DIMENSIONS, key[1:]))
+    low, high = conn.execute(select(func.min(tx.amount), func.max(tx.amount)).where(*conditions)).one()
+    table = LedgerRollup.__table__
+    conn.execute(
+        update(table)
+        .where(*(table.c[col] == value for col, value in zip(ROLLUP_KEY, key)))
+        .values(min_amount=low, max_amount=high)
+    )
+
+
+def remove_from_rollup(bind: Union[Session, Connection], facts: Iterable[Optional[RollupFact]]) -> int:
+    """
+    삭제된 거래(또는 수정 전 값)를 롤업 버킷에서 빼고 반영한 버킷 수를 반환합니다.
+    최솟값 · 최댓값을 다시 구할 때 ledger_transaction을 조회하므로, 거래 변경이 같은 트랜잭션에 flush된 뒤 호출해야 합니다.
+    """
+    buckets = _summarize(facts)
+    if not buckets:
+        return 0
+    conn = _connection(bind)
+    table = LedgerRollup.__table__
+    key_match = and_(*(table.c[col] == bindparam(f"key_{col}") for col in ROLLUP_KEY))
+    conn.execute(
+        update(table).where(key_match).values(
+            total=table.c.total - bindparam("delta_total"),
+            abs_total=table.c.abs_total - bindparam("delta_abs_total"),
+            count=table.c.count - bindparam("delta_count"),
+        ),
+        [
+            {
+                **{f"key_{col}": value for col, value in zip(ROLLUP_KEY, key)},
+                "delta_total": bucket["total"], "delta_abs_total": bucket["abs_total"], "delta_count": bucket["count"],
+            }
+            for key, bucket in buckets.items()
+        ],
+    )
+
+    key_columns = tuple_(*(table.c[col] for col in ROLLUP_KEY))
+    rows = conn.execute(
+        select(*(table.c[col] for col in ROLLUP_KEY), table.c.count, table.c.min_amount, table.c.max_amount)
+        .where(key_columns.in_(list(buckets)))
+    ).all()
+    empty = []
+    for row in rows:
+        key = tuple(row[:len(ROLLUP_KEY)])
+        removed = buckets[key]
+        if row.count <= 0:
+            empty.append(key)
+        elif removed["min_amount"] is not None and (
+            row.min_amount is None or removed["min_amount"] <= row.min_amount
+            or row.max_amount is None or removed["max_amount"] >= row.max_amount
+        ):
+            _recompute_min_max(conn, key)
+    if empty:
+        conn.execute(delete(table).where(key_columns.in_(empty)))
+    return len(buckets)
+
+
+def rebuild_rollup(bind: Union[Session, Connection]) -> int:
+    """
+    롤업을 비우고 ledger_transaction 전체로 다시 만든 뒤 버킷 수를 반환합니다.
+    증분 반영이 어긋났을 때의 복구용이며, commit은 호출자가 담당합니다.
+    """
+    conn = _connection(bind)
+    table = LedgerRollup.__table__
+    tx = LedgerTransaction
+    day = func.date(tx.transaction_date)
+    dims = [func.coalesce(getattr(tx, dim), "") for dim in ROLLUP_DIMENSIONS]
+    conn.execute(delete(table))
+    conn.execute(insert(table).from_select(
+        list(ROLLUP_KEY) + ["total", "abs_total", "count", "min_amount", "max_amount"],
+        select(
+            day, *dims,
+            func.coalesce(func.sum(tx.amount), 0),
+            func.coalesce(func.sum(func.abs(tx.amount)), 0),
+            func.count(),
+            func.min(tx.amount),
+            func.max(tx.amount),
+        ).where(tx.transaction_date.isnot(None)).group_by(day, *dims),
+    ))
+    return conn.execute(select(func.count()).select_from(table)).scalar()
@@ -0,0 +1,254 @@
+"""
+가계부 내역 검색 (내용 · 메모 · 분류 · 결제수단)
+
+검색 대상은 내용 · 메모 · 대분류 · 소분류 · 결제수단(SEARCH_COLUMNS)을 공백으로 이은 문자열이며,
+두 가지 중 하나라도 맞으면 결과에 포함합니다.
+- 부분 문자열: 대소문자 구분 없이 검색어를 포함 (ILIKE '%검색어%')
+- 유사도: 검색어 trigram과 대상 문자열의 가장 비슷한 연속 구간의 유사도(pg_trgm word_similarity)가
+  LEDGER_SEARCH_SIMILARITY 이상 → '스타벅수'로 '스타벅스 강남점'을 찾는 오타 허용
+점수는 (부분 문자열 일치 1 / 0) + 유사도이며, 점수 → 거래일 최신순으로 정렬합니다.
+3글자 미만 검색어는 온전한 trigram이 없어 오타 허용이 의미가 없으므로 부분 문자열만 찾습니다
+(유사도는 정렬 점수에만 씀. 유사도 조건은 인덱스로 좁혀지지 않는 짧은 검색어에서 행마다 계산되어 느림).
+타입 · 대분류 · 기간 조건(ledger_query_service.ledger_filters)과 함께 쓸 수 있습니다.
+
+- PostgreSQL(pg_trgm 설치): 두 조건 모두 GIN trigram 인덱스(ix_ledger_transaction_search_trgm, migration 027)로 찾습니다.
+  한글은 음절 하나가 문자 하나라 2글자 검색어의 단어 중간 부분 일치는 인덱스로 좁혀지지 않습니다
+  (단어 앞부분 일치는 유사도 조건이 인덱스로 찾음).
+- SQLite: FTS5 trigram 색인(models.LEDGER_SEARCH_FTS)으로 후보를 찾고, 같은 규칙의 점수는 Python으로 계산해
+  후보만 다시 정렬합니다. 후보는 검색어를 그대로 포함하는 행과(한 컬럼 안), 검색어 단어의 3글자 조각 중 하나를
+  포함하는 행(오타 후보)이며 각각 거래일 최신순 LEDGER_SEARCH_CANDIDATES건까지입니다.
+- 색인으로 찾을 수 없는 경우(PostgreSQL에 pg_trgm 없음, SQLite 3글자 미만 검색어 · FTS5 색인 없음)에는
+  조건에 맞는 최근 LEDGER_SEARCH_SCAN_ROWS건 안에서만 부분 문자열로 찾습니다. 그보다 오래된 행은 나오지 않으며,
+  pg_trgm이 없으면 오타 허용 없이 점수는 모두 1입니다.
+"""
+import heapq
+import os
+from datetime import date
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import case, column, func, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models.models import LEDGER_SEARCH_COLUMNS, LEDGER_SEARCH_FTS, LedgerTransaction
+from app.services.ledger_query_service import ledger_filters
+
+LEDGER_SEARCH_SIMILARITY = float(os.getenv("LEDGER_SEARCH_SIMILARITY", "0.4"))
+
+# SQLite FTS5 후보 상한 (부분 일치 · 오타 후보 각각)
+LEDGER_SEARCH_CANDIDATES = int(os.getenv("LEDGER_SEARCH_CANDIDATES", "5000"))
+
+# 색인 없이 찾을 때 훑는 최근 행 수
+LEDGER_SEARCH_SCAN_ROWS = int(os.getenv("LEDGER_SEARCH_SCAN_ROWS", "20000"))
+
+SEARCH_COLUMNS = LEDGER_SEARCH_COLUMNS
+
+# migration 027 인덱스와 같은 식이어야 인덱스를 탑니다
+SEARCH_DOCUMENT = "(" + " || ' ' || ".join(f"coalesce({col}, '')" for col in SEARCH_COLUMNS) + ")"
+
+# 이 길이 미만 검색어는 유사도 조건 없이 부분 문자열로만 찾음
+SEARCH_FUZZY_MIN_LENGTH = 3
+
+_FTS = table(LEDGER_SEARCH_FTS, column("rowid"))
+
+
+def normalize_query(q: str) -> str:
+    """앞뒤 공백 제거, 연속 공백은 하나로."""
+    return " ".join(q.split())
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _trgm_available(db: Session) -> bool:
+    return db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+def _fts_available(db: Session) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": LEDGER_SEARCH_FTS},
+    ).first() is not None
+
+
+def _fts_phrase(s: str) -> str:
+    return '"' + s.replace('"', '""') + '"'
+
+
+# ── Python trigram (pg_trgm 규칙) ─────────────────────────────
+
+def _words(s: str) -> List[str]:
+    """영숫자(한글 포함) 연속 구간을 소문자 단어로."""
+    words, current = [], []
+    for ch in s.lower():
+        if ch.isalnum():
+            current.append(ch)
+        elif current:
+            words.append("".join(current))
+            current = []
+    if current:
+        words.append("".join(current))
+    return words
+
+
+def _ordered_trigrams(s: str) -> List[str]:
+    """단어마다 앞에 공백 2개 · 뒤에 1개를 붙여 만든 trigram을 문자열 순서대로."""
+    trigrams = []
+    for word in _words(s):
+        padded = f"  {word} "
+        trigrams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def word_similarity(q: str, document: str, q_trigrams: Optional[Set[str]] = None) -> float:
+    """
+    검색어 trigram 집합과, 대상 trigram 목록의 연속 구간 중 가장 비슷한 구간의 Jaccard 유사도.
+    pg_trgm word_similarity와 같은 정의입니다 (구간 탐색 최적화는 생략).
+    """
+    query = q_trigrams if q_trigrams is not None else set(_ordered_trigrams(q))
+    if not query:
+        return 0.0
+    trigrams = _ordered_trigrams(document)
+    best = 0.0
+    for start in range(len(trigrams)):
+        if trigrams[start] not in query:
+            continue  # 일치하지 않는 trigram으로 시작하는 구간은 더 짧은 구간보다 나을 수 없음
+        seen: Set[str] = set()
+        common = 0
+        for trigram in trigrams[start:]:
+            if trigram in seen:
+                continue
+            seen.add(trigram)
+            if trigram in query:
+                common += 1
+                best = max(best, common / (len(query) + len(seen) - common))
+    return best
+
+
+def _score(q_lower: str, q_trigrams: Set[str], document: str) -> Optional[float]:
+    """일치하지 않으면 None."""
+    similarity = word_similarity(q_lower, document, q_trigrams)
+    substring = q_lower in document.lower()
+    if not substring and (len(q_lower) < SEARCH_FUZZY_MIN_LENGTH or similarity < LEDGER_SEARCH_SIMILARITY):
+        return None
+    return (1.0 if substring else 0.0) + similarity
+
+
+# ── 검색 ──────────────────────────────────────────────────────
+
+def search_ledger(
+    db: Session,
+    q: str,
+    transaction_type: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 50,
+    skip: int = 0,
+) -> List[Tuple[LedgerTransaction, float]]:
+    """검색어와 일치하는 가계부 내역을 (거래, 점수) 목록으로 점수 · 거래일 최신순으로 반환합니다."""
+    q = normalize_query(q)
+    if not q:
+        return []
+    filters = ledger_filters(transaction_type, category, date_from, date_to)
+    document = literal_column(SEARCH_DOCUMENT)
+    substring = document.ilike(_like_pattern(q), escape="\\")
+    if db.get_bind().dialect.name == "postgresql":
+        if _trgm_available(db):
+            return _search_trgm(db, q, document, substring, filters, limit, skip)
+        return _search_sql(db, substring & _recent(db, filters), literal_column("1.0"), filters, limit, skip)
+    if len(q) >= SEARCH_FUZZY_MIN_LENGTH and _fts_available(db):
+        return _search_fts(db, q, filters, limit, skip)
+    return _rerank(db, q, [_candidates(db, filters).filter(substring, _recent(db, filters))], limit, skip)
+
+
+def _recent(db: Session, filters: list):
+    """조건에 맞는 최근 LEDGER_SEARCH_SCAN_ROWS건으로 제한하는 조건 (거래일 · id 인덱스 역순으로 읽음)."""
+    recent = (
+        db.query(LedgerTransaction.id)
+        .filter(*filters)
+        .order_by(LedgerTransaction.transaction_date.desc(), LedgerTransaction.id.desc())
+        .limit(LEDGER_SEARCH_SCAN_ROWS)
+        .subquery()
+    )
+    return LedgerTransaction.id.in_(select(recent.c.id))
+
+
+def _search_trgm(
+    db: Session, q: str, document, substring, filters: list, limit: int, skip: int,
+) -> List[Tuple[LedgerTransaction, float]]:
+    score = case((substring, 1.0), else_=0.0) + func.word_similarity(q, document)
+    match = substring
+    if len(q) >= SEARCH_FUZZY_MIN_LENGTH:
+        # %> 는 pg_trgm.word_similarity_threshold를 쓰므로 이 트랜잭션에서만 설정값으로 바꿈
+        db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :value, true)"),
+            {"value": str(LEDGER_SEARCH_SIMILARITY)},
+        )
+        match = substring | document.op("%>")(q)
+    return _search_sql(db, match, score, filters, limit, skip)
+
+
+def _search_sql(
+    db: Session, match, score, filters: list, limit: int, skip: int,
+) -> List[Tuple[LedgerTransaction, float]]:
+    score = score.label("score")
+    rows = (
+        db.query(LedgerTransaction, score)
+        .filter(*filters)
+        .filter(match)
+        .order_by(
+            score.desc(),
+            LedgerTransaction.transaction_date.desc().nullslast(),
+            LedgerTransaction.id.desc(),
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [(tx, float(s)) for tx, s in rows]
+
+
+def _candidates(db: Session, filters: list):
+    return db.query(
+        LedgerTransaction.id, LedgerTransaction.transaction_date,
+        *(getattr(LedgerTransaction, col) for col in SEARCH_COLUMNS),
+    ).filter(*filters)
+
+
+def _search_fts(
+    db: Session, q: str, filters: list, limit: int, skip: int,
+) -> List[Tuple[LedgerTransaction, float]]:
+    phrase = _fts_phrase(q)
+    matches = [phrase]
+    pieces = dict.fromkeys(word[i:i + 3] for word in _words(q) for i in range(len(word) - 2))
+    if pieces:
+        # 부분 일치 후보와 겹치지 않게 검색어 자체를 포함하는 행은 제외
+        matches.append(f"({' OR '.join(map(_fts_phrase, pieces))}) NOT {phrase}")
+    queries = [
+        _candidates(db, filters)
+        .join(_FTS, _FTS.c.rowid == LedgerTransaction.id)
+        .filter(text(f"{LEDGER_SEARCH_FTS} MATCH :match").bindparams(match=match))
+        .order_by(LedgerTransaction.transaction_date.desc(), LedgerTransaction.id.desc())
+        .limit(LEDGER_SEARCH_CANDIDATES)
+        for match in matches
+    ]
+    return _rerank(db, q, queries, limit, skip)
+
+
+def _rerank(db: Session, q: str, queries: list, limit: int, skip: int) -> List[Tuple[LedgerTransaction, float]]:
+    """후보 (id, 거래일, 검색 컬럼...) 행의 점수를 Python으로 계산해 점수 · 거래일 최신순으로 자릅니다."""
+    q_lower = q.lower()
+    q_trigrams = set(_ordered_trigrams(q_lower))
+    scored = []
+    for query in queries:
+        for tx_id, tx_date, *values in query:
+            score = _score(q_lower, q_trigrams, " ".join(v or "" for v in values))
+            if score is not None:
+                # 점수 → 거래일 → id 내림차순 (거래일 없는 행은 뒤)
+                scored.append((score, tx_date is not None, tx_date.isoformat() if tx_date else "", tx_id))
+    top = heapq.nlargest(skip + limit, scored)[skip:]
+    if not top:
+        return []
+    by_id = {tx.id: tx for tx in db.query(LedgerTransaction).filter(LedgerTransaction.id.in_([t[3] for t in top]))}
+    return [(by_id[t[3]], t[0]) for t in top]
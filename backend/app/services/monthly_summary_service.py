@@ -0,0 +1,55 @@
+"""
+월별 결산 누적 순수익 관리
+
+cumulative_net_income은 연도별로 1월부터 해당 월까지의 net_income 누적 합계입니다.
+어떤 월이 바뀌면 같은 연도의 그 월 이후만 값이 달라지므로, 변경된 (연, 월) 중 연도별 가장 이른 월부터
+연말까지만 윈도우 함수 UPDATE 한 번으로 다시 계산합니다.
+"""
+from typing import Iterable, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.models import MonthlySummary
+
+
+def refresh_cumulative_net_income(db: Session, changed: Iterable[Tuple[int, int]]) -> int:
+    """
+    changed에 포함된 (year, month)의 변경을 반영해 cumulative_net_income을 다시 계산하고 갱신한 행 수를 반환합니다.
+    net_income이 NULL인 월은 0으로 누적합니다. commit은 호출자가 담당합니다.
+    """
+    earliest: dict[int, int] = {}
+    for year, month in changed:
+        if year not in earliest or month < earliest[year]:
+            earliest[year] = month
+    if not earliest:
+        return 0
+
+    db.flush()
+    table = MonthlySummary.__table__
+    cumulative = (
+        select(
+            table.c.id,
+            func.sum(func.coalesce(table.c.net_income, 0)).over(
+                partition_by=table.c.year,
+                order_by=(table.c.month, table.c.id),
+            ).label("cumulative"),
+        )
+        .where(table.c.year.in_(earliest))
+        .subquery()
+    )
+    stmt = (
+        update(table)
+        .where(table.c.id == cumulative.c.id)
+        .where(or_(*(
+            and_(table.c.year == year, table.c.month >= month)
+            for year, month in earliest.items()
+        )))
+        .values(cumulative_net_income=cumulative.c.cumulative)
+    )
+    updated = db.execute(stmt).rowcount
+    # 세션에 올라와 있는 객체는 DB 값으로 다시 읽도록 만료
+    for obj in db.identity_map.values():
+        if isinstance(obj, MonthlySummary) and obj.year in earliest:
+            db.expire(obj, ["cumulative_net_income"])
+    return updated
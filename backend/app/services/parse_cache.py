@@ -0,0 +1,281 @@
+"""
+시트 파싱 결과 디스크 캐시
+
+같은 파일을 다시 처리할 때(dry-run 후 import, 쓰기 실패 후 재시도, 파서 수정 후 재import) openpyxl 파싱을 건너뛰도록
+시트별 정규화 결과를 로컬 디스크에 저장합니다. 항목 이름은 업로드 바이트의 SHA-256에 시트 이름(가계부는 증분 기준일도)을
+붙인 것이며, 무엇을 저장할지(뱅샐현황 행, 가계부 배치)는 workbook_parser가 정하고 이 모듈은 저장 · 읽기 · 용량 관리만 합니다.
+
+항목 파일 하나는 pickle(HIGHEST_PROTOCOL) 객체를 이어 쓴 것입니다.
+  헤더 {"version": CACHE_FORMAT_VERSION, "meta": 부가 정보, "size": 데이터 바이트 수} · 데이터 객체들
+읽을 때는 파일을 mmap하고 객체를 하나씩 복원합니다. 가계부는 배치마다 객체 하나라 한 번에 한 배치만 메모리에 올라옵니다.
+
+가계부 배치는 먼저 스풀 파일(new_spool_file, SPOOL_DIR · 기본은 시스템 임시 디렉터리)에 같은 방식으로 이어 씁니다.
+캐시에 넣을 때는 헤더 뒤에 스풀 내용을 복사하고(store_spool), 적중하면 데이터 부분을 새 스풀 파일로 복사해
+돌려주므로(load_spool) 그 뒤 캐시에서 항목이 지워져도 결과는 그대로 읽을 수 있습니다.
+
+캐시 디렉터리 전체 크기가 PARSE_CACHE_MAX_BYTES를 넘으면 마지막 사용 시각(mtime, 적중할 때마다 갱신)이
+오래된 항목부터 지웁니다 (LRU). 저장 · 읽기 실패는 캐시 미스로 처리하고 파싱은 그대로 진행합니다.
+저장하는 파싱 결과의 의미가 바뀌면(파서 수정 등) CACHE_FORMAT_VERSION을 올려 이전 항목을 무효화합니다.
+pickle은 읽을 때 코드를 실행할 수 있으므로 캐시 디렉터리는 현재 사용자 전용(0700)으로 만들고,
+다른 사용자 소유의 디렉터리면 캐시를 쓰지 않습니다.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 캐시 디렉터리와 전체 크기 상한 (0이면 캐시 사용 안 함)
+PARSE_CACHE_DIR = os.getenv("IMPORT_PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mymoney-parse-cache"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("IMPORT_PARSE_CACHE_MB", "256")) * 1024 * 1024
+
+# 가계부 스풀 파일 디렉터리 (None이면 시스템 임시 디렉터리). 캐시를 꺼도 여기에 씁니다.
+SPOOL_DIR: Optional[str] = os.getenv("IMPORT_PARSE_SPOOL_DIR") or None
+
+CACHE_FORMAT_VERSION = 3
+CACHE_SUFFIX = ".mmpc"
+SPOOL_SUFFIX = ".spool"
+
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# 손상 · 다른 형식 항목을 읽을 때 나는 예외 (캐시 미스로 처리)
+_READ_ERRORS = (OSError, ValueError, EOFError, KeyError, TypeError, AttributeError, pickle.UnpicklingError)
+
+
+@dataclass
+class CacheEntry:
+    """캐시 항목 하나. meta는 부가 정보, objects는 헤더 뒤에 이어 쓴 데이터 객체들."""
+    meta: dict = field(default_factory=dict)
+    objects: List[Any] = field(default_factory=list)
+
+
+def cache_enabled() -> bool:
+    return PARSE_CACHE_MAX_BYTES > 0
+
+
+def source_sha256(source: Union[str, bytes], chunk_size: int = 1024 * 1024) -> str:
+    """워크북 원본(경로 또는 바이트)의 SHA-256 hex. 업로드 이력의 content_sha256과 같은 값입니다."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(name: str) -> str:
+    return os.path.join(PARSE_CACHE_DIR, name + CACHE_SUFFIX)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _cache_dir_ready() -> bool:
+    """캐시를 쓸 수 있으면 디렉터리를 만들고 True. 다른 사용자 소유의 디렉터리면 False."""
+    if not cache_enabled():
+        return False
+    try:
+        os.makedirs(PARSE_CACHE_DIR, mode=0o700, exist_ok=True)
+        owner = os.stat(PARSE_CACHE_DIR).st_uid
+    except OSError as e:
+        logger.warning(f"파싱 캐시 디렉터리를 쓸 수 없습니다: {e}")
+        return False
+    if hasattr(os, "getuid") and owner != os.getuid():
+        logger.warning(f"다른 사용자 소유의 파싱 캐시 디렉터리라 캐시를 쓰지 않습니다: {PARSE_CACHE_DIR}")
+        return False
+    return True
+
+
+# ── 스풀 파일 ───────────────────────────────────────────────────
+
+def new_spool_file() -> str:
+    """SPOOL_DIR에 빈 스풀 파일을 만들고 경로를 반환합니다 (지우는 것은 호출자 몫)."""
+    fd, path = tempfile.mkstemp(prefix="mymoney-ledger-", suffix=SPOOL_SUFFIX, dir=SPOOL_DIR)
+    os.close(fd)
+    return path
+
+
+def append_object(f: IO[bytes], obj: Any) -> None:
+    """객체 하나를 스풀 · 캐시 파일 끝에 씁니다."""
+    pickle.dump(obj, f, protocol=_PICKLE_PROTOCOL)
+
+
+def iter_spool(path: str) -> Iterator[Any]:
+    """스풀 파일의 객체를 앞에서부터 하나씩 mmap으로 읽습니다."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            unpickler = pickle.Unpickler(mapped)
+            while mapped.tell() < mapped.size():
+                yield unpickler.load()
+
+
+# ── 저장 ────────────────────────────────────────────────────────
+
+def _store(name: str, meta: dict, size: int, write_data) -> bool:
+    """헤더 뒤에 write_data(f)로 데이터를 쓴 항목을 원자적으로(임시 파일 → rename) 저장하고 오래된 항목을 지웁니다."""
+    if size > PARSE_CACHE_MAX_BYTES or not _cache_dir_ready():
+        return False
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=PARSE_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            append_object(f, {"version": CACHE_FORMAT_VERSION, "meta": meta, "size": size})
+            write_data(f)
+        os.replace(tmp_path, _entry_path(name))
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning(f"파싱 캐시 저장 실패 ({name}): {e}")
+        if tmp_path is not None:
+            _remove(tmp_path)
+        return False
+    evict()
+    return True
+
+
+def store_entry(name: str, meta: dict, objects: Iterable[Any] = ()) -> bool:
+    """meta와 objects를 항목 name으로 저장합니다. 캐시가 꺼져 있거나 저장할 수 없으면 False."""
+    try:
+        data = b"".join(pickle.dumps(obj, protocol=_PICKLE_PROTOCOL) for obj in objects)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        logger.info(f"파싱 캐시 저장 생략 ({name}): {e}")
+        return False
+    return _store(name, meta, len(data), lambda f: f.write(data))
+
+
+def store_spool(name: str, meta: dict, path: str) -> bool:
+    """다 쓴 스풀 파일의 내용을 항목 name으로 복사해 저장합니다. path는 그대로 남습니다."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+
+    def _copy(f: IO[bytes]) -> None:
+        with open(path, "rb") as src:
+            shutil.copyfileobj(src, f)
+
+    return _store(name, meta, size, _copy)
+
+
+# ── 읽기 ────────────────────────────────────────────────────────
+
+def _open_entry(name: str) -> Optional[Tuple[IO[bytes], dict]]:
+    """
+    항목을 열어 (헤더까지 읽은 파일, 헤더)를 반환합니다. 없으면 None이며,
+    버전이 다르거나 데이터 크기가 헤더와 다른 항목은 지우고 None을 반환합니다.
+    """
+    if not _cache_dir_ready():
+        return None
+    path = _entry_path(name)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"파싱 캐시 항목을 읽을 수 없습니다 ({name}): {e}")
+        return None
+    try:
+        header = pickle.load(f)
+        if header["version"] != CACHE_FORMAT_VERSION:
+            raise ValueError("캐시 형식 버전이 다름")
+        if os.fstat(f.fileno()).st_size - f.tell() != header["size"]:
+            raise ValueError("데이터 크기가 헤더와 다름")
+    except _READ_ERRORS as e:
+        f.close()
+        logger.warning(f"파싱 캐시 항목을 읽을 수 없어 삭제합니다 ({name}): {e}")
+        _remove(path)
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return f, header
+
+
+def load_entry(name: str) -> Optional[CacheEntry]:
+    """항목을 mmap으로 읽습니다. 없거나 캐시가 꺼져 있거나 읽을 수 없으면(손상 항목은 삭제) None."""
+    opened = _open_entry(name)
+    if opened is None:
+        return None
+    f, header = opened
+    with f:
+        start = f.tell()
+        try:
+            objects = []
+            if header["size"]:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    mapped.seek(start)
+                    unpickler = pickle.Unpickler(mapped)
+                    while mapped.tell() < mapped.size():
+                        objects.append(unpickler.load())
+        except _READ_ERRORS as e:
+            logger.warning(f"파싱 캐시 항목을 읽을 수 없어 삭제합니다 ({name}): {e}")
+            _remove(_entry_path(name))
+            return None
+    return CacheEntry(meta=header["meta"], objects=objects)
+
+
+def load_spool(name: str) -> Optional[Tuple[dict, str]]:
+    """
+    항목 name의 데이터를 새 스풀 파일로 복사해 (meta, 스풀 파일 경로)를 반환합니다 (호출자가 다 쓴 뒤 지움).
+    없거나 캐시가 꺼져 있거나 읽을 수 없으면 None.
+    """
+    opened = _open_entry(name)
+    if opened is None:
+        return None
+    f, header = opened
+    path = new_spool_file()
+    try:
+        with f, open(path, "wb") as dst:
+            shutil.copyfileobj(f, dst)
+    except OSError as e:
+        logger.warning(f"파싱 캐시 항목을 읽을 수 없습니다 ({name}): {e}")
+        _remove(path)
+        return None
+    return header["meta"], path
+
+
+# ── 용량 관리 ───────────────────────────────────────────────────
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """캐시 파일 전체 크기가 max_bytes(기본 PARSE_CACHE_MAX_BYTES) 이하가 될 때까지 오래 쓰지 않은 항목부터 지웁니다."""
+    max_bytes = PARSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    try:
+        with os.scandir(PARSE_CACHE_DIR) as it:
+            for item in it:
+                if not item.name.endswith(CACHE_SUFFIX):
+                    continue
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+    except FileNotFoundError:
+        return 0
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_cache() -> int:
+    """캐시 항목을 모두 지우고 지운 개수를 반환합니다."""
+    return evict(0)
@@ -1,8 +1,8 @@
 """
 스케줄러 서비스 - 주기적으로 DB 상태를 모니터링하고 로깅합니다.
 
-현재 아키텍처에서 실제 데이터 동기화는 POST /api/import/banksalad-excel 엔드포인트에서
-업로드 시점에 동기적으로 처리됩니다. 스케줄러는 시스템 상태를 모니터링하는 역할을 합니다.
+현재 아키텍처에서 실제 데이터 동기화는 POST /api/import/banksalad-excel 엔드포인트가 등록한
+import 작업(import_job_service)에서 처리됩니다. 스케줄러는 시스템 상태를 모니터링하는 역할을 합니다.
 """
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
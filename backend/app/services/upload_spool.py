@@ -0,0 +1,120 @@
+"""
+업로드 파일 스풀
+
+업로드를 청크 단위로 읽어 임계값(UPLOAD_SPOOL_THRESHOLD)까지는 메모리에, 그 이상은 임시 파일에 씁니다.
+업로드 한 건이 차지하는 메모리는 파일 크기와 무관하게 임계값 + 청크 크기로 제한됩니다.
+읽는 동안 크기 상한(MAX_UPLOAD_BYTES)을 넘으면 즉시 중단하고, SHA-256도 함께 계산합니다.
+
+tempfile.SpooledTemporaryFile은 디스크로 넘어갈 때 이름 없는 파일을 만들어 다른 프로세스가 열 수 없으므로,
+같은 방식으로 동작하되 이름 있는 임시 파일로 넘어가는 SpooledUpload를 사용합니다.
+source는 메모리에 있으면 bytes, 디스크에 있으면 파일 경로라서 시트 파싱 워커 프로세스가 그대로 열 수 있습니다.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from typing import Optional, Union
+
+from fastapi import UploadFile
+
+MAX_UPLOAD_BYTES = int(os.getenv("IMPORT_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("IMPORT_SPOOL_THRESHOLD_KB", "1024")) * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """업로드가 MAX_UPLOAD_BYTES를 넘는 경우."""
+
+    def __init__(self, max_bytes: int) -> None:
+        limit = f"{max_bytes // (1024 * 1024)}MB" if max_bytes >= 1024 * 1024 else f"{max_bytes // 1024}KB"
+        super().__init__(f"업로드 파일은 {limit} 이하만 지원합니다.")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload:
+    """임계값까지 메모리, 넘으면 이름 있는 임시 파일에 쓰는 업로드 버퍼."""
+
+    def __init__(self, threshold: int = UPLOAD_SPOOL_THRESHOLD) -> None:
+        self._threshold = threshold
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file = None
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def on_disk(self) -> bool:
+        return self._file is not None
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        """workbook_parser에 넘길 원본: 디스크에 있으면 임시 파일 경로, 아니면 바이트."""
+        if self._file is not None:
+            self._file.flush()
+            return self._file.name
+        return self._buffer.getvalue()
+
+    def write(self, chunk: bytes) -> None:
+        self._sha256.update(chunk)
+        self.size += len(chunk)
+        if self._file is None and self.size > self._threshold:
+            self._rollover()
+        (self._file or self._buffer).write(chunk)
+
+    def _rollover(self) -> None:
+        self._file = tempfile.NamedTemporaryFile(prefix="mymoney-upload-", suffix=".xlsx", delete=False)
+        self._file.write(self._buffer.getvalue())
+        self._buffer = None
+
+    def is_zipfile(self) -> bool:
+        """xlsx(zip) 시그니처 확인."""
+        if self._file is not None:
+            self._file.flush()
+            return zipfile.is_zipfile(self._file.name)
+        return zipfile.is_zipfile(self._buffer)
+
+    def close(self) -> None:
+        """버퍼를 비우고 임시 파일을 삭제합니다. 여러 번 호출해도 됩니다."""
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except FileNotFoundError:
+                pass
+            self._file = None
+        self._buffer = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: Optional[int] = None,
+    threshold: Optional[int] = None,
+) -> SpooledUpload:
+    """
+    UploadFile을 청크 단위로 SpooledUpload에 복사합니다.
+    max_bytes를 넘으면 지금까지 쓴 내용을 지우고 UploadTooLarge를 발생시킵니다.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    spooled = SpooledUpload(UPLOAD_SPOOL_THRESHOLD if threshold is None else threshold)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if spooled.size + len(chunk) > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled
@@ -29,22 +29,46 @@ def is_date_in_range(target_date: date, start_date: date, end_date: date) -> boo
     return start_date <= target_date <= end_date
 
 
+def ranges_overlap(start_a: date, end_a: date, start_b: date, end_b: date) -> bool:
+    """두 날짜 구간이 하루라도 겹치는지 확인합니다 (양 끝 포함)."""
+    return start_a <= end_b and start_b <= end_a
+
+
+def compare_date_ranges(new_range: Optional[Tuple[date, date]], old_range: Optional[Tuple[date, date]]) -> int:
+    """
+    두 export 날짜 범위의 최신 순서를 비교합니다: 시작일, 같으면 종료일 기준.
+    new_range가 최신이면 1, 오래되었으면 -1, 같거나 한쪽이라도 범위가 없으면 0.
+    """
+    if not new_range or not old_range or new_range == old_range:
+        return 0
+    return 1 if new_range > old_range else -1
+
+
+def date_range_key(date_range: Tuple[date, date]) -> str:
+    """날짜 범위를 파일명과 같은 'YYYY-MM-DD~YYYY-MM-DD' 문자열로 변환합니다."""
+    return f"{date_range[0].isoformat()}~{date_range[1].isoformat()}"
+
+
+def parse_date_range_key(key: Optional[str]) -> Optional[Tuple[date, date]]:
+    """date_range_key 문자열을 날짜 범위로 되돌립니다. 형식이 다르면 None."""
+    if not key:
+        return None
+    try:
+        start_str, end_str = key.split("~")
+        return date.fromisoformat(start_str), date.fromisoformat(end_str)
+    except ValueError:
+        return None
+
+
 def is_upload_newer(new_upload: UploadHistory, old_upload: UploadHistory) -> bool:
     """
     두 업로드 중 new_upload가 더 최신인지 판단합니다.
     파일명의 날짜 범위를 우선 비교하고, 실패 시 업로드 시간을 비교합니다.
     """
-    new_range = parse_date_range_from_filename(new_upload.filename)
-    old_range = parse_date_range_from_filename(old_upload.filename)
-
-    if new_range and old_range:
-        if new_range[0] > old_range[0]:
-            return True
-        elif new_range[0] < old_range[0]:
-            return False
-        if new_range[1] > old_range[1]:
-            return True
-        elif new_range[1] < old_range[1]:
-            return False
-
+    order = compare_date_ranges(
+        parse_date_range_from_filename(new_upload.filename),
+        parse_date_range_from_filename(old_upload.filename),
+    )
+    if order:
+        return order > 0
     return new_upload.uploaded_at > old_upload.uploaded_at
@@ -0,0 +1,847 @@
+"""
+뱅크샐러드 export 시트 파서
+
+DB에 접근하지 않고 시트를 plain 구조(dict · list · tuple)로만 변환하므로 워커 프로세스에서 실행할 수 있습니다.
+뱅샐현황과 가계부 내역은 서로 독립적이라 프로세스 풀에서 동시에 파싱하고,
+DB 쓰기는 import_service가 파싱 결과를 받아 순서대로 처리합니다.
+
+각 파서는 단계별 프로파일(import_profile.ImportProfile)을 자기 프로세스 안에서 기록해 결과와 함께 반환합니다.
+섹션 파싱이 실패하면 예외 대신 errors[section]에 사유를 담아 돌려주어, 나머지 섹션은 계속 반영됩니다.
+
+같은 파일(SHA-256)을 다시 파싱하면 parse_cache에 저장해 둔 결과를 읽어 openpyxl 파싱을 건너뜁니다.
+- 뱅샐현황: 비어 있지 않은 행. 섹션 위치 찾기와 섹션 파싱은 적중해도 다시 실행하므로 섹션 파서 수정이 바로 반영됩니다.
+- 가계부 내역: dedup_hash까지 채운 배치. (원본, 증분 기준일)마다 따로 저장합니다.
+
+가계부 내역은 행 수에 비례해 커지므로 워커가 전체 컬럼을 pickle로 돌려주지 않습니다.
+LEDGER_BATCH_ROWS 행씩 파싱해 스풀 파일(parse_cache.new_spool_file)에 이어 쓰고 파일 경로만 돌려주며,
+부모 프로세스는 ParsedLedger.batches()로 한 배치씩 읽어 적재하므로 메모리는 배치 하나 크기입니다.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.services.excel_reader import (
+    LEDGER_SHEET, SUMMARY_SHEET,
+    iter_ledger_rows, iter_sheet_rows, ledger_row_total, open_workbook,
+)
+from app.services.import_profile import ImportProfile
+from app.services.ledger_loader import LedgerColumns, add_dedup_hashes
+from app.services.ledger_parser import LedgerScan, iter_rows_since, ledger_row_count, parse_ledger_columns
+from app.services.parse_cache import (
+    append_object, cache_enabled, iter_spool, load_entry, load_spool, new_spool_file, source_sha256,
+    store_entry, store_spool,
+)
+
+logger = logging.getLogger(__name__)
+
+# 시트 파싱 워커 프로세스 수 (0이면 호출 스레드에서 순서대로 파싱)
+PARSE_PROCESSES = int(os.getenv("IMPORT_PARSE_PROCESSES", str(min(2, os.cpu_count() or 1))))
+
+# 뱅샐현황 시트를 읽을 최대 행 수 (비정상적으로 긴 시트 방지용 상한)
+SUMMARY_MAX_ROWS = int(os.getenv("IMPORT_SUMMARY_MAX_ROWS", "5000"))
+
+# 가계부 내역을 스풀 파일에 쓰고 읽는 단위 (행)
+LEDGER_BATCH_ROWS = int(os.getenv("IMPORT_LEDGER_BATCH_ROWS", "5000"))
+
+WorkbookSource = Union[str, bytes]
+
+SUMMARY_SECTIONS = ("customer", "cash_flow", "monthly_summary", "investment", "financial_snapshot")
+
+
+class WorkbookLoadError(ValueError):
+    """워크북 파일 자체를 열 수 없는 경우."""
+
+
+@dataclass
+class SummarySheet:
+    """
+    뱅샐현황 시트(B~P열)의 비어 있지 않은 행과 섹션 위치 (locate_summary_sections 참고).
+    spans는 {섹션: (첫 행, 마지막 행)}, fingerprint는 섹션 라벨 행의 (행 번호, 라벨) 목록입니다.
+    """
+    rows: dict
+    header_row: Optional[int] = None
+    month_labels: List[str] = field(default_factory=list)
+    income_total_row: Optional[int] = None
+    expense_total_row: Optional[int] = None
+    net_total_row: Optional[int] = None
+    spans: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    fingerprint: List[Tuple[int, str]] = field(default_factory=list)
+
+    def span_rows(self, section: str) -> Iterator[Tuple[int, tuple]]:
+        """섹션 범위 안의 (행 번호, 값 튜플)만 순서대로 yield합니다. 섹션을 찾지 못했으면 없음."""
+        span = self.spans.get(section)
+        if span is None:
+            return
+        for ridx in range(span[0], span[1] + 1):
+            r = self.rows.get(ridx)
+            if r is not None:
+                yield ridx, r
+
+
+@dataclass
+class ParsedSummary:
+    """뱅샐현황 섹션별 파싱 결과. 파싱에 실패한 섹션은 None이고 errors에 사유가 있습니다."""
+    month_labels: List[str] = field(default_factory=list)
+    customer: Optional[dict] = None
+    cash_flow: Optional[List[dict]] = None
+    monthly_summary: Optional[List[dict]] = None
+    investment: Optional[dict] = None
+    financial_snapshot: Optional[dict] = None
+    errors: Dict[str, str] = field(default_factory=dict)
+    stages: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class ParsedLedger:
+    """
+    가계부 내역 파싱 결과. 행은 paths의 스풀 파일에 순서대로 들어 있고 batches()로 한 배치씩 읽습니다.
+    배치는 dedup_hash까지 채운 LedgerColumns이며(ledger_parser 참고), 다 쓴 뒤에는 discard()로 파일을 지웁니다.
+    """
+    paths: List[str] = field(default_factory=list)
+    rows: int = 0
+    max_date: Optional[datetime] = None     # 가장 최근 거래일 (행이 없으면 None)
+    before_mark: int = 0            # 증분 기준일 이전이라 검사하지 않은 행 수
+    stopped_early: bool = False     # 기준일 이전 영역에서 시트 읽기를 멈췄는지
+    stages: List[dict] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def batches(self) -> Iterator[LedgerColumns]:
+        for path in self.paths:
+            yield from iter_spool(path)
+
+    def discard(self) -> None:
+        for path in self.paths:
+            _remove_file(path)
+        self.paths = []
+
+
+class _LedgerSpool:
+    """파싱한 가계부 배치를 스풀 파일에 이어 쓰며 ParsedLedger를 만듭니다."""
+
+    def __init__(self) -> None:
+        self.parsed = ParsedLedger(paths=[new_spool_file()])
+        self._file = open(self.parsed.paths[0], "wb")
+
+    def write(self, columns: LedgerColumns) -> None:
+        count = ledger_row_count(columns)
+        if not count:
+            return
+        append_object(self._file, columns)
+        latest = max(columns["transaction_date"])
+        self.parsed.rows += count
+        self.parsed.max_date = latest if self.parsed.max_date is None else max(self.parsed.max_date, latest)
+
+    def finish(self, before_mark: int, stopped_early: bool) -> ParsedLedger:
+        self.parsed.before_mark = before_mark
+        self.parsed.stopped_early = stopped_early
+        self._file.close()
+        return self.parsed
+
+    def abort(self) -> None:
+        self._file.close()
+        self.parsed.discard()
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@dataclass
+class ParsedWorkbook:
+    """시트별 파싱 결과. 시트가 없으면 None."""
+    summary: Optional[ParsedSummary] = None
+    ledger: Optional[ParsedLedger] = None
+
+    def discard(self) -> None:
+        """가계부 스풀 파일을 지웁니다."""
+        if self.ledger is not None:
+            self.ledger.discard()
+
+
+# ── 프로세스 풀 ─────────────────────────────────────────────────
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if PARSE_PROCESSES <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # import 작업 스레드에서 fork하지 않도록 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_parse_workers(wait: bool = True) -> None:
+    """파싱 프로세스 풀을 종료합니다. 다음 파싱 시 새 풀이 생성됩니다."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _submit(executor: Optional[Executor], fn: Callable, *args: Any) -> Future:
+    if executor is not None:
+        return executor.submit(fn, *args)
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except BaseException as e:
+        future.set_exception(e)
+    return future
+
+
+def as_workbook_source(source: Union[str, bytes, IO[bytes]]) -> WorkbookSource:
+    """워커 프로세스로 넘길 수 있도록 파일 객체는 바이트로 읽어 둡니다 (경로 · 바이트는 그대로)."""
+    if isinstance(source, (str, bytes)):
+        return source
+    return source.read()
+
+
+def _open(source: WorkbookSource):
+    try:
+        return open_workbook(io.BytesIO(source) if isinstance(source, bytes) else source)
+    except Exception:
+        raise WorkbookLoadError("Excel 파일을 읽을 수 없습니다.")
+
+
+def parse_workbook(
+    source: Union[str, bytes, IO[bytes]],
+    summary: bool = True,
+    ledger: bool = True,
+    ledger_since: Optional[datetime] = None,
+    content_sha256: Optional[str] = None,
+) -> ParsedWorkbook:
+    """
+    뱅샐현황 · 가계부 내역 시트를 워커 프로세스에서 동시에 파싱합니다.
+    ledger_since를 주면 그 이전 날짜의 가계부 행은 건너뜁니다 (parse_ledger_sheet 참고).
+    content_sha256은 파싱 캐시 키이며, 주지 않으면 원본에서 계산합니다.
+    워크북을 열 수 없으면 WorkbookLoadError를 발생시킵니다.
+    """
+    source = as_workbook_source(source)
+    futures = _submit_workbook(
+        _get_executor(), source, summary, ledger, ledger_since, _cache_key(source, content_sha256),
+    )
+    try:
+        return ParsedWorkbook(**{name: future.result() for name, future in futures.items()})
+    except BaseException:
+        if "ledger" in futures:
+            _discard_ledger_result(futures["ledger"])
+        raise
+
+
+def parse_workbooks(
+    sources: Dict[str, WorkbookSource],
+    ledger_since: Optional[datetime] = None,
+) -> Dict[str, ParsedWorkbook]:
+    """
+    여러 워크북({이름: 경로 또는 바이트})의 시트를 한 번에 프로세스 풀에 제출해 동시에 파싱합니다.
+    결과는 sources와 같은 순서의 {이름: ParsedWorkbook}입니다.
+    열 수 없는 워크북이 있으면 아직 시작하지 않은 파싱을 취소하고 이름을 붙인 WorkbookLoadError를 발생시킵니다.
+    """
+    executor = _get_executor()
+    pending = {
+        name: _submit_workbook(executor, source, True, True, ledger_since, _cache_key(source))
+        for name, source in sources.items()
+    }
+    parsed: Dict[str, ParsedWorkbook] = {}
+    try:
+        for name, futures in pending.items():
+            try:
+                parsed[name] = ParsedWorkbook(**{sheet: future.result() for sheet, future in futures.items()})
+            except WorkbookLoadError as e:
+                raise WorkbookLoadError(f"{name}: {e}")
+    except BaseException:
+        for futures in pending.values():
+            for future in futures.values():
+                future.cancel()
+        for futures in pending.values():
+            if "ledger" in futures:
+                _discard_ledger_result(futures["ledger"])
+        raise
+    return parsed
+
+
+def _discard_ledger_result(future: Future) -> None:
+    """취소하지 못한 가계부 파싱은 끝나기를 기다려 스풀 파일을 지웁니다."""
+    if future.cancelled():
+        return
+    try:
+        ledger = future.result()
+    except BaseException:
+        return
+    if ledger is not None:
+        ledger.discard()
+
+
+def _submit_workbook(
+    executor: Optional[Executor],
+    source: WorkbookSource,
+    summary: bool,
+    ledger: bool,
+    ledger_since: Optional[datetime],
+    cache_key: Optional[str] = None,
+) -> Dict[str, Future]:
+    futures: Dict[str, Future] = {}
+    if summary:
+        futures["summary"] = _submit(executor, parse_summary_sheet, source, cache_key)
+    if ledger:
+        futures["ledger"] = _submit(executor, parse_ledger_sheet, source, ledger_since, cache_key)
+    return futures
+
+
+# ── 파싱 캐시 ───────────────────────────────────────────────────
+
+def _cache_key(source: WorkbookSource, content_sha256: Optional[str] = None) -> Optional[str]:
+    """파싱 캐시 키 (원본 SHA-256). 캐시가 꺼져 있으면 None."""
+    if not cache_enabled():
+        return None
+    return content_sha256 or source_sha256(source)
+
+
+def _summary_entry_name(cache_key: str) -> str:
+    return f"{cache_key}.summary"
+
+
+def _ledger_entry_name(cache_key: str, since: Optional[datetime]) -> str:
+    return f"{cache_key}.ledger.{since:%Y%m%dT%H%M%S}" if since is not None else f"{cache_key}.ledger.all"
+
+
+def _store_cached(profile: ImportProfile, name: str, meta: dict, objects: Iterable[Any] = ()) -> None:
+    with profile.stage("cache_store"):
+        store_entry(name, meta, objects)
+
+
+def _load_cached_summary_rows(profile: ImportProfile, cache_key: Optional[str]) -> Tuple[bool, Optional[dict]]:
+    """캐시된 뱅샐현황 행을 (적중 여부, 행 dict 또는 시트 없음 None)으로 반환합니다."""
+    if cache_key is None:
+        return False, None
+    with profile.stage("cache_load") as stage:
+        entry = load_entry(_summary_entry_name(cache_key))
+        if entry is None:
+            return False, None
+        if not entry.meta["sheet"]:
+            return True, None
+        rows = entry.objects[0]
+        stage.rows += len(rows)
+    return True, rows
+
+
+def _ledger_cache_meta(parsed: ParsedLedger) -> dict:
+    return {
+        "sheet": True,
+        "rows": parsed.rows,
+        "max_date": parsed.max_date,
+        "before_mark": parsed.before_mark,
+        "stopped_early": parsed.stopped_early,
+    }
+
+
+def _load_cached_ledger(
+    profile: ImportProfile,
+    cache_key: Optional[str],
+    since: Optional[datetime],
+) -> Tuple[bool, Optional[ParsedLedger]]:
+    """
+    캐시된 가계부 파싱 결과를 (적중 여부, ParsedLedger 또는 시트 없음 None)으로 반환합니다.
+    적중하면 캐시 항목의 배치를 새 스풀 파일로 복사하므로, 이후 캐시에서 지워져도 결과는 그대로 읽을 수 있습니다.
+    """
+    if cache_key is None:
+        return False, None
+    with profile.stage("cache_load") as stage:
+        loaded = load_spool(_ledger_entry_name(cache_key, since))
+        if loaded is None:
+            return False, None
+        meta, path = loaded
+        if not meta["sheet"]:
+            _remove_file(path)
+            return True, None
+        parsed = ParsedLedger(
+            paths=[path],
+            rows=meta["rows"],
+            max_date=meta["max_date"],
+            before_mark=meta["before_mark"],
+            stopped_early=meta["stopped_early"],
+        )
+        stage.rows += len(parsed)
+    return True, parsed
+
+
+# ── 뱅샐현황 ────────────────────────────────────────────────────
+
+def parse_summary_sheet(source: WorkbookSource, cache_key: Optional[str] = None) -> Optional[ParsedSummary]:
+    """
+    뱅샐현황 시트의 섹션을 모두 파싱합니다. 시트가 없으면 None.
+    cache_key(원본 SHA-256)를 주면 캐시된 행이 있을 때 워크북을 열지 않고, 없으면 읽은 행을 캐시에 저장합니다.
+    """
+    profile = ImportProfile()
+    parsed = ParsedSummary()
+    try:
+        hit, rows = _load_cached_summary_rows(profile, cache_key)
+        if hit:
+            if rows is None:
+                return None
+            sheet = locate_summary_sections(rows.items())
+        else:
+            with profile.stage("load"):
+                wb = _open(source)
+            try:
+                if SUMMARY_SHEET not in wb.sheetnames:
+                    if cache_key is not None:
+                        _store_cached(profile, _summary_entry_name(cache_key), {"sheet": False})
+                    return None
+                # cols B~P = cols 2~16, 시트 끝까지 한 번만 읽으며 섹션 위치를 기록
+                with profile.stage("summary_read") as stage:
+                    sheet = locate_summary_sections(
+                        iter_sheet_rows(wb, SUMMARY_SHEET, min_row=1, max_row=SUMMARY_MAX_ROWS, min_col=2, max_col=16)
+                    )
+                    stage.rows += len(sheet.rows)
+            finally:
+                wb.close()
+            if cache_key is not None:
+                _store_cached(profile, _summary_entry_name(cache_key), {"sheet": True}, [sheet.rows])
+
+        parsed.month_labels = sheet.month_labels
+        with profile.stage("summary_parse"):
+            for section, parse in (
+                ("customer", parse_customer),
+                ("cash_flow", parse_cash_flow_items),
+                ("investment", parse_investments),
+                ("financial_snapshot", parse_financial_snapshot),
+            ):
+                try:
+                    setattr(parsed, section, parse(sheet))
+                except Exception as e:
+                    parsed.errors[section] = str(e)
+            try:
+                parsed.monthly_summary = parse_monthly_summary(sheet, parsed.cash_flow or [])
+            except Exception as e:
+                parsed.errors["monthly_summary"] = str(e)
+    finally:
+        parsed.stages = profile.finish()["stages"]
+    return parsed
+
+
+# 섹션 번호가 붙은 라벨 ('2.현금흐름현황', '3.재무현황' …)
+SECTION_LABEL = re.compile(r"^\s*\d+\.")
+CASH_FLOW_TOTALS = {'월수입 총계': 'income_total_row', '월지출 총계': 'expense_total_row', '순수입 총계': 'net_total_row'}
+# 고객 정보 섹션 라벨('1.고객정보')에 들어 있는 말과 값 행 위의 헤더 라벨
+CUSTOMER_SECTION = '고객'
+CUSTOMER_HEADER = '이름'
+
+
+def locate_summary_sections(rows: Iterable[Tuple[int, tuple]]) -> SummarySheet:
+    """
+    뱅샐현황 (행 번호, B~P 값) 행을 한 번 순회하면서 빈 행을 버리고, 라벨로 섹션 위치를 기록합니다.
+    Excel 버전 · 항목 수에 따라 행 번호가 달라지므로 고정 행 범위 대신 라벨을 기준으로 합니다.
+    - 고객 정보: '고객정보' 번호 섹션 라벨 또는 '이름' 헤더 다음의 첫 값 행 (현금흐름 헤더 이전)
+    - 현금흐름: 첫 '항목' 헤더(월 레이블) ~ '월수입 총계' / '월지출 총계' / '순수입 총계'
+    - 재무현황: '재무현황' 라벨 ~ 다음 번호 섹션 라벨 직전 (라벨이 없으면 현금흐름 다음 행부터)
+    - 투자성 자산: 재무현황 안의 '투자성 자산' ~ 다음 B열 라벨 직전
+    - 부채: 재무현황 시작 ~ F열 '총부채'
+    """
+    sheet = SummarySheet(rows={})
+    snapshot_row = investment_row = liabilities_end = None
+    customer_start = customer_row = None
+    for ridx, r in rows:
+        if not r or all(v is None for v in r):
+            continue
+        sheet.rows[ridx] = r
+        label = r[0]
+        is_section = isinstance(label, str) and SECTION_LABEL.match(label) is not None
+        if customer_start is not None and customer_row is None and sheet.header_row is None \
+                and not is_section and label != CUSTOMER_HEADER:
+            customer_row = ridx
+        if isinstance(label, str):
+            if is_section:
+                sheet.fingerprint.append((ridx, label.strip()))
+                if snapshot_row is None and '재무현황' in label:
+                    snapshot_row = ridx
+                if customer_start is None and CUSTOMER_SECTION in label:
+                    customer_start = ridx
+            elif label == CUSTOMER_HEADER and customer_start is None and sheet.header_row is None:
+                customer_start = ridx
+            if label == '항목' and sheet.header_row is None:
+                sheet.header_row = ridx
+                sheet.month_labels = [str(v) for v in r[3:15] if v is not None]
+            elif label in CASH_FLOW_TOTALS and sheet.header_row is not None \
+                    and getattr(sheet, CASH_FLOW_TOTALS[label]) is None:
+                setattr(sheet, CASH_FLOW_TOTALS[label], ridx)
+            elif label == '투자성 자산' and investment_row is None:
+                investment_row = ridx
+                sheet.fingerprint.append((ridx, label))
+        if liabilities_end is None and len(r) > 4 and r[4] == '총부채' and ridx > (snapshot_row or 0):
+            liabilities_end = ridx
+
+    last_row = max(sheet.rows, default=0)
+    if customer_row is not None:
+        sheet.spans["customer"] = (customer_row, customer_row)
+    if sheet.header_row is not None:
+        sheet.spans["cash_flow"] = (
+            sheet.header_row, sheet.net_total_row or sheet.expense_total_row or sheet.income_total_row or last_row,
+        )
+
+    cash_flow_end = sheet.spans.get("cash_flow", (0, 0))[1]
+    snapshot_start = snapshot_row if snapshot_row is not None else cash_flow_end + 1
+    snapshot_end = next(
+        (ridx - 1 for ridx, _ in sheet.fingerprint if ridx > snapshot_start and ridx != investment_row), last_row,
+    )
+    if snapshot_start <= snapshot_end:
+        sheet.spans["financial_snapshot"] = (snapshot_start, snapshot_end)
+        sheet.spans["liabilities"] = (snapshot_start, min(liabilities_end or snapshot_end, snapshot_end))
+
+    if investment_row is not None:
+        investment_end = next(
+            (ridx - 1 for ridx in sheet.rows if ridx > investment_row and sheet.rows[ridx][0] is not None),
+            last_row,
+        )
+        sheet.spans["investment"] = (investment_row, investment_end)
+    return sheet
+
+
+def parse_customer(sheet: SummarySheet) -> Optional[dict]:
+    """1. 고객 정보 ('이름' 헤더 다음 행: B=이름, C=성별, D=나이, E=신용점수, F=이메일)"""
+    r = next((r for _, r in sheet.span_rows("customer")), None)
+    if not (r and r[0]):
+        return None
+    email_raw = str(r[4]) if r[4] else None
+    return {
+        "name": str(r[0]),
+        "gender": str(r[1]) if r[1] else None,
+        "age": int(r[2]) if r[2] is not None else None,
+        "credit_score": int(r[3]) if r[3] is not None else None,
+        "email": email_raw if email_raw and email_raw != '-' else None,
+    }
+
+
+SKIP_CASHFLOW = {'월수입 총계', '월지출 총계', '순수입 총계'}
+
+
+def parse_cashflow_row(row_data: Optional[tuple], item_type: str, month_labels: List[str]) -> Optional[dict]:
+    """뱅샐현황 현금흐름 행(B~P)을 cash_flow 컬럼 dict로 변환합니다. 항목명이 없거나 총계 행이면 None."""
+    if not row_data:
+        return None
+    item_name = str(row_data[0]) if row_data[0] else None
+    if not item_name or item_name in SKIP_CASHFLOW:
+        return None
+    total = float(row_data[1]) if row_data[1] is not None else None
+    monthly_avg = float(row_data[2]) if row_data[2] is not None else None
+    monthly_data = {
+        month_labels[j]: float(row_data[3 + j])
+        for j in range(len(month_labels))
+        if 3 + j < len(row_data) and row_data[3 + j] is not None
+    }
+    # Excel 합계 컬럼이 수식(formula)이어서 0으로 읽히는 경우 monthly_data 합계로 대체
+    if not total and monthly_data:
+        total = sum(monthly_data.values())
+    if not monthly_avg and total and month_labels:
+        monthly_avg = total / len(month_labels)
+    return {
+        "item_name": item_name,
+        "item_type": item_type,
+        "total": total,
+        "monthly_average": monthly_avg,
+        "monthly_data": monthly_data,
+    }
+
+
+def parse_cash_flow_items(sheet: SummarySheet) -> List[dict]:
+    """2. 현금흐름 항목 (헤더 ~ 월수입 총계: 수입, 월수입 총계 ~ 월지출 총계: 지출)"""
+    rows = sheet.rows
+    items: List[dict] = []
+    # 헤더 다음 행 ~ 월수입 총계 직전 → 수입 항목
+    if sheet.header_row and sheet.income_total_row:
+        for ridx in range(sheet.header_row + 1, sheet.income_total_row):
+            item = parse_cashflow_row(rows.get(ridx), "수입", sheet.month_labels)
+            if item:
+                items.append(item)
+    # 월수입 총계 다음 행 ~ 월지출 총계 직전 → 지출 항목
+    if sheet.income_total_row and sheet.expense_total_row:
+        for ridx in range(sheet.income_total_row + 1, sheet.expense_total_row):
+            item = parse_cashflow_row(rows.get(ridx), "지출", sheet.month_labels)
+            if item:
+                items.append(item)
+    return items
+
+
+def month_totals_by_type(items: List[dict], month_labels: List[str]) -> Dict[str, List[float]]:
+    """
+    현금흐름 항목으로 item_type별 항목 × 월 행렬을 만들고 열 합계(월별 합계)를 반환합니다.
+    같은 항목명이 여러 번 나오면 upsert와 같이 마지막 행만 반영합니다.
+    """
+    matrix: Dict[str, List[List[float]]] = {}
+    for item in {item["item_name"]: item for item in items}.values():
+        monthly_data = item["monthly_data"] or {}
+        matrix.setdefault(item["item_type"], []).append(
+            [float(monthly_data.get(label, 0)) for label in month_labels]
+        )
+    return {item_type: [sum(column) for column in zip(*rows)] for item_type, rows in matrix.items()}
+
+
+def parse_month_key(label: str) -> Optional[Tuple[int, int]]:
+    """'2025-01' 형식 월 레이블을 (연, 월)로 변환합니다. 형식이 다르면 None."""
+    try:
+        return int(label[:4]), int(label[5:7])
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_monthly_summary(sheet: SummarySheet, cash_flow_items: List[dict]) -> List[dict]:
+    """3. 월별 결산 — 동적으로 찾은 총계 행 사용. 의미 있는 월만 {year, month, income, expense, net_income}로 반환"""
+    rows = sheet.rows
+    month_labels = sheet.month_labels
+    r_income_total = rows.get(sheet.income_total_row) if sheet.income_total_row else None
+    r_expense_total = rows.get(sheet.expense_total_row) if sheet.expense_total_row else None
+    r_net_total = rows.get(sheet.net_total_row) if sheet.net_total_row else None
+
+    # 총계 행의 월별 값도 수식 캐시 없으면 0 → 수입/지출 항목 합계로 대체
+    # 파싱한 항목으로 항목 × 월 행렬을 한 번 만들고 열 합계를 월별 대체값으로 사용
+    item_month_totals = month_totals_by_type(cash_flow_items, month_labels)
+    income_sums = item_month_totals.get("수입", [0.0] * len(month_labels))
+    expense_sums = item_month_totals.get("지출", [0.0] * len(month_labels))
+
+    def _safe_float(row_data: "tuple | None", idx: int) -> "float | None":
+        if row_data is None:
+            return None
+        return float(row_data[idx]) if len(row_data) > idx and row_data[idx] is not None else None
+
+    months: List[dict] = []
+    for j, label in enumerate(month_labels):
+        key = parse_month_key(label)
+        if key is None:
+            continue
+
+        income = _safe_float(r_income_total, 3 + j)
+        expense = _safe_float(r_expense_total, 3 + j)
+        net = _safe_float(r_net_total, 3 + j)
+
+        # 수식 캐시 없어서 0인 경우 항목 합산으로 대체
+        if not income:
+            income = income_sums[j] or None
+        if not expense:
+            expense = expense_sums[j] or None
+        if income is not None and expense is not None and not net:
+            net = income - expense
+
+        # 수입·지출·순수익이 모두 None 또는 0이면 의미 없는 행이므로 건너뜀
+        if income is None and expense is None and net is None:
+            continue
+        if (income or 0) == 0 and (expense or 0) == 0 and (net or 0) == 0:
+            continue
+        months.append({"year": key[0], "month": key[1], "income": income, "expense": expense, "net_income": net})
+    return months
+
+
+def parse_investments(sheet: SummarySheet) -> dict:
+    """
+    4. 투자성 자산 (재무현황 안의 '투자성 자산' ~ 다음 라벨 직전, sheet.spans["investment"])
+    {"items": [(상품명, 평가금액)], "month": 파일의 마지막 (연, 월) 또는 None}
+    """
+    # col B(index 0)=섹션라벨, col C(index 1)=상품명, col E(index 3)=평가금액
+    items: List[Tuple[str, float]] = []
+    for _, r in sheet.span_rows("investment"):
+        product_name = str(r[1]) if r[1] else None
+        raw_val = r[3]  # col E
+        if not product_name or raw_val is None:
+            continue
+        try:
+            val = float(raw_val)
+        except (TypeError, ValueError):
+            continue
+        if val <= 1:  # 사실상 0인 항목 제외
+            continue
+        items.append((product_name, val))
+
+    last_month = parse_month_key(sheet.month_labels[-1]) if sheet.month_labels else None
+    return {"items": items, "month": last_month}
+
+
+def parse_financial_snapshot(sheet: SummarySheet) -> dict:
+    """5. 재무현황 (3.재무현황 섹션, sheet.spans["financial_snapshot"]) → {total_assets, total_liabilities, net_assets, snapshot_data}"""
+    # col B(index 0)=카테고리, col C(index 1)=상품명, col E(index 3)=금액(자산), col I(index 7)=금액(부채)
+    ASSET_CATEGORIES = {
+        '자유입출금 자산', '신탁 자산', '현금 자산', '저축성 자산',
+        '전자금융 자산', '투자성 자산', '부동산', '동산',
+        '기타 실물 자산', '보험 자산', '연금 자산',
+    }
+
+    snap_data: dict = {}
+    cur_cat: "str | None" = None
+    total_assets_v: "float | None" = None
+    total_liab_v: "float | None" = None
+    net_assets_v: "float | None" = None
+
+    for _, r in sheet.span_rows("financial_snapshot"):
+        label = r[0]          # col B
+        product = r[1] if len(r) > 1 else None   # col C
+        amt_e = r[3] if len(r) > 3 else None      # col E (자산 금액)
+        amt_i = r[7] if len(r) > 7 else None      # col I (부채 금액)
+
+        # 총자산/총부채 행
+        if label == '총자산':
+            if amt_e is not None:
+                total_assets_v = float(amt_e)
+            if amt_i is not None:
+                total_liab_v = float(amt_i)
+            continue
+
+        # 순자산 값 행 (col B가 숫자인 경우)
+        if label is not None and not isinstance(label, str):
+            try:
+                net_assets_v = float(label)
+            except (TypeError, ValueError):
+                pass
+            continue
+
+        # 자산 카테고리 헤더
+        if isinstance(label, str) and label in ASSET_CATEGORIES:
+            cur_cat = label
+            if cur_cat not in snap_data:
+                snap_data[cur_cat] = []
+            if product is not None and amt_e is not None:
+                snap_data[cur_cat].append({"name": str(product), "amount": float(amt_e)})
+            continue
+
+        # 카테고리 내 항목 (label=None, product 있음)
+        if cur_cat and label is None and product is not None and amt_e is not None:
+            snap_data[cur_cat].append({"name": str(product), "amount": float(amt_e)})
+
+    # 부채 항목 파싱 (col F(r[4])=카테고리, col G(r[5])=상품명, col I(r[7])=금액)
+    liab_data: dict = {}
+    cur_liab: "str | None" = None
+    SKIP_LIAB_LABELS = {'부채', '항목', None}
+    for _, r in sheet.span_rows("liabilities"):
+        liab_label = r[4] if len(r) > 4 else None   # col F
+        liab_product = r[5] if len(r) > 5 else None  # col G
+        liab_amt = r[7] if len(r) > 7 else None      # col I
+
+        if liab_label == '총부채':
+            break
+        if isinstance(liab_label, str) and liab_label not in SKIP_LIAB_LABELS:
+            cur_liab = liab_label.strip()
+            liab_data.setdefault(cur_liab, [])
+            if liab_product is not None and liab_amt is not None:
+                liab_data[cur_liab].append({"name": str(liab_product), "amount": float(liab_amt)})
+        elif cur_liab and liab_label is None and liab_product is not None and liab_amt is not None:
+            liab_data[cur_liab].append({"name": str(liab_product), "amount": float(liab_amt)})
+
+    if liab_data:
+        snap_data['_liabilities'] = liab_data
+
+    # 의미 없는 빈 자산 카테고리 제거 (부채 키는 유지)
+    snap_data = {
+        k: v for k, v in snap_data.items()
+        if k == '_liabilities' or v
+    }
+
+    # 총자산이 파싱되지 않은 경우(0 또는 None) snapshot_data 합계로 대체
+    if not total_assets_v:
+        total_assets_v = sum(
+            item["amount"]
+            for k, items in snap_data.items()
+            if k != '_liabilities' and isinstance(items, list)
+            for item in items
+            if isinstance(item.get("amount"), (int, float))
+        )
+    # 총부채가 파싱되지 않은 경우 _liabilities 합계로 대체
+    if not total_liab_v and '_liabilities' in snap_data:
+        total_liab_v = sum(
+            item["amount"]
+            for items in snap_data['_liabilities'].values()
+            if isinstance(items, list)
+            for item in items
+            if isinstance(item.get("amount"), (int, float))
+        )
+    if total_assets_v is not None and total_liab_v is not None and not net_assets_v:
+        net_assets_v = total_assets_v - total_liab_v
+
+    return {
+        "total_assets": total_assets_v,
+        "total_liabilities": total_liab_v,
+        "net_assets": net_assets_v,
+        "snapshot_data": snap_data,
+    }
+
+
+# ── 가계부 내역 ─────────────────────────────────────────────────
+
+def parse_ledger_sheet(
+    source: WorkbookSource,
+    since: Optional[datetime] = None,
+    cache_key: Optional[str] = None,
+) -> Optional[ParsedLedger]:
+    """
+    가계부 내역 시트를 LEDGER_BATCH_ROWS 행씩 파싱하고 중복 판정 키(dedup_hash)까지 계산해 스풀 파일에 씁니다.
+    시트가 없으면 None. since를 주면 그 이전 날짜의 행은 변환 · 해시 없이 건너뛰고 before_mark에 셉니다.
+    cache_key(원본 SHA-256)를 주면 같은 기준일로 캐시된 결과가 있을 때 워크북을 열지 않고, 없으면 파싱 결과를 캐시에 넣습니다.
+    """
+    profile = ImportProfile()
+    parsed: Optional[ParsedLedger] = None
+    try:
+        hit, parsed = _load_cached_ledger(profile, cache_key, since)
+        if hit:
+            return parsed
+        with profile.stage("load"):
+            wb = _open(source)
+        try:
+            if LEDGER_SHEET not in wb.sheetnames:
+                if cache_key is not None:
+                    _store_cached(profile, _ledger_entry_name(cache_key, since), {"sheet": False})
+                return None
+            parsed = _spool_ledger(wb, since, profile)
+        finally:
+            wb.close()
+        if cache_key is not None:
+            with profile.stage("cache_store"):
+                store_spool(_ledger_entry_name(cache_key, since), _ledger_cache_meta(parsed), parsed.paths[0])
+    finally:
+        stages = profile.finish()["stages"]
+        if parsed is not None:
+            parsed.stages = stages
+    return parsed
+
+
+def _spool_ledger(wb, since: Optional[datetime], profile: ImportProfile) -> ParsedLedger:
+    rows = iter_ledger_rows(wb)
+    scan = LedgerScan()
+    if since is not None:
+        rows = iter_rows_since(rows, since, scan, total=ledger_row_total(wb))
+    spool = _LedgerSpool()
+    try:
+        while True:
+            with profile.stage("ledger_parse") as stage:
+                chunk = list(islice(rows, LEDGER_BATCH_ROWS))
+                columns = parse_ledger_columns(chunk, with_hash=False)
+                stage.rows += ledger_row_count(columns)
+                if not chunk:
+                    stage.rows += scan.before_mark
+                    break
+            with profile.stage("dedup") as stage:
+                add_dedup_hashes(columns)
+                stage.rows += ledger_row_count(columns)
+            with profile.stage("spool"):
+                spool.write(columns)
+        return spool.finish(scan.before_mark, scan.stopped_early)
+    except BaseException:
+        spool.abort()
+        raise
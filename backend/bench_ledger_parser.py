@@ -0,0 +1,95 @@
+"""
+가계부 내역 파서 마이크로 벤치마크
+
+같은 가계부 행 튜플(기본 100,000행)을 두 방식으로 파싱해 행당 비용을 비교합니다.
+- dict: 행마다 10개 키 dict를 만들고 dedup_hash를 행 dict에 채우는 기존 방식
+- columns: ledger_parser.parse_ledger_columns (컬럼 리스트에 한 번에 추가)
+openpyxl 읽기 비용은 두 방식이 같으므로 제외하고, 파싱 · 해시 · 워커 결과 pickle 크기만 잽니다.
+
+    python bench_ledger_parser.py [행 수]
+"""
+import pickle
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from app.services.ledger_loader import ledger_dedup_hash
+from app.services.ledger_parser import parse_ledger_columns
+
+
+def _sample_rows(n: int) -> list[tuple]:
+    base = datetime(2025, 1, 1)
+    rows = []
+    for i in range(n):
+        amount = -(1000 + i % 9000) if i % 7 else f"{3000000 + i:,}"
+        rows.append((
+            base + timedelta(minutes=17 * i), f"{i % 24:02d}:{i % 60:02d}:00", "지출" if i % 7 else "수입",
+            "식비", "한식" if i % 3 else None, f"가맹점 {i % 500}", amount, "KRW", "신한카드", None,
+        ))
+    return rows
+
+
+def parse_rows_as_dicts(rows: list[tuple]) -> list[dict]:
+    """컬럼 파서 도입 전의 행 dict 방식 (비교 기준)."""
+    parsed = []
+    for row in rows:
+        if not any(row):
+            continue
+        raw_date, raw_time, tx_type, category, subcategory, description, raw_amount, currency, payment_method, memo = row
+        if isinstance(raw_date, datetime):
+            tx_date = raw_date
+        elif isinstance(raw_date, date):
+            tx_date = datetime(raw_date.year, raw_date.month, raw_date.day)
+        else:
+            continue
+        amount_val = None
+        if raw_amount is not None:
+            try:
+                amount_val = float(str(raw_amount).replace(",", ""))
+            except (ValueError, TypeError):
+                pass
+        parsed.append({
+            "transaction_date": tx_date,
+            "transaction_time": str(raw_time) if raw_time is not None else None,
+            "transaction_type": str(tx_type) if tx_type else None,
+            "category": str(category) if category else None,
+            "subcategory": str(subcategory) if subcategory else None,
+            "description": str(description) if description else None,
+            "amount": amount_val,
+            "currency": str(currency) if currency else None,
+            "payment_method": str(payment_method) if payment_method else None,
+            "memo": str(memo) if memo else None,
+        })
+    for row in parsed:
+        row["dedup_hash"] = ledger_dedup_hash(
+            row["transaction_date"], row["transaction_time"], row["description"], row["amount"],
+        )
+    return parsed
+
+
+def _measure(fn, rows: list[tuple]) -> tuple[float, int, object]:
+    # 시간은 tracemalloc 없이, 메모리는 별도 실행으로 측정 (추적 오버헤드가 시간에 섞이지 않도록)
+    start = time.perf_counter()
+    result = fn(rows)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def run(n: int = 100_000) -> None:
+    rows = _sample_rows(n)
+    print(f"{n:,}행")
+    print(f"{'방식':<8} {'전체(s)':>9} {'행당(µs)':>9} {'peak(MB)':>9} {'pickle(MB)':>11}")
+    for name, fn in (("dict", parse_rows_as_dicts), ("columns", parse_ledger_columns)):
+        fn(rows[:1000])  # 워밍업
+        elapsed, peak, result = _measure(fn, rows)
+        size = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"{name:<8} {elapsed:>9.3f} {elapsed / n * 1e6:>9.2f} {peak / 2**20:>9.1f} {size / 2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
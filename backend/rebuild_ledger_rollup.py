@@ -0,0 +1,25 @@
+"""
+ledger_rollup(가계부 일 단위 집계)을 ledger_transaction 전체로 다시 만듭니다.
+거래 변경 시 증분 반영이 어긋났거나(직접 SQL 수정 등) 롤업이 비어 있을 때의 복구용입니다.
+
+    python rebuild_ledger_rollup.py
+"""
+from app.database import SessionLocal
+from app.services.import_lock import lock_import_writes
+from app.services.ledger_rollup_service import rebuild_rollup
+
+
+def run():
+    db = SessionLocal()
+    try:
+        # 다시 만드는 동안 import가 거래를 넣지 않도록 import 쓰기 락을 잡음 (commit 시 해제)
+        lock_import_writes(db)
+        buckets = rebuild_rollup(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"ledger_rollup 재생성 완료: {buckets}개 버킷")
+
+
+if __name__ == "__main__":
+    run()
@@ -3,13 +3,23 @@ pytest 공통 픽스처 설정
 - SQLite in-memory DB로 PostgreSQL 대체
 - FastAPI TestClient 제공
 """
+import io
+import os
+from datetime import datetime
+
+import openpyxl
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+# 테스트끼리 파싱 캐시를 공유하지 않도록 기본으로 끔 (워커 프로세스도 이 환경 변수를 상속)
+os.environ.setdefault("IMPORT_PARSE_CACHE_MB", "0")
+
+from app.database import Base, get_db, get_session_factory
 from app.main import app
+from app.services import parse_cache
+from app.services.ledger_parser import empty_ledger_columns
 
 SQLITE_URL = "sqlite:///:memory:"
 
@@ -51,6 +61,125 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = _override_get_db
+    # import 작업 워커도 같은 SQLite 세션을 사용
+    app.dependency_overrides[get_session_factory] = lambda: (lambda: db_session)
     with TestClient(app, raise_server_exceptions=True) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def parse_cache_dir(tmp_path, monkeypatch):
+    """테스트 전용 디렉터리에 파싱 캐시를 켭니다 (PARSE_PROCESSES=0으로 호출 프로세스에서 파싱할 때 적용)."""
+    cache_dir = tmp_path / "parse-cache"
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+    return cache_dir
+
+
+@pytest.fixture()
+def spool_dir(tmp_path, monkeypatch):
+    """가계부 스풀 파일을 테스트 전용 디렉터리에 씁니다 (PARSE_PROCESSES=0으로 호출 프로세스에서 파싱할 때 적용)."""
+    path = tmp_path / "spool"
+    path.mkdir()
+    monkeypatch.setattr(parse_cache, "SPOOL_DIR", str(path))
+    return path
+
+
+# ────────────────────────────────────────────
+# 뱅크샐러드 Excel 샘플 생성
+# ────────────────────────────────────────────
+
+SAMPLE_MONTHS = ["2025-01", "2025-02", "2025-03"]
+
+SAMPLE_LEDGER_ROWS = [
+    # 날짜, 시간, 타입, 대분류, 소분류, 내용, 금액, 화폐, 결제수단, 메모
+    (datetime(2025, 1, 3), "12:30:00", "지출", "식비", "한식", "김밥천국", -8000, "KRW", "신한카드", None),
+    (datetime(2025, 1, 25), "09:00:00", "수입", "급여", None, "월급", 3000000, "KRW", "우리은행", "1월"),
+    (datetime(2025, 2, 14), "19:10:00", "지출", "카페/간식", "커피", "스타벅스", "-5,600", "KRW", "신한카드", None),
+    (datetime(2025, 3, 2), "08:05:00", "이체", "내계좌이체", None, "저축", -500000, "KRW", "우리은행", None),
+]
+
+
+def build_banksalad_workbook(ledger_rows=None, months=None, with_summary=True, salary=3000000) -> bytes:
+    """뱅샐현황 · 가계부 내역 시트를 가진 최소 뱅크샐러드 export를 xlsx 바이트로 생성합니다. salary는 월별 급여 값."""
+    months = SAMPLE_MONTHS if months is None else months
+    ledger_rows = SAMPLE_LEDGER_ROWS if ledger_rows is None else ledger_rows
+
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+
+    if with_summary:
+        ws = wb.create_sheet("뱅샐현황")
+        # 1. 고객 정보 (라벨 B2, 헤더 B5~F5, 값 B6~F6)
+        ws.cell(row=2, column=2, value="1.고객정보")
+        for col, v in enumerate(["이름", "성별", "나이", "신용점수", "이메일"], start=2):
+            ws.cell(row=5, column=col, value=v)
+        for col, v in enumerate(["홍길동", "남", 40, 900, "-"], start=2):
+            ws.cell(row=6, column=col, value=v)
+        # 2. 현금흐름 (항목 헤더 + 수입/지출 항목 + 총계 행, 총계는 수식 캐시 없는 0)
+        ws.cell(row=9, column=2, value="2.현금흐름현황")
+        for col, v in enumerate(["항목", "총계", "월평균", *months], start=2):
+            ws.cell(row=11, column=col, value=v)
+        n = len(months)
+        cash_rows = [
+            ("급여", [salary] * n),
+            ("금융수입", [1000] * n),
+            ("월수입 총계", [0] * n),
+            ("식비", [300000] * n),
+            ("교통", [50000] * n),
+            ("월지출 총계", [0] * n),
+            ("순수입 총계", [0] * n),
+        ]
+        for offset, (label, values) in enumerate(cash_rows):
+            ridx = 12 + offset
+            ws.cell(row=ridx, column=2, value=label)
+            ws.cell(row=ridx, column=3, value=0)
+            ws.cell(row=ridx, column=4, value=0)
+            for j, v in enumerate(values):
+                ws.cell(row=ridx, column=5 + j, value=v)
+        # 3. 재무현황 (자산: B/C/E, 부채: F/G/I)
+        ws.cell(row=40, column=2, value="3.재무현황")
+        ws.cell(row=41, column=2, value="총자산")
+        ws.cell(row=41, column=5, value=6200000)
+        ws.cell(row=41, column=9, value=500000)
+        ws.cell(row=43, column=2, value="자유입출금 자산")
+        ws.cell(row=43, column=3, value="우리은행 통장")
+        ws.cell(row=43, column=5, value=1000000)
+        ws.cell(row=43, column=6, value="신용대출")
+        ws.cell(row=43, column=7, value="카카오뱅크 대출")
+        ws.cell(row=43, column=9, value=500000)
+        ws.cell(row=44, column=3, value="카카오 통장")
+        ws.cell(row=44, column=5, value=200000)
+        ws.cell(row=45, column=6, value="총부채")
+        # 4. 투자성 자산
+        ws.cell(row=72, column=2, value="투자성 자산")
+        ws.cell(row=72, column=3, value="삼성전자")
+        ws.cell(row=72, column=5, value=3000000)
+        ws.cell(row=73, column=3, value="미국 S&P500")
+        ws.cell(row=73, column=5, value=2000000)
+        ws.cell(row=74, column=2, value="부동산")
+
+    ws_ledger = wb.create_sheet("가계부 내역")
+    ws_ledger.append(["날짜", "시간", "타입", "대분류", "소분류", "내용", "금액", "화폐", "결제수단", "메모"])
+    for row in ledger_rows:
+        ws_ledger.append(list(row))
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def read_ledger_columns(ledger) -> dict:
+    """ParsedLedger의 배치를 모두 읽어 컬럼 하나로 합칩니다 (비교용)."""
+    columns = empty_ledger_columns()
+    for batch in ledger.batches():
+        for col, values in columns.items():
+            values.extend(batch[col])
+    return columns
+
+
+@pytest.fixture()
+def banksalad_xlsx():
+    """기본 샘플 뱅크샐러드 export 바이트."""
+    return build_banksalad_workbook()
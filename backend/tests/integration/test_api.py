@@ -2,9 +2,15 @@
 API 엔드포인트 통합 테스트
 SQLite in-memory DB + TestClient 사용
 """
+import csv
+import io
+import json
+
 import pytest
 from sqlalchemy import text
 
+from app.services import ledger_search_service
+
 
 # ────────────────────────────────────────────
 # Health check
@@ -54,6 +60,304 @@ class TestCashFlowsEndpoint:
         assert response.status_code == 200
         assert response.json() == []
 
+    def test_duplicate_item_name_conflicts(self, client):
+        payload = {"item_name": "급여", "item_type": "수입"}
+        assert client.post("/api/cash-flows", json=payload).status_code == 200
+        assert client.post("/api/cash-flows", json=payload).status_code == 409
+        other = client.post("/api/cash-flows", json={"item_name": "보너스"}).json()
+        response = client.put(f"/api/cash-flows/{other['id']}", json={"item_name": "급여"})
+        assert response.status_code == 409
+        assert len(client.get("/api/cash-flows").json()) == 2
+
+
+# ────────────────────────────────────────────
+# 월별 결산 누적 순수익 (POST/PUT/DELETE /api/monthly-summaries)
+# ────────────────────────────────────────────
+
+class TestMonthlySummaryCumulative:
+    def _cumulative(self, client):
+        return [s["cumulative_net_income"] for s in client.get("/api/monthly-summaries").json()]
+
+    def test_edits_keep_cumulative_in_sync(self, client):
+        ids = [
+            client.post("/api/monthly-summaries", json={"year": 2025, "month": m, "net_income": 100}).json()["id"]
+            for m in (1, 2, 3)
+        ]
+        assert self._cumulative(client) == [100, 200, 300]
+
+        client.put(f"/api/monthly-summaries/{ids[0]}", json={"net_income": 50})
+        assert self._cumulative(client) == [50, 150, 250]
+
+        client.delete(f"/api/monthly-summaries/{ids[1]}")
+        assert self._cumulative(client) == [50, 150]
+
+    def test_moving_month_updates_both_positions(self, client):
+        first = client.post("/api/monthly-summaries", json={"year": 2025, "month": 1, "net_income": 10}).json()
+        client.post("/api/monthly-summaries", json={"year": 2025, "month": 2, "net_income": 20})
+        client.put(f"/api/monthly-summaries/{first['id']}", json={"month": 3})
+        summaries = client.get("/api/monthly-summaries").json()
+        assert [(s["month"], s["cumulative_net_income"]) for s in summaries] == [(2, 20), (3, 30)]
+
+
+# ────────────────────────────────────────────
+# 가계부 집계 (GET /api/ledger-transactions/aggregate)
+# ────────────────────────────────────────────
+
+class TestLedgerAggregate:
+    ROWS = [
+        ("2024-12-31T08:00:00", "지출", "식비", "국민카드", -200),
+        ("2025-01-06T10:00:00", "지출", "식비", "국민카드", -1000),
+        ("2025-01-12T23:30:00", "지출", "교통", "현금", -500),
+        ("2025-02-01T00:00:00", "수입", "급여", None, 3000),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def _ledger(self, client):
+        for when, tx_type, category, payment, amount in self.ROWS:
+            client.post("/api/ledger-transactions", json={
+                "transaction_date": when, "transaction_type": tx_type, "category": category,
+                "payment_method": payment, "amount": amount,
+            })
+
+    def _rows(self, client, **params):
+        response = client.get("/api/ledger-transactions/aggregate", params=params)
+        assert response.status_code == 200
+        return response.json()["rows"]
+
+    def test_total_without_grouping(self, client):
+        assert self._rows(client) == [{
+            "period": None, "transaction_type": None, "category": None, "subcategory": None,
+            "payment_method": None, "total": 1300.0, "abs_total": 4700.0, "count": 4,
+        }]
+
+    def test_month_by_type(self, client):
+        rows = self._rows(client, period="month", group_by="transaction_type")
+        assert [(r["period"], r["transaction_type"], r["total"], r["count"]) for r in rows] == [
+            ("2024-12-01", "지출", -200.0, 1),
+            ("2025-01-01", "지출", -1500.0, 2),
+            ("2025-02-01", "수입", 3000.0, 1),
+        ]
+
+    def test_week_starts_monday_and_year(self, client):
+        weeks = [(r["period"], r["count"]) for r in self._rows(client, period="week")]
+        assert weeks == [("2024-12-30", 1), ("2025-01-06", 2), ("2025-01-27", 1)]
+        years = [(r["period"], r["count"]) for r in self._rows(client, period="year")]
+        assert years == [("2024-01-01", 1), ("2025-01-01", 3)]
+
+    def test_group_by_multiple_with_date_range(self, client):
+        rows = self._rows(
+            client, group_by=["transaction_type", "category"], date_from="2025-01-01", date_to="2025-01-12",
+        )
+        assert [(r["transaction_type"], r["category"], r["abs_total"]) for r in rows] == [
+            ("지출", "교통", 500.0), ("지출", "식비", 1000.0),
+        ]
+
+    def test_filters(self, client):
+        rows = self._rows(client, group_by="payment_method", transaction_type="지출", category="식비")
+        assert [(r["payment_method"], r["count"]) for r in rows] == [("국민카드", 2)]
+
+    def test_edits_reflected_through_rollup(self, client):
+        rows = client.get("/api/ledger-transactions").json()
+        by_date = {r["transaction_date"][:10]: r["id"] for r in rows}
+        client.put(f"/api/ledger-transactions/{by_date['2025-01-06']}", json={"category": "교통", "amount": -300})
+        client.delete(f"/api/ledger-transactions/{by_date['2025-02-01']}")
+        client.post("/api/ledger-transactions", json={"transaction_type": "지출", "category": "교통", "amount": -50})
+
+        rows = self._rows(client, group_by="category")
+        assert [(r["category"], r["total"], r["count"]) for r in rows] == [("교통", -850.0, 3), ("식비", -200.0, 1)]
+        # 거래일 없는 거래는 기간별 집계에서 빠짐
+        months = self._rows(client, period="month")
+        assert [(r["period"], r["total"]) for r in months] == [("2024-12-01", -200.0), ("2025-01-01", -800.0)]
+
+    def test_invalid_params(self, client):
+        url = "/api/ledger-transactions/aggregate"
+        assert client.get(url, params={"period": "quarter"}).status_code == 422
+        assert client.get(url, params={"group_by": "amount"}).status_code == 422
+        assert client.get(url, params={"date_from": "2025-02-01", "date_to": "2025-01-01"}).status_code == 400
+
+
+# ────────────────────────────────────────────
+# 가계부 목록 keyset 페이지 (GET /api/ledger-transactions)
+# ────────────────────────────────────────────
+
+class TestLedgerPagination:
+    URL = "/api/ledger-transactions"
+
+    @pytest.fixture(autouse=True)
+    def _ledger(self, client):
+        days = ["2025-01-03", "2025-01-01", "2025-01-02", "2025-01-02", None, "2025-01-01", None]
+        for i, day in enumerate(days):
+            client.post(self.URL, json={
+                "transaction_date": f"{day}T00:00:00" if day else None, "description": f"거래{i}",
+                "category": "식비" if i % 2 else "교통", "amount": -100 * (i + 1),
+            })
+
+    def _walk(self, client, **params):
+        pages, cursor = [], None
+        while True:
+            response = client.get(self.URL, params={**params, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200
+            pages.append([row["description"] for row in response.json()])
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return pages
+
+    def test_pages_follow_date_then_id_desc(self, client):
+        # 거래일 없는 행 먼저, 그다음 거래일 · id 내림차순
+        expected = ["거래6", "거래4", "거래0", "거래3", "거래2", "거래5", "거래1"]
+        pages = self._walk(client, limit=2)
+        assert [len(p) for p in pages] == [2, 2, 2, 1]
+        assert sum(pages, []) == expected
+        assert self._walk(client) == [expected]
+
+    def test_inserts_do_not_shift_later_pages(self, client):
+        first = client.get(self.URL, params={"limit": 3})
+        client.post(self.URL, json={"transaction_date": "2025-02-01T00:00:00", "description": "새 거래", "amount": -1})
+        rest = client.get(self.URL, params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]}).json()
+        assert [r["description"] for r in rest] == ["거래3", "거래2", "거래5", "거래1"]
+
+    def test_date_range_and_category(self, client):
+        pages = self._walk(client, limit=1, date_from="2025-01-02", date_to="2025-01-02")
+        assert pages == [["거래3"], ["거래2"]]
+        assert sum(self._walk(client, limit=2, category="식비"), []) == ["거래3", "거래5", "거래1"]
+
+    def test_invalid_params(self, client):
+        assert client.get(self.URL, params={"cursor": "not-a-cursor"}).status_code == 400
+        assert client.get(self.URL, params={"date_from": "2025-02-01", "date_to": "2025-01-01"}).status_code == 400
+        assert client.get(self.URL, params={"limit": 0}).status_code == 422
+
+
+class TestLedgerSearch:
+    URL = "/api/ledger-transactions/search"
+    ROWS = [
+        ("2025-01-05", "지출", "식비", "스타벅스 강남점", None),
+        ("2025-01-03", "지출", "식비", "이디야커피", "스타벅스 쿠폰 사용"),
+        ("2025-01-09", "지출", "교통", "카카오택시", None),
+        ("2025-02-01", "지출", "식비", "스타벅스 역삼점", None),
+        ("2025-02-03", "수입", "급여", "Coffee_Bean 환급", "100% 환불"),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def _ledger(self, client):
+        for day, tx_type, category, description, memo in self.ROWS:
+            client.post("/api/ledger-transactions", json={
+                "transaction_date": f"{day}T00:00:00", "transaction_type": tx_type, "category": category,
+                "description": description, "memo": memo, "amount": -1000,
+            })
+
+    def _search(self, client, **params):
+        response = client.get(self.URL, params=params)
+        assert response.status_code == 200
+        return [(row["description"], row["score"]) for row in response.json()]
+
+    def test_substring_in_description_and_memo(self, client):
+        # 점수(부분 일치 + 유사도)가 같으면 거래일 최신순
+        assert [d for d, _ in self._search(client, q="스타벅스")] == ["스타벅스 역삼점", "스타벅스 강남점", "이디야커피"]
+        assert [d for d, _ in self._search(client, q="택시")] == ["카카오택시"]
+        assert [d for d, _ in self._search(client, q="쿠폰")] == ["이디야커피"]
+
+    def test_category_and_payment_method(self, client):
+        assert [d for d, _ in self._search(client, q="교통")] == ["카카오택시"]
+        client.post("/api/ledger-transactions", json={
+            "transaction_date": "2025-02-05T00:00:00", "transaction_type": "지출", "category": "생활",
+            "subcategory": "편의점", "description": "GS25", "payment_method": "현대카드", "amount": -1000,
+        })
+        assert [d for d, _ in self._search(client, q="편의점")] == ["GS25"]
+        assert [d for d, _ in self._search(client, q="현대카드")] == ["GS25"]
+
+    def test_typo_matches_with_lower_score(self, client):
+        hits = self._search(client, q="스타벅수")
+        assert [d for d, _ in hits] == ["스타벅스 역삼점", "스타벅스 강남점", "이디야커피"]
+        assert all(0.4 <= score < 1 for _, score in hits)
+        assert self._search(client, q="스타벅스")[0][1] > 1
+
+    def test_case_insensitive_and_like_wildcards_literal(self, client):
+        assert [d for d, _ in self._search(client, q="coffee_bean")] == ["Coffee_Bean 환급"]
+        assert [d for d, _ in self._search(client, q="100%")] == ["Coffee_Bean 환급"]
+        assert self._search(client, q="e_b%") == []
+
+    def test_filters(self, client):
+        assert [d for d, _ in self._search(client, q="스타벅스", date_to="2025-01-31")] == ["스타벅스 강남점", "이디야커피"]
+        assert [d for d, _ in self._search(client, q="스타벅스", date_from="2025-02-01")] == ["스타벅스 역삼점"]
+        assert self._search(client, q="스타벅스", category="교통") == []
+        assert self._search(client, q="환급", transaction_type="수입")[0][0] == "Coffee_Bean 환급"
+
+    def test_limit_and_skip(self, client):
+        assert [d for d, _ in self._search(client, q="스타벅스", limit=1, skip=1)] == ["스타벅스 강남점"]
+
+    def test_index_follows_update_and_delete(self, client):
+        tx_id = next(row["id"] for row in client.get(self.URL, params={"q": "카카오택시"}).json())
+        client.put(f"/api/ledger-transactions/{tx_id}", json={"description": "티머니 버스"})
+        assert self._search(client, q="카카오택시") == []
+        assert [d for d, _ in self._search(client, q="티머니")] == ["티머니 버스"]
+        client.delete(f"/api/ledger-transactions/{tx_id}")
+        assert self._search(client, q="티머니") == []
+
+    def test_short_query_scans_recent_rows_only(self, client, monkeypatch):
+        monkeypatch.setattr(ledger_search_service, "LEDGER_SEARCH_SCAN_ROWS", 2)
+        assert self._search(client, q="택시") == []  # 2025-01-09 거래는 최근 2건 밖
+        assert [d for d, _ in self._search(client, q="역삼")] == ["스타벅스 역삼점"]
+        assert [d for d, _ in self._search(client, q="카카오택시")] == ["카카오택시"]  # 3글자 이상은 색인으로 찾음
+
+    def test_invalid_params(self, client):
+        assert client.get(self.URL).status_code == 422
+        assert client.get(self.URL, params={"q": ""}).status_code == 422
+        assert client.get(self.URL, params={"q": "   "}).status_code == 400
+        assert client.get(self.URL, params={"q": "a", "limit": 501}).status_code == 422
+        assert client.get(self.URL, params={"q": "a", "date_from": "2025-02-01", "date_to": "2025-01-01"}).status_code == 400
+
+
+class TestLedgerExport:
+    URL = "/api/ledger-transactions/export"
+
+    @pytest.fixture(autouse=True)
+    def _ledger(self, client):
+        rows = [
+            ("2025-01-05T09:30:00", "지출", "식비", '스타벅스, "강남"점', -4500.5, "쿠폰\n사용"),
+            ("2025-01-07T00:00:00", "지출", "교통", "카카오택시", -12000, None),
+            (None, "수입", "급여", "월급", 3000000, None),
+        ]
+        for when, tx_type, category, description, amount, memo in rows:
+            client.post("/api/ledger-transactions", json={
+                "transaction_date": when, "transaction_type": tx_type, "category": category,
+                "description": description, "amount": amount, "memo": memo,
+            })
+
+    def test_csv(self, client):
+        response = client.get(self.URL)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="ledger-transactions.csv"' in response.headers["content-disposition"]
+        body = response.content.decode("utf-8")
+        assert body.startswith("\ufeff")
+        rows = list(csv.DictReader(io.StringIO(body[1:])))
+        # 목록과 같은 순서: 거래일 없는 행 먼저, 그다음 최신순
+        assert [r["description"] for r in rows] == ["월급", "카카오택시", '스타벅스, "강남"점']
+        assert rows[2]["transaction_date"] == "2025-01-05T09:30:00"
+        assert rows[2]["amount"] == "-4500.5"
+        assert rows[2]["memo"] == "쿠폰\n사용"
+        assert rows[0]["transaction_date"] == "" and rows[0]["memo"] == ""
+
+    def test_ndjson_with_filters(self, client):
+        response = client.get(self.URL, params={"format": "ndjson", "transaction_type": "지출", "date_to": "2025-01-06"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 1
+        assert lines[0]["description"] == '스타벅스, "강남"점'
+        assert lines[0]["amount"] == -4500.5
+        assert lines[0]["transaction_date"] == "2025-01-05T09:30:00"
+
+    def test_batches_cover_all_rows(self, client, monkeypatch):
+        from app.services import ledger_export_service
+        monkeypatch.setattr(ledger_export_service, "LEDGER_EXPORT_BATCH", 2)
+        response = client.get(self.URL, params={"format": "ndjson"})
+        assert [line.count('"id"') for line in response.text.splitlines()] == [1, 1, 1]
+        assert client.get(self.URL, params={"category": "없는분류"}).content.decode("utf-8").count("\n") == 1
+
+    def test_invalid_params(self, client):
+        assert client.get(self.URL, params={"format": "xlsx"}).status_code == 422
+        assert client.get(self.URL, params={"date_from": "2025-02-01", "date_to": "2025-01-01"}).status_code == 400
 
 # ────────────────────────────────────────────
 # 파일 업로드 (POST /api/upload)
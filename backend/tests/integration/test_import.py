@@ -0,0 +1,564 @@
+"""
+뱅크샐러드 Excel import 엔드포인트 통합 테스트
+SQLite in-memory DB + TestClient 사용
+"""
+import io
+import zipfile
+from datetime import datetime
+
+import openpyxl
+from sqlalchemy import event
+
+from app.services.import_job_service import wait_for_job
+from tests.conftest import SAMPLE_LEDGER_ROWS, build_banksalad_workbook
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _run_job(client, url: str, content: bytes, filename: str, force: bool = False) -> dict:
+    """import 작업을 제출하고 완료될 때까지 기다린 뒤 작업 상태를 반환합니다."""
+    params = {"force": "true"} if force else None
+    response = client.post(url, files={"file": (filename, content, XLSX_MIME)}, params=params)
+    assert response.status_code in (200, 202)
+    job_id = response.json()["id"]
+    wait_for_job(job_id, timeout=30)
+    return client.get(f"/api/import/jobs/{job_id}").json()
+
+
+def _post_banksalad(
+    client, content: bytes, filename: str = "2025-01-01~2025-03-31.xlsx", force: bool = False,
+) -> dict:
+    job = _run_job(client, "/api/import/banksalad-excel", content, filename, force)
+    assert job["status"] == "succeeded", job["error"]
+    return job["result"]
+
+
+def _post_ledger(client, content: bytes, filename: str = "ledger.xlsx", force: bool = False) -> dict:
+    return _run_job(client, "/api/ledger-transactions/import-excel", content, filename, force)
+
+
+def _ledger_counts(job: dict) -> dict:
+    return {"inserted": job["result"]["inserted"], "skipped": job["result"]["skipped"]}
+
+
+# ────────────────────────────────────────────
+# POST /api/import/banksalad-excel
+# ────────────────────────────────────────────
+
+class TestBanksaladImport:
+    def test_invalid_extension(self, client):
+        response = client.post(
+            "/api/import/banksalad-excel",
+            files={"file": ("test.txt", b"dummy", "text/plain")},
+        )
+        assert response.status_code == 400
+
+    def test_unreadable_xlsx(self, client):
+        response = client.post(
+            "/api/import/banksalad-excel",
+            files={"file": ("test.xlsx", b"not an xlsx", XLSX_MIME)},
+        )
+        assert response.status_code == 400
+
+    def test_returns_job_immediately(self, client, banksalad_xlsx):
+        response = client.post(
+            "/api/import/banksalad-excel",
+            files={"file": ("a.xlsx", banksalad_xlsx, XLSX_MIME)},
+        )
+        assert response.status_code == 202
+        body = response.json()
+        assert body["kind"] == "banksalad"
+        assert body["status"] in ("queued", "running", "succeeded")
+        wait_for_job(body["id"], timeout=30)
+
+    def test_job_reports_stage_and_counts(self, client, banksalad_xlsx):
+        job = _run_job(client, "/api/import/banksalad-excel", banksalad_xlsx, "a.xlsx")
+        assert job["status"] == "succeeded"
+        assert job["stage"] == "done"
+        assert job["counts"]["ledger_inserted"] == 4
+        assert job["finished_at"] is not None
+
+    def test_unknown_job(self, client):
+        assert client.get("/api/import/jobs/does-not-exist").status_code == 404
+
+    def test_imports_all_sections(self, client, banksalad_xlsx):
+        result = _post_banksalad(client, banksalad_xlsx)
+        assert result["customer"]["inserted"] == 1
+        assert result["cash_flow"]["inserted"] == 4
+        assert result["monthly_summary"]["inserted"] == 3
+        assert result["financial_snapshot"]["inserted"] == 1
+        assert result["ledger"] == {"inserted": 4, "skipped": 0, "before_mark": 0}
+        assert result["queue_position"] == 0  # SQLite: 쓰기 락 없음
+
+        summaries = client.get("/api/monthly-summaries").json()
+        assert [(s["year"], s["month"]) for s in summaries] == [(2025, 1), (2025, 2), (2025, 3)]
+        # 총계 행이 0이면 항목 합계로 대체
+        assert summaries[0]["income"] == 3001000
+        assert summaries[0]["expense"] == 350000
+        assert summaries[2]["cumulative_net_income"] == 3 * (3001000 - 350000)
+
+        snapshot = client.get("/api/financial-snapshot").json()
+        assert snapshot["total_assets"] == 6200000
+        assert snapshot["total_liabilities"] == 500000
+        assert "_liabilities" in snapshot["snapshot_data"]
+
+    def test_reimport_skips_existing_ledger_rows(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        result = _post_banksalad(client, banksalad_xlsx, force=True)
+        assert "replay" not in result
+        assert result["ledger"] == {"inserted": 0, "skipped": 4, "before_mark": 0}
+        assert result["cash_flow"]["updated"] == 4
+        assert len(client.get("/api/ledger-transactions").json()) == 4
+
+    def test_single_commit_per_import(self, client, db_session, banksalad_xlsx):
+        commits = []
+
+        def _on_commit(session):
+            # 섹션 SAVEPOINT의 RELEASE는 제외하고 실제 트랜잭션 commit만 집계
+            if not session.in_nested_transaction():
+                commits.append(session)
+
+        event.listen(db_session, "after_commit", _on_commit)
+        try:
+            _post_banksalad(client, banksalad_xlsx)
+        finally:
+            event.remove(db_session, "after_commit", _on_commit)
+        # 이력 행까지 포함해 import 전체가 commit 1회
+        assert len(commits) == 1
+
+    def test_failing_section_skipped_and_reported(self, client, banksalad_xlsx):
+        wb = openpyxl.load_workbook(io.BytesIO(banksalad_xlsx))
+        wb["뱅샐현황"].cell(row=6, column=4, value="마흔")  # 나이 → int 변환 실패
+        buf = io.BytesIO()
+        wb.save(buf)
+
+        result = _post_banksalad(client, buf.getvalue())
+        assert "customer" in result["errors"]
+        assert result["customer"] == {"updated": 0, "inserted": 0}
+        # 나머지 섹션은 그대로 반영
+        assert set(result["errors"]) == {"customer"}
+        assert result["cash_flow"]["inserted"] == 4
+        assert result["ledger"]["inserted"] == 4
+        assert client.get("/api/customers").json() == []
+        assert len(client.get("/api/monthly-summaries").json()) == 3
+
+    def test_ledger_only_workbook(self, client):
+        content = build_banksalad_workbook(with_summary=False)
+        result = _post_banksalad(client, content)
+        assert result["customer"] == {"updated": 0, "inserted": 0}
+        assert result["ledger"]["inserted"] == 4
+
+    def test_records_upload_history(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        history = client.get("/api/upload-history").json()
+        assert len(history) == 1
+        assert history[0]["filename"] == "2025-01-01~2025-03-31.xlsx"
+        assert history[0]["result_json"]["ledger"]["inserted"] == 4
+        assert history[0]["import_kind"] == "banksalad"
+        assert len(history[0]["content_sha256"]) == 64
+
+    def test_profile_recorded_in_history(self, client, banksalad_xlsx):
+        job_profile = _post_banksalad(client, banksalad_xlsx)["profile"]
+        profile = client.get("/api/upload-history").json()[0]["result_json"]["profile"]
+        stages = {stage["stage"]: stage for stage in profile["stages"]}
+        # 워커 프로세스에서 측정한 파싱 단계는 parse 단계 뒤에 합쳐짐
+        worker_stages = ["load", "summary_read", "summary_parse", "ledger_parse", "dedup", "spool"]
+        assert list(stages) == [
+            "parse", *worker_stages, "lock_wait", "cleanup",
+            "customer", "cash_flow", "monthly_summary", "investment", "financial_snapshot",
+            "write",
+        ]
+        # commit 소요 시간은 commit 뒤에야 알 수 있으므로 작업 결과에만 있음
+        assert [stage["stage"] for stage in job_profile["stages"]] == list(stages) + ["commit"]
+        assert stages["ledger_parse"]["rows"] == 4
+        assert stages["write"]["rows"] == 4
+        assert stages["cash_flow"]["rows"] == 4
+        assert all(stage["seconds"] >= 0 for stage in profile["stages"])
+        # RSS 최고치는 항상, tracemalloc 측정은 기본으로 꺼져 있음 (IMPORT_PROFILE_MEMORY)
+        assert all(stage["rss_kb"] > 0 for stage in profile["stages"])
+        assert all(stage["peak_kb"] is None for stage in profile["stages"])
+        assert profile["memory_scope"] == "process"
+        main_seconds = sum(s["seconds"] for name, s in stages.items() if name not in worker_stages)
+        assert profile["total_seconds"] >= main_seconds * 0.99
+
+    def test_same_file_replays_stored_result(self, client, banksalad_xlsx):
+        first = _post_banksalad(client, banksalad_xlsx)
+        response = client.post(
+            "/api/import/banksalad-excel",
+            files={"file": ("renamed.xlsx", banksalad_xlsx, XLSX_MIME)},
+        )
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "succeeded"
+        assert job["result"]["replay"] is True
+        assert job["result"]["ledger"] == first["ledger"]
+        assert job["result"]["cash_flow"] == first["cash_flow"]
+        # 재사용은 새 이력을 남기지 않음
+        assert len(client.get("/api/upload-history").json()) == 1
+        assert client.get(f"/api/import/jobs/{job['id']}").json()["result"]["replay"] is True
+
+    def test_force_reimports_same_file(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        response = client.post(
+            "/api/import/banksalad-excel",
+            files={"file": ("a.xlsx", banksalad_xlsx, XLSX_MIME)},
+            params={"force": "true"},
+        )
+        assert response.status_code == 202
+        wait_for_job(response.json()["id"], timeout=30)
+        assert len(client.get("/api/upload-history").json()) == 2
+
+
+class TestBanksaladDryRun:
+    def _post_dry_run(self, client, content: bytes) -> dict:
+        job = _run_job(client, "/api/import/banksalad-excel?dry_run=true", content, "preview.xlsx")
+        assert job["status"] == "succeeded", job["error"]
+        return job["result"]
+
+    def _modified_workbook(self) -> bytes:
+        new_row = (datetime(2025, 3, 20), "10:00:00", "지출", "식비", None, "새 거래", -1000, "KRW", "신한카드", None)
+        wb = openpyxl.load_workbook(io.BytesIO(build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS + [new_row])))
+        wb["뱅샐현황"].cell(row=15, column=5, value=350000)  # 식비 2025-01: 300000 → 350000
+        buf = io.BytesIO()
+        wb.save(buf)
+        return buf.getvalue()
+
+    def test_empty_db_everything_inserted(self, client, banksalad_xlsx):
+        diff = self._post_dry_run(client, banksalad_xlsx)
+        assert diff["dry_run"] is True
+        assert diff["customer"]["action"] == "insert"
+        assert {item["item_name"] for item in diff["cash_flow"]["inserted"]} == {"급여", "금융수입", "식비", "교통"}
+        assert len(diff["monthly_summary"]["inserted"]) == 3
+        assert diff["investment"]["unmatched"] == ["미국 S&P500", "삼성전자"]
+        assert diff["financial_snapshot"]["action"] == "insert"
+        assert diff["ledger"] == {"inserted": 4, "skipped": 0, "before_mark": 0}
+        # 아무것도 쓰지 않음
+        assert client.get("/api/cash-flows").json() == []
+        assert client.get("/api/ledger-transactions").json() == []
+        assert client.get("/api/upload-history").json() == []
+
+    def test_changes_against_current_state(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        diff = self._post_dry_run(client, self._modified_workbook())
+        assert diff["customer"]["action"] == "unchanged"
+        assert diff["cash_flow"]["inserted"] == []
+        assert diff["cash_flow"]["unchanged"] == 3
+        [food] = diff["cash_flow"]["updated"]
+        assert food["item_name"] == "식비"
+        assert food["changes"]["total"] == {"from": 900000.0, "to": 950000.0}
+        assert food["changes"]["monthly_data"] == {"months": ["2025-01"]}
+        [january] = diff["monthly_summary"]["updated"]
+        assert (january["year"], january["month"]) == (2025, 1)
+        assert january["changes"]["expense"] == {"from": 350000.0, "to": 400000.0}
+        assert diff["monthly_summary"]["unchanged"] == 2
+        assert diff["financial_snapshot"]["action"] == "unchanged"
+        assert diff["ledger"] == {"inserted": 1, "skipped": 4, "before_mark": 3}
+        # DB는 그대로
+        food_row = next(cf for cf in client.get("/api/cash-flows").json() if cf["item_name"] == "식비")
+        assert food_row["total"] == 900000
+        assert len(client.get("/api/ledger-transactions").json()) == 4
+        assert len(client.get("/api/upload-history").json()) == 1
+
+    def test_no_write_statements(self, client, db_session, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        statements = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.lstrip().split()[0].upper())
+
+        conn = db_session.connection()
+        event.listen(conn, "before_cursor_execute", _before)
+        try:
+            self._post_dry_run(client, self._modified_workbook())
+        finally:
+            event.remove(conn, "before_cursor_execute", _before)
+        assert statements and set(statements) == {"SELECT"}
+
+    def test_dry_run_skips_replay(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        diff = self._post_dry_run(client, banksalad_xlsx)
+        assert "replay" not in diff
+        assert diff["ledger"]["inserted"] == 0
+
+
+class TestUploadLimits:
+    def test_oversized_upload_rejected(self, client, banksalad_xlsx, monkeypatch):
+        from app.services import upload_spool
+        monkeypatch.setattr(upload_spool, "MAX_UPLOAD_BYTES", len(banksalad_xlsx) - 1)
+        response = client.post(
+            "/api/import/banksalad-excel",
+            files={"file": ("a.xlsx", banksalad_xlsx, XLSX_MIME)},
+        )
+        assert response.status_code == 413
+        assert client.get("/api/upload-history").json() == []
+
+    def test_oversized_content_length_rejected_before_parsing(self, client, monkeypatch):
+        from app.services import upload_spool
+        monkeypatch.setattr(upload_spool, "MAX_UPLOAD_BYTES", 1024)
+        response = client.post(
+            "/api/ledger-transactions/import-excel",
+            files={"file": ("a.xlsx", b"x" * 200 * 1024, XLSX_MIME)},
+        )
+        assert response.status_code == 413
+        assert "1KB" in response.json()["detail"]
+
+    def test_spooled_to_disk_import(self, client, banksalad_xlsx, monkeypatch):
+        from app.services import upload_spool
+        monkeypatch.setattr(upload_spool, "UPLOAD_SPOOL_THRESHOLD", 1024)
+        result = _post_banksalad(client, banksalad_xlsx)
+        assert result["ledger"]["inserted"] == 4
+
+
+class TestCashFlowMonthMerge:
+    def _salary(self, client) -> dict:
+        return next(cf for cf in client.get("/api/cash-flows").json() if cf["item_name"] == "급여")
+
+    def test_overlapping_uploads_merge_by_month(self, client):
+        _post_banksalad(client, build_banksalad_workbook(months=["2025-01", "2025-02", "2025-03"]),
+                        filename="2025-01-01~2025-03-31.xlsx")
+        _post_banksalad(client, build_banksalad_workbook(months=["2025-02", "2025-03", "2025-04"], salary=3500000),
+                        filename="2025-02-01~2025-04-30.xlsx")
+        salary = self._salary(client)
+        assert salary["monthly_data"] == {
+            "2025-01": 3000000.0, "2025-02": 3500000.0, "2025-03": 3500000.0, "2025-04": 3500000.0,
+        }
+        assert salary["month_sources"]["2025-01"] == "2025-01-01~2025-03-31"
+        assert salary["month_sources"]["2025-04"] == "2025-02-01~2025-04-30"
+
+    def test_older_upload_after_newer_keeps_newer_months(self, client):
+        _post_banksalad(client, build_banksalad_workbook(months=["2025-02", "2025-03", "2025-04"], salary=3500000),
+                        filename="2025-02-01~2025-04-30.xlsx")
+        _post_banksalad(client, build_banksalad_workbook(months=["2025-01", "2025-02", "2025-03"]),
+                        filename="2025-01-01~2025-03-31.xlsx")
+        salary = self._salary(client)
+        assert salary["monthly_data"]["2025-01"] == 3000000.0
+        assert salary["monthly_data"]["2025-03"] == 3500000.0
+        assert float(salary["total"]) == 3500000.0 * 3  # 최신 범위 업로드의 합계 유지
+
+
+# ────────────────────────────────────────────
+# POST /api/import/banksalad-zip
+# ────────────────────────────────────────────
+
+def _zip(files: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
+
+
+def _post_zip(client, content: bytes, filename: str = "exports.zip", force: bool = False) -> dict:
+    return _run_job(client, "/api/import/banksalad-zip", content, filename, force)
+
+
+class TestBanksaladZipImport:
+    def _exports(self) -> bytes:
+        # 2월 · 3월이 겹치는 두 기간 — 파일명 순서와 zip 안 순서를 일부러 반대로 둠
+        newer = build_banksalad_workbook(
+            months=["2025-02", "2025-03", "2025-04"], ledger_rows=SAMPLE_LEDGER_ROWS[2:], salary=3500000,
+        )
+        older = build_banksalad_workbook(
+            months=["2025-01", "2025-02", "2025-03"], ledger_rows=SAMPLE_LEDGER_ROWS[:3],
+        )
+        return _zip({"2025-02-01~2025-04-30.xlsx": newer, "2025-01-01~2025-03-31.xlsx": older})
+
+    def test_newest_range_wins_per_month(self, client):
+        job = _post_zip(client, self._exports())
+        assert job["status"] == "succeeded", job["error"]
+        result = job["result"]
+        assert [f["date_range"] for f in result["files"]] == ["2025-01-01~2025-03-31", "2025-02-01~2025-04-30"]
+        assert result["errors"] == {}
+
+        income = {
+            (m["year"], m["month"]): float(m["income"])
+            for m in client.get("/api/monthly-summaries").json()
+        }
+        assert income == {(2025, 1): 3001000.0, (2025, 2): 3501000.0, (2025, 3): 3501000.0, (2025, 4): 3501000.0}
+
+        salary = next(cf for cf in client.get("/api/cash-flows").json() if cf["item_name"] == "급여")
+        assert salary["monthly_data"] == {
+            "2025-01": 3000000.0, "2025-02": 3500000.0, "2025-03": 3500000.0, "2025-04": 3500000.0,
+        }
+
+    def test_overlapping_ledger_rows_written_once(self, client):
+        result = _post_zip(client, self._exports())["result"]
+        assert result["ledger"] == {"inserted": 4, "skipped": 1, "before_mark": 0}
+        assert len(client.get("/api/ledger-transactions").json()) == 4
+
+    def test_single_history_row_and_replay(self, client):
+        content = self._exports()
+        _post_zip(client, content)
+        history = client.get("/api/upload-history").json()
+        assert [h["import_kind"] for h in history] == ["banksalad_archive"]
+        assert history[0]["ledger_high_water"].startswith("2025-03-02")
+
+        replay = _post_zip(client, content)
+        assert replay["result"]["replay"] is True
+        assert len(client.get("/api/upload-history").json()) == 1
+
+    def test_backfill_zip_after_newer_import(self, client):
+        # 최신 기간을 먼저 import해 증분 기준일이 생긴 뒤, 그 이전 기간만 담은 zip을 올림
+        _post_banksalad(
+            client,
+            build_banksalad_workbook(months=["2025-03"], ledger_rows=SAMPLE_LEDGER_ROWS[3:], with_summary=False),
+            filename="2025-03-01~2025-03-31.xlsx",
+        )
+        backfill = _zip({
+            "2025-01-01~2025-01-31.xlsx": build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS[:2]),
+            "2025-02-01~2025-02-28.xlsx": build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS[2:3]),
+        })
+        job = _post_zip(client, backfill)
+        assert job["status"] == "succeeded", job["error"]
+        assert job["result"]["ledger"] == {"inserted": 3, "skipped": 0, "before_mark": 0}
+        descriptions = {tx["description"] for tx in client.get("/api/ledger-transactions").json()}
+        assert descriptions == {"김밥천국", "월급", "스타벅스", "저축"}
+        # 오래된 zip이 증분 기준일을 앞당기지 않음
+        history = client.get("/api/upload-history").json()
+        assert max(h["ledger_high_water"] for h in history if h["ledger_high_water"]).startswith("2025-03-02")
+
+    def test_invalid_extension(self, client):
+        response = client.post(
+            "/api/import/banksalad-zip",
+            files={"file": ("a.xlsx", build_banksalad_workbook(), XLSX_MIME)},
+        )
+        assert response.status_code == 400
+
+    def test_zip_without_exports_fails_job(self, client):
+        job = _post_zip(client, _zip({"readme.txt": b"-"}))
+        assert job["status"] == "failed"
+        assert "xlsx" in job["error"]
+        assert client.get("/api/upload-history").json() == []
+
+    def test_unreadable_member_fails_job(self, client):
+        job = _post_zip(client, _zip({"2025-01-01~2025-03-31.xlsx": b"not an xlsx"}))
+        assert job["status"] == "failed"
+        assert "2025-01-01~2025-03-31.xlsx" in job["error"]
+
+
+# ────────────────────────────────────────────
+# POST /api/ledger-transactions/import-excel
+# ────────────────────────────────────────────
+
+class TestLedgerImport:
+    def test_missing_ledger_sheet_fails_job(self, client):
+        wb = openpyxl.Workbook()
+        buf = io.BytesIO()
+        wb.save(buf)
+        job = _post_ledger(client, buf.getvalue())
+        assert job["status"] == "failed"
+        assert "가계부 내역" in job["error"]
+
+    def test_inserts_then_skips(self, client, banksalad_xlsx):
+        first = _post_ledger(client, banksalad_xlsx)
+        assert first["kind"] == "ledger"
+        assert _ledger_counts(first) == {"inserted": 4, "skipped": 0}
+        second = _post_ledger(client, banksalad_xlsx, force=True)
+        assert _ledger_counts(second) == {"inserted": 0, "skipped": 4}
+
+    def test_same_file_replays_stored_result(self, client, banksalad_xlsx):
+        _post_ledger(client, banksalad_xlsx)
+        second = _post_ledger(client, banksalad_xlsx)
+        assert second["result"]["replay"] is True
+        assert second["result"]["inserted"] == 4
+
+    def test_banksalad_history_not_replayed_for_ledger(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        job = _post_ledger(client, banksalad_xlsx)
+        assert _ledger_counts(job) == {"inserted": 0, "skipped": 4}
+
+    def test_amount_with_comma_parsed(self, client, banksalad_xlsx):
+        _post_ledger(client, banksalad_xlsx)
+        rows = client.get("/api/ledger-transactions", params={"category": "카페/간식"}).json()
+        assert rows[0]["amount"] == -5600
+
+    def test_duplicate_rows_in_file_inserted_once(self, client):
+        content = build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS + SAMPLE_LEDGER_ROWS[:1], with_summary=False)
+        job = _post_ledger(client, content)
+        assert _ledger_counts(job) == {"inserted": 4, "skipped": 1}
+
+
+# ────────────────────────────────────────────
+# 가계부 증분 import (출처별 기준일)
+# ────────────────────────────────────────────
+
+class TestIncrementalLedgerImport:
+    # SAMPLE_LEDGER_ROWS의 마지막 거래일은 2025-03-02 → 기준일 2025-02-23 (LEDGER_OVERLAP_DAYS=7)
+    NEW_ROW = (datetime(2025, 3, 20), "10:00:00", "지출", "식비", None, "새 거래", -1000, "KRW", "신한카드", None)
+    BACKDATED_ROW = (datetime(2025, 1, 10), "10:00:00", "지출", "식비", None, "누락 거래", -2000, "KRW", "신한카드", None)
+
+    def test_high_water_recorded(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        history = client.get("/api/upload-history").json()[0]
+        assert history["ledger_source"] == "banksalad"
+        assert history["ledger_high_water"].startswith("2025-03-02")
+
+    def test_only_overlap_window_checked(self, client, banksalad_xlsx):
+        _post_ledger(client, banksalad_xlsx)
+        content = build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS + [self.NEW_ROW], with_summary=False)
+        job = _post_ledger(client, content)
+        assert job["result"]["before_mark"] == 3
+        assert _ledger_counts(job) == {"inserted": 1, "skipped": 4}
+        marks = [h["ledger_high_water"] for h in client.get("/api/upload-history").json()]
+        assert max(marks).startswith("2025-03-20")
+
+    def test_mark_shared_between_import_kinds(self, client, banksalad_xlsx):
+        _post_banksalad(client, banksalad_xlsx)
+        job = _post_ledger(client, banksalad_xlsx)
+        assert job["result"]["before_mark"] == 3
+
+    def test_newest_first_sheet_counts_unread_rows(self, client, banksalad_xlsx):
+        # 뱅크샐러드 export처럼 최신 거래가 위면 기준일 이전 구간은 읽지 않지만 before_mark에는 모두 셈
+        _post_ledger(client, banksalad_xlsx)
+        rows = list(reversed(SAMPLE_LEDGER_ROWS + [self.NEW_ROW]))
+        job = _post_ledger(client, build_banksalad_workbook(ledger_rows=rows, with_summary=False))
+        assert job["result"]["before_mark"] == 3
+        assert _ledger_counts(job) == {"inserted": 1, "skipped": 4}
+
+    def test_rows_before_mark_need_force(self, client, banksalad_xlsx):
+        _post_ledger(client, banksalad_xlsx)
+        content = build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS + [self.BACKDATED_ROW], with_summary=False)
+        assert _ledger_counts(_post_ledger(client, content)) == {"inserted": 0, "skipped": 5}
+        job = _post_ledger(client, content, force=True)
+        assert job["result"]["before_mark"] == 0
+        assert _ledger_counts(job) == {"inserted": 1, "skipped": 4}
+
+    def test_failed_ledger_section_leaves_no_mark(self, client, banksalad_xlsx, monkeypatch):
+        from app.services import import_service
+
+        def _fail(*args, **kwargs):
+            raise RuntimeError("ledger write failed")
+
+        monkeypatch.setattr(import_service, "bulk_insert_ledger_batches", _fail)
+        result = _post_banksalad(client, banksalad_xlsx)
+        assert "ledger" in result["errors"]
+        history = client.get("/api/upload-history").json()[0]
+        assert history["ledger_high_water"] is None
+
+
+# ────────────────────────────────────────────
+# POST/PUT /api/ledger-transactions 중복 방지
+# ────────────────────────────────────────────
+
+class TestLedgerTransactionDedup:
+    PAYLOAD = {
+        "transaction_date": "2025-01-03T00:00:00",
+        "transaction_time": "12:30:00",
+        "description": "김밥천국",
+        "amount": -8000,
+    }
+
+    def test_duplicate_create_conflicts(self, client):
+        assert client.post("/api/ledger-transactions", json=self.PAYLOAD).status_code == 200
+        assert client.post("/api/ledger-transactions", json=self.PAYLOAD).status_code == 409
+
+    def test_import_skips_manually_created_row(self, client, banksalad_xlsx):
+        client.post("/api/ledger-transactions", json=self.PAYLOAD)
+        job = _post_ledger(client, banksalad_xlsx)
+        assert _ledger_counts(job) == {"inserted": 3, "skipped": 1}
+
+    def test_update_refreshes_hash(self, client):
+        tx = client.post("/api/ledger-transactions", json=self.PAYLOAD).json()
+        client.put(f"/api/ledger-transactions/{tx['id']}", json={"amount": -9000})
+        # 원래 키로 다시 생성 가능
+        assert client.post("/api/ledger-transactions", json=self.PAYLOAD).status_code == 200
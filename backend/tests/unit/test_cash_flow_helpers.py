@@ -1,230 +1,145 @@
 """
-cash_flow_service.py 헬퍼 함수 단위 테스트
+cash_flow_service.py 월 단위 병합 엔진 단위 테스트
 """
-from datetime import datetime
-from unittest.mock import MagicMock
+from datetime import date
 
-import pytest
+from app.models import CashFlow
+from app.services import cash_flow_service
+from app.services.cash_flow_service import CashFlowMerger, load_cash_flow_items
 
-from app.services.cash_flow_service import (
-    _extract_row_data,
-    _find_column_headers,
-    _find_section_header,
-    _merge_monthly_data,
-    _to_float,
-    _to_str,
-)
+RANGE_2024 = "2024-01-01~2024-12-31"
+RANGE_2025 = "2025-01-01~2025-12-31"
 
 
-# ────────────────────────────────────────────
-# _to_str
-# ────────────────────────────────────────────
-
-class TestToStr:
-    def test_string_value(self):
-        assert _to_str("  수입  ") == "수입"
-
-    def test_int_value(self):
-        assert _to_str(42) == "42"
-
-    def test_float_value(self):
-        assert _to_str(3.14) == "3.14"
-
-    def test_none_value(self):
-        assert _to_str(None) == ""
-
-    def test_empty_string(self):
-        assert _to_str("") == ""
-
-
-# ────────────────────────────────────────────
-# _to_float
-# ────────────────────────────────────────────
-
-class TestToFloat:
-    def test_int(self):
-        assert _to_float(100) == 100.0
-
-    def test_float(self):
-        assert _to_float(3.14) == 3.14
-
-    def test_string_number(self):
-        assert _to_float("1234") == 1234.0
-
-    def test_string_with_comma(self):
-        assert _to_float("1,234,567") == 1234567.0
-
-    def test_negative(self):
-        assert _to_float("-500") == -500.0
-
-    def test_invalid_string(self):
-        assert _to_float("abc") is None
-
-    def test_none(self):
-        assert _to_float(None) is None
-
-    def test_empty_string(self):
-        assert _to_float("") is None
+def _item(name: str, monthly: dict, total: float = 0.0, item_type: str = "지출", sources: dict = None) -> dict:
+    item = {
+        "item_name": name,
+        "item_type": item_type,
+        "total": total,
+        "monthly_average": total / 12,
+        "monthly_data": monthly,
+    }
+    if sources is not None:
+        item["month_sources"] = sources
+    return item
 
 
 # ────────────────────────────────────────────
-# _find_section_header
+# 캐시
 # ────────────────────────────────────────────
 
-def _make_record(row_index: int, col1: str):
-    record = MagicMock()
-    record.row_index = row_index
-    record.data = {"1": col1}
-    return record
-
+class TestCaches:
+    def test_month_interval(self):
+        merger = CashFlowMerger()
+        assert merger.month_interval("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+        assert merger.month_interval("총계") is None
 
-class TestFindSectionHeader:
-    def test_finds_header(self):
-        records = [
-            _make_record(1, "고객정보"),
-            _make_record(5, "2.현금흐름현황"),
-            _make_record(6, "항목"),
-        ]
-        assert _find_section_header(records) == 5
+    def test_source_range_parsed_once(self, monkeypatch):
+        calls = []
+        original = cash_flow_service.parse_date_range_key
 
-    def test_finds_partial_match(self):
-        records = [_make_record(3, "현금흐름 분석")]
-        assert _find_section_header(records) == 3
-
-    def test_returns_none_when_not_found(self):
-        records = [_make_record(1, "고객정보"), _make_record(2, "자산현황")]
-        assert _find_section_header(records) is None
-
-
-# ────────────────────────────────────────────
-# _find_column_headers
-# ────────────────────────────────────────────
+        def _counting(key):
+            calls.append(key)
+            return original(key)
 
-class TestFindColumnHeaders:
-    def test_finds_headers_after_section_start(self):
-        records = [
-            _make_record(5, "2.현금흐름현황"),
-            # 항목 헤더 행
-            MagicMock(
-                row_index=6,
-                data={
-                    "1": "항목",
-                    "2": "총계",
-                    "3": "월평균",
-                    "4": "2024-01",
-                    "5": "2024-02",
-                    "6": "",
-                },
-            ),
-        ]
-        header_idx, monthly = _find_column_headers(records, section_start=5)
-        assert header_idx == 6
-        assert "4" in monthly
-        assert monthly["4"] == "2024-01"
-        assert "6" not in monthly  # 빈 값 제외
-
-    def test_ignores_rows_before_section_start(self):
-        records = [
-            MagicMock(row_index=3, data={"1": "항목"}),
-            _make_record(5, "현금흐름현황"),
-        ]
-        header_idx, monthly = _find_column_headers(records, section_start=5)
-        assert header_idx is None
-
-    def test_returns_none_when_not_found(self):
-        records = [_make_record(6, "급여"), _make_record(7, "지출")]
-        header_idx, monthly = _find_column_headers(records, section_start=5)
-        assert header_idx is None
-        assert monthly == {}
+        monkeypatch.setattr(cash_flow_service, "parse_date_range_key", _counting)
+        merger = CashFlowMerger()
+        existing = {"식비": _item("식비", {f"2025-{m:02d}": 1.0 for m in range(1, 13)}, sources={
+            f"2025-{m:02d}": RANGE_2024 for m in range(1, 13)
+        })}
+        incoming = [_item(f"항목{i}", {f"2025-{m:02d}": 2.0 for m in range(1, 13)}) for i in range(20)]
+        merger.merge_items(existing, incoming + [_item("식비", {"2025-01": 2.0})], RANGE_2025)
+        assert sorted(calls) == [RANGE_2024, RANGE_2025]
 
 
 # ────────────────────────────────────────────
-# _extract_row_data
+# incoming_wins / merge_item
 # ────────────────────────────────────────────
 
-class TestExtractRowData:
-    def test_income_row(self):
-        data = {
-            "1": "급여",
-            "2": "36000000",
-            "3": "3000000",
-            "4": "3000000",
-        }
-        monthly_headers = {"4": "2024-01"}
-        result = _extract_row_data(data, monthly_headers)
-        assert result is not None
-        item_name, total, avg, monthly, item_type = result
-        assert item_name == "급여"
-        assert total == 36000000.0
-        assert item_type == "수입"
-        assert monthly == {"2024-01": 3000000.0}
-
-    def test_expense_row(self):
-        data = {"1": "식비", "2": "1200000", "3": "100000"}
-        result = _extract_row_data(data, {})
-        assert result is not None
-        assert result[4] == "지출"
-
-    def test_excluded_keyword(self):
-        data = {"1": "항목", "2": ""}
-        assert _extract_row_data(data, {}) is None
-
-    def test_excludes_total_in_name(self):
-        data = {"1": "월수입 총계", "2": "5000000"}
-        assert _extract_row_data(data, {}) is None
-
-    def test_asset_keyword_excluded(self):
-        data = {"1": "주식 자산", "2": "10000000"}
-        assert _extract_row_data(data, {}) is None
-
-    def test_numeric_only_item_name_excluded(self):
-        data = {"1": "1234", "2": ""}
-        assert _extract_row_data(data, {}) is None
-
-    def test_section_number_prefix_excluded(self):
-        data = {"1": "2.현금흐름현황", "2": ""}
-        assert _extract_row_data(data, {}) is None
+class TestMergeItem:
+    def test_new_month_added(self):
+        existing = _item("식비", {"2024-01": 100.0}, sources={"2024-01": RANGE_2024})
+        merged = CashFlowMerger().merge_item(existing, _item("식비", {"2025-01": 200.0}), RANGE_2025)
+        assert merged["monthly_data"] == {"2024-01": 100.0, "2025-01": 200.0}
+        assert merged["month_sources"] == {"2024-01": RANGE_2024, "2025-01": RANGE_2025}
+
+    def test_existing_kept_when_month_outside_incoming_range(self):
+        # 2025 범위 업로드가 2024-06 값을 덮어쓰려 해도 2024 범위 업로드 값 유지
+        existing = _item("식비", {"2024-06": 500.0}, sources={"2024-06": RANGE_2024})
+        merged = CashFlowMerger().merge_item(existing, _item("식비", {"2024-06": 999.0}), RANGE_2025)
+        assert merged["monthly_data"]["2024-06"] == 500.0
+
+    def test_incoming_wins_when_only_it_covers_month(self):
+        existing = _item("식비", {"2025-03": 1.0}, sources={"2025-03": RANGE_2024})
+        merged = CashFlowMerger().merge_item(existing, _item("식비", {"2025-03": 2.0}), RANGE_2025)
+        assert merged["monthly_data"]["2025-03"] == 2.0
+
+    def test_newer_range_wins_on_overlap_regardless_of_order(self):
+        older, newer = "2024-07-01~2025-06-30", "2024-10-01~2025-09-30"
+        merger = CashFlowMerger()
+        existing = _item("식비", {"2025-01": 1.0}, sources={"2025-01": newer})
+        merged = merger.merge_item(existing, _item("식비", {"2025-01": 2.0}), older)
+        assert merged["monthly_data"]["2025-01"] == 1.0
+        existing = _item("식비", {"2025-01": 1.0}, sources={"2025-01": older})
+        merged = merger.merge_item(existing, _item("식비", {"2025-01": 2.0}), newer)
+        assert merged["monthly_data"]["2025-01"] == 2.0
+
+    def test_unknown_sources_later_upload_wins(self):
+        existing = _item("식비", {"2025-01": 1.0})  # 출처 기록 이전 데이터
+        merged = CashFlowMerger().merge_item(existing, _item("식비", {"2025-01": 2.0}), None)
+        assert merged["monthly_data"]["2025-01"] == 2.0
+        assert merged["month_sources"] == {"2025-01": None}
+
+    def test_none_existing_value_replaced(self):
+        existing = _item("식비", {"2025-01": None}, sources={"2025-01": RANGE_2025})
+        merged = CashFlowMerger().merge_item(existing, _item("식비", {"2025-01": 3.0}), RANGE_2024)
+        assert merged["monthly_data"]["2025-01"] == 3.0
+
+    def test_totals_from_newest_range(self):
+        merger = CashFlowMerger()
+        existing = _item("식비", {"2025-01": 1.0}, total=12.0, sources={"2025-01": RANGE_2025})
+        merged = merger.merge_item(existing, _item("식비", {"2024-01": 1.0}, total=99.0, item_type="수입"), RANGE_2024)
+        assert (merged["total"], merged["item_type"]) == (12.0, "지출")
+        merged = merger.merge_item(merged, _item("식비", {"2025-02": 1.0}, total=50.0), RANGE_2025)
+        assert merged["total"] == 50.0
+
+    def test_inputs_not_mutated(self):
+        existing = _item("식비", {"2025-01": 1.0}, sources={"2025-01": RANGE_2024})
+        CashFlowMerger().merge_item(existing, _item("식비", {"2025-01": 2.0}), RANGE_2025)
+        assert existing["monthly_data"] == {"2025-01": 1.0}
+        assert existing["month_sources"] == {"2025-01": RANGE_2024}
+
+
+class TestMergeItems:
+    def test_returns_only_incoming_names(self):
+        existing = {"교통": _item("교통", {"2025-01": 1.0})}
+        merged = CashFlowMerger().merge_items(existing, [_item("식비", {"2025-01": 2.0})], RANGE_2025)
+        assert set(merged) == {"식비"}
+
+    def test_repeated_name_merged_in_order(self):
+        merged = CashFlowMerger().merge_items(
+            {}, [_item("식비", {"2025-01": 1.0, "2025-02": 1.0}), _item("식비", {"2025-02": 2.0})], RANGE_2025,
+        )
+        assert merged["식비"]["monthly_data"] == {"2025-01": 1.0, "2025-02": 2.0}
 
 
 # ────────────────────────────────────────────
-# _merge_monthly_data
+# load_cash_flow_items
 # ────────────────────────────────────────────
 
-def _make_upload_hist(filename: str, uploaded_at: datetime):
-    u = MagicMock()
-    u.filename = filename
-    u.uploaded_at = uploaded_at
-    return u
-
-
-class TestMergeMonthlyData:
-    def test_new_month_added(self):
-        current = _make_upload_hist("2025-01-01~2025-12-31.xlsx", datetime(2025, 2, 1))
-        existing = _make_upload_hist("2024-01-01~2024-12-31.xlsx", datetime(2025, 1, 1))
-        merged = _merge_monthly_data(
-            {"2024-01": 100.0},
-            {"2025-01": 200.0},
-            current,
-            existing,
-        )
-        assert merged["2024-01"] == 100.0
-        assert merged["2025-01"] == 200.0
-
-    def test_existing_data_preserved_when_not_in_current_range(self):
-        # current upload covers 2025; existing data for 2024 should stay
-        current = _make_upload_hist("2025-01-01~2025-12-31.xlsx", datetime(2025, 2, 1))
-        existing = _make_upload_hist("2024-01-01~2024-12-31.xlsx", datetime(2025, 1, 1))
-        merged = _merge_monthly_data(
-            {"2024-06": 500.0},
-            {"2024-06": 999.0},   # current tries to overwrite 2024-06
-            current,
-            existing,
-        )
-        # 2024-06 is in existing range, not in current range → keep existing value
-        assert merged["2024-06"] == 500.0
-
-    def test_none_existing_treated_as_empty(self):
-        current = _make_upload_hist("report.xlsx", datetime(2025, 2, 1))
-        existing = _make_upload_hist("report.xlsx", datetime(2025, 1, 1))
-        merged = _merge_monthly_data(None, {"2025-01": 300.0}, current, existing)
-        assert merged["2025-01"] == 300.0
+class TestLoadCashFlowItems:
+    def test_loads_requested_names(self, db_session):
+        db_session.add_all([
+            CashFlow(item_name="식비", item_type="지출", total=10, monthly_data={"2025-01": 10.0},
+                     month_sources={"2025-01": RANGE_2025}),
+            CashFlow(item_name="교통", item_type="지출", total=5),
+        ])
+        db_session.flush()
+        items = load_cash_flow_items(db_session, ["식비", "교통", "없음"])
+        assert set(items) == {"식비", "교통"}
+        assert items["식비"]["total"] == 10.0
+        assert items["식비"]["month_sources"] == {"2025-01": RANGE_2025}
+        assert items["교통"]["monthly_data"] == {} and items["교통"]["month_sources"] == {}
+
+    def test_empty_names_issue_no_query(self, db_session):
+        assert load_cash_flow_items(db_session, []) == {}
@@ -7,9 +7,13 @@ from unittest.mock import MagicMock
 import pytest
 
 from app.services.utils.date_utils import (
+    compare_date_ranges,
+    date_range_key,
     is_date_in_range,
     is_upload_newer,
     parse_date_range_from_filename,
+    parse_date_range_key,
+    ranges_overlap,
 )
 
 
@@ -93,3 +97,36 @@ class TestIsUploadNewer:
         newer = _make_upload("2024-01-01~2024-12-31.xlsx", datetime(2025, 3, 1))
         older = _make_upload("2024-01-01~2024-12-31.xlsx", datetime(2025, 1, 1))
         assert is_upload_newer(newer, older)
+
+
+# ────────────────────────────────────────────
+# compare_date_ranges / ranges_overlap / date_range_key
+# ────────────────────────────────────────────
+
+class TestCompareDateRanges:
+    def test_start_then_end(self):
+        r2024 = (date(2024, 1, 1), date(2024, 12, 31))
+        r2024_long = (date(2024, 1, 1), date(2025, 6, 30))
+        assert compare_date_ranges(r2024_long, r2024) == 1
+        assert compare_date_ranges(r2024, r2024_long) == -1
+        assert compare_date_ranges(r2024, r2024) == 0
+
+    def test_missing_range_is_unknown(self):
+        assert compare_date_ranges(None, (date(2024, 1, 1), date(2024, 12, 31))) == 0
+
+
+class TestRangesOverlap:
+    def test_inclusive_ends(self):
+        assert ranges_overlap(date(2025, 1, 1), date(2025, 1, 31), date(2025, 1, 31), date(2025, 6, 30))
+        assert not ranges_overlap(date(2025, 1, 1), date(2025, 1, 31), date(2025, 2, 1), date(2025, 6, 30))
+
+
+class TestDateRangeKey:
+    def test_round_trip(self):
+        date_range = (date(2024, 8, 13), date(2025, 8, 13))
+        assert date_range_key(date_range) == "2024-08-13~2025-08-13"
+        assert parse_date_range_key(date_range_key(date_range)) == date_range
+
+    def test_invalid_key(self):
+        assert parse_date_range_key(None) is None
+        assert parse_date_range_key("report") is None
@@ -0,0 +1,68 @@
+"""
+excel_reader.py 스트리밍 리더 단위 테스트
+"""
+import io
+
+import openpyxl
+
+from app.services.excel_reader import (
+    LEDGER_COLUMN_COUNT,
+    iter_ledger_rows,
+    iter_sheet_rows,
+    ledger_row_total,
+    open_workbook,
+)
+from tests.conftest import SAMPLE_LEDGER_ROWS, build_banksalad_workbook
+
+
+def _workbook_bytes(sheet_name: str, cells: dict) -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = sheet_name
+    for (row, col), value in cells.items():
+        ws.cell(row=row, column=col, value=value)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class TestIterSheetRows:
+    def test_row_numbers_survive_empty_rows(self):
+        content = _workbook_bytes("S", {(1, 1): "a", (4, 1): "b"})
+        wb = open_workbook(io.BytesIO(content))
+        rows = list(iter_sheet_rows(wb, "S", min_col=1, max_col=1))
+        wb.close()
+        assert rows[0] == (1, ("a",))
+        assert rows[3] == (4, ("b",))
+
+    def test_min_row_offset(self):
+        content = _workbook_bytes("S", {(1, 1): "h", (2, 1): "x", (3, 1): "y"})
+        wb = open_workbook(io.BytesIO(content))
+        rows = list(iter_sheet_rows(wb, "S", min_row=2, min_col=1, max_col=1))
+        wb.close()
+        assert rows == [(2, ("x",)), (3, ("y",))]
+
+    def test_pads_to_requested_columns(self):
+        content = _workbook_bytes("S", {(6, 2): "홍길동"})
+        wb = open_workbook(io.BytesIO(content))
+        rows = dict(iter_sheet_rows(wb, "S", min_row=1, max_row=10, min_col=2, max_col=16))
+        wb.close()
+        assert rows[6][0] == "홍길동"
+        assert len(rows[6]) == 15
+
+
+class TestIterLedgerRows:
+    def test_rows_have_fixed_width(self):
+        wb = open_workbook(io.BytesIO(build_banksalad_workbook()))
+        rows = list(iter_ledger_rows(wb))
+        wb.close()
+        assert len(rows) == len(SAMPLE_LEDGER_ROWS)
+        assert all(len(r) == LEDGER_COLUMN_COUNT for r in rows)
+        # 메모가 비어 있는 행도 10개 컬럼으로 패딩
+        assert rows[0][9] is None
+
+    def test_row_total_matches_rows(self):
+        wb = open_workbook(io.BytesIO(build_banksalad_workbook()))
+        total = ledger_row_total(wb)
+        wb.close()
+        assert total == len(SAMPLE_LEDGER_ROWS)
@@ -0,0 +1,158 @@
+"""
+export_archive.py zip 추출 · 병합 단위 테스트
+"""
+import io
+import zipfile
+
+import pytest
+
+from app.services import export_archive
+from app.services.export_archive import (
+    ExportArchiveError,
+    export_sort_key,
+    extract_exports,
+    merge_cash_flow_items,
+    merge_ledgers,
+    merge_monthly_summaries,
+    merge_summaries,
+)
+from app.services.ledger_parser import parse_ledger_columns
+from app.services.workbook_parser import ParsedLedger, ParsedSummary, _LedgerSpool
+from tests.conftest import SAMPLE_LEDGER_ROWS, read_ledger_columns
+
+
+def _zip(files: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
+
+
+def _cash(name: str, monthly: dict, item_type: str = "수입") -> dict:
+    total = sum(monthly.values())
+    return {
+        "item_name": name, "item_type": item_type, "total": total,
+        "monthly_average": total / len(monthly), "monthly_data": monthly,
+    }
+
+
+# ────────────────────────────────────────────
+# 정렬 · 추출
+# ────────────────────────────────────────────
+
+class TestExportSortKey:
+    def test_orders_by_range_start_then_end(self):
+        names = [
+            "b/2024-03-01~2025-03-01.xlsx",
+            "2024-01-01~2025-02-01.xlsx",
+            "2024-01-01~2025-01-01.xlsx",
+            "memo.xlsx",
+        ]
+        assert sorted(names, key=export_sort_key) == [
+            "memo.xlsx",
+            "2024-01-01~2025-01-01.xlsx",
+            "2024-01-01~2025-02-01.xlsx",
+            "b/2024-03-01~2025-03-01.xlsx",
+        ]
+
+
+class TestExtractExports:
+    def test_extracts_sorted_and_skips_other_files(self, tmp_path):
+        content = _zip({
+            "exports/2025-02-01~2025-04-30.xlsx": b"new",
+            "2025-01-01~2025-03-31.xlsx": b"old",
+            "readme.txt": b"-",
+            "__MACOSX/._2025-01-01~2025-03-31.xlsx": b"-",
+        })
+        members = extract_exports(content, str(tmp_path))
+        assert [m.name for m in members] == [
+            "2025-01-01~2025-03-31.xlsx", "exports/2025-02-01~2025-04-30.xlsx",
+        ]
+        assert [open(m.path, "rb").read() for m in members] == [b"old", b"new"]
+        assert all(m.path.startswith(str(tmp_path)) for m in members)
+
+    def test_bad_zip(self, tmp_path):
+        with pytest.raises(ExportArchiveError):
+            extract_exports(b"not a zip", str(tmp_path))
+
+    def test_no_exports(self, tmp_path):
+        with pytest.raises(ExportArchiveError):
+            extract_exports(_zip({"readme.txt": b"-"}), str(tmp_path))
+
+    def test_too_many_files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(export_archive, "ARCHIVE_MAX_FILES", 1)
+        with pytest.raises(ExportArchiveError):
+            extract_exports(_zip({"a.xlsx": b"a", "b.xlsx": b"b"}), str(tmp_path))
+
+    def test_extracted_size_limit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(export_archive, "ARCHIVE_MAX_EXTRACTED_BYTES", 10)
+        with pytest.raises(ExportArchiveError):
+            extract_exports(_zip({"a.xlsx": b"x" * 11}), str(tmp_path))
+
+
+# ────────────────────────────────────────────
+# 병합
+# ────────────────────────────────────────────
+
+class TestMergeCashFlowItems:
+    def test_newest_month_wins_and_months_are_unioned(self):
+        old = [_cash("급여", {"2025-01": 100.0, "2025-02": 100.0})]
+        new = [_cash("급여", {"2025-02": 200.0, "2025-03": 200.0}), _cash("식비", {"2025-03": 5.0}, "지출")]
+        merged = {item["item_name"]: item for item in merge_cash_flow_items([old, new])}
+        assert merged["급여"]["monthly_data"] == {"2025-01": 100.0, "2025-02": 200.0, "2025-03": 200.0}
+        assert merged["급여"]["total"] == 400.0  # 최신 파일 기간의 합계
+        assert merged["식비"]["item_type"] == "지출"
+
+    def test_inputs_not_mutated(self):
+        old = [_cash("급여", {"2025-01": 100.0})]
+        merge_cash_flow_items([old, [_cash("급여", {"2025-02": 1.0})]])
+        assert old[0]["monthly_data"] == {"2025-01": 100.0}
+
+
+class TestMergeMonthlySummaries:
+    def test_newest_file_wins_per_month(self):
+        old = [{"year": 2025, "month": 1, "income": 1}, {"year": 2025, "month": 2, "income": 1}]
+        new = [{"year": 2025, "month": 2, "income": 2}, {"year": 2025, "month": 3, "income": 2}]
+        merged = merge_monthly_summaries([old, new])
+        assert [(m["month"], m["income"]) for m in merged] == [(1, 1), (2, 2), (3, 2)]
+
+
+class TestMergeSummaries:
+    def test_point_in_time_sections_from_newest_parsed_file(self):
+        old = ParsedSummary(customer={"name": "old"}, investment={"items": [("a", 1.0)], "month": None},
+                            financial_snapshot={"net_assets": 1}, cash_flow=[], monthly_summary=[])
+        new = ParsedSummary(customer=None, financial_snapshot={"net_assets": 2}, cash_flow=[], monthly_summary=[],
+                            errors={"investment": "파싱 실패"})
+        merged = merge_summaries([old, new])
+        assert merged.customer == {"name": "old"}         # 최신 파일에 고객 정보 없음
+        assert merged.investment["items"] == [("a", 1.0)]  # 최신 파일은 파싱 실패
+        assert merged.financial_snapshot == {"net_assets": 2}
+        assert merged.errors == {}
+
+    def test_section_failed_everywhere_is_error(self):
+        broken = ParsedSummary(errors={"cash_flow": "x", "monthly_summary": "y"})
+        merged = merge_summaries([broken, broken])
+        assert merged.errors == {"cash_flow": "x", "monthly_summary": "y"}
+        assert merged.cash_flow is None
+
+
+def _spooled(rows, before_mark: int = 0) -> ParsedLedger:
+    spool = _LedgerSpool()
+    spool.write(parse_ledger_columns(rows))
+    return spool.finish(before_mark, False)
+
+
+class TestMergeLedgers:
+    def test_newest_file_rows_first(self):
+        old = _spooled(SAMPLE_LEDGER_ROWS[:2], before_mark=1)
+        new = _spooled(SAMPLE_LEDGER_ROWS[1:], before_mark=2)
+        try:
+            merged = merge_ledgers([old, new])
+            assert len(merged) == 5
+            assert read_ledger_columns(merged)["description"][:3] == ["월급", "스타벅스", "저축"]
+            assert merged.before_mark == 3
+            assert merged.max_date == SAMPLE_LEDGER_ROWS[-1][0]
+        finally:
+            old.discard()
+            new.discard()
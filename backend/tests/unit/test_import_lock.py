@@ -0,0 +1,78 @@
+"""
+import_lock.py import 쓰기 락 단위 테스트
+
+PostgreSQL 경로는 실행된 SQL과 결과를 흉내 내는 세션으로 검사합니다.
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services.import_lock import STAGE_WAITING, ImportLockTimeout, lock_import_writes
+
+
+class _FakePgSession:
+    """execute된 SQL을 기록하고, SQL에 포함된 문구별로 준비된 결과를 돌려주는 세션."""
+
+    def __init__(self, results: dict, fail_on: str = None, pgcode: str = "55P03"):
+        self.results = results
+        self.fail_on = fail_on
+        self.pgcode = pgcode
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if self.fail_on and self.fail_on in sql:
+            raise OperationalError(sql, params, SimpleNamespace(pgcode=self.pgcode))
+        value = next((v for key, v in self.results.items() if key in sql), None)
+        return SimpleNamespace(scalar=lambda: value)
+
+
+class TestLockImportWrites:
+    def test_noop_on_sqlite(self, db_session):
+        calls = []
+        assert lock_import_writes(db_session, lambda *a, **k: calls.append(a)) == 0
+        assert calls == []
+
+    def test_uncontended_lock_taken_immediately(self):
+        db = _FakePgSession({"pg_try_advisory_xact_lock": True})
+        calls = []
+        assert lock_import_writes(db, lambda stage, **counts: calls.append(stage)) == 0
+        assert calls == []
+        assert len(db.statements) == 1
+
+    def test_contended_reports_queue_position_then_waits(self):
+        db = _FakePgSession({
+            "pg_try_advisory_xact_lock": False,
+            "pg_locks": 2,
+            "current_setting": "0",
+        })
+        reported = []
+        position = lock_import_writes(db, lambda stage, **counts: reported.append((stage, counts)), timeout_seconds=5)
+        assert position == 3  # 락 보유 1 + 먼저 기다리는 2
+        assert reported == [(STAGE_WAITING, {"queue_position": 3})]
+        sqls = [sql for sql, _ in db.statements]
+        assert any("SELECT pg_advisory_xact_lock" in sql for sql in sqls)
+        # 대기에만 lock_timeout을 적용하고 원래 값으로 되돌림
+        settings = [params["value"] for sql, params in db.statements if "set_config" in sql]
+        assert settings == ["5000ms", "0"]
+
+    def test_timeout_raises_import_lock_timeout(self):
+        db = _FakePgSession(
+            {"pg_try_advisory_xact_lock": False, "pg_locks": 0, "current_setting": "0"},
+            fail_on="SELECT pg_advisory_xact_lock",
+        )
+        with pytest.raises(ImportLockTimeout):
+            lock_import_writes(db, timeout_seconds=1)
+
+    def test_other_errors_propagate(self):
+        db = _FakePgSession(
+            {"pg_try_advisory_xact_lock": False, "pg_locks": 0, "current_setting": "0"},
+            fail_on="SELECT pg_advisory_xact_lock", pgcode="57014",
+        )
+        with pytest.raises(OperationalError):
+            lock_import_writes(db, timeout_seconds=1)
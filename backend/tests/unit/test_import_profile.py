@@ -0,0 +1,104 @@
+"""
+import_profile.py 단계별 프로파일 단위 테스트
+"""
+import tracemalloc
+
+import pytest
+
+from app.services import import_profile
+from app.services.import_profile import ImportProfile
+
+
+@pytest.fixture()
+def memory_profile(monkeypatch):
+    monkeypatch.setattr(import_profile, "PROFILE_MEMORY", True)
+
+
+class TestImportProfile:
+    def test_stages_in_first_seen_order(self):
+        profile = ImportProfile()
+        with profile.stage("load"):
+            pass
+        with profile.stage("write", rows=3):
+            pass
+        result = profile.finish()
+        assert [stage["stage"] for stage in result["stages"]] == ["load", "write"]
+        assert result["stages"][1]["rows"] == 3
+        assert result["total_seconds"] >= 0
+
+    def test_repeated_stage_accumulates(self):
+        profile = ImportProfile()
+        for n in (2, 5):
+            with profile.stage("ledger_parse") as stage:
+                stage.rows += n
+        stages = profile.finish()["stages"]
+        assert len(stages) == 1
+        assert stages[0]["rows"] == 7
+
+    def test_memory_off_by_default(self):
+        profile = ImportProfile()
+        assert not tracemalloc.is_tracing()
+        with profile.stage("load"):
+            pass
+        assert profile.finish()["stages"][0]["peak_kb"] is None
+
+    def test_rss_high_water_always_recorded(self):
+        profile = ImportProfile()
+        with profile.stage("load"):
+            pass
+        profile.merge([{"stage": "load", "seconds": 0.0, "rows": 0, "rss_kb": 10 ** 9, "peak_kb": None}])
+        result = profile.finish()
+        assert result["stages"][0]["rss_kb"] == 10 ** 9  # 프로세스별 최고치 중 최댓값
+        assert result["memory_scope"] == "process"
+
+    def test_peak_memory_of_stage(self, memory_profile):
+        profile = ImportProfile()
+        with profile.stage("small"):
+            pass
+        with profile.stage("big"):
+            buf = bytearray(4 * 1024 * 1024)
+            del buf
+        stages = {stage["stage"]: stage for stage in profile.finish()["stages"]}
+        assert stages["big"]["peak_kb"] >= 4 * 1024
+        assert stages["small"]["peak_kb"] < 1024
+
+    def test_stage_recorded_when_block_raises(self):
+        profile = ImportProfile()
+        try:
+            with profile.stage("load"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        assert profile.finish()["stages"][0]["stage"] == "load"
+
+    def test_nested_stage_keeps_outer_peak(self, memory_profile):
+        # 안쪽 단계가 전역 최고치를 초기화하면 바깥 단계가 앞서 도달한 최고치를 잃음
+        profile = ImportProfile()
+        with profile.stage("parse"):
+            buf = bytearray(4 * 1024 * 1024)
+            del buf
+            with profile.stage("ledger_parse"):
+                pass
+        stages = {stage["stage"]: stage for stage in profile.finish()["stages"]}
+        assert stages["parse"]["peak_kb"] >= 4 * 1024
+        assert stages["ledger_parse"]["peak_kb"] < 1024
+
+    def test_finish_stops_tracing(self, memory_profile):
+        profile = ImportProfile()
+        assert tracemalloc.is_tracing()
+        profile.finish()
+        assert not tracemalloc.is_tracing()
+
+    def test_second_finish_keeps_first_result(self, memory_profile):
+        profile = ImportProfile()
+        other = ImportProfile()  # 동시에 실행 중인 import
+        with profile.stage("parse"):
+            pass
+        first = profile.finish()
+        with profile.stage("late"):
+            pass
+        assert profile.finish() is first
+        assert [s["stage"] for s in first["stages"]] == ["parse"]
+        assert tracemalloc.is_tracing()  # 두 번째 호출이 다른 import의 추적을 끄지 않음
+        other.finish()
+        assert not tracemalloc.is_tracing()
@@ -0,0 +1,151 @@
+"""
+import_service.py 헬퍼 단위 테스트
+"""
+import io
+import os
+import tracemalloc
+import zipfile
+
+import pytest
+from sqlalchemy import event
+
+from app.models import CashFlow
+from app.services import import_diff, import_profile, import_service, parse_cache, workbook_parser
+from app.services.import_service import upsert_cash_flow_items
+from tests.conftest import build_banksalad_workbook
+
+
+def _item(name: str, total: float = 100.0, item_type: str = "지출") -> dict:
+    return {
+        "item_name": name,
+        "item_type": item_type,
+        "total": total,
+        "monthly_average": total / 2,
+        "monthly_data": {"2025-01": total / 2, "2025-02": total / 2},
+    }
+
+
+def _count_statements(db_session, fn) -> int:
+    statements = []
+    conn = db_session.connection()
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(conn, "before_cursor_execute", _before)
+    try:
+        fn()
+    finally:
+        event.remove(conn, "before_cursor_execute", _before)
+    return len(statements)
+
+
+# ────────────────────────────────────────────
+# upsert_cash_flow_items
+# ────────────────────────────────────────────
+
+class TestUpsertCashFlowItems:
+    def test_inserts_then_updates(self, db_session):
+        assert upsert_cash_flow_items(db_session, [_item("식비"), _item("교통")]) == (0, 2)
+        assert upsert_cash_flow_items(db_session, [_item("식비", 500.0), _item("통신")]) == (1, 1)
+        rows = {cf.item_name: cf for cf in db_session.query(CashFlow).all()}
+        assert set(rows) == {"식비", "교통", "통신"}
+        assert float(rows["식비"].total) == 500.0
+
+    def test_repeated_name_last_row_wins(self, db_session):
+        # 같은 배치에서 반복된 항목명은 한 번만 셈
+        assert upsert_cash_flow_items(db_session, [_item("식비", 1.0), _item("식비", 2.0)]) == (0, 1)
+        rows = db_session.query(CashFlow).all()
+        assert len(rows) == 1
+        assert float(rows[0].total) == 2.0
+        assert upsert_cash_flow_items(db_session, [_item("식비", 3.0), _item("식비", 4.0), _item("교통")]) == (1, 1)
+
+    def test_empty_input_issues_no_statements(self, db_session):
+        assert _count_statements(db_session, lambda: upsert_cash_flow_items(db_session, [])) == 0
+
+    def test_statement_count_independent_of_item_count(self, db_session):
+        few = [_item(f"항목{i}") for i in range(3)]
+        many = [_item(f"항목{i}") for i in range(200)]
+        count_few = _count_statements(db_session, lambda: upsert_cash_flow_items(db_session, few))
+        count_many = _count_statements(db_session, lambda: upsert_cash_flow_items(db_session, many))
+        assert count_few == count_many == 2
+
+
+# ────────────────────────────────────────────
+# 실패한 import의 메모리 추적 정리
+# ────────────────────────────────────────────
+
+def _boom(*args, **kwargs):
+    raise RuntimeError("boom")
+
+
+def _zip(content: bytes) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("2025-01-01~2025-03-31.xlsx", content)
+    return buf.getvalue()
+
+
+class TestProfileFinishedOnFailure:
+    @pytest.fixture(autouse=True)
+    def _memory_profile(self, monkeypatch):
+        monkeypatch.setattr(import_profile, "PROFILE_MEMORY", True)
+        assert not tracemalloc.is_tracing()
+
+    def test_workbook_cutoff_fails(self, db_session, monkeypatch):
+        monkeypatch.setattr(import_service, "ledger_cutoff", _boom)
+        with pytest.raises(RuntimeError):
+            import_service.import_banksalad_workbook(db_session, build_banksalad_workbook(), "a.xlsx")
+        assert not tracemalloc.is_tracing()
+
+    def test_ledger_commit_fails(self, db_session, monkeypatch):
+        monkeypatch.setattr(db_session, "commit", _boom)
+        with pytest.raises(RuntimeError):
+            import_service.import_ledger_workbook(db_session, build_banksalad_workbook(with_summary=False), "a.xlsx")
+        assert not tracemalloc.is_tracing()
+
+    def test_archive_merge_fails(self, db_session, monkeypatch):
+        monkeypatch.setattr(import_service, "merge_parsed_workbooks", _boom)
+        with pytest.raises(RuntimeError):
+            import_service.import_banksalad_archive(db_session, _zip(build_banksalad_workbook()), "a.zip")
+        assert not tracemalloc.is_tracing()
+
+    def test_dry_run_cutoff_fails(self, db_session, monkeypatch):
+        monkeypatch.setattr(import_diff, "ledger_cutoff", _boom)
+        with pytest.raises(RuntimeError):
+            import_diff.diff_banksalad_workbook(db_session, build_banksalad_workbook())
+        assert not tracemalloc.is_tracing()
+
+
+# ────────────────────────────────────────────
+# 가계부 스풀 파일 정리
+# ────────────────────────────────────────────
+
+class TestLedgerSpoolFilesRemoved:
+    @pytest.fixture(autouse=True)
+    def _inline(self, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+
+    def test_after_import(self, db_session, parse_cache_dir, spool_dir):
+        result = import_service.import_banksalad_workbook(db_session, build_banksalad_workbook(), "a.xlsx")
+        assert result["ledger"]["inserted"] == 4
+        assert os.listdir(spool_dir) == []
+        # 캐시 항목은 스풀 파일의 복사본이라 남아 있음
+        assert any(name.endswith(".ledger.all" + parse_cache.CACHE_SUFFIX) for name in os.listdir(parse_cache_dir))
+
+    def test_after_failed_write(self, db_session, spool_dir, monkeypatch):
+        monkeypatch.setattr(db_session, "commit", _boom)
+        with pytest.raises(RuntimeError):
+            import_service.import_ledger_workbook(db_session, build_banksalad_workbook(with_summary=False), "a.xlsx")
+        assert os.listdir(spool_dir) == []
+
+    def test_after_failed_archive_merge(self, db_session, spool_dir, monkeypatch):
+        monkeypatch.setattr(import_service, "merge_parsed_workbooks", _boom)
+        with pytest.raises(RuntimeError):
+            import_service.import_banksalad_archive(db_session, _zip(build_banksalad_workbook()), "a.zip")
+        assert os.listdir(spool_dir) == []
+
+    def test_after_dry_run(self, db_session, spool_dir):
+        result = import_diff.diff_banksalad_workbook(db_session, build_banksalad_workbook())
+        assert result["ledger"]["inserted"] == 4
+        assert os.listdir(spool_dir) == []
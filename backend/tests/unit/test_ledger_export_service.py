@@ -0,0 +1,40 @@
+"""
+ledger_export_service.py 배치 스트리밍 단위 테스트
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models.models import LedgerTransaction
+from app.services.ledger_export_service import EXPORT_COLUMNS, iter_ledger_export
+
+
+@pytest.fixture()
+def ledger(db_session):
+    for i in range(5):
+        db_session.add(LedgerTransaction(
+            transaction_date=datetime(2025, 1, i + 1), description=f"거래{i}", amount=Decimal("-100.25") * (i + 1),
+        ))
+    db_session.flush()
+
+
+class TestIterLedgerExport:
+    def test_one_chunk_per_batch(self, db_session, ledger):
+        chunks = list(iter_ledger_export(db_session, "csv", batch_size=2))
+        assert chunks[0] == "\ufeff" + ",".join(EXPORT_COLUMNS) + "\n"
+        assert [c.count("\n") for c in chunks[1:]] == [2, 2, 1]
+        first = dict(zip(EXPORT_COLUMNS, chunks[1].split("\n")[0].split(",")))
+        assert (first["transaction_date"], first["amount"]) == ("2025-01-05T00:00:00", "-501.25")
+
+    def test_ndjson_has_no_header(self, db_session, ledger):
+        chunks = list(iter_ledger_export(db_session, "ndjson", batch_size=10))
+        assert len(chunks) == 1 and chunks[0].count("\n") == 5
+
+    def test_empty_result(self, db_session):
+        assert list(iter_ledger_export(db_session, "ndjson")) == []
+        assert len(list(iter_ledger_export(db_session, "csv"))) == 1
+
+    def test_unknown_format(self, db_session):
+        with pytest.raises(ValueError):
+            list(iter_ledger_export(db_session, "xlsx"))
@@ -0,0 +1,147 @@
+"""
+ledger_loader.py 대량 적재기 단위 테스트
+"""
+from datetime import datetime
+
+from app.models import LedgerTransaction
+from app.services.ledger_loader import (
+    INSERT_COLUMNS,
+    LEDGER_COLUMNS,
+    _copy_value,
+    _format_copy_rows,
+    bulk_insert_ledger_batches,
+    bulk_insert_ledger_columns,
+    ledger_dedup_hash,
+)
+
+
+def _row(**overrides) -> dict:
+    row = {col: None for col in LEDGER_COLUMNS}
+    row.update(
+        transaction_date=datetime(2025, 1, 3),
+        transaction_time="12:30:00",
+        transaction_type="지출",
+        description="김밥천국",
+        amount=-8000.0,
+    )
+    row.update(overrides)
+    return row
+
+
+def _columns(rows: list) -> dict:
+    return {col: [row.get(col) for row in rows] for col in LEDGER_COLUMNS}
+
+
+def _values(row: dict) -> tuple:
+    """행 dict → INSERT_COLUMNS 순서의 값 튜플."""
+    values = tuple(row[col] for col in LEDGER_COLUMNS)
+    return values + (ledger_dedup_hash(values[0], values[1], values[5], values[6]),)
+
+
+# ────────────────────────────────────────────
+# ledger_dedup_hash
+# ────────────────────────────────────────────
+
+class TestLedgerDedupHash:
+    def test_time_of_day_in_date_ignored(self):
+        a = ledger_dedup_hash(datetime(2025, 1, 3), "12:30:00", "김밥천국", -8000)
+        b = ledger_dedup_hash(datetime(2025, 1, 3, 23, 59), "12:30:00", "김밥천국", -8000)
+        assert a == b
+
+    def test_amount_normalized(self):
+        from decimal import Decimal
+        a = ledger_dedup_hash(datetime(2025, 1, 3), None, "x", -8000.0)
+        b = ledger_dedup_hash(datetime(2025, 1, 3), None, "x", Decimal("-8000.00"))
+        assert a == b
+
+    def test_empty_string_equals_none(self):
+        assert ledger_dedup_hash(None, "", "", None) == ledger_dedup_hash(None, None, None, None)
+
+    def test_different_description(self):
+        a = ledger_dedup_hash(datetime(2025, 1, 3), None, "a", 1)
+        b = ledger_dedup_hash(datetime(2025, 1, 3), None, "b", 1)
+        assert a != b
+
+
+# ────────────────────────────────────────────
+# COPY text 포맷
+# ────────────────────────────────────────────
+
+class TestCopyValue:
+    def test_none_is_null_marker(self):
+        assert _copy_value(None) == r"\N"
+
+    def test_datetime(self):
+        assert _copy_value(datetime(2025, 1, 3, 9, 5)) == "2025-01-03 09:05:00"
+
+    def test_escapes_delimiters(self):
+        assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+    def test_float(self):
+        assert _copy_value(-5600.0) == "-5600.0"
+
+
+class TestFormatCopyRows:
+    def test_one_line_per_row_in_column_order(self):
+        buf = _format_copy_rows([_values(_row()), _values(_row(memo="메모"))])
+        lines = buf.getvalue().splitlines()
+        assert len(lines) == 2
+        fields = lines[1].split("\t")
+        assert len(fields) == len(INSERT_COLUMNS)
+        assert fields[0] == "2025-01-03 00:00:00"
+        assert fields[-2] == "메모"
+        assert len(fields[-1]) == 64
+
+
+# ────────────────────────────────────────────
+# bulk_insert_ledger_columns (SQLite executemany)
+# ────────────────────────────────────────────
+
+class TestBulkInsertLedgerColumns:
+    def test_inserts_all_rows_in_batches(self, db_session):
+        columns = _columns([_row(description=f"거래 {i}") for i in range(7)])
+        inserted, skipped = bulk_insert_ledger_columns(db_session, columns, batch_size=3)
+        assert (inserted, skipped) == (7, 0)
+        assert db_session.query(LedgerTransaction).count() == 7
+
+    def test_empty_input(self, db_session):
+        assert bulk_insert_ledger_columns(db_session, _columns([])) == (0, 0)
+
+    def test_existing_rows_skipped_by_conflict(self, db_session):
+        rows = [_row(description=f"거래 {i}") for i in range(5)]
+        bulk_insert_ledger_columns(db_session, _columns(rows[:3]))
+        assert bulk_insert_ledger_columns(db_session, _columns(rows)) == (2, 3)
+        assert db_session.query(LedgerTransaction).count() == 5
+
+    def test_duplicates_within_input_skipped(self, db_session):
+        assert bulk_insert_ledger_columns(db_session, _columns([_row(), _row(memo="다른 메모")])) == (1, 1)
+
+    def test_on_batch_reports_running_totals(self, db_session):
+        calls = []
+        rows = [_row(description=f"거래 {i}") for i in range(5)] + [_row(description="거래 0")]
+        bulk_insert_ledger_columns(db_session, _columns(rows), batch_size=4, on_batch=lambda i, s: calls.append((i, s)))
+        assert calls == [(4, 0), (5, 1)]
+
+    def test_missing_values_stored_as_null(self, db_session):
+        bulk_insert_ledger_columns(db_session, _columns([{"transaction_date": datetime(2025, 2, 1), "amount": 100.0}]))
+        tx = db_session.query(LedgerTransaction).one()
+        assert tx.memo is None
+        assert float(tx.amount) == 100.0
+        assert tx.dedup_hash == ledger_dedup_hash(datetime(2025, 2, 1), None, None, 100.0)
+
+    def test_hashes_filled_and_rows_inserted(self, db_session):
+        columns = _columns([_row(description=f"거래 {i}") for i in range(5)])
+        assert bulk_insert_ledger_columns(db_session, columns, batch_size=2) == (5, 0)
+        assert len(columns["dedup_hash"]) == 5
+        stored = {tx.description: tx.dedup_hash for tx in db_session.query(LedgerTransaction)}
+        assert stored["거래 3"] == columns["dedup_hash"][3]
+
+
+class TestBulkInsertLedgerBatches:
+    def test_totals_accumulate_across_batches(self, db_session):
+        rows = [_row(description=f"거래 {i}") for i in range(5)]
+        calls = []
+        batches = [_columns(rows[:3]), _columns(rows[2:])]  # 거래 2는 두 배치에 모두 있음
+        result = bulk_insert_ledger_batches(db_session, batches, on_batch=lambda i, s: calls.append((i, s)))
+        assert result == (5, 1)
+        assert calls == [(3, 0), (5, 1)]
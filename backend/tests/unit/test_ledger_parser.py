@@ -0,0 +1,92 @@
+"""
+ledger_parser.py 컬럼 파서 단위 테스트
+"""
+from datetime import date, datetime
+
+from app.services.ledger_loader import INSERT_COLUMNS, ledger_dedup_hash
+from app.services.ledger_parser import LedgerScan, iter_rows_since, ledger_row_count, parse_ledger_columns
+from tests.conftest import SAMPLE_LEDGER_ROWS
+
+
+class TestParseLedgerColumns:
+    def test_one_list_per_column(self):
+        columns = parse_ledger_columns(SAMPLE_LEDGER_ROWS)
+        assert set(columns) == set(INSERT_COLUMNS)
+        assert all(len(values) == len(SAMPLE_LEDGER_ROWS) for values in columns.values())
+        assert ledger_row_count(columns) == len(SAMPLE_LEDGER_ROWS)
+
+    def test_values_normalized(self):
+        columns = parse_ledger_columns(SAMPLE_LEDGER_ROWS)
+        assert columns["amount"] == [-8000.0, 3000000.0, -5600.0, -500000.0]
+        assert columns["subcategory"][1] is None
+        assert columns["memo"][1] == "1월"
+        assert columns["transaction_time"][0] == "12:30:00"
+
+    def test_date_coercion(self):
+        rows = [
+            (date(2025, 1, 3), None, None, None, None, "a", 1, None, None, None),
+            ("2025-01-04", None, None, None, None, "b", 1, None, None, None),
+        ]
+        assert parse_ledger_columns(rows)["transaction_date"] == [datetime(2025, 1, 3), datetime(2025, 1, 4)]
+
+    def test_invalid_rows_skipped(self):
+        rows = [
+            (None,) * 10,
+            (None, "12:00:00", "지출", None, None, "날짜 없음", 100, None, None, None),
+            ("어제", None, None, None, None, "날짜 아님", 100, None, None, None),
+            (datetime(2025, 1, 3), None),
+            SAMPLE_LEDGER_ROWS[0],
+        ]
+        columns = parse_ledger_columns(rows)
+        assert columns["description"] == ["김밥천국"]
+
+    def test_unparseable_amount_is_none(self):
+        row = (datetime(2025, 1, 3), None, None, None, None, "x", "N/A", None, None, None)
+        assert parse_ledger_columns([row])["amount"] == [None]
+
+    def test_dedup_hash(self):
+        columns = parse_ledger_columns(SAMPLE_LEDGER_ROWS[:1])
+        assert columns["dedup_hash"] == [ledger_dedup_hash(datetime(2025, 1, 3), "12:30:00", "김밥천국", -8000.0)]
+        assert parse_ledger_columns(SAMPLE_LEDGER_ROWS[:1], with_hash=False)["dedup_hash"] == []
+
+
+class TestIterRowsSince:
+    CUTOFF = datetime(2025, 2, 1)
+
+    def _dates(self, rows):
+        return [row[0] for row in rows]
+
+    def test_ascending_sheet_skips_old_rows_and_reads_all(self):
+        scan = LedgerScan()
+        kept = list(iter_rows_since(SAMPLE_LEDGER_ROWS, self.CUTOFF, scan))
+        assert self._dates(kept) == [datetime(2025, 2, 14), datetime(2025, 3, 2)]
+        assert scan.before_mark == 2
+        assert scan.stopped_early is False
+
+    def test_descending_sheet_stops_after_crossing_cutoff(self):
+        scan = LedgerScan()
+        rows = iter(list(reversed(SAMPLE_LEDGER_ROWS)))
+        kept = list(iter_rows_since(rows, self.CUTOFF, scan, total=len(SAMPLE_LEDGER_ROWS)))
+        assert self._dates(kept) == [datetime(2025, 3, 2), datetime(2025, 2, 14)]
+        assert scan.stopped_early is True
+        assert scan.before_mark == 2  # 읽지 않은 마지막 행도 셈
+        assert len(list(rows)) == 1  # 마지막 행은 읽지 않음
+
+    def test_descending_sheet_without_total_reads_all(self):
+        scan = LedgerScan()
+        rows = iter(list(reversed(SAMPLE_LEDGER_ROWS)))
+        list(iter_rows_since(rows, self.CUTOFF, scan))
+        assert scan.before_mark == 2
+        assert scan.stopped_early is False
+        assert list(rows) == []
+
+    def test_unsorted_sheet_not_stopped(self):
+        scan = LedgerScan()
+        rows = [SAMPLE_LEDGER_ROWS[2], SAMPLE_LEDGER_ROWS[3], SAMPLE_LEDGER_ROWS[0], SAMPLE_LEDGER_ROWS[1]]
+        list(iter_rows_since(rows, self.CUTOFF, scan))
+        assert scan.before_mark == 2
+        assert scan.stopped_early is False
+
+    def test_rows_without_date_passed_through(self):
+        rows = [(None,) * 10, ("날짜 아님",) + (None,) * 9]
+        assert list(iter_rows_since(rows, self.CUTOFF, LedgerScan())) == rows
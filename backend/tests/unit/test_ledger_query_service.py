@@ -0,0 +1,28 @@
+"""
+ledger_query_service.py 페이지 커서 단위 테스트
+"""
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ledger_query_service import InvalidCursor, decode_cursor, encode_cursor
+
+
+class TestCursor:
+    def test_roundtrip(self):
+        when = datetime(2025, 1, 31, 23, 59, 59, 123456)
+        cursor = encode_cursor(SimpleNamespace(transaction_date=when, id=42))
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (when, 42)
+        assert decode_cursor(encode_cursor(SimpleNamespace(transaction_date=None, id=7))) == (None, 7)
+
+    @pytest.mark.parametrize("payload", [b"garbage", b'["2025-01-01", "x"]', b'["not a date", 1]', b"[1]", b'[null, true]'])
+    def test_invalid(self, payload):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(base64.urlsafe_b64encode(payload).decode())
+
+    def test_not_base64(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor("!!!")
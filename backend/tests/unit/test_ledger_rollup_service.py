@@ -0,0 +1,115 @@
+"""
+ledger_rollup_service.py 가계부 일 단위 롤업 단위 테스트
+
+증분 반영 결과가 ledger_transaction 전체로 다시 만든 롤업(rebuild_rollup)과 같은지 비교합니다.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.models.models import LedgerRollup, LedgerTransaction
+from app.services.ledger_loader import LEDGER_COLUMNS, bulk_insert_ledger_columns
+from app.services.ledger_rollup_service import (
+    add_to_rollup,
+    rebuild_rollup,
+    remove_from_rollup,
+    rollup_fact,
+    transaction_fact,
+)
+
+
+def _snapshot(db) -> list:
+    return sorted(
+        (r.day, r.transaction_type, r.category, r.subcategory, r.payment_method,
+         float(r.total), float(r.abs_total), r.count,
+         None if r.min_amount is None else float(r.min_amount),
+         None if r.max_amount is None else float(r.max_amount))
+        for r in db.query(LedgerRollup)
+    )
+
+
+def _assert_matches_rebuild(db) -> list:
+    db.flush()
+    incremental = _snapshot(db)
+    rebuild_rollup(db)
+    assert _snapshot(db) == incremental
+    return incremental
+
+
+def _tx(db, day=datetime(2025, 1, 5, 9), amount=-1000, **fields) -> LedgerTransaction:
+    values = {"transaction_type": "지출", "category": "식비", "payment_method": "국민카드", "description": str(amount)}
+    values.update(fields)
+    tx = LedgerTransaction(transaction_date=day, amount=amount, **values)
+    db.add(tx)
+    db.flush()
+    add_to_rollup(db, [transaction_fact(tx)])
+    return tx
+
+
+def _columns(rows: list) -> dict:
+    return {col: [row.get(col) for row in rows] for col in LEDGER_COLUMNS}
+
+
+def _delete(db, tx: LedgerTransaction) -> None:
+    fact = transaction_fact(tx)
+    db.delete(tx)
+    db.flush()
+    remove_from_rollup(db, [fact])
+
+
+class TestRollupFact:
+    def test_key_and_amount(self):
+        key, amount = rollup_fact(datetime(2025, 1, 5, 23, 59), "지출", None, "", "현금", -1234.565)
+        assert key == (date(2025, 1, 5), "지출", "", "", "현금")
+        assert amount == Decimal("-1234.57")
+
+    def test_undated_not_rolled_up(self):
+        assert rollup_fact(None, "지출", "식비", None, None, 100) is None
+
+
+class TestIncrementalRollup:
+    def test_adds_merge_into_bucket(self, db_session):
+        _tx(db_session, amount=-1000)
+        _tx(db_session, amount=-300, day=datetime(2025, 1, 5, 20))
+        _tx(db_session, amount=None, description="금액 없음")
+        _tx(db_session, amount=-50, category=None)
+        rows = _assert_matches_rebuild(db_session)
+        assert rows == [
+            (date(2025, 1, 5), "지출", "", "", "국민카드", -50.0, 50.0, 1, -50.0, -50.0),
+            (date(2025, 1, 5), "지출", "식비", "", "국민카드", -1300.0, 1300.0, 3, -1000.0, -300.0),
+        ]
+
+    def test_removing_min_or_max_recomputes_bucket(self, db_session):
+        low = _tx(db_session, amount=-1000)
+        _tx(db_session, amount=-500)
+        high = _tx(db_session, amount=-100)
+        _delete(db_session, low)
+        _delete(db_session, high)
+        assert _assert_matches_rebuild(db_session)[0][5:] == (-500.0, 500.0, 1, -500.0, -500.0)
+
+    def test_removing_last_transaction_drops_bucket(self, db_session):
+        tx = _tx(db_session)
+        _tx(db_session, day=None)
+        _delete(db_session, tx)
+        assert _assert_matches_rebuild(db_session) == []
+
+    def test_update_moves_between_buckets(self, db_session):
+        tx = _tx(db_session, amount=-1000)
+        _tx(db_session, amount=-200)
+        previous = transaction_fact(tx)
+        tx.category, tx.amount = "교통", -700
+        db_session.flush()
+        remove_from_rollup(db_session, [previous])
+        add_to_rollup(db_session, [transaction_fact(tx)])
+        rows = _assert_matches_rebuild(db_session)
+        assert [(r[2], r[5], r[8]) for r in rows] == [("교통", -700.0, -700.0), ("식비", -200.0, -200.0)]
+
+    def test_bulk_insert_rolls_up_only_inserted_rows(self, db_session):
+        rows = [
+            {"transaction_date": datetime(2025, 2, day % 3 + 1), "transaction_type": "지출", "category": "식비",
+             "description": f"거래 {day}", "amount": -100 * day}
+            for day in range(1, 8)
+        ]
+        bulk_insert_ledger_columns(db_session, _columns(rows[:4]), batch_size=3)
+        bulk_insert_ledger_columns(db_session, _columns(rows), batch_size=3)  # 앞 4건은 중복으로 건너뜀
+        snapshot = _assert_matches_rebuild(db_session)
+        assert sum(r[7] for r in snapshot) == 7
@@ -0,0 +1,30 @@
+"""
+ledger_search_service.py trigram 유사도 단위 테스트 (pg_trgm word_similarity와 같은 값)
+"""
+import pytest
+
+from app.services.ledger_search_service import _ordered_trigrams, normalize_query, word_similarity
+
+
+class TestTrigrams:
+    def test_words_padded_and_lowercased(self):
+        assert _ordered_trigrams("Ab, c") == ["  a", " ab", "ab ", "  c", " c "]
+        assert _ordered_trigrams("!!") == []
+
+    def test_normalize_query(self):
+        assert normalize_query("  스타벅스   강남 ") == "스타벅스 강남"
+
+
+class TestWordSimilarity:
+    @pytest.mark.parametrize("q, document, expected", [
+        ("word", "two words", 0.8),           # pg_trgm 문서 예시
+        ("스타벅스", "스타벅스 강남점", 1.0),
+        ("스타벅수", "스타벅스 강남점", 0.6),
+        ("택시", "카카오택시", 1 / 3),         # 단어 중간은 앞 공백 trigram이 달라 낮음 (부분 일치로 찾음)
+        ("", "아무 내용", 0.0),
+    ])
+    def test_values(self, q, document, expected):
+        assert word_similarity(q, document) == pytest.approx(expected)
+
+    def test_best_extent_wins(self):
+        assert word_similarity("강남", "스타벅스 강남점 강남") == pytest.approx(1.0)
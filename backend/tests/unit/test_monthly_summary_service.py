@@ -0,0 +1,40 @@
+"""
+monthly_summary_service.py 누적 순수익 갱신 단위 테스트
+"""
+from app.models import MonthlySummary
+from app.services.monthly_summary_service import refresh_cumulative_net_income
+
+
+def _seed(db_session, rows):
+    for year, month, net in rows:
+        db_session.add(MonthlySummary(year=year, month=month, net_income=net, cumulative_net_income=-1))
+    db_session.flush()
+
+
+def _cumulative(db_session):
+    return {
+        (s.year, s.month): (float(s.cumulative_net_income) if s.cumulative_net_income is not None else None)
+        for s in db_session.query(MonthlySummary).all()
+    }
+
+
+class TestRefreshCumulativeNetIncome:
+    def test_recomputes_from_earliest_changed_month(self, db_session):
+        _seed(db_session, [(2025, 1, 10), (2025, 2, 20), (2025, 3, 30)])
+        assert refresh_cumulative_net_income(db_session, [(2025, 3), (2025, 2)]) == 2
+        values = _cumulative(db_session)
+        # 1월은 변경 범위 밖이므로 그대로
+        assert values == {(2025, 1): -1, (2025, 2): 30, (2025, 3): 60}
+
+    def test_other_years_untouched(self, db_session):
+        _seed(db_session, [(2024, 12, 5), (2025, 1, 10), (2026, 1, 7)])
+        refresh_cumulative_net_income(db_session, [(2025, 1)])
+        assert _cumulative(db_session) == {(2024, 12): -1, (2025, 1): 10, (2026, 1): -1}
+
+    def test_resets_per_year_and_null_counts_as_zero(self, db_session):
+        _seed(db_session, [(2024, 11, 5), (2024, 12, None), (2025, 1, 10), (2025, 2, 1)])
+        refresh_cumulative_net_income(db_session, [(2024, 11), (2025, 1)])
+        assert _cumulative(db_session) == {(2024, 11): 5, (2024, 12): 5, (2025, 1): 10, (2025, 2): 11}
+
+    def test_no_changes(self, db_session):
+        assert refresh_cumulative_net_income(db_session, []) == 0
@@ -0,0 +1,149 @@
+"""
+parse_cache.py 파싱 결과 디스크 캐시 단위 테스트
+"""
+import hashlib
+import os
+from datetime import datetime
+
+from app.services import parse_cache
+from app.services.parse_cache import (
+    append_object,
+    clear_cache,
+    iter_spool,
+    load_entry,
+    load_spool,
+    new_spool_file,
+    source_sha256,
+    store_entry,
+    store_spool,
+)
+
+
+def _batch(size: int) -> dict:
+    return {"v": [float(i) for i in range(size)], "transaction_date": [datetime(2025, 1, 1)] * size}
+
+
+def _age(cache_dir, name: str, seconds: int) -> None:
+    path = cache_dir / (name + parse_cache.CACHE_SUFFIX)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+
+# ────────────────────────────────────────────
+# 저장 · 읽기 · LRU
+# ────────────────────────────────────────────
+
+class TestStoreLoad:
+    def test_roundtrip_through_disk(self, parse_cache_dir):
+        rows = {3: ("항목", 1.5, None, datetime(2025, 3, 1, 9, 30))}
+        assert store_entry("abc.summary", {"sheet": True}, [rows])
+        entry = load_entry("abc.summary")
+        assert entry.meta == {"sheet": True}
+        assert entry.objects == [rows]
+        assert load_entry("missing") is None
+
+    def test_meta_only_entry(self, parse_cache_dir):
+        assert store_entry("abc", {"sheet": False})
+        assert load_entry("abc").objects == []
+
+    def test_disabled(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_BYTES", 0)
+        assert not store_entry("abc", {}, [_batch(1)])
+        assert load_entry("abc") is None
+        assert not parse_cache_dir.exists()
+
+    def test_unpicklable_not_stored(self, parse_cache_dir):
+        assert not store_entry("x", {}, [lambda: None])
+        assert not parse_cache_dir.exists() or not os.listdir(parse_cache_dir)
+
+    def test_corrupt_entry_removed(self, parse_cache_dir):
+        store_entry("abc", {}, [_batch(10)])
+        path = parse_cache_dir / ("abc" + parse_cache.CACHE_SUFFIX)
+        path.write_bytes(path.read_bytes()[:-16])
+        assert load_entry("abc") is None
+        assert not path.exists()
+
+    def test_old_format_version_is_miss(self, parse_cache_dir, monkeypatch):
+        store_entry("abc", {}, [_batch(1)])
+        monkeypatch.setattr(parse_cache, "CACHE_FORMAT_VERSION", parse_cache.CACHE_FORMAT_VERSION + 1)
+        assert load_entry("abc") is None
+
+    def test_least_recently_used_evicted(self, parse_cache_dir, monkeypatch):
+        store_entry("probe", {}, [_batch(1000)])
+        size = (parse_cache_dir / ("probe" + parse_cache.CACHE_SUFFIX)).stat().st_size
+        clear_cache()
+        monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_BYTES", size * 2)
+        store_entry("a", {}, [_batch(1000)])
+        store_entry("b", {}, [_batch(1000)])
+        _age(parse_cache_dir, "a", 20)
+        _age(parse_cache_dir, "b", 10)
+        assert load_entry("a") is not None  # a 사용 → b가 가장 오래 쓰지 않은 항목
+        store_entry("c", {}, [_batch(1000)])
+        assert load_entry("b") is None
+        assert load_entry("a") is not None and load_entry("c") is not None
+
+    def test_entry_larger_than_cap_not_stored(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_BYTES", 100)
+        assert not store_entry("big", {}, [_batch(1000)])
+
+    def test_clear_cache(self, parse_cache_dir):
+        store_entry("a", {}, [_batch(1)])
+        store_entry("b", {}, [_batch(1)])
+        assert clear_cache() == 2
+        assert load_entry("a") is None
+
+
+# ────────────────────────────────────────────
+# 스풀 파일
+# ────────────────────────────────────────────
+
+def _spool(*batches: dict) -> str:
+    path = new_spool_file()
+    with open(path, "wb") as f:
+        for batch in batches:
+            append_object(f, batch)
+    return path
+
+
+class TestSpool:
+    def test_batches_read_one_by_one(self, spool_dir):
+        path = _spool(_batch(3), _batch(2))
+        assert os.path.dirname(path) == str(spool_dir)
+        batches = iter_spool(path)
+        assert next(batches)["v"] == [0.0, 1.0, 2.0]
+        assert next(batches)["v"] == [0.0, 1.0]
+        assert next(batches, None) is None
+
+    def test_empty_file(self, spool_dir):
+        assert list(iter_spool(new_spool_file())) == []
+
+    def test_store_and_load_copies(self, parse_cache_dir, spool_dir):
+        path = _spool(_batch(3))
+        assert store_spool("abc.ledger.all", {"rows": 3}, path)
+        os.remove(path)  # 캐시 항목은 복사본이라 원본을 지워도 남음
+        meta, loaded = load_spool("abc.ledger.all")
+        clear_cache()  # 캐시에서 지워져도 받은 스풀 파일은 읽을 수 있음
+        assert meta == {"rows": 3}
+        assert [batch["v"] for batch in iter_spool(loaded)] == [[0.0, 1.0, 2.0]]
+        assert load_spool("abc.ledger.all") is None
+
+    def test_truncated_entry_removed(self, parse_cache_dir, spool_dir):
+        store_spool("abc", {}, _spool(_batch(10)))
+        cached = parse_cache_dir / ("abc" + parse_cache.CACHE_SUFFIX)
+        cached.write_bytes(cached.read_bytes()[:-16])
+        assert load_spool("abc") is None
+        assert not cached.exists()
+
+    def test_disabled(self, parse_cache_dir, spool_dir, monkeypatch):
+        path = _spool(_batch(1))
+        monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_BYTES", 0)
+        assert not store_spool("abc", {}, path)
+        assert load_spool("abc") is None
+
+
+class TestSourceSha256:
+    def test_path_and_bytes_match(self, tmp_path):
+        content = os.urandom(3 * 1024 * 1024 + 7)
+        path = tmp_path / "a.xlsx"
+        path.write_bytes(content)
+        assert source_sha256(str(path)) == source_sha256(content) == hashlib.sha256(content).hexdigest()
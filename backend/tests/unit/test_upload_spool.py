@@ -0,0 +1,51 @@
+"""
+upload_spool.py 업로드 스풀 단위 테스트
+"""
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.upload_spool import SpooledUpload, UploadTooLarge, spool_upload
+
+
+def _spool(content: bytes, **kwargs) -> SpooledUpload:
+    return asyncio.run(spool_upload(UploadFile(io.BytesIO(content), filename="a.xlsx"), **kwargs))
+
+
+class TestSpooledUpload:
+    def test_small_upload_stays_in_memory(self):
+        with _spool(b"abc", threshold=10) as spooled:
+            assert not spooled.on_disk
+            assert spooled.source == b"abc"
+            assert spooled.size == 3
+            assert spooled.sha256 == hashlib.sha256(b"abc").hexdigest()
+
+    def test_large_upload_rolls_over_to_named_file(self):
+        content = os.urandom(200 * 1024)
+        spooled = _spool(content, threshold=64 * 1024)
+        assert spooled.on_disk
+        path = spooled.source
+        with open(path, "rb") as f:
+            assert f.read() == content
+        assert spooled.sha256 == hashlib.sha256(content).hexdigest()
+        spooled.close()
+        assert not os.path.exists(path)
+        spooled.close()
+
+    def test_too_large_rejected(self):
+        with pytest.raises(UploadTooLarge):
+            _spool(b"x" * 5000, max_bytes=4096)
+
+    def test_exact_limit_allowed(self):
+        with _spool(b"x" * 4096, max_bytes=4096) as spooled:
+            assert spooled.size == 4096
+
+    def test_zip_signature(self, banksalad_xlsx):
+        with _spool(banksalad_xlsx, threshold=1024) as spooled:
+            assert spooled.on_disk and spooled.is_zipfile()
+        with _spool(b"not an xlsx") as spooled:
+            assert not spooled.is_zipfile()
@@ -0,0 +1,326 @@
+"""
+workbook_parser.py 시트 파서 단위 테스트
+"""
+import io
+import os
+import pickle
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from app.services import parse_cache, workbook_parser
+from app.services.workbook_parser import (
+    WorkbookLoadError,
+    locate_summary_sections,
+    month_totals_by_type,
+    parse_cashflow_row,
+    parse_workbook,
+    parse_summary_sheet,
+    parse_workbooks,
+)
+from tests.conftest import SAMPLE_LEDGER_ROWS, build_banksalad_workbook, read_ledger_columns
+
+MONTHS = ["2025-01", "2025-02"]
+
+
+def _item(name: str, total: float = 100.0, item_type: str = "지출") -> dict:
+    return {
+        "item_name": name,
+        "item_type": item_type,
+        "total": total,
+        "monthly_average": total / 2,
+        "monthly_data": {"2025-01": total / 2, "2025-02": total / 2},
+    }
+
+
+# ────────────────────────────────────────────
+# parse_cashflow_row
+# ────────────────────────────────────────────
+
+class TestParseCashflowRow:
+    def test_total_rows_skipped(self):
+        assert parse_cashflow_row(("월수입 총계", 0, 0, 1, 2), "수입", MONTHS) is None
+        assert parse_cashflow_row((None, 0, 0, 1, 2), "수입", MONTHS) is None
+        assert parse_cashflow_row(None, "수입", MONTHS) is None
+
+    def test_zero_total_replaced_by_monthly_sum(self):
+        item = parse_cashflow_row(("식비", 0, 0, 100, 300), "지출", MONTHS)
+        assert item["monthly_data"] == {"2025-01": 100.0, "2025-02": 300.0}
+        assert item["total"] == 400.0
+        assert item["monthly_average"] == 200.0
+
+
+# ────────────────────────────────────────────
+# month_totals_by_type
+# ────────────────────────────────────────────
+
+class TestMonthTotalsByType:
+    def test_column_sums_per_type(self):
+        items = [
+            {**_item("급여", item_type="수입"), "monthly_data": {"2025-01": 300.0, "2025-02": 310.0}},
+            {**_item("식비"), "monthly_data": {"2025-01": 50.0}},
+            {**_item("교통"), "monthly_data": {"2025-01": 10.0, "2025-02": 20.0}},
+        ]
+        totals = month_totals_by_type(items, MONTHS)
+        assert totals == {"수입": [300.0, 310.0], "지출": [60.0, 20.0]}
+
+    def test_repeated_name_counted_once(self):
+        items = [_item("식비", 100.0), _item("식비", 40.0)]
+        assert month_totals_by_type(items, MONTHS) == {"지출": [20.0, 20.0]}
+
+    def test_no_items(self):
+        assert month_totals_by_type([], MONTHS) == {}
+
+
+# ────────────────────────────────────────────
+# locate_summary_sections
+# ────────────────────────────────────────────
+
+def _long_export(extra_items: int) -> bytes:
+    """지출 항목을 extra_items개 더 넣어 이후 섹션이 아래로 밀린 export."""
+    wb = openpyxl.load_workbook(io.BytesIO(build_banksalad_workbook()))
+    ws = wb["뱅샐현황"]
+    ws.insert_rows(16, amount=extra_items)
+    for i in range(extra_items):
+        for col, v in enumerate([f"기타지출{i}", 0, 0, 1000, 1000, 1000], start=2):
+            ws.cell(row=16 + i, column=col, value=v)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class TestLocateSummarySections:
+    def _sheet(self, content: bytes):
+        from app.services.excel_reader import iter_sheet_rows, open_workbook
+        wb = open_workbook(io.BytesIO(content))
+        try:
+            return locate_summary_sections(iter_sheet_rows(wb, "뱅샐현황", min_col=2, max_col=16))
+        finally:
+            wb.close()
+
+    def test_spans_and_fingerprint(self):
+        sheet = self._sheet(build_banksalad_workbook())
+        assert sheet.fingerprint == [
+            (2, "1.고객정보"), (9, "2.현금흐름현황"), (40, "3.재무현황"), (72, "투자성 자산"),
+        ]
+        assert sheet.spans["customer"] == (6, 6)
+        assert sheet.spans["cash_flow"] == (11, 18)
+        assert sheet.spans["financial_snapshot"] == (40, 74)
+        assert sheet.spans["liabilities"] == (40, 45)
+        assert sheet.spans["investment"] == (72, 73)
+        assert sheet.month_labels == ["2025-01", "2025-02", "2025-03"]
+
+    def test_customer_row_follows_label(self):
+        wb = openpyxl.load_workbook(io.BytesIO(build_banksalad_workbook()))
+        wb["뱅샐현황"].insert_rows(3, amount=2)  # 라벨과 헤더 사이에 행이 더 있는 export
+        buf = io.BytesIO()
+        wb.save(buf)
+        sheet = self._sheet(buf.getvalue())
+        assert sheet.spans["customer"] == (8, 8)
+        assert workbook_parser.parse_customer(sheet)["name"] == "홍길동"
+
+    def test_customer_header_without_section_label(self):
+        wb = openpyxl.load_workbook(io.BytesIO(build_banksalad_workbook()))
+        wb["뱅샐현황"]["B2"] = None
+        buf = io.BytesIO()
+        wb.save(buf)
+        assert self._sheet(buf.getvalue()).spans["customer"] == (6, 6)
+
+    def test_missing_customer_section(self):
+        wb = openpyxl.load_workbook(io.BytesIO(build_banksalad_workbook()))
+        wb["뱅샐현황"].delete_rows(2, 5)
+        buf = io.BytesIO()
+        wb.save(buf)
+        sheet = self._sheet(buf.getvalue())
+        assert "customer" not in sheet.spans
+        assert workbook_parser.parse_customer(sheet) is None
+
+    def test_empty_rows_not_kept(self):
+        sheet = self._sheet(build_banksalad_workbook())
+        assert all(any(v is not None for v in r) for r in sheet.rows.values())
+        assert 30 not in sheet.rows
+
+    def test_sections_beyond_row_120(self):
+        parsed = parse_summary_sheet(_long_export(150))
+        assert parsed.errors == {}
+        assert len(parsed.cash_flow) == 4 + 150
+        assert [name for name, _ in parsed.investment["items"]] == ["삼성전자", "미국 S&P500"]
+        assert parsed.financial_snapshot["total_assets"] == 6200000
+        assert parsed.financial_snapshot["snapshot_data"]["_liabilities"] == {
+            "신용대출": [{"name": "카카오뱅크 대출", "amount": 500000.0}],
+        }
+        expense = {m["month"]: m["expense"] for m in parsed.monthly_summary}
+        assert expense[1] == 300000 + 50000 + 150 * 1000
+
+
+# ────────────────────────────────────────────
+# parse_workbook
+# ────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def _spool_dir(spool_dir):
+    """가계부 스풀 파일을 테스트 디렉터리에 씀 (캐시는 parse_cache_dir 픽스처를 쓸 때만 켜짐)."""
+
+
+def _without_stages(parsed):
+    """
+    프로파일 수치(시간 · 메모리)와 가계부 스풀 파일 경로는 실행마다 달라지므로 비교에서 제외하고,
+    가계부는 스풀 파일에서 읽은 행으로 비교
+    """
+    for sheet in (parsed.summary, parsed.ledger):
+        if sheet is not None:
+            sheet.stages = []
+    ledger = parsed.ledger
+    if ledger is None:
+        return parsed.summary, None
+    return parsed.summary, (
+        read_ledger_columns(ledger), ledger.max_date, ledger.before_mark, ledger.stopped_early,
+    )
+
+
+class TestParseWorkbook:
+    def test_pool_matches_inline(self, monkeypatch):
+        content = build_banksalad_workbook()
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        inline = parse_workbook(content)
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 2)
+        try:
+            pooled = parse_workbook(content)
+        finally:
+            workbook_parser.shutdown_parse_workers()
+        assert _without_stages(pooled) == _without_stages(inline)
+        pooled.discard()
+
+    def test_result_is_plain_and_picklable(self, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        parsed = parse_workbook(build_banksalad_workbook())
+        assert pickle.loads(pickle.dumps(parsed)) == parsed
+        assert parsed.summary.errors == {}
+        assert parsed.summary.customer["name"] == "홍길동"
+        assert len(parsed.ledger) == len(SAMPLE_LEDGER_ROWS)
+        assert all(read_ledger_columns(parsed.ledger)["dedup_hash"])
+
+    def test_ledger_returned_as_bounded_batches(self, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        monkeypatch.setattr(workbook_parser, "LEDGER_BATCH_ROWS", 3)
+        ledger = parse_workbook(build_banksalad_workbook(), summary=False).ledger
+        # 행은 스풀 파일에 있고 결과 객체에는 경로 · 건수만 담김
+        assert [len(batch["dedup_hash"]) for batch in ledger.batches()] == [3, 1]
+        assert ledger.max_date == datetime(2025, 3, 2)
+        paths = list(ledger.paths)
+        ledger.discard()
+        assert not any(os.path.exists(path) for path in paths)
+
+    def test_missing_sheet_is_none(self, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        parsed = parse_workbook(build_banksalad_workbook(with_summary=False))
+        assert parsed.summary is None
+        assert parsed.ledger is not None
+
+    def test_unreadable_file(self, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        with pytest.raises(WorkbookLoadError):
+            parse_workbook(b"not an xlsx")
+
+
+class TestParseWorkbooks:
+    def test_matches_single_parses_in_order(self, monkeypatch):
+        sources = {
+            "b.xlsx": build_banksalad_workbook(ledger_rows=SAMPLE_LEDGER_ROWS[:1]),
+            "a.xlsx": build_banksalad_workbook(),
+        }
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 2)
+        try:
+            parsed = parse_workbooks(sources)
+        finally:
+            workbook_parser.shutdown_parse_workers()
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        assert list(parsed) == ["b.xlsx", "a.xlsx"]
+        for name, content in sources.items():
+            assert _without_stages(parsed[name]) == _without_stages(parse_workbook(content))
+            parsed[name].discard()
+
+    def test_unreadable_file_named(self, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        with pytest.raises(WorkbookLoadError, match="broken.xlsx"):
+            parse_workbooks({"ok.xlsx": build_banksalad_workbook(), "broken.xlsx": b"not an xlsx"})
+
+
+# ────────────────────────────────────────────
+# 파싱 캐시
+# ────────────────────────────────────────────
+
+def _no_workbook(source):
+    raise AssertionError("캐시 적중 시 워크북을 열면 안 됨")
+
+
+class TestParseCache:
+    def test_second_parse_served_from_cache(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        content = _long_export(30)
+        first = parse_workbook(content)
+        monkeypatch.setattr(workbook_parser, "_open", _no_workbook)
+        second = parse_workbook(content)
+        assert "cache_load" in {stage["stage"] for stage in second.ledger.stages}
+        assert _without_stages(second) == _without_stages(first)
+
+    def test_section_parsers_rerun_on_cached_rows(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        content = build_banksalad_workbook()
+        parse_workbook(content)
+        monkeypatch.setattr(workbook_parser, "_open", _no_workbook)
+        monkeypatch.setattr(workbook_parser, "parse_customer", lambda sheet: {"name": "수정된 파서"})
+        assert parse_workbook(content).summary.customer == {"name": "수정된 파서"}
+
+    def test_ledger_cached_per_since(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        rows = sorted(SAMPLE_LEDGER_ROWS, key=lambda r: r[0], reverse=True)
+        content = build_banksalad_workbook(ledger_rows=rows)
+        since = datetime(2025, 1, 20)
+        expected = parse_workbook(content, summary=False, ledger_since=since).ledger
+        monkeypatch.setattr(workbook_parser, "_open", _no_workbook)
+        cached = parse_workbook(content, summary=False, ledger_since=since).ledger
+        assert read_ledger_columns(cached) == read_ledger_columns(expected)
+        assert (len(cached), cached.max_date) == (len(expected), expected.max_date)
+        assert (cached.before_mark, cached.stopped_early) == (expected.before_mark, expected.stopped_early)
+        with pytest.raises(AssertionError):  # 다른 기준일은 시트를 다시 읽음
+            parse_workbook(content, summary=False, ledger_since=datetime(2025, 2, 1))
+
+    def test_cache_hit_survives_eviction(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        content = build_banksalad_workbook()
+        parse_workbook(content, summary=False).discard()
+        monkeypatch.setattr(workbook_parser, "_open", _no_workbook)
+        cached = parse_workbook(content, summary=False).ledger
+        parse_cache.clear_cache()
+        assert len(read_ledger_columns(cached)["transaction_date"]) == len(SAMPLE_LEDGER_ROWS)
+
+    def test_spool_files_outside_cache_dir(self, parse_cache_dir, spool_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_BYTES", 0)
+        ledger = parse_workbook(build_banksalad_workbook(), summary=False).ledger
+        assert [os.path.dirname(path) for path in ledger.paths] == [str(spool_dir)]
+        assert not parse_cache_dir.exists()
+        ledger.discard()
+        assert os.listdir(spool_dir) == []
+
+    def test_partial_entry_not_used_for_full_scan(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        content = build_banksalad_workbook()
+        parse_workbook(content, ledger_since=datetime(2025, 2, 1))
+        assert len(parse_workbook(content).ledger) == len(SAMPLE_LEDGER_ROWS)
+
+    def test_missing_sheet_cached(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        content = build_banksalad_workbook(with_summary=False)
+        parse_workbook(content)
+        monkeypatch.setattr(workbook_parser, "_open", _no_workbook)
+        assert parse_workbook(content).summary is None
+
+    def test_keyed_by_given_content_hash(self, parse_cache_dir, monkeypatch):
+        monkeypatch.setattr(workbook_parser, "PARSE_PROCESSES", 0)
+        parse_workbook(build_banksalad_workbook(), content_sha256="upload-sha").discard()
+        assert sorted(os.listdir(parse_cache_dir)) == [
+            "upload-sha.ledger.all.mmpc", "upload-sha.summary.mmpc",
+        ]
@@ -8,12 +8,13 @@ import type {
   InvestmentStatus, InvestmentStatusCreate, InvestmentStatusUpdate,
   FinancialSnapshot,
   LedgerTransaction, LedgerTransactionCreate, LedgerTransactionUpdate,
+  LedgerAggregatePeriod, LedgerAggregateDimension, LedgerAggregateResponse, LedgerSearchHit,
   UploadHistory,
 } from '@/types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8051';
 
-async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T> {
+async function request(endpoint: string, options?: RequestInit): Promise<Response> {
   try {
     const response = await fetch(`${API_URL}${endpoint}`, {
       ...options,
@@ -27,10 +28,7 @@ async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T>
       const error = await response.json().catch(() => ({ detail: 'An error occurred' }));
       throw new Error(error.detail || `HTTP error! status: ${response.status}`);
     }
-
-    // DELETE 등 본문이 없는 응답 처리
-    const text = await response.text();
-    return text ? JSON.parse(text) : ({} as T);
+    return response;
   } catch (error) {
     if (error instanceof TypeError && error.message === 'Failed to fetch') {
       throw new Error(`백엔드 서버에 연결할 수 없습니다. API URL: ${API_URL}${endpoint}`);
@@ -39,6 +37,13 @@ async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T>
   }
 }
 
+async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T> {
+  const response = await request(endpoint, options);
+  // DELETE 등 본문이 없는 응답 처리
+  const text = await response.text();
+  return text ? JSON.parse(text) : ({} as T);
+}
+
 // ── Customer ─────────────────────────────────────────────────
 export const getCustomers = (): Promise<Customer[]> =>
   fetchAPI('/api/customers');
@@ -135,12 +140,68 @@ export const getFinancialSnapshot = (): Promise<FinancialSnapshot | null> =>
   fetchAPI('/api/financial-snapshot');
 
 // ── LedgerTransaction ─────────────────────────────────────────
-export const getLedgerTransactions = (params?: { transaction_type?: string; category?: string }): Promise<LedgerTransaction[]> => {
+export type LedgerTransactionQuery = {
+  transaction_type?: string;
+  category?: string;
+  date_from?: string;
+  date_to?: string;
+};
+
+function ledgerQueryString(params?: LedgerTransactionQuery & { q?: string; cursor?: string; limit?: number }): string {
   const query = new URLSearchParams();
+  if (params?.q) query.set('q', params.q);
   if (params?.transaction_type) query.set('transaction_type', params.transaction_type);
   if (params?.category) query.set('category', params.category);
+  if (params?.date_from) query.set('date_from', params.date_from);
+  if (params?.date_to) query.set('date_to', params.date_to);
+  if (params?.cursor) query.set('cursor', params.cursor);
+  if (params?.limit) query.set('limit', String(params.limit));
   const qs = query.toString();
-  return fetchAPI(`/api/ledger-transactions${qs ? `?${qs}` : ''}`);
+  return qs ? `?${qs}` : '';
+}
+
+export const getLedgerTransactions = (params?: LedgerTransactionQuery): Promise<LedgerTransaction[]> =>
+  fetchAPI(`/api/ledger-transactions${ledgerQueryString(params)}`);
+
+// 거래일 최신순 한 페이지. nextCursor가 null이면 마지막 페이지
+export const getLedgerTransactionsPage = async (
+  params: LedgerTransactionQuery & { cursor?: string; limit?: number },
+): Promise<{ items: LedgerTransaction[]; nextCursor: string | null }> => {
+  const response = await request(`/api/ledger-transactions${ledgerQueryString(params)}`);
+  return { items: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
+};
+
+// 내용 · 메모 · 분류 · 결제수단 검색 (부분 일치 + 오타 허용). 점수 · 거래일 최신순
+export const searchLedgerTransactions = (
+  q: string,
+  params?: LedgerTransactionQuery & { limit?: number },
+): Promise<LedgerSearchHit[]> =>
+  fetchAPI(`/api/ledger-transactions/search${ledgerQueryString({ ...params, q })}`);
+
+// 내보내기 다운로드 URL (서버가 배치 단위로 스트리밍하므로 fetch 대신 링크로 받음)
+export const ledgerExportUrl = (format: 'csv' | 'ndjson', params?: LedgerTransactionQuery): string => {
+  const qs = ledgerQueryString(params);
+  return `${API_URL}/api/ledger-transactions/export${qs ? `${qs}&` : '?'}format=${format}`;
+};
+
+// 기간 · 분류별 합계 (서버 GROUP BY). date_to는 해당 날짜 포함
+export const getLedgerAggregate = (params: {
+  period?: LedgerAggregatePeriod;
+  group_by?: LedgerAggregateDimension[];
+  date_from?: string;
+  date_to?: string;
+  transaction_type?: string;
+  category?: string;
+}): Promise<LedgerAggregateResponse> => {
+  const query = new URLSearchParams();
+  if (params.period) query.set('period', params.period);
+  params.group_by?.forEach((d) => query.append('group_by', d));
+  if (params.date_from) query.set('date_from', params.date_from);
+  if (params.date_to) query.set('date_to', params.date_to);
+  if (params.transaction_type) query.set('transaction_type', params.transaction_type);
+  if (params.category) query.set('category', params.category);
+  const qs = query.toString();
+  return fetchAPI(`/api/ledger-transactions/aggregate${qs ? `?${qs}` : ''}`);
 };
 
 export const createLedgerTransaction = (data: LedgerTransactionCreate): Promise<LedgerTransaction> =>
@@ -152,44 +213,127 @@ export const updateLedgerTransaction = (id: number, data: LedgerTransactionUpdat
 export const deleteLedgerTransaction = (id: number): Promise<void> =>
   fetchAPI(`/api/ledger-transactions/${id}`, { method: 'DELETE' });
 
+export type ImportProfile = {
+  stages: { stage: string; seconds: number; rows: number; rss_kb: number | null; peak_kb: number | null }[];
+  total_seconds: number;
+  memory_scope: 'process';
+};
+
 export type ImportBanksaladResult = {
   customer: { updated: number; inserted: number };
   cash_flow: { updated: number; inserted: number };
   monthly_summary: { updated: number; inserted: number };
   investment: { updated: number; inserted: number };
   financial_snapshot: { updated: number; inserted: number };
-  ledger: { inserted: number; skipped: number };
+  ledger: { inserted: number; skipped: number; before_mark?: number };
+  // 실패해서 되돌린 섹션 → 사유 (나머지 섹션은 반영됨)
+  errors?: Record<string, string>;
+  // 단계별 소요 시간 · 행 수 · 최대 메모리
+  profile?: ImportProfile;
+  // 같은 파일을 다시 올리면 저장된 결과를 그대로 돌려줌
+  replay?: boolean;
+  replayed_upload_id?: number;
+  // 쓰기 단계 시작 전 앞에 있던 import 수 (바로 시작했으면 0)
+  queue_position?: number;
+  // zip import: 반영 순서(오래된 순)대로 파일별 날짜 범위 · 가계부 행 수 · 파싱 오류
+  files?: { name: string; date_range: string | null; ledger_rows: number | null; errors: Record<string, string> }[];
+};
+
+export type ImportJob<T> = {
+  id: string;
+  kind: 'banksalad' | 'banksalad_archive' | 'ledger';
+  filename: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  // 'waiting'이면 다른 import의 쓰기가 끝나기를 기다리는 중 (counts.queue_position = 앞에 있는 import 수)
+  stage: string | null;
+  counts: Record<string, number>;
+  result: T | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
 };
 
-export const importBanksaladExcel = (file: File): Promise<ImportBanksaladResult> => {
+export const getImportJob = <T>(jobId: string): Promise<ImportJob<T>> =>
+  fetchAPI(`/api/import/jobs/${jobId}`);
+
+const IMPORT_POLL_INTERVAL_MS = 1000;
+
+// import 작업을 제출하고 완료될 때까지 상태를 폴링하여 최종 결과를 반환
+const submitImportJob = async <T>(
+  endpoint: string,
+  file: File,
+  fallbackError: string,
+  onProgress?: (job: ImportJob<T>) => void,
+): Promise<T> => {
   const formData = new FormData();
   formData.append('file', file);
-  return fetch(`${API_URL}/api/import/banksalad-excel`, {
-    method: 'POST',
-    body: formData,
-  }).then(async res => {
-    if (!res.ok) {
-      const err = await res.json().catch(() => ({}));
-      throw new Error(err.detail ?? '가져오기 실패');
-    }
-    return res.json();
-  });
+  const res = await fetch(`${API_URL}${endpoint}`, { method: 'POST', body: formData });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail ?? fallbackError);
+  }
+  let job: ImportJob<T> = await res.json();
+  while (job.status === 'queued' || job.status === 'running') {
+    onProgress?.(job);
+    await new Promise(resolve => setTimeout(resolve, IMPORT_POLL_INTERVAL_MS));
+    job = await getImportJob<T>(job.id);
+  }
+  if (job.status === 'failed' || job.result === null) {
+    throw new Error(job.error ?? fallbackError);
+  }
+  return job.result;
+};
+
+export const importBanksaladExcel = (
+  file: File,
+  onProgress?: (job: ImportJob<ImportBanksaladResult>) => void,
+): Promise<ImportBanksaladResult> =>
+  submitImportJob('/api/import/banksalad-excel', file, '가져오기 실패', onProgress);
+
+// 여러 기간의 export를 묶은 zip — 기간 순으로 합쳐 한 번에 반영
+export const importBanksaladZip = (
+  file: File,
+  onProgress?: (job: ImportJob<ImportBanksaladResult>) => void,
+): Promise<ImportBanksaladResult> =>
+  submitImportJob('/api/import/banksalad-zip', file, '가져오기 실패', onProgress);
+
+type FieldChange = { from: number | string | null; to: number | string | null };
+
+// dry_run=true 결과: DB에 쓰지 않고 섹션별로 무엇이 바뀔지만 반환
+export type ImportBanksaladDiff = {
+  dry_run: true;
+  cleanup: { investment: number; monthly_summary: number };
+  customer?: { action: 'insert' | 'update' | 'unchanged'; changes?: Record<string, FieldChange> } | null;
+  cash_flow?: {
+    inserted: { item_name: string; item_type: string; total: number }[];
+    updated: { item_name: string; changes: Record<string, FieldChange | { months: string[] }> }[];
+    unchanged: number;
+  };
+  monthly_summary?: {
+    inserted: { year: number; month: number; income: number; expense: number; net_income: number }[];
+    updated: { year: number; month: number; changes: Record<string, FieldChange> }[];
+    unchanged: number;
+  };
+  investment?: {
+    updated: { id: number; product_name: string; from: number | null; to: number }[];
+    unchanged: number;
+    unmatched: string[];
+  };
+  financial_snapshot?: { action: 'insert' | 'update' | 'unchanged'; changes?: Record<string, FieldChange> } | null;
+  ledger?: { inserted: number; skipped: number; before_mark: number };
+  errors: Record<string, string>;
+  profile?: ImportProfile;
 };
 
+export const previewBanksaladExcel = (
+  file: File,
+  onProgress?: (job: ImportJob<ImportBanksaladDiff>) => void,
+): Promise<ImportBanksaladDiff> =>
+  submitImportJob('/api/import/banksalad-excel?dry_run=true', file, '미리보기 실패', onProgress);
+
 export const getUploadHistory = (): Promise<UploadHistory[]> =>
   fetchAPI('/api/upload-history');
 
-export const uploadLedgerExcel = (file: File): Promise<{ inserted: number; skipped: number }> => {
-  const formData = new FormData();
-  formData.append('file', file);
-  return fetch(`${API_URL}/api/ledger-transactions/import-excel`, {
-    method: 'POST',
-    body: formData,
-  }).then(async res => {
-    if (!res.ok) {
-      const err = await res.json().catch(() => ({}));
-      throw new Error(err.detail ?? 'Excel 업로드 실패');
-    }
-    return res.json();
-  });
-};
+export const uploadLedgerExcel = (file: File): Promise<{ inserted: number; skipped: number; before_mark?: number }> =>
+  submitImportJob('/api/ledger-transactions/import-excel', file, 'Excel 업로드 실패');
@@ -1,6 +1,6 @@
 import React, { useRef, useState } from 'react';
 import { useQuery, useQueryClient } from '@tanstack/react-query';
-import { importBanksaladExcel, getUploadHistory, type ImportBanksaladResult } from '@/lib/api';
+import { importBanksaladExcel, importBanksaladZip, getUploadHistory, type ImportBanksaladResult } from '@/lib/api';
 import type { UploadHistory } from '@/types';
 
 const cardStyle: React.CSSProperties = {
@@ -80,7 +80,8 @@ export default function ImportPage() {
     setError(null);
     setResult(null);
     try {
-      const res = await importBanksaladExcel(selectedFile);
+      const isZip = selectedFile.name.toLowerCase().endsWith('.zip');
+      const res = await (isZip ? importBanksaladZip : importBanksaladExcel)(selectedFile);
       setResult(res);
       // 모든 관련 쿼리 무효화하여 각 탭에 최신 데이터 반영
       queryClient.invalidateQueries();
@@ -126,7 +127,7 @@ export default function ImportPage() {
           color: 'var(--md-sys-light-on-surface-variant)',
           marginTop: 0, marginBottom: 16,
         }}>
-          지원 형식: <code>.xlsx</code> · 포함 시트: <strong>뱅샐현황</strong> · <strong>가계부 내역</strong>
+          지원 형식: <code>.xlsx</code> (여러 기간은 <code>.zip</code>으로 묶어서) · 포함 시트: <strong>뱅샐현황</strong> · <strong>가계부 내역</strong>
         </p>
 
         {/* 파일 선택 영역 */}
@@ -134,7 +135,7 @@ export default function ImportPage() {
           <input
             ref={fileInputRef}
             type="file"
-            accept=".xlsx,.xls"
+            accept=".xlsx,.xls,.zip"
             onChange={handleFileChange}
             style={{ display: 'none' }}
           />
@@ -254,6 +255,21 @@ export default function ImportPage() {
                 </tr>
               </tbody>
             </table>
+            {!!result.ledger.before_mark && (
+              <p style={{ font: 'var(--md-body-small)', color: 'var(--md-sys-light-on-surface-variant)', margin: '10px 0 0' }}>
+                가계부 내역 중 {result.ledger.before_mark}건은 이전 import에 이미 반영된 기간이라 검사하지 않았습니다.
+              </p>
+            )}
+            {result.files && (
+              <p style={{ font: 'var(--md-body-small)', color: 'var(--md-sys-light-on-surface-variant)', margin: '10px 0 0' }}>
+                반영 순서: {result.files.map(f => f.date_range ?? f.name).join(' → ')}
+              </p>
+            )}
+            {result.errors && Object.keys(result.errors).length > 0 && (
+              <p style={{ font: 'var(--md-body-small)', color: '#b91c1c', margin: '10px 0 0' }}>
+                건너뛴 섹션: {Object.entries(result.errors).map(([section, msg]) => `${section} (${msg})`).join(', ')}
+              </p>
+            )}
           </div>
         )}
       </div>
@@ -298,9 +314,15 @@ export default function ImportPage() {
                     </span>
                     <span style={{ font: 'var(--md-body-small)', color: 'var(--md-sys-light-on-surface-variant)', whiteSpace: 'nowrap', flexShrink: 0 }}>
                       {uploadedAt} · {fmtBytes(h.file_size)}
+                      {r?.profile && ` · ${r.profile.total_seconds.toFixed(1)}초`}
                     </span>
                   </div>
-                  {r && (
+                  {r && h.import_kind === 'ledger' && (
+                    <div style={{ display: 'flex', flexWrap: 'wrap', gap: 2 }}>
+                      <ResultBadge label="가계부" inserted={r.inserted} skipped={r.skipped} />
+                    </div>
+                  )}
+                  {r && h.import_kind !== 'ledger' && (
                     <div style={{ display: 'flex', flexWrap: 'wrap', gap: 2 }}>
                       <ResultBadge label="고객" updated={r.customer?.updated} inserted={r.customer?.inserted} />
                       <ResultBadge label="현금흐름" updated={r.cash_flow?.updated} inserted={r.cash_flow?.inserted} />
@@ -1,11 +1,14 @@
-import React, { useState, useMemo } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import React, { useState, useMemo, useEffect } from 'react';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import {
   BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer,
   PieChart, Pie, Cell,
 } from 'recharts';
 import {
-  getLedgerTransactions,
+  getLedgerTransactionsPage,
+  searchLedgerTransactions,
+  ledgerExportUrl,
+  getLedgerAggregate,
   createLedgerTransaction,
   updateLedgerTransaction,
   deleteLedgerTransaction,
@@ -15,6 +18,10 @@ import type { LedgerTransaction, LedgerTransactionCreate } from '@/types';
 import YearTabs from '@/components/YearTabs';
 
 type Tab = '목록' | '카테고리' | '월별';
+
+const PAGE_SIZE = 200;
+const SEARCH_LIMIT = 200;
+const SEARCH_DEBOUNCE_MS = 300;
 type TypeFilter = '전체' | '지출' | '수입' | '이체';
 
 const cardStyle: React.CSSProperties = {
@@ -122,6 +129,7 @@ export default function LedgerPage() {
   const [typeFilter, setTypeFilter] = useState<TypeFilter>('전체');
   const [categoryFilter, setCategoryFilter] = useState<string>('전체');
   const [searchText, setSearchText] = useState('');
+  const [searchQuery, setSearchQuery] = useState('');
   const [selectedYear, setSelectedYear] = useState<number | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [editTarget, setEditTarget] = useState<LedgerTransaction | null>(null);
@@ -131,12 +139,6 @@ export default function LedgerPage() {
 
   const queryClient = useQueryClient();
 
-  const { data: allItems = [], isLoading } = useQuery({
-    queryKey: ['ledger-transactions'],
-    queryFn: () => getLedgerTransactions(),
-    refetchInterval: 30000,
-  });
-
   const createMutation = useMutation({
     mutationFn: (data: LedgerTransactionCreate) => createLedgerTransaction(data),
     onSuccess: () => {
@@ -215,70 +217,105 @@ export default function LedgerPage() {
 
   const isSaving = createMutation.isPending || updateMutation.isPending;
 
-  const availableYears = useMemo(() => {
-    const years = new Set<number>();
-    allItems.forEach((i) => {
-      if (i.transaction_date) years.add(parseInt(i.transaction_date.slice(0, 4)));
-    });
-    return Array.from(years).sort();
-  }, [allItems]);
+  // 연도 목록 · 합계 · 차트는 서버 집계로 받음 (키가 'ledger-transactions'로 시작해 저장/삭제 시 함께 갱신)
+  const { data: yearAgg } = useQuery({
+    queryKey: ['ledger-transactions', 'aggregate', 'year'],
+    queryFn: () => getLedgerAggregate({ period: 'year' }),
+    refetchInterval: 30000,
+  });
+
+  const availableYears = useMemo(
+    () => (yearAgg?.rows ?? []).map((r) => parseInt(r.period!.slice(0, 4))),
+    [yearAgg],
+  );
 
   const effectiveYear = selectedYear ?? (availableYears.at(-1) ?? null);
+  const yearRange = effectiveYear
+    ? { date_from: `${effectiveYear}-01-01`, date_to: `${effectiveYear}-12-31` }
+    : {};
+
+  const { data: monthAgg } = useQuery({
+    queryKey: ['ledger-transactions', 'aggregate', 'month', effectiveYear],
+    queryFn: () => getLedgerAggregate({ period: 'month', group_by: ['transaction_type'], ...yearRange }),
+    refetchInterval: 30000,
+  });
+
+  const { data: categoryAgg } = useQuery({
+    queryKey: ['ledger-transactions', 'aggregate', 'category', effectiveYear],
+    queryFn: () => getLedgerAggregate({ group_by: ['transaction_type', 'category'], ...yearRange }),
+    refetchInterval: 30000,
+  });
 
-  const yearFiltered = useMemo(() => {
-    if (!effectiveYear) return allItems;
-    return allItems.filter((i) => i.transaction_date?.startsWith(String(effectiveYear)));
-  }, [allItems, effectiveYear]);
+  // 목록은 연도 · 타입 · 대분류 조건으로 서버에서 한 페이지씩 (커서 페이지)
+  const listFilters = {
+    ...yearRange,
+    transaction_type: typeFilter !== '전체' ? typeFilter : undefined,
+    category: categoryFilter !== '전체' ? categoryFilter : undefined,
+  };
+  const {
+    data: listPages, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage,
+  } = useInfiniteQuery({
+    queryKey: ['ledger-transactions', 'list', effectiveYear, typeFilter, categoryFilter],
+    queryFn: ({ pageParam }) => getLedgerTransactionsPage({ ...listFilters, cursor: pageParam, limit: PAGE_SIZE }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (last) => last.nextCursor ?? undefined,
+    enabled: yearAgg !== undefined,
+  });
+  const loadedItems = useMemo(() => listPages?.pages.flatMap(p => p.items) ?? [], [listPages]);
 
   const categories = useMemo(() => {
-    const cats = new Set(yearFiltered.map(i => i.category).filter(Boolean) as string[]);
+    const cats = new Set((categoryAgg?.rows ?? []).map(r => r.category).filter(Boolean) as string[]);
     return ['전체', ...Array.from(cats).sort()];
-  }, [yearFiltered]);
-
-  const filtered = useMemo(() => {
-    return yearFiltered.filter(item => {
-      if (typeFilter !== '전체' && item.transaction_type !== typeFilter) return false;
-      if (categoryFilter !== '전체' && item.category !== categoryFilter) return false;
-      if (searchText) {
-        const q = searchText.toLowerCase();
-        return (
-          item.description?.toLowerCase().includes(q) ||
-          item.category?.toLowerCase().includes(q) ||
-          item.subcategory?.toLowerCase().includes(q) ||
-          item.payment_method?.toLowerCase().includes(q)
-        );
-      }
-      return true;
-    });
-  }, [yearFiltered, typeFilter, categoryFilter, searchText]);
+  }, [categoryAgg]);
+
+  // 검색어는 입력이 멈춘 뒤 서버에서 내용 · 메모를 검색 (목록과 같은 연도 · 타입 · 대분류 조건)
+  useEffect(() => {
+    const timer = setTimeout(() => setSearchQuery(searchText.trim()), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchText]);
+
+  const { data: searchHits } = useQuery({
+    queryKey: ['ledger-transactions', 'search', searchQuery, effectiveYear, typeFilter, categoryFilter],
+    queryFn: () => searchLedgerTransactions(searchQuery, { ...listFilters, limit: SEARCH_LIMIT }),
+    enabled: searchQuery !== '' && yearAgg !== undefined,
+    placeholderData: (previous) => previous,
+  });
+
+  const isSearching = searchQuery !== '';
+  const filtered: LedgerTransaction[] = isSearching ? searchHits ?? [] : loadedItems;
+
+  const yearCount = (categoryAgg?.rows ?? []).reduce((s, r) => s + r.count, 0);
+  const listCount = (categoryAgg?.rows ?? [])
+    .filter(r => (typeFilter === '전체' || r.transaction_type === typeFilter)
+      && (categoryFilter === '전체' || r.category === categoryFilter))
+    .reduce((s, r) => s + r.count, 0);
 
   const categoryStats = useMemo(() => {
     const map: Record<string, number> = {};
-    yearFiltered.filter(i => i.transaction_type === '지출').forEach(i => {
-      const cat = i.category ?? '미분류';
-      map[cat] = (map[cat] ?? 0) + Math.abs(i.amount ?? 0);
+    (categoryAgg?.rows ?? []).filter(r => r.transaction_type === '지출').forEach(r => {
+      const cat = r.category ?? '미분류';
+      map[cat] = (map[cat] ?? 0) + r.abs_total;
     });
     return Object.entries(map)
       .map(([name, value]) => ({ name, value }))
       .sort((a, b) => b.value - a.value);
-  }, [yearFiltered]);
+  }, [categoryAgg]);
 
   const monthlyStats = useMemo(() => {
     const map: Record<string, { income: number; expense: number }> = {};
-    yearFiltered.forEach(i => {
-      if (!i.transaction_date) return;
-      const month = i.transaction_date.slice(0, 7);
+    (monthAgg?.rows ?? []).forEach(r => {
+      const month = r.period!.slice(0, 7);
       if (!map[month]) map[month] = { income: 0, expense: 0 };
-      if (i.transaction_type === '수입') map[month].income += Math.abs(i.amount ?? 0);
-      if (i.transaction_type === '지출') map[month].expense += Math.abs(i.amount ?? 0);
+      if (r.transaction_type === '수입') map[month].income += r.abs_total;
+      if (r.transaction_type === '지출') map[month].expense += r.abs_total;
     });
     return Object.entries(map)
       .sort((a, b) => a[0].localeCompare(b[0]))
       .map(([month, v]) => ({ month, ...v, net: v.income - v.expense }));
-  }, [yearFiltered]);
+  }, [monthAgg]);
 
-  const totalIncome = yearFiltered.filter(i => i.transaction_type === '수입').reduce((s, i) => s + Math.abs(i.amount ?? 0), 0);
-  const totalExpense = yearFiltered.filter(i => i.transaction_type === '지출').reduce((s, i) => s + Math.abs(i.amount ?? 0), 0);
+  const totalIncome = monthlyStats.reduce((s, m) => s + m.income, 0);
+  const totalExpense = monthlyStats.reduce((s, m) => s + m.expense, 0);
 
   const tabStyle = (key: Tab): React.CSSProperties => ({
     padding: 'var(--md-space-sm) var(--md-space-md)',
@@ -319,6 +356,22 @@ export default function LedgerPage() {
             <input type="file" accept=".xlsx,.xls" style={{ display: 'none' }} onChange={handleExcelImport} disabled={isImporting} />
             {isImporting ? '가져오는 중...' : '↑ Excel 가져오기'}
           </label>
+          {/* CSV 내보내기 (목록과 같은 연도 · 타입 · 대분류 조건) */}
+          <a
+            href={ledgerExportUrl('csv', listFilters)}
+            download
+            style={{
+              padding: 'var(--md-space-sm) var(--md-space-lg)',
+              borderRadius: 'var(--md-radius-full)',
+              border: '1px solid var(--md-sys-light-outline)',
+              color: 'var(--md-sys-light-primary)',
+              font: 'var(--md-label-large)',
+              textDecoration: 'none',
+              whiteSpace: 'nowrap',
+            }}
+          >
+            ↓ CSV 내보내기
+          </a>
           {importResult && (
             <span style={{ font: 'var(--md-label-small)', color: 'var(--md-sys-light-on-surface-variant)', whiteSpace: 'nowrap' }}>
               신규 {importResult.inserted}건 · 중복 {importResult.skipped}건
@@ -356,7 +409,7 @@ export default function LedgerPage() {
       {/* 요약 카드 */}
       <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(160px, 1fr))', gap: 'var(--md-space-md)' }}>
         {[
-          { label: '총 거래 건수', value: `${yearFiltered.length.toLocaleString()}건`, color: undefined },
+          { label: '총 거래 건수', value: `${yearCount.toLocaleString()}건`, color: undefined },
           { label: '총 수입', value: `₩${fmt(totalIncome)}`, color: '#1a7f37' },
           { label: '총 지출', value: `₩${fmt(totalExpense)}`, color: '#ba1a1a' },
           { label: '순수익', value: `${totalIncome - totalExpense >= 0 ? '+' : ''}₩${fmt(Math.abs(totalIncome - totalExpense))}`, color: totalIncome - totalExpense >= 0 ? '#1a7f37' : '#ba1a1a' },
@@ -393,13 +446,13 @@ export default function LedgerPage() {
                 {categories.map(c => <option key={c}>{c}</option>)}
               </select>
               <input
-                placeholder="검색..."
+                placeholder="내용 · 분류 · 결제수단 검색..."
                 value={searchText}
                 onChange={e => setSearchText(e.target.value)}
                 style={{ padding: '5px 8px', borderRadius: 'var(--md-radius-sm)', border: '1px solid var(--md-sys-light-outline-variant)', font: 'var(--md-body-small)', backgroundColor: 'var(--md-sys-light-surface-container-high)', color: 'var(--md-sys-light-on-surface)', outline: 'none', width: 140 }}
               />
               <span style={{ font: 'var(--md-label-small)', color: 'var(--md-sys-light-on-surface-variant)' }}>
-                {filtered.length.toLocaleString()}건
+                {(isSearching ? filtered.length : listCount).toLocaleString()}건
               </span>
             </div>
           )}
@@ -419,7 +472,7 @@ export default function LedgerPage() {
                   </tr>
                 </thead>
                 <tbody>
-                  {filtered.slice(0, 200).map(item => (
+                  {filtered.map(item => (
                     <tr key={item.id}
                       onMouseEnter={e => (e.currentTarget.style.backgroundColor = 'color-mix(in srgb, var(--md-sys-light-on-surface) 4%, transparent)')}
                       onMouseLeave={e => (e.currentTarget.style.backgroundColor = 'transparent')}
@@ -462,9 +515,15 @@ export default function LedgerPage() {
                   데이터가 없습니다.
                 </div>
               )}
-              {filtered.length > 200 && (
-                <div style={{ textAlign: 'center', padding: 'var(--md-space-md)', font: 'var(--md-body-small)', color: 'var(--md-sys-light-on-surface-variant)' }}>
-                  200건 표시 중 (전체 {filtered.length.toLocaleString()}건)
+              {hasNextPage && !isSearching && (
+                <div style={{ textAlign: 'center', padding: 'var(--md-space-md)' }}>
+                  <button
+                    onClick={() => fetchNextPage()}
+                    disabled={isFetchingNextPage}
+                    style={{ padding: '6px 16px', borderRadius: 'var(--md-radius-full)', border: '1px solid var(--md-sys-light-outline-variant)', background: 'transparent', font: 'var(--md-label-large)', cursor: isFetchingNextPage ? 'wait' : 'pointer', color: 'var(--md-sys-light-primary)' }}
+                  >
+                    {isFetchingNextPage ? '불러오는 중...' : `더 보기 (${loadedItems.length.toLocaleString()} / ${listCount.toLocaleString()}건)`}
+                  </button>
                 </div>
               )}
             </div>
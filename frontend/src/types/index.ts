@@ -272,6 +272,30 @@ export interface LedgerTransactionCreate {
 
 export interface LedgerTransactionUpdate extends LedgerTransactionCreate {}
 
+export interface LedgerSearchHit extends LedgerTransaction {
+  score: number;  // 부분 일치 1 + 유사도(0~1), 클수록 앞
+}
+
+export type LedgerAggregatePeriod = 'day' | 'week' | 'month' | 'year';
+export type LedgerAggregateDimension = 'transaction_type' | 'category' | 'subcategory' | 'payment_method';
+
+export interface LedgerAggregateRow {
+  period: string | null;  // 기간 시작일 (YYYY-MM-DD)
+  transaction_type: string | null;
+  category: string | null;
+  subcategory: string | null;
+  payment_method: string | null;
+  total: number;
+  abs_total: number;
+  count: number;
+}
+
+export interface LedgerAggregateResponse {
+  period: LedgerAggregatePeriod | null;
+  group_by: LedgerAggregateDimension[];
+  rows: LedgerAggregateRow[];
+}
+
 export interface FinancialSnapshotItem {
   name: string;
   amount: number;
@@ -307,6 +331,10 @@ export interface UploadHistory {
   id: number;
   filename: string;
   file_size: number | null;
+  import_kind: 'banksalad' | 'banksalad_archive' | 'ledger' | null;
+  content_sha256: string | null;
+  ledger_source: string | null;
+  ledger_high_water: string | null;
   result_json: Record<string, any> | null;
   created_at: string;
 }